@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
-from typing import List, Optional
+from typing import List, Optional, Dict
 from functools import lru_cache
 import os
 
@@ -43,6 +43,11 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30  # 30 días por defecto
     ACCESS_TOKEN_EXPIRE_MINUTES_NEW: int = 60  # 1 hora para access tokens nuevos
     REFRESH_TOKEN_ROTATION: bool = True  # Rotar refresh tokens en cada renovación
+    # Particiones mensuales creadas por adelantado (PostgreSQL)
+    REFRESH_TOKEN_PARTITION_MONTHS_AHEAD: int = 2
+    # Caché negativa en memoria de tokens revocados/rotados por worker
+    REFRESH_TOKEN_REVOKED_CACHE_SIZE: int = 100_000
+    REFRESH_TOKEN_REVOKED_CACHE_TTL_SECONDS: float = 86400
 
     # Clave de encriptación para datos sensibles (se toma del .env)
     ENCRYPTION_KEY: str
@@ -53,6 +58,31 @@ class Settings(BaseSettings):
 
     STATIC_URL_PREFIX: str = "http://localhost:8000/static/uploads"
 
+    # Subida de archivos por bloques: tamaño de bloque, máximo general y
+    # miniaturas en segundo plano (requieren Pillow)
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+    UPLOAD_MAX_FILE_SIZE: int = 10 * 1024 * 1024
+    UPLOAD_THUMBNAILS_ENABLED: bool = False
+    UPLOAD_THUMBNAIL_MAX_PX: int = 320
+
+    # Almacenamiento por contenido: "local" (STORAGE_LOCAL_ROOT, servido por
+    # nginx) o "s3" (bucket S3 o compatible, requiere boto3)
+    STORAGE_BACKEND: str = "local"
+    STORAGE_LOCAL_ROOT: str = "static/uploads"
+    STORAGE_STAGING_DIR: str = "static/uploads/tmp"
+    STORAGE_PUBLIC_URL: Optional[str] = None  # Por defecto STATIC_URL_PREFIX
+    # Secreto de las URL firmadas (secure_link de nginx); distinto de SECRET_KEY.
+    # Sin él las URL públicas funcionan pero signed_url falla
+    STORAGE_URL_SECRET: Optional[str] = None
+    STORAGE_SIGNED_URL_TTL: int = 3600
+    STORAGE_GC_SECONDS: float = 3600
+    STORAGE_GC_GRACE_SECONDS: float = 86400  # Archivos sin referencias se borran tras 1 día
+    S3_BUCKET: Optional[str] = None
+    S3_ENDPOINT_URL: Optional[str] = None  # MinIO, R2, etc.
+    S3_REGION: Optional[str] = None
+    S3_ACCESS_KEY_ID: Optional[str] = None
+    S3_SECRET_ACCESS_KEY: Optional[str] = None
+
     # Configuración de Google Maps
     GOOGLE_API_KEY: str
 
@@ -64,6 +94,65 @@ class Settings(BaseSettings):
     FIREBASE_CLIENT_ID: Optional[str] = None
     FIREBASE_CLIENT_CERT_URL: Optional[str] = None
 
+    # Configuración de logging
+    LOG_LEVEL: str = "INFO"
+    # Niveles por módulo, p. ej. {"app.services.chat_service": "DEBUG"}
+    LOG_LEVELS: Dict[str, str] = {}
+    LOG_FORMAT: str = "json"  # "json" o "text"
+    LOG_DEBUG_SAMPLE_RATE: float = 1.0  # Fracción de registros DEBUG que se emiten
+
+    # Despacho de notificaciones push
+    PUSH_CLIENT_BACKEND: str = "firebase"  # "firebase" o "fake" (tests/benchmarks)
+    PUSH_DISPATCH_WORKERS: int = 2
+    PUSH_DISPATCH_LINGER_MS: int = 20  # Ventana para agrupar mensajes en lotes
+
+    # Redis (invalidación de caché entre workers)
+    REDIS_URL: Optional[str] = None
+
+    # Caché de configuración (ProjectSettings, ConfigServiceValue, TypeService)
+    CONFIG_CACHE_TTL_SECONDS: int = 300
+    CONFIG_CACHE_BACKEND: str = "local"  # "local" (un solo proceso) o "redis"
+    CONFIG_CACHE_CHANNEL: str = "milla99:config-cache"
+
+    # Vista de ofertas por solicitud: se reutiliza mientras no cambien las
+    # ofertas, y se recalcula pasado este tiempo para refrescar los ETA
+    OFFER_VIEW_CACHE_TTL_SECONDS: int = 20
+
+    # Motor de ETA (conductor asignado → punto de recogida)
+    ETA_TRACKING_ENABLED: bool = True
+    ETA_TICK_SECONDS: float = 5
+    ETA_MOVE_THRESHOLD_METERS: float = 75
+    ETA_MAX_AGE_SECONDS: float = 30
+    ETA_ROUTE_REFRESH_SECONDS: float = 90
+    ETA_MAX_ROUTE_CALLS_PER_TICK: int = 20
+    ETA_CHANNEL: str = "milla99:eta"  # Con SIO_MANAGER=redis, ETA del líder a los demás workers
+
+    # Feed de solicitudes cercanas por socket: segundos sin reportar posición
+    # tras los cuales el conductor deja de recibir solicitudes
+    DISPATCH_DRIVER_TTL_SECONDS: float = 120
+    DISPATCH_FEED_CHANNEL: str = "milla99:dispatch-feed"
+
+    # Socket.IO: "memory" (un solo proceso) o "redis" (varios workers)
+    SIO_MANAGER: str = "memory"
+    SIO_REDIS_URL: Optional[str] = None  # Por defecto REDIS_URL
+    SIO_CHANNEL: str = "milla99:socketio"
+
+    # Jobs de mantenimiento (un solo worker los ejecuta)
+    MAINTENANCE_ENABLED: bool = True
+    MAINTENANCE_JITTER: float = 0.1  # Variación aleatoria del intervalo (±10%)
+    SUSPENSION_SWEEP_SECONDS: float = 300
+    DOCUMENT_EXPIRY_SWEEP_SECONDS: float = 3600
+    REFRESH_TOKEN_CLEANUP_SECONDS: float = 3600
+    # Corrección de los contadores del tablero de verificación contra la base
+    VERIFICATION_COUNTERS_RECONCILE_SECONDS: float = 900
+
+    # Vencimiento de solicitudes sin conductor (request_timeout_minutes de
+    # project_settings): ciclo en memoria por worker y barrido de respaldo
+    REQUEST_EXPIRY_ENABLED: bool = True
+    REQUEST_EXPIRY_TICK_SECONDS: float = 5
+    REQUEST_EXPIRY_BATCH_SIZE: int = 500
+    REQUEST_EXPIRY_SWEEP_SECONDS: float = 300
+
     model_config = ConfigDict(
         env_file=".env",  # Por defecto, pero se sobreescribe abajo
         case_sensitive=True,
@@ -13,6 +13,9 @@ from app.models import (
     DriverSavings, Transaction, VerifyMount, TypeService, ConfigServiceValue,
     AdminLog, Administrador
 )
+import logging
+
+logger = logging.getLogger(__name__)
 
 # ============================================================================
 # CONFIGURACIÓN DE BASE DE DATOS DINÁMICA
@@ -45,19 +48,20 @@ def validate_database_environment():
             raise ValueError(
                 " ERROR: QA no puede usar la base de datos de desarrollo")
 
-    print(f" Conectando a base de datos para entorno: {environment}")
-    print(f" URL de base de datos: {get_database_url()}")
+    logger.debug(" Conectando a base de datos para entorno: %s", environment)
+    logger.debug(" URL de base de datos: %s", get_database_url())
 
 
 # Crear el engine con la URL dinámica
 engine = create_engine(get_database_url(), echo=False)
 
 
-def create_all_tables():
-    """Crea todas las tablas en la base de datos"""
+def migrate_database():
+    """Aplica las migraciones de esquema pendientes (app/core/migrations)"""
     validate_database_environment()
-    SQLModel.metadata.create_all(engine)
-    print(f" Tablas creadas en entorno: {settings.environment_name}")
+    from app.core.migrations import run_migrations
+    run_migrations(engine)
+    logger.debug(" Esquema migrado en entorno: %s", settings.environment_name)
 
 
 def get_session():
@@ -86,11 +90,13 @@ def is_safe_for_data_initialization() -> bool:
     force_init = os.getenv("FORCE_INIT_DATA", "false").lower() == "true"
 
     if environment == "qa" and force_init:
-        print("  ADVERTENCIA: Inicializando datos en QA con FORCE_INIT_DATA=true")
+        logger.warning(
+            "  ADVERTENCIA: Inicializando datos en QA con FORCE_INIT_DATA=true")
         return True
 
     if environment == "production" and force_init:
-        print("  ADVERTENCIA: Inicializando datos en producción con FORCE_INIT_DATA=true")
+        logger.warning(
+            "  ADVERTENCIA: Inicializando datos en producción con FORCE_INIT_DATA=true")
         return True
 
     return False
@@ -55,3 +55,23 @@ def get_current_user(request: Request, session: SessionDep, credentials: HTTPAut
         return user
     except JWTError:
         raise credentials_exception
+
+
+def user_id_from_token(token: str):
+    """
+    user_id (sub) de un access token válido, o None si el token es inválido,
+    expiró o pertenece a un administrador. No consulta la base de datos
+    (se usa al autenticar conexiones de socket).
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY,
+                             algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    if not user_id or payload.get("role") == AdminRole.BASIC.value:
+        return None
+    try:
+        return UUID(user_id)
+    except ValueError:
+        return None
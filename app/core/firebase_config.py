@@ -1,6 +1,9 @@
 import firebase_admin
 from firebase_admin import credentials
 from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def initialize_firebase():
@@ -17,9 +20,9 @@ def initialize_firebase():
         ]
 
         if not all(required_vars):
-            print(
+            logger.warning(
                 "⚠️ Firebase no configurado - las notificaciones push estarán deshabilitadas")
-            print(
+            logger.info(
                 "   Para habilitar notificaciones push, configura las variables FIREBASE_* en tu .env")
             return
 
@@ -34,10 +37,10 @@ def initialize_firebase():
                 "client_x509_cert_url": settings.FIREBASE_CLIENT_CERT_URL,
             })
             firebase_admin.initialize_app(cred)
-            print("✅ Firebase Admin SDK inicializado correctamente")
+            logger.info("✅ Firebase Admin SDK inicializado correctamente")
         except Exception as e:
-            print(f"❌ Error inicializando Firebase: {e}")
-            print("   Las notificaciones push estarán deshabilitadas")
+            logger.error("❌ Error inicializando Firebase: %s", e)
+            logger.info("   Las notificaciones push estarán deshabilitadas")
 
 
 # Llama a la función al importar el módulo
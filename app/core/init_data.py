@@ -20,6 +20,7 @@ import shutil
 import os
 from app.models.config_service_value import ConfigServiceValue
 from app.services.type_service_service import TypeServiceService
+from app.services.config_cache_service import get_config_cache
 from app.models.type_service import TypeService
 from app.models.client_request import ClientRequest, StatusEnum
 from app.models.driver_position import DriverPosition
@@ -34,6 +35,9 @@ import random
 from app.models.bank import Bank
 import traceback
 from app.core.db import is_safe_for_data_initialization, get_environment_info
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def uuid_prueba(num: int) -> UUID:
@@ -236,7 +240,7 @@ def create_admin(session: Session):
         session.add(admin)
 
     session.commit()
-    print("✅ Admins creados con roles jerárquicos")
+    logger.info("✅ Admins creados con roles jerárquicos")
 
 
 # ============================================================================
@@ -390,9 +394,10 @@ def create_all_users(session: Session):
             drivers.append(user)
 
     session.commit()
-    print(f"✅ Creados {len(clients)} clientes y {len(drivers)} conductores")
-    print(
-        f"DEBUG: Lista de clientes creados: {[c.phone_number for c in clients]}")
+    logger.info(
+        "✅ Creados %s clientes y %s conductores", len(clients), len(drivers))
+    logger.debug(
+        "DEBUG: Lista de clientes creados: %s", [c.phone_number for c in clients])
     return {'clients': clients, 'drivers': drivers}
 
 
@@ -582,8 +587,8 @@ def create_all_drivers(session: Session, users):
         completed_drivers.append(user)
 
     session.commit()
-    print(
-        f"✅ Configurados {len(completed_drivers)} conductores con documentos, transacciones y montos")
+    logger.info(
+        "✅ Configurados %s conductores con documentos, transacciones y montos", len(completed_drivers))
     return completed_drivers
 
 
@@ -717,7 +722,8 @@ def create_client_requests(session: Session, users, drivers):
     for req in requests:
         session.refresh(req)
 
-    print(f"✅ Creadas {len(requests)} solicitudes específicas para pruebas")
+    logger.info(
+        "✅ Creadas %s solicitudes específicas para pruebas", len(requests))
     return requests
 
 
@@ -773,7 +779,7 @@ def create_driver_offers(session: Session, drivers, requests):
                 offers_created += 1
 
     session.commit()
-    print(f"✅ Creadas {offers_created} ofertas de conductores")
+    logger.info("✅ Creadas %s ofertas de conductores", offers_created)
 
 
 def complete_some_requests(session: Session, drivers, requests):
@@ -870,7 +876,8 @@ def complete_some_requests(session: Session, drivers, requests):
             completed_count += 1
 
     session.commit()
-    print(f"✅ Completadas {completed_count} solicitudes con estado PAID")
+    logger.info(
+        "✅ Completadas %s solicitudes con estado PAID", completed_count)
 
 
 def init_referral_data(session: Session, users):
@@ -914,7 +921,7 @@ def init_referral_data(session: Session, users):
             session.add(referral)
 
     session.commit()
-    print("✅ Datos de referidos inicializados")
+    logger.info("✅ Datos de referidos inicializados")
 
 
 def create_driver_positions(session: Session, drivers):
@@ -944,7 +951,7 @@ def create_driver_positions(session: Session, drivers):
             session.merge(position)
 
     session.commit()
-    print("✅ Posiciones de conductores creadas")
+    logger.info("✅ Posiciones de conductores creadas")
 
 
 def init_banks(session: Session):
@@ -975,7 +982,7 @@ def init_banks(session: Session):
             session.add(bank)
 
     session.commit()
-    print("✅ Bancos inicializados")
+    logger.info("✅ Bancos inicializados")
 
 
 # ============================================================================
@@ -989,94 +996,100 @@ def init_data():
     env_info = get_environment_info()
     environment = env_info["environment"]
 
-    print(f"🚀 Iniciando inicialización de datos en entorno: {environment}")
-    print(f"📊 Base de datos: {env_info['database_url']}")
+    logger.info(
+        "🚀 Iniciando inicialización de datos en entorno: %s", environment)
+    logger.info("📊 Base de datos: %s", env_info['database_url'])
 
     # Validar si es seguro inicializar datos
     if not is_safe_for_data_initialization():
-        print(
-            f"❌ INICIALIZACIÓN BLOQUEADA: No es seguro inicializar datos en entorno '{environment}'")
-        print("💡 Para forzar la inicialización, establece FORCE_INIT_DATA=true")
-        print("💡 Solo se permite inicialización automática en entorno 'development'")
+        logger.error(
+            "❌ INICIALIZACIÓN BLOQUEADA: No es seguro inicializar datos en entorno '%s'", environment)
+        logger.info(
+            "💡 Para forzar la inicialización, establece FORCE_INIT_DATA=true")
+        logger.info(
+            "💡 Solo se permite inicialización automática en entorno 'development'")
         return
 
-    print(f"✅ Inicialización permitida en entorno: {environment}")
+    logger.info("✅ Inicialización permitida en entorno: %s", environment)
 
     session = Session(engine)
 
     try:
         # 1. Inicializar roles
-        print("📋 Inicializando roles...")
+        logger.info("📋 Inicializando roles...")
         init_roles()
 
         # 2. Inicializar tipos de documentos
-        print("📄 Inicializando tipos de documentos...")
+        logger.info("📄 Inicializando tipos de documentos...")
         init_document_types()
 
         # 3. Inicializar tipos de vehículos
-        print("🚗 Inicializando tipos de vehículos...")
+        logger.info("🚗 Inicializando tipos de vehículos...")
         init_vehicle_types(engine)
 
         # 4. Inicializar tipos de servicio
-        print("🔧 Inicializando tipos de servicio...")
+        logger.info("🔧 Inicializando tipos de servicio...")
         type_service_service = TypeServiceService(session)
         type_service_service.init_default_types()
 
         # 5. Inicializar valores de tiempo y distancia
-        print("⏱️ Inicializando valores de tiempo y distancia...")
+        logger.info("⏱️ Inicializando valores de tiempo y distancia...")
         init_time_distance_values(engine)
 
         # 6. Inicializar configuración del proyecto
-        print("⚙️ Inicializando configuración del proyecto...")
+        logger.info("⚙️ Inicializando configuración del proyecto...")
         init_project_settings()
 
+        # La configuración se acaba de sembrar: descartar lo que hubiera en caché
+        get_config_cache().invalidate()
+
         # 7. Inicializar métodos de pago
-        print("💳 Inicializando métodos de pago...")
+        logger.info("💳 Inicializando métodos de pago...")
         init_payment_methods(session)
 
         # 8. Inicializar bancos
-        print("🏦 Inicializando bancos...")
+        logger.info("🏦 Inicializando bancos...")
         init_banks(session)
 
         # 9. Crear admin
-        print("👨‍💼 Creando administrador...")
+        logger.info("👨‍💼 Creando administrador...")
         create_admin(session)
 
         # 10. Crear usuarios
-        print("👥 Creando usuarios...")
+        logger.info("👥 Creando usuarios...")
         users = create_all_users(session)
 
         # 11. Crear conductores
-        print("🚕 Creando conductores...")
+        logger.info("🚕 Creando conductores...")
         create_all_drivers(session, users)
 
         # 12. Crear solicitudes de clientes
-        print("📝 Creando solicitudes de clientes...")
+        logger.info("📝 Creando solicitudes de clientes...")
         requests = create_client_requests(session, users, users['drivers'])
 
         # 13. Crear ofertas de conductores
-        print("💰 Creando ofertas de conductores...")
+        logger.info("💰 Creando ofertas de conductores...")
         create_driver_offers(session, users['drivers'], requests)
 
         # 15. Inicializar datos de referidos
-        print("🔗 Inicializando datos de referidos...")
+        logger.info("🔗 Inicializando datos de referidos...")
         init_referral_data(session, users)
 
         # 14. Completar algunas solicitudes
-        print("✅ Completando solicitudes...")
+        logger.info("✅ Completando solicitudes...")
         complete_some_requests(session, users['drivers'], requests)
 
         # 16. Crear posiciones de conductores
-        print("📍 Creando posiciones de conductores...")
+        logger.info("📍 Creando posiciones de conductores...")
         create_driver_positions(session, users['drivers'])
 
-        print(
-            f"🎉 Inicialización de datos completada exitosamente en entorno: {environment}")
+        logger.info(
+            "🎉 Inicialización de datos completada exitosamente en entorno: %s", environment)
 
     except Exception as e:
-        print(
-            f"❌ Error en la inicialización en entorno {environment}:", str(e))
-        print(traceback.format_exc())
+        logger.error(
+            "❌ Error en la inicialización en entorno %s: %s", environment, str(e))
+        logger.error("Traceback:", exc_info=True)
         raise
     finally:
         session.close()
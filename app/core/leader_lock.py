@@ -0,0 +1,90 @@
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection, Engine
+from typing import Optional
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """
+    Elige un único worker para una tarea de fondo con un advisory lock de
+    sesión de PostgreSQL. El lock se mantiene mientras viva la conexión: si el
+    worker líder termina, otro lo toma en su siguiente intento.
+    En otros motores (tests) siempre se considera líder.
+    Es seguro llamarlo desde varios hilos (los jobs corren con to_thread).
+    """
+
+    def __init__(self, key: int, engine: Optional[Engine] = None):
+        self.key = key
+        self._engine = engine
+        self._conn: Optional[Connection] = None
+        self._mutex = threading.Lock()
+
+    @property
+    def engine(self) -> Engine:
+        if self._engine is None:
+            from app.core.db import engine
+            self._engine = engine
+        return self._engine
+
+    def acquire(self) -> bool:
+        """
+        Retorna True si este proceso es (o acaba de convertirse en) líder.
+        """
+        if self.engine.dialect.name != "postgresql":
+            return True
+        with self._mutex:
+            if self._conn is not None:
+                return self._still_held()
+            return self._try_acquire()
+
+    def _still_held(self) -> bool:
+        """
+        Comprueba que la conexión del lock siga viva. Si se cayó, el lock ya
+        se liberó en el servidor y otro worker puede haberlo tomado.
+        """
+        try:
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            return True
+        except Exception as e:
+            logger.warning("Se perdió la conexión del lock de líder %s: %s", self.key, e)
+            self._discard()
+            return False
+
+    def _discard(self) -> None:
+        try:
+            self._conn.invalidate()
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def _try_acquire(self) -> bool:
+        conn = self.engine.connect()
+        try:
+            acquired = conn.execute(
+                select(func.pg_try_advisory_lock(self.key))).scalar()
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not acquired:
+            conn.close()
+            return False
+        self._conn = conn
+        logger.info("Lock de líder %s adquirido", self.key)
+        return True
+
+    def release(self) -> None:
+        with self._mutex:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(select(func.pg_advisory_unlock(self.key)))
+                self._conn.commit()
+            finally:
+                self._conn.close()
+                self._conn = None
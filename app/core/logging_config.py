@@ -0,0 +1,114 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+# Atributos estándar de LogRecord que no se copian como campos extra en JSON
+_RESERVED_ATTRS = set(vars(logging.LogRecord(
+    "", logging.INFO, "", 0, "", (), None)).keys()) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formatea cada registro como una línea JSON con timestamp, nivel, logger,
+    mensaje y los campos pasados en `extra`.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class DebugSamplingFilter(logging.Filter):
+    """
+    Deja pasar solo una fracción de los registros DEBUG (sample_rate entre 0 y 1).
+    Los niveles INFO y superiores siempre pasan.
+    """
+
+    def __init__(self, sample_rate: float = 1.0):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.sample_rate >= 1.0:
+            return True
+        return random.random() < self.sample_rate
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    module_levels: Optional[Dict[str, str]] = None,
+    log_format: Optional[str] = None,
+    debug_sample_rate: Optional[float] = None,
+) -> None:
+    """
+    Configura el logging de la aplicación:
+    - Nivel raíz (LOG_LEVEL, INFO por defecto) y niveles por módulo (LOG_LEVELS).
+    - Salida JSON o texto (LOG_FORMAT).
+    - Muestreo de registros DEBUG (LOG_DEBUG_SAMPLE_RATE).
+    - Escritura no bloqueante: los handlers de la app solo encolan y un hilo
+      (QueueListener) escribe en stdout.
+    """
+    global _listener
+
+    level = level or settings.LOG_LEVEL
+    module_levels = settings.LOG_LEVELS if module_levels is None else module_levels
+    log_format = log_format or settings.LOG_FORMAT
+    debug_sample_rate = settings.LOG_DEBUG_SAMPLE_RATE if debug_sample_rate is None else debug_sample_rate
+
+    stop_logging()
+
+    stream_handler = logging.StreamHandler()
+    if log_format == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(DebugSamplingFilter(debug_sample_rate))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper())
+
+    for module, module_level in (module_levels or {}).items():
+        logging.getLogger(module).setLevel(module_level.upper())
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """
+    Vacía la cola de logs pendientes y detiene el hilo escritor.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
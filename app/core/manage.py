@@ -0,0 +1,38 @@
+"""
+Tareas de mantenimiento de datos derivados.
+
+Uso:
+    python -m app.core.manage rebuild-rating-summary [--user-id UUID]
+"""
+
+import argparse
+import sys
+from uuid import UUID
+
+from sqlmodel import Session
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.core.manage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    rating_parser = subparsers.add_parser(
+        "rebuild-rating-summary",
+        help="Recalcula rating_summary desde los viajes PAID calificados")
+    rating_parser.add_argument("--user-id", type=UUID, default=None,
+                               help="Recalcular solo este usuario")
+    args = parser.parse_args()
+
+    from app.core.db import engine
+    import app.models  # noqa: F401  (registra todos los modelos)
+
+    if args.command == "rebuild-rating-summary":
+        from app.services.rating_summary_service import rebuild_rating_summaries
+
+        with Session(engine) as session:
+            total = rebuild_rating_summaries(session, args.user_id)
+        print(f"Filas de rating_summary generadas: {total}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
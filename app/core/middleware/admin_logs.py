@@ -6,6 +6,9 @@ from starlette.types import ASGIApp
 
 from app.models.admin_log import AdminActionType, LogSeverity
 from app.models.administrador import Administrador
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class AdminLogMiddleware(BaseHTTPMiddleware):
@@ -90,11 +93,11 @@ class AdminLogMiddleware(BaseHTTPMiddleware):
 
                 except Exception as e:
                     # No fallar la request si el logging falla
-                    print(f"Error en AdminLogMiddleware: {str(e)}")
+                    logger.error("Error en AdminLogMiddleware: %s", str(e))
         else:
             # Endpoint tiene decorador específico, no crear log automático
-            print(
-                f"Endpoint {path} tiene decorador específico, omitiendo log automático")
+            logger.debug(
+                "Endpoint %s tiene decorador específico, omitiendo log automático", path)
 
         # Continuar con la request
         response = await call_next(request)
@@ -224,7 +227,7 @@ class AdminLogMiddleware(BaseHTTPMiddleware):
             # Por ahora retornamos None para evitar errores
             return None
         except Exception as e:
-            print(f"Error obteniendo admin: {str(e)}")
+            logger.error("Error obteniendo admin: %s", str(e))
             return None
 
     async def _create_admin_log(
@@ -257,14 +260,14 @@ class AdminLogMiddleware(BaseHTTPMiddleware):
 
                     # Por ahora solo imprimimos para debug
             # En producción, usarías el servicio real de logs
-            print(
-                f"ADMIN LOG: {admin_id} - {action_type.value} - {severity.value} - {description}")
+            logger.debug(
+                "ADMIN LOG: %s - %s - %s - %s", admin_id, action_type.value, severity.value, description)
 
         except Exception as e:
-            print(f"❌ Error al crear admin log: {str(e)}")
+            logger.error("❌ Error al crear admin log: %s", str(e))
             # Fallback: solo imprimir si falla el servicio
-            print(
-                f"ADMIN LOG (FALLBACK): {admin_id} - {action_type.value} - {severity.value} - {description}")
+            logger.debug(
+                "ADMIN LOG (FALLBACK): %s - %s - %s - %s", admin_id, action_type.value, severity.value, description)
 
 
 def create_admin_log_middleware(app: ASGIApp) -> AdminLogMiddleware:
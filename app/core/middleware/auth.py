@@ -4,6 +4,9 @@ from starlette.responses import JSONResponse
 from jose import jwt, JWTError
 from app.core.config import settings
 from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class JWTAuthMiddleware(BaseHTTPMiddleware):
@@ -54,41 +57,38 @@ class JWTAuthMiddleware(BaseHTTPMiddleware):
         if is_public:
             return await call_next(request)
 
-        # Para el resto de rutas, verificar token
+        # Para el resto de rutas, verificar token. Nunca se registran el
+        # header, el token ni su payload: los logs no deben tener credenciales
         try:
             auth_header = request.headers.get("Authorization")
-            print(
-                f"🔍 DEBUG MIDDLEWARE: Ruta: {request.url.path}, Auth header: {auth_header}")
 
             if not auth_header or not auth_header.startswith("Bearer "):
-                print(f"❌ DEBUG MIDDLEWARE: No hay Authorization header válido")
+                logger.debug(
+                    "401 sin Authorization header válido: %s %s", request.method, request.url.path)
                 return JSONResponse(
                     status_code=401,
                     content={"detail": "No se proporcionó token de autenticación"}
                 )
 
             token = auth_header.split(" ")[1]
-            print(f"🔍 DEBUG MIDDLEWARE: Token extraído: {token[:20]}...")
-
             payload = jwt.decode(token, settings.SECRET_KEY,
                                  algorithms=[settings.ALGORITHM])
-            print(f"🔍 DEBUG MIDDLEWARE: Payload decodificado: {payload}")
 
             user_id = payload.get("sub")
-            print(f"🔍 DEBUG MIDDLEWARE: User ID extraído: {user_id}")
-
             if not user_id:
-                print(f"❌ DEBUG MIDDLEWARE: No hay user_id en el token")
+                logger.debug(
+                    "401 token sin user_id: %s %s", request.method, request.url.path)
                 return JSONResponse(
                     status_code=401,
                     content={"detail": "Token inválido"}
                 )
 
             request.state.user_id = UUID(user_id)
-            print(
-                f"✅ DEBUG MIDDLEWARE: User ID asignado a request.state: {request.state.user_id}")
+            logger.debug("Ruta %s autenticada para %s", request.url.path, request.state.user_id)
 
         except JWTError:
+            logger.debug(
+                "401 token inválido o expirado: %s %s", request.method, request.url.path)
             return JSONResponse(
                 status_code=401,
                 content={"detail": "Token inválido o expirado"}
@@ -0,0 +1,4 @@
+# Migraciones de esquema versionadas (reemplazan create_all al arrancar)
+from app.core.migrations.runner import run_migrations, migration_status, discover_migrations
+
+__all__ = ["run_migrations", "migration_status", "discover_migrations"]
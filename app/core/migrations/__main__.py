@@ -0,0 +1,37 @@
+"""
+Línea de comandos de migraciones.
+
+Uso:
+    python -m app.core.migrations upgrade [--target N]
+    python -m app.core.migrations status
+"""
+
+import argparse
+import sys
+
+from app.core.migrations.runner import migration_status, run_migrations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.core.migrations")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = subparsers.add_parser(
+        "upgrade", help="Aplica las migraciones pendientes")
+    upgrade_parser.add_argument("--target", type=int, default=None,
+                                help="Última versión a aplicar")
+    subparsers.add_parser("status", help="Muestra el estado de cada migración")
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = run_migrations(target=args.target)
+        print(f"Migraciones aplicadas: {applied or 'ninguna'}")
+        return 0
+
+    for item in migration_status():
+        state = item["applied_at"].isoformat() if item["applied_at"] else "pendiente"
+        print(f"{item['version']:04d}  {state:<32}  {item['description']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""
+Reporte de índices para PostgreSQL a partir de las estadísticas del servidor.
+
+- Sin uso: índices secundarios (no primarios ni únicos) con idx_scan = 0
+  desde el último reinicio de estadísticas.
+- Faltantes:
+  * índices declarados en los modelos que no existen en la base
+    (migraciones sin aplicar);
+  * llaves foráneas cuya columna no es la primera de ningún índice;
+  * tablas donde predominan los recorridos secuenciales sobre tablas grandes.
+
+Uso:
+    python -m app.core.migrations.index_report [--min-rows 10000] [--json]
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import SQLModel
+
+from app.core.migrations.runner import load_models
+
+UNUSED_INDEXES_SQL = text("""
+    SELECT s.relname AS table_name,
+           s.indexrelname AS index_name,
+           s.idx_scan AS scans,
+           pg_relation_size(s.indexrelid) AS size_bytes
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    WHERE s.idx_scan = 0
+      AND NOT i.indisprimary
+      AND NOT i.indisunique
+    ORDER BY pg_relation_size(s.indexrelid) DESC
+""")
+
+UNINDEXED_FOREIGN_KEYS_SQL = text("""
+    SELECT c.conrelid::regclass::text AS table_name,
+           a.attname AS column_name,
+           c.conname AS constraint_name
+    FROM pg_constraint c
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+    WHERE c.contype = 'f'
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_index i
+          WHERE i.indrelid = c.conrelid AND i.indkey[0] = c.conkey[1]
+      )
+    ORDER BY 1, 2
+""")
+
+SEQ_SCAN_TABLES_SQL = text("""
+    SELECT relname AS table_name,
+           seq_scan,
+           seq_tup_read,
+           COALESCE(idx_scan, 0) AS idx_scan,
+           n_live_tup AS live_rows
+    FROM pg_stat_user_tables
+    WHERE n_live_tup >= :min_rows
+      AND seq_scan > COALESCE(idx_scan, 0)
+    ORDER BY seq_tup_read DESC
+""")
+
+EXISTING_INDEXES_SQL = text("""
+    SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()
+""")
+
+
+def declared_indexes() -> Dict[str, str]:
+    """
+    Índices con nombre declarados en los modelos: {nombre: tabla}.
+    """
+    load_models()
+    return {
+        index.name: table.name
+        for table in SQLModel.metadata.tables.values()
+        for index in table.indexes
+        if index.name
+    }
+
+
+def build_report(conn: Connection, min_rows: int = 10_000) -> Dict[str, List[dict]]:
+    if conn.dialect.name != "postgresql":
+        raise ValueError(
+            "El reporte de índices requiere PostgreSQL (usa pg_stat_*)")
+
+    existing = {row.indexname for row in conn.execute(EXISTING_INDEXES_SQL)}
+    missing_declared = [
+        {"table_name": table_name, "index_name": index_name}
+        for index_name, table_name in sorted(declared_indexes().items())
+        if index_name not in existing
+    ]
+    return {
+        "unused": [dict(row._mapping) for row in conn.execute(UNUSED_INDEXES_SQL)],
+        "missing_declared": missing_declared,
+        "unindexed_foreign_keys": [
+            dict(row._mapping) for row in conn.execute(UNINDEXED_FOREIGN_KEYS_SQL)],
+        "seq_scan_heavy": [
+            dict(row._mapping) for row in conn.execute(SEQ_SCAN_TABLES_SQL, {"min_rows": min_rows})],
+    }
+
+
+def print_report(report: Dict[str, List[dict]]) -> None:
+    titles = {
+        "unused": "Índices sin uso (idx_scan = 0)",
+        "missing_declared": "Índices declarados en los modelos que no existen",
+        "unindexed_foreign_keys": "Llaves foráneas sin índice",
+        "seq_scan_heavy": "Tablas con más recorridos secuenciales que por índice",
+    }
+    for key, title in titles.items():
+        rows = report[key]
+        print("=" * 60)
+        print(f"{title}: {len(rows)}")
+        for row in rows:
+            print("  " + ", ".join(f"{column}={value}" for column, value in row.items()))
+
+
+def main(engine: Optional[Engine] = None) -> int:
+    parser = argparse.ArgumentParser(description="Reporte de índices sin uso y faltantes")
+    parser.add_argument("--min-rows", type=int, default=10_000,
+                        help="Tamaño mínimo de tabla para el análisis de recorridos secuenciales")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    if engine is None:
+        from app.core.db import engine
+
+    with engine.connect() as conn:
+        report = build_report(conn, args.min_rows)
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_PACKAGE = "app.core.migrations.versions"
+
+# Llave del advisory lock de PostgreSQL que serializa las migraciones cuando
+# varios workers arrancan a la vez
+MIGRATION_LOCK_KEY = 99_000_001
+
+_metadata = MetaData()
+
+schema_migration = Table(
+    "schema_migration",
+    _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime(timezone=True), nullable=False),
+)
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def load_models() -> None:
+    """
+    Importa todos los módulos de app.models para que la metadata de SQLModel
+    tenga todas las tablas (algunos modelos no se reexportan en el paquete).
+    """
+    import app.models as models_package
+    for info in pkgutil.iter_modules(models_package.__path__):
+        importlib.import_module(f"{models_package.__name__}.{info.name}")
+
+
+def _load_migration(module: ModuleType) -> Migration:
+    return Migration(
+        version=module.VERSION,
+        description=module.DESCRIPTION,
+        upgrade=module.upgrade,
+    )
+
+
+def discover_migrations() -> List[Migration]:
+    """
+    Carga los módulos de app/core/migrations/versions (vNNNN_nombre.py),
+    ordenados por VERSION. Falla si hay versiones repetidas.
+    """
+    package = importlib.import_module(VERSIONS_PACKAGE)
+    migrations: Dict[int, Migration] = {}
+    for info in pkgutil.iter_modules(package.__path__):
+        if not info.name.startswith("v"):
+            continue
+        migration = _load_migration(
+            importlib.import_module(f"{VERSIONS_PACKAGE}.{info.name}"))
+        if migration.version in migrations:
+            raise ValueError(
+                f"Versión de migración duplicada: {migration.version}")
+        migrations[migration.version] = migration
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_versions(conn: Connection) -> Dict[int, datetime]:
+    schema_migration.create(conn, checkfirst=True)
+    rows = conn.execute(
+        select(schema_migration.c.version, schema_migration.c.applied_at))
+    return {row.version: row.applied_at for row in rows}
+
+
+def _acquire_lock(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_lock(MIGRATION_LOCK_KEY)))
+        conn.commit()
+
+
+def _release_lock(conn: Connection) -> None:
+    if conn.dialect.name == "postgresql":
+        conn.execute(select(func.pg_advisory_unlock(MIGRATION_LOCK_KEY)))
+        conn.commit()
+
+
+def run_migrations(engine: Optional[Engine] = None, target: Optional[int] = None) -> List[int]:
+    """
+    Aplica en orden las migraciones pendientes (hasta `target` si se indica).
+    Cada migración corre en su propia transacción y queda registrada en la
+    tabla schema_migration. Retorna las versiones aplicadas.
+    """
+    if engine is None:
+        from app.core.db import engine
+
+    applied: List[int] = []
+    with engine.connect() as conn:
+        _acquire_lock(conn)
+        try:
+            with conn.begin():
+                done = applied_versions(conn)
+            for migration in discover_migrations():
+                if migration.version in done:
+                    continue
+                if target is not None and migration.version > target:
+                    break
+                logger.info("Aplicando migración %04d: %s",
+                            migration.version, migration.description)
+                with conn.begin():
+                    migration.upgrade(conn)
+                    conn.execute(insert(schema_migration).values(
+                        version=migration.version,
+                        description=migration.description,
+                        applied_at=datetime.now(timezone.utc),
+                    ))
+                applied.append(migration.version)
+        finally:
+            _release_lock(conn)
+
+    if applied:
+        logger.info("Migraciones aplicadas: %s", applied)
+    else:
+        logger.debug("Esquema al día, sin migraciones pendientes")
+    return applied
+
+
+def migration_status(engine: Optional[Engine] = None) -> List[dict]:
+    """
+    Estado de cada migración conocida: versión, descripción y fecha de aplicación.
+    """
+    if engine is None:
+        from app.core.db import engine
+
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    return [
+        {
+            "version": migration.version,
+            "description": migration.description,
+            "applied_at": done.get(migration.version),
+        }
+        for migration in discover_migrations()
+    ]
@@ -0,0 +1,3 @@
+# Migraciones versionadas: cada módulo vNNNN_nombre.py define VERSION,
+# DESCRIPTION y upgrade(conn). No se editan una vez aplicadas; los cambios
+# de esquema nuevos van en un módulo con la siguiente versión.
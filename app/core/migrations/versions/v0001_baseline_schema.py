@@ -0,0 +1,17 @@
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.migrations.runner import load_models
+
+VERSION = 1
+DESCRIPTION = "Esquema base: tablas de los modelos SQLModel"
+
+
+def upgrade(conn: Connection) -> None:
+    """
+    Crea las tablas que no existan. En bases creadas antes del sistema de
+    migraciones (con create_all al arrancar) no modifica nada.
+    """
+    load_models()
+
+    SQLModel.metadata.create_all(conn)
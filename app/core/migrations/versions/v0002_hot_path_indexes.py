@@ -0,0 +1,70 @@
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.migrations.runner import load_models
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+VERSION = 2
+DESCRIPTION = "Índices compuestos y parciales para viajes, ofertas, chat, saldos y tokens"
+
+# Índices declarados en __table_args__ de los modelos. En bases nuevas ya los
+# crea la migración 0001; aquí se agregan a las tablas existentes.
+#
+# Consultas que cubre cada índice:
+# - client_request_open_created: solicitudes CREATED/PENDING recientes por
+#   tipo de servicio (feed de cercanía, expiración de solicitudes).
+# - client_request_driver_status: viaje activo e historial del conductor.
+# - client_request_client_status_created: historial y validaciones del cliente.
+# - client_request_busy_driver: solicitudes asignadas a conductor ocupado.
+# - client_request/driver_position/trip_stop *_geog: ST_DWithin y KNN (<->).
+# - transaction_user_type: suma de income/expense por usuario y tipo.
+# - transaction_client_request: transacciones de un viaje.
+# - chat_message_request_created: conversación de una solicitud.
+# - chat_message_unread: no leídos por receptor y conversación.
+# - driver_trip_offer_*: ofertas por solicitud y oferta de un conductor.
+# - user_has_role_role_status: conductores aprobados/verificados/no suspendidos.
+# - user_fcm_token_*: tokens activos por usuario y desactivación por token.
+INDEXES = {
+    "client_request": [
+        "idx_client_request_open_created",
+        "idx_client_request_driver_status",
+        "idx_client_request_client_status_created",
+        "idx_client_request_busy_driver",
+        "idx_client_request_pickup_position_geog",
+    ],
+    "driver_position": ["idx_driver_position_position_geog"],
+    "trip_stop": ["idx_trip_stop_position_geog"],
+    "transaction": [
+        "idx_transaction_user_type",
+        "idx_transaction_client_request",
+    ],
+    "chat_message": [
+        "idx_chat_message_request_created",
+        "idx_chat_message_unread",
+    ],
+    "driver_trip_offer": [
+        "idx_driver_trip_offer_request_created",
+        "idx_driver_trip_offer_driver_request",
+    ],
+    "user_has_role": ["idx_user_has_role_role_status"],
+    "user_fcm_token": [
+        "idx_user_fcm_token_user_active",
+        "idx_user_fcm_token_token",
+    ],
+}
+
+
+def upgrade(conn: Connection) -> None:
+    load_models()
+
+    for table_name, index_names in INDEXES.items():
+        table = SQLModel.metadata.tables[table_name]
+        indexes = {index.name: index for index in table.indexes}
+        for name in index_names:
+            # checkfirst: no falla si el índice ya existe; los índices de
+            # geography solo se crean en PostgreSQL (ddl_if)
+            indexes[name].create(conn, checkfirst=True)
+            logger.info("Índice verificado: %s", name)
@@ -0,0 +1,12 @@
+from sqlalchemy.engine import Connection
+
+VERSION = 3
+DESCRIPTION = "Tabla rating_summary con el acumulado de calificaciones por usuario y rol"
+
+
+def upgrade(conn: Connection) -> None:
+    from app.models.rating_summary import RatingSummary
+    from app.services.rating_summary_service import rebuild_rating_summary_rows
+
+    RatingSummary.__table__.create(conn, checkfirst=True)
+    rebuild_rating_summary_rows(conn)
@@ -0,0 +1,17 @@
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.migrations.runner import load_models
+
+VERSION = 4
+DESCRIPTION = "Tabla geocoded_address e índice para el historial paginado del conductor"
+
+
+def upgrade(conn: Connection) -> None:
+    load_models()
+
+    SQLModel.metadata.tables["geocoded_address"].create(conn, checkfirst=True)
+    client_request = SQLModel.metadata.tables["client_request"]
+    for index in client_request.indexes:
+        if index.name == "idx_client_request_driver_status_created":
+            index.create(conn, checkfirst=True)
@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+
+VERSION = 5
+DESCRIPTION = "Tabla stored_file con los conteos de referencias del almacenamiento por contenido"
+
+
+def upgrade(conn: Connection) -> None:
+    from app.models.stored_file import StoredFile
+
+    StoredFile.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,24 @@
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.migrations.runner import load_models
+
+VERSION = 6
+DESCRIPTION = "Índices para la cola de revisión de documentos de conductores"
+
+INDEXES = {
+    "driver_documents": [
+        "idx_driver_documents_status_created",
+        "idx_driver_documents_driver_info_status",
+    ],
+    "driver_info": ["idx_driver_info_user"],
+}
+
+
+def upgrade(conn: Connection) -> None:
+    load_models()
+
+    for table_name, index_names in INDEXES.items():
+        indexes = {index.name: index for index in SQLModel.metadata.tables[table_name].indexes}
+        for name in index_names:
+            indexes[name].create(conn, checkfirst=True)
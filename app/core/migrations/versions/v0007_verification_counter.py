@@ -0,0 +1,20 @@
+from sqlalchemy import delete, insert
+from sqlalchemy.engine import Connection
+from datetime import datetime
+
+VERSION = 7
+DESCRIPTION = "Tabla verification_counter con los contadores del tablero de verificación"
+
+
+def upgrade(conn: Connection) -> None:
+    from app.models.verification_counter import COLOMBIA_TZ, VerificationCounter
+    from app.services.verification_counter_service import count_verification_totals
+
+    table = VerificationCounter.__table__
+    table.create(conn, checkfirst=True)
+    counts = count_verification_totals(conn)
+    now = datetime.now(COLOMBIA_TZ)
+    conn.execute(delete(table))
+    conn.execute(insert(table), [
+        {"name": name, "value": value, "updated_at": now} for name, value in counts.items()
+    ])
@@ -0,0 +1,43 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+VERSION = 8
+DESCRIPTION = "refresh_token particionada por mes de expiración (PostgreSQL)"
+
+_COLUMNS = ("id, user_id, token_hash, expires_at, is_revoked, created_at, "
+            "updated_at, user_agent, ip_address")
+
+
+def upgrade(conn: Connection) -> None:
+    """
+    Convierte refresh_token en una tabla particionada por rango de
+    expires_at y copia solo los tokens vigentes. En bases nuevas la tabla ya
+    nace particionada (postgresql_partition_by) y solo se crean particiones.
+    En otros motores no hace nada.
+    """
+    if conn.dialect.name != "postgresql":
+        return
+
+    from app.models.refresh_token import RefreshToken
+    from app.services.refresh_token_service import ensure_refresh_token_partitions, is_partitioned
+
+    if not is_partitioned(conn):
+        conn.execute(text("ALTER TABLE refresh_token RENAME TO refresh_token_old"))
+        # Liberar los nombres de la llave primaria e índices para la tabla nueva
+        inspector = inspect(conn)
+        primary_key = inspector.get_pk_constraint("refresh_token_old").get("name")
+        if primary_key:
+            conn.execute(text(
+                f'ALTER TABLE refresh_token_old RENAME CONSTRAINT "{primary_key}" TO "{primary_key}_old"'))
+        for index in inspector.get_indexes("refresh_token_old"):
+            conn.execute(text(f'ALTER INDEX "{index["name"]}" RENAME TO "{index["name"]}_old"'))
+
+        RefreshToken.__table__.create(conn)
+        ensure_refresh_token_partitions(conn)
+        conn.execute(text(
+            f"INSERT INTO refresh_token ({_COLUMNS}) SELECT {_COLUMNS} FROM refresh_token_old "
+            "WHERE expires_at > now() AT TIME ZONE 'utc' AND NOT is_revoked"
+        ))
+        conn.execute(text("DROP TABLE refresh_token_old"))
+    else:
+        ensure_refresh_token_partitions(conn)
@@ -0,0 +1,29 @@
+from sqlalchemy import insert, inspect, select
+from sqlalchemy.engine import Connection
+
+VERSION = 9
+DESCRIPTION = "verification_counter repartida en varias filas por contador"
+
+
+def upgrade(conn: Connection) -> None:
+    """
+    Recrea verification_counter con la llave (name, shard) y la vuelve a
+    sembrar con los conteos reales. En bases nuevas v0007 ya la creó con la
+    columna shard (valores en la fila 0): solo se agregan las filas en cero
+    que falten.
+    """
+    from app.models.verification_counter import COUNTER_NAMES, VerificationCounter
+    from app.services.verification_counter_service import count_verification_totals, counter_rows
+
+    table = VerificationCounter.__table__
+    columns = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    if "shard" not in columns:
+        table.drop(conn)
+        table.create(conn)
+        conn.execute(insert(table), counter_rows(count_verification_totals(conn)))
+        return
+    existing = set(conn.execute(select(table.c.name, table.c.shard)).all())
+    missing = [row for row in counter_rows(dict.fromkeys(COUNTER_NAMES, 0))
+               if (row["name"], row["shard"]) not in existing]
+    if missing:
+        conn.execute(insert(table), missing)
@@ -0,0 +1,13 @@
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from app.core.migrations.runner import load_models
+
+VERSION = 10
+DESCRIPTION = "Tabla maintenance_job_run con el último resultado de cada job de mantenimiento"
+
+
+def upgrade(conn: Connection) -> None:
+    load_models()
+
+    SQLModel.metadata.tables["maintenance_job_run"].create(conn, checkfirst=True)
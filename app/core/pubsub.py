@@ -0,0 +1,70 @@
+"""
+Canales pub/sub entre workers: uno local (un solo proceso) y uno sobre Redis.
+"""
+from typing import Any, Callable, Dict
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LocalInvalidationBus:
+    """
+    Canal para un solo proceso: no hace nada, quien publica ya aplicó el
+    cambio localmente.
+    """
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        pass
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class RedisInvalidationBus:
+    """
+    Canal sobre Redis pub/sub para despliegues con varios workers. Un hilo
+    escucha el canal y entrega cada mensaje (JSON) al callback. Lo usan la
+    caché de configuración y el feed de despacho, cada uno en su canal y con
+    su propia `label` para los logs.
+    """
+
+    def __init__(self, url: str, channel: str, label: str = "mensaje"):
+        import redis
+
+        self.channel = channel
+        self.label = label
+        self._client = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread = None
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        try:
+            self._client.publish(self.channel, json.dumps(message))
+        except Exception as e:
+            # Sin Redis los demás workers no se enteran; quien usa el bus
+            # decide cómo se recupera (TTL, reconexión, etc.)
+            logger.warning("No se pudo publicar %s en %s: %s", self.label, self.channel, e)
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        def handler(raw):
+            try:
+                callback(json.loads(raw["data"]))
+            except Exception as e:
+                logger.error("Mensaje inválido de %s en %s: %s", self.label, self.channel, e)
+
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: handler})
+        self._thread = self._pubsub.run_in_thread(
+            sleep_time=1.0, daemon=True)
+
+    def close(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
@@ -0,0 +1,161 @@
+from app.core.leader_lock import LeaderLock
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobStats:
+    runs: int = 0
+    failures: int = 0
+    skipped_not_leader: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_ms: Optional[float] = None
+    last_started_at: Optional[str] = None
+    last_error: Optional[str] = None
+    last_result: Any = None
+
+    def as_dict(self) -> Dict:
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped_not_leader": self.skipped_not_leader,
+            "avg_ms": round(self.total_ms / self.runs, 2) if self.runs else None,
+            "max_ms": round(self.max_ms, 2),
+            "last_ms": round(self.last_ms, 2) if self.last_ms is not None else None,
+            "last_started_at": self.last_started_at,
+            "last_error": self.last_error,
+            "last_result": self.last_result,
+        }
+
+
+@dataclass
+class ScheduledJob:
+    name: str
+    func: Callable[[], Any]
+    interval: float
+    jitter: float = 0.1
+    stats: JobStats = field(default_factory=JobStats)
+
+    def next_delay(self) -> float:
+        """
+        Intervalo con variación aleatoria de ±jitter para que los workers y
+        los jobs no coincidan siempre en el mismo instante.
+        """
+        if self.jitter <= 0:
+            return self.interval
+        return max(self.interval * (1 + random.uniform(-self.jitter, self.jitter)), 0.0)
+
+
+class MaintenanceScheduler:
+    """
+    Planificador asyncio para tareas de mantenimiento periódicas.
+
+    - Cada job corre en su propio ciclo, con el intervalo y jitter indicados;
+      la función (síncrona, con acceso a la base de datos) se ejecuta en un
+      hilo para no bloquear el event loop.
+    - Con varios workers solo el que tiene el advisory lock de líder ejecuta
+      los jobs; los demás cuentan la ejecución como omitida.
+    - Registra por job ejecuciones, fallas y tiempos (último, promedio, máximo).
+    """
+
+    def __init__(self, leader_lock: Optional[LeaderLock] = None):
+        self._leader_lock = leader_lock
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: List[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Any], interval: float, jitter: float = 0.1) -> ScheduledJob:
+        if name in self._jobs:
+            raise ValueError(f"El job {name} ya está registrado")
+        job = ScheduledJob(name, func, interval, jitter)
+        self._jobs[name] = job
+        return job
+
+    @property
+    def jobs(self) -> Dict[str, ScheduledJob]:
+        return dict(self._jobs)
+
+    async def run_job(self, name: str) -> Any:
+        """
+        Ejecuta el job una vez (si este worker es líder) y registra su tiempo.
+        """
+        job = self._jobs[name]
+        if self._leader_lock is not None:
+            is_leader = await asyncio.to_thread(self._leader_lock.acquire)
+            if not is_leader:
+                job.stats.skipped_not_leader += 1
+                return None
+
+        job.stats.last_started_at = datetime.utcnow().isoformat()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(job.func)
+        except Exception as e:
+            job.stats.failures += 1
+            job.stats.last_error = str(e)
+            logger.error("Error en el job de mantenimiento %s: %s", name, e, exc_info=True)
+            result = None
+        else:
+            job.stats.last_error = None
+            job.stats.last_result = result
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            job.stats.runs += 1
+            job.stats.total_ms += elapsed
+            job.stats.max_ms = max(job.stats.max_ms, elapsed)
+            job.stats.last_ms = elapsed
+        logger.info("Job de mantenimiento %s: %.1f ms, resultado %s", name, elapsed, result)
+        return result
+
+    async def _run(self, job: ScheduledJob) -> None:
+        # Primera ejecución desplazada para no arrancar todos a la vez
+        await asyncio.sleep(random.uniform(0, job.interval * max(job.jitter, 0.0)))
+        while True:
+            try:
+                await self.run_job(job.name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error en el ciclo del job %s: %s", job.name, e, exc_info=True)
+            await asyncio.sleep(job.next_delay())
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run(job)) for job in self._jobs.values()]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._leader_lock is not None:
+            await asyncio.to_thread(self._leader_lock.release)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {name: job.stats.as_dict() for name, job in self._jobs.items()}
+
+    def prometheus_lines(self) -> List[str]:
+        lines = []
+        for name, job in self._jobs.items():
+            stats = job.stats
+            lines.extend([
+                f'milla99_job_runs_total{{job="{name}"}} {stats.runs}',
+                f'milla99_job_failures_total{{job="{name}"}} {stats.failures}',
+                f'milla99_job_skipped_total{{job="{name}"}} {stats.skipped_not_leader}',
+                f'milla99_job_last_duration_ms{{job="{name}"}} {round(stats.last_ms or 0, 2)}',
+                f'milla99_job_max_duration_ms{{job="{name}"}} {round(stats.max_ms, 2)}',
+            ])
+        return lines
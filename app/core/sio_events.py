@@ -1,38 +1,245 @@
 import socketio
 import json
+from urllib.parse import parse_qs
 from datetime import datetime
 from uuid import UUID
-from app.services.chat_service import create_chat_message, get_unread_count
+from app.services.chat_service import create_chat_message, get_conversation_unread_count
 from app.models.chat_message import ChatMessageCreate
 from app.core.db import get_session
+from app.core.dependencies.auth import user_id_from_token
+from app.core.sio_manager import build_client_manager
+from app.core.sio_rooms import area_room, area_rooms_around, trip_room, user_room
+from app.services.dispatch_feed_service import get_dispatch_feed, load_driver_feed_profile
+from app.services.client_requests_service import (
+    get_active_trip_ids,
+    get_assigned_trip_client,
+    is_trip_participant,
+)
+from app.services.driver_trip_offer_service import has_driver_offer
+from fastapi import HTTPException
+from typing import Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
-# Configura Redis como message manager
-mgr = socketio.AsyncRedisManager('redis://localhost:6379/0')
-# sio = socketio.AsyncServer(
-#     async_mode='asgi',
-#     client_manager=mgr,
-#     cors_allowed_origins='*'
-# )
+# Client manager según SIO_MANAGER (Redis pub/sub con varios workers)
 sio = socketio.AsyncServer(
     async_mode='asgi',
+    client_manager=build_client_manager(),
     cors_allowed_origins='*'
 )
 
 
+def _token_from_handshake(environ, auth) -> str:
+    if isinstance(auth, dict) and auth.get('token'):
+        return auth['token']
+    header = environ.get('HTTP_AUTHORIZATION', '')
+    if header.lower().startswith('bearer '):
+        return header[7:]
+    return (parse_qs(environ.get('QUERY_STRING', '')).get('token') or [''])[0]
+
+
+def _with_db_session(fn, *args):
+    session = next(get_session())
+    try:
+        return fn(session, *args)
+    finally:
+        session.close()
+
+
+async def _session_user_id(sid):
+    return (await sio.get_session(sid)).get('user_id')
+
+
+async def _authorized_trip_id(sid, data, check=None) -> Optional[UUID]:
+    """
+    Id del viaje de `data` si el usuario del socket es su cliente o su
+    conductor asignado (o cumple `check`); None si no. Los ids que envía el
+    cliente no se usan sin esta validación.
+    """
+    try:
+        client_request_id = UUID(str(data['id_client_request']))
+    except (KeyError, ValueError):
+        return None
+    user_id = await _session_user_id(sid)
+    allowed = await asyncio.to_thread(
+        _with_db_session, check or is_trip_participant, client_request_id, user_id)
+    if not allowed:
+        logger.warning("Socket %s (%s) sin acceso al viaje %s", sid, user_id, client_request_id)
+        return None
+    return client_request_id
+
+
+async def _driven_trip(sid, data) -> Optional[tuple]:
+    """
+    (id del viaje, id del cliente) si el socket está en el room del viaje
+    (validado al entrar) y su usuario es el conductor asignado; None si no.
+    La verificación se guarda en la sesión del socket, así los pings de GPS
+    no consultan la base.
+    """
+    try:
+        client_request_id = UUID(str(data['id_client_request']))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if trip_room(client_request_id) not in sio.rooms(sid):
+        return None
+    socket_session = await sio.get_session(sid)
+    driven = socket_session.setdefault('driven_trips', {})
+    key = str(client_request_id)
+    if key not in driven:
+        client_id = await asyncio.to_thread(
+            _with_db_session, get_assigned_trip_client, client_request_id,
+            socket_session.get('user_id'))
+        driven[key] = str(client_id) if client_id else None
+        await sio.save_session(sid, socket_session)
+    if driven[key] is None:
+        return None
+    return client_request_id, driven[key]
+
+
+async def join_user_to_trip(user_id, client_request_id) -> None:
+    """
+    Une al room del viaje los sockets del usuario conectados a este worker.
+    En otro worker el usuario entra al reconectar o con `join_trip`.
+    """
+    room = trip_room(client_request_id)
+    for sid, _ in list(sio.manager.get_participants('/', user_room(user_id))):
+        await sio.enter_room(sid, room)
+
+
 @sio.event
-async def connect(sid, environ):
-    print(f'Cliente conectado: {sid}')
+async def connect(sid, environ, auth=None):
+    """
+    Conexión autenticada con el access token: `auth={"token": ...}`, header
+    `Authorization: Bearer ...` o query `?token=...`.
+    El socket entra al room del usuario y a los rooms de sus viajes activos;
+    los eventos de un usuario o de un viaje solo llegan a esos rooms.
+    """
+    user_id = user_id_from_token(_token_from_handshake(environ, auth))
+    if user_id is None:
+        raise socketio.exceptions.ConnectionRefusedError('Token inválido o expirado')
+    await sio.save_session(sid, {'user_id': user_id})
+    await sio.enter_room(sid, user_room(user_id))
+    trip_ids = await asyncio.to_thread(_with_db_session, get_active_trip_ids, user_id)
+    for trip_id in trip_ids:
+        await sio.enter_room(sid, trip_room(trip_id))
+    logger.debug("Cliente conectado: %s (%s, %s viajes)", sid, user_id, len(trip_ids))
 
 
 @sio.event
 async def disconnect(sid):
-    print(f'Cliente desconectado: {sid}')
-    await sio.emit('driver_disconnected', {'id_socket': sid})
+    logger.debug("Cliente desconectado: %s", sid)
+    feed_session = await sio.get_session(sid)
+    if feed_session.get('feed_driver_id'):
+        get_dispatch_feed().unsubscribe(feed_session['feed_driver_id'])
+    # Solo a los participantes de los viajes de este socket
+    rooms = [room for room in sio.rooms(sid) if room.startswith('trip:')]
+    if rooms:
+        await sio.emit('driver_disconnected', {'id_socket': sid}, room=rooms, skip_sid=sid)
+
+
+@sio.event
+async def join_trip(sid, data):
+    """
+    Une el socket al room de un viaje del que el usuario es cliente o
+    conductor asignado (p. ej. tras una asignación hecha en otro worker).
+    - JSON de ejemplo para enviar: {"id_client_request": "uuid-de-la-solicitud"}
+    - Responde (ack) {"ok": true} o {"ok": false, "detail": "..."}.
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    try:
+        client_request_id = UUID(str(data['id_client_request']))
+    except (KeyError, ValueError):
+        return {'ok': False, 'detail': 'id_client_request inválido'}
+    user_id = await _session_user_id(sid)
+    allowed = await asyncio.to_thread(
+        _with_db_session, is_trip_participant, client_request_id, user_id)
+    if not allowed:
+        return {'ok': False, 'detail': 'No participa en este viaje'}
+    await sio.enter_room(sid, trip_room(client_request_id))
+    return {'ok': True}
+
+
+@sio.event
+async def leave_trip(sid, data):
+    if isinstance(data, str):
+        data = json.loads(data)
+    # Solo rooms en los que el socket ya entró (validado al entrar)
+    room = trip_room(data.get('id_client_request'))
+    if room in sio.rooms(sid):
+        await sio.leave_room(sid, room)
+
+
+@sio.event
+async def watch_nearby_drivers(sid, data):
+    """
+    Suscribe el socket a las posiciones de conductores libres alrededor de un
+    punto (`new_driver_position`). Reemplaza la zona anterior.
+    - JSON de ejemplo para enviar: {"lat": 4.708822, "lng": -74.076542}
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    session_data = await sio.get_session(sid)
+    for room in session_data.get('areas', []):
+        await sio.leave_room(sid, room)
+    areas = area_rooms_around(float(data['lat']), float(data['lng']))
+    for room in areas:
+        await sio.enter_room(sid, room)
+    session_data['areas'] = areas
+    await sio.save_session(sid, session_data)
+
+
+@sio.event
+async def subscribe_nearby_feed(sid, data):
+    """
+    Suscribe al conductor al feed de solicitudes cercanas por push.
+    - JSON de ejemplo para enviar:
+        {"lat": 4.708822, "lng": -74.076542}
+      (`token` opcional: por defecto se usa el usuario de la conexión)
+    - Responde con `nearby_feed/subscribed` o `nearby_feed/error`.
+    - Luego recibe en su room:
+        nearby_request/new      solicitud nueva dentro del radio (incluye `distance`)
+        nearby_request/removed  {"id", "status"} la solicitud ya no está disponible
+        nearby_request/offer    {"id", "offers_count"} otro conductor ofertó
+    - Para reconstruir la lista tras reconectar usar GET /client-request/nearby.
+    """
+    if isinstance(data, str):
+        data = json.loads(data)
+    user_id = await _session_user_id(sid) or user_id_from_token(data.get('token', ''))
+    if user_id is None:
+        await sio.emit('nearby_feed/error', {'detail': 'Token inválido o expirado'}, to=sid)
+        return
+
+    try:
+        profile = await asyncio.to_thread(_with_db_session, load_driver_feed_profile, user_id)
+    except HTTPException as e:
+        await sio.emit('nearby_feed/error', {'detail': e.detail}, to=sid)
+        return
+
+    feed_session = await sio.get_session(sid)
+    feed_session['feed_driver_id'] = user_id
+    await sio.save_session(sid, feed_session)
+    get_dispatch_feed().subscribe(profile, float(data['lat']), float(data['lng']))
+    await sio.emit('nearby_feed/subscribed', {
+        'id': str(user_id),
+        'type_service_ids': profile.type_service_ids,
+    }, to=sid)
+
+
+@sio.event
+async def unsubscribe_nearby_feed(sid, data=None):
+    feed_session = await sio.get_session(sid)
+    driver_id = feed_session.pop('feed_driver_id', None)
+    if driver_id:
+        get_dispatch_feed().unsubscribe(driver_id)
+        await sio.save_session(sid, feed_session)
 
 
 @sio.event
 async def message(sid, data):
-    print(f'Datos del cliente en socket: {sid}: {data}')
+    logger.debug("Datos del cliente en socket: %s: %s", sid, data)
     await sio.emit(
         'new_message',
         data,
@@ -45,15 +252,23 @@ async def change_driver_position(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(f'Emitio nueva posicion en socket: {sid}: {data}')
+    logger.debug("Emitio nueva posicion en socket: %s: %s", sid, data)
+    # Mover al conductor en el índice del feed (si está suscrito)
+    feed_session = await sio.get_session(sid)
+    if feed_session.get('feed_driver_id'):
+        get_dispatch_feed().driver_moved(
+            feed_session['feed_driver_id'], float(data['lat']), float(data['lng']))
+    # El id es el del usuario autenticado, no el que envía el cliente
     await sio.emit(
         'new_driver_position',
         {
             'id_socket': sid,
-            'id': data['id'],
+            'id': str(feed_session['user_id']),
             'lat': data['lat'],
             'lng': data['lng']
-        }
+        },
+        room=area_room(float(data['lat']), float(data['lng'])),
+        skip_sid=sid
     )
     # NO hay lógica de transición aquí porque es para conductores libres
 
@@ -63,27 +278,36 @@ async def trip_change_driver_position(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(f'El conductor actualizo su posicion en el socket: {sid}: {data}')
+    logger.debug(
+        "El conductor actualizo su posicion en el socket: %s: %s", sid, data)
+    # Solo el conductor asignado, desde un socket que ya está en el room
+    driven = await _driven_trip(sid, data)
+    if driven is None:
+        return
+    client_request_id, client_id = driven
     await sio.emit(
-        f'trip_new_driver_position/{data["id_client"]}',
+        f'trip_new_driver_position/{client_id}',
         {
             'id_socket': sid,
             'lat': data['lat'],
             'lng': data['lng']
-        }
+        },
+        room=trip_room(client_request_id),
+        skip_sid=sid
     )
 
+    # Posición para el motor de ETA (recalcula en su siguiente ciclo)
+    from app.services.eta_tracking_service import get_eta_tracker
+    get_eta_tracker().observe_driver_position(client_request_id, data['lat'], data['lng'])
+
     # --- INTEGRACIÓN DE LÓGICA DE TRANSICIÓN AUTOMÁTICA ---
     try:
         from app.services.client_requests_service import evaluate_and_update_trip_state
         from app.core.db import get_session
         from app.services.notification_service import NotificationService
         from app.models.client_request import ClientRequest
-        from uuid import UUID
 
         session = next(get_session())
-        # data debe incluir id_client_request y la posición
-        client_request_id = UUID(data['id_client_request'])
         driver_position = {'lat': data['lat'], 'lng': data['lng']}
         new_status = evaluate_and_update_trip_state(
             session, client_request_id, driver_position)
@@ -96,7 +320,8 @@ async def trip_change_driver_position(sid, data):
                     'id_socket': sid,
                     'status': new_status,
                     'id_client_request': str(client_request_id)
-                }
+                },
+                room=trip_room(client_request_id)
             )
             # Enviar notificación push a cliente y conductor
             client_request = session.get(ClientRequest, client_request_id)
@@ -115,7 +340,7 @@ async def trip_change_driver_position(sid, data):
                     body=f'El estado del viaje cambió a {new_status}'
                 )
     except Exception as e:
-        print(f'Error en transición automática de estado: {e}')
+        logger.error("Error en transición automática de estado: %s", e)
 
 
 @sio.event
@@ -123,13 +348,20 @@ async def new_client_request(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(
-        f'El cliente emitio una nueva solicitud de servicio en socket: {sid}: {data}')
-    await sio.emit(
+    logger.debug(
+        "El cliente emitio una nueva solicitud de servicio en socket: %s: %s", sid, data)
+    client_request_id = await _authorized_trip_id(sid, data)
+    if client_request_id is None:
+        return
+    await sio.enter_room(sid, trip_room(client_request_id))
+    # Solo a los conductores que recibieron la solicitud en el feed, estén
+    # conectados a este worker o a otro
+    get_dispatch_feed().publish_to_recipients(
+        client_request_id,
         'created_client_request',
         {
             'id_socket': sid,
-            'id_client_request': data['id_client_request'],
+            'id_client_request': str(client_request_id),
         }
     )
 
@@ -139,13 +371,18 @@ async def new_driver_offer(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(
-        f'El conductor emitio una nueva oferta de servicio en socket: {sid}: {data}')
+    logger.debug(
+        "El conductor emitio una nueva oferta de servicio en socket: %s: %s", sid, data)
+    # El conductor aún no está asignado: debe haber ofertado por la solicitud
+    client_request_id = await _authorized_trip_id(sid, data, check=has_driver_offer)
+    if client_request_id is None:
+        return
     await sio.emit(
-        f'created_driver_offer/{data["id_client_request"]}',
+        f'created_driver_offer/{client_request_id}',
         {
             'id_socket': sid
-        }
+        },
+        room=trip_room(client_request_id)
     )
 
 
@@ -154,14 +391,25 @@ async def new_driver_assigned(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(
-        f'El cliente emitio una nueva asignacion de conductor en socket: {sid}: {data}')
+    logger.debug(
+        "El cliente emitio una nueva asignacion de conductor en socket: %s: %s", sid, data)
+    try:
+        driver_id = UUID(str(data['id_driver']))
+    except (KeyError, ValueError):
+        return
+    client_request_id = await _authorized_trip_id(sid, data)
+    # El conductor debe ser el asignado a la solicitud
+    if client_request_id is None or not await asyncio.to_thread(
+            _with_db_session, is_trip_participant, client_request_id, driver_id):
+        return
+    await join_user_to_trip(driver_id, client_request_id)
     await sio.emit(
-        f'driver_assigned/{data["id_driver"]}',
+        f'driver_assigned/{driver_id}',
         {
             'id_socket': sid,
-            "id_client_request": data["id_client_request"]
-        }
+            "id_client_request": str(client_request_id)
+        },
+        room=user_room(driver_id)
     )
 
 
@@ -170,14 +418,19 @@ async def update_status_trip(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(f'Se actualizo el estado de la viaje en el socket: {sid}: {data}')
+    logger.debug(
+        "Se actualizo el estado de la viaje en el socket: %s: %s", sid, data)
+    client_request_id = await _authorized_trip_id(sid, data)
+    if client_request_id is None:
+        return
     await sio.emit(
-        f'new_status_trip/{data["id_client_request"]}',
+        f'new_status_trip/{client_request_id}',
         {
             'id_socket': sid,
             'status': data['status'],
-            'id_client_request': data['id_client_request']
-        }
+            'id_client_request': str(client_request_id)
+        },
+        room=trip_room(client_request_id)
     )
 
 
@@ -210,7 +463,7 @@ async def client_to_driver_message(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(f'Mensaje del cliente al conductor: {sid}: {data}')
+    logger.debug("Mensaje del cliente al conductor: %s: %s", sid, data)
 
     try:
         # Guardar mensaje en base de datos
@@ -224,15 +477,9 @@ async def client_to_driver_message(sid, data):
         chat_message = create_chat_message(
             session, UUID(data["client_id"]), message_data)
 
-        # Obtener conteo de mensajes no leídos
-        unread_counts = get_unread_count(session, UUID(data["id_driver"]))
-
-        # Buscar el contador específico para esta conversación
-        unread_count = 0
-        for count_info in unread_counts:
-            if str(count_info.conversation_id) == data["id_client_request"]:
-                unread_count = count_info.unread_count
-                break
+        # Obtener conteo de mensajes no leídos de esta conversación
+        unread_count = get_conversation_unread_count(
+            session, UUID(data["id_driver"]), UUID(data["id_client_request"]))
 
         # Emitir el mensaje al conductor específico con información adicional
         await sio.emit(
@@ -246,7 +493,8 @@ async def client_to_driver_message(sid, data):
                 'timestamp': datetime.utcnow().isoformat(),
                 'unread_count': unread_count,
                 'message_id': str(chat_message.id)
-            }
+            },
+            room=user_room(data["id_driver"])
         )
 
         # Emitir notificación de mensaje no leído
@@ -258,11 +506,12 @@ async def client_to_driver_message(sid, data):
                 'last_message': data['message'],
                 'other_user_name': data['client_name'],
                 'last_message_time': datetime.utcnow().isoformat()
-            }
+            },
+            room=user_room(data["id_driver"])
         )
 
     except Exception as e:
-        print(f"Error al procesar mensaje del cliente: {str(e)}")
+        logger.error("Error al procesar mensaje del cliente: %s", str(e))
         # Emitir mensaje de error
         await sio.emit(
             f'client_message/{data["id_driver"]}',
@@ -274,7 +523,8 @@ async def client_to_driver_message(sid, data):
                 'id_client_request': data['id_client_request'],
                 'timestamp': datetime.utcnow().isoformat(),
                 'error': 'Error al guardar mensaje'
-            }
+            },
+            room=user_room(data["id_driver"])
         )
 
 
@@ -307,7 +557,7 @@ async def driver_to_client_message(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(f'Mensaje del conductor al cliente: {sid}: {data}')
+    logger.debug("Mensaje del conductor al cliente: %s: %s", sid, data)
 
     try:
         # Guardar mensaje en base de datos
@@ -321,15 +571,9 @@ async def driver_to_client_message(sid, data):
         chat_message = create_chat_message(
             session, UUID(data["driver_id"]), message_data)
 
-        # Obtener conteo de mensajes no leídos
-        unread_counts = get_unread_count(session, UUID(data["id_client"]))
-
-        # Buscar el contador específico para esta conversación
-        unread_count = 0
-        for count_info in unread_counts:
-            if str(count_info.conversation_id) == data["id_client_request"]:
-                unread_count = count_info.unread_count
-                break
+        # Obtener conteo de mensajes no leídos de esta conversación
+        unread_count = get_conversation_unread_count(
+            session, UUID(data["id_client"]), UUID(data["id_client_request"]))
 
         # Emitir el mensaje al cliente específico con información adicional
         await sio.emit(
@@ -343,7 +587,8 @@ async def driver_to_client_message(sid, data):
                 'timestamp': datetime.utcnow().isoformat(),
                 'unread_count': unread_count,
                 'message_id': str(chat_message.id)
-            }
+            },
+            room=user_room(data["id_client"])
         )
 
         # Emitir notificación de mensaje no leído
@@ -355,11 +600,12 @@ async def driver_to_client_message(sid, data):
                 'last_message': data['message'],
                 'other_user_name': data['driver_name'],
                 'last_message_time': datetime.utcnow().isoformat()
-            }
+            },
+            room=user_room(data["id_client"])
         )
 
     except Exception as e:
-        print(f"Error al procesar mensaje del conductor: {str(e)}")
+        logger.error("Error al procesar mensaje del conductor: %s", str(e))
         # Emitir mensaje de error
         await sio.emit(
             f'driver_message/{data["id_client"]}',
@@ -371,7 +617,8 @@ async def driver_to_client_message(sid, data):
                 'id_client_request': data['id_client_request'],
                 'timestamp': datetime.utcnow().isoformat(),
                 'error': 'Error al guardar mensaje'
-            }
+            },
+            room=user_room(data["id_client"])
         )
 
 
@@ -399,15 +646,20 @@ async def update_eta(sid, data):
     # Si data es string, conviértelo a dict
     if isinstance(data, str):
         data = json.loads(data)
-    print(f'Actualización de ETA: {sid}: {data}')
+    logger.debug("Actualización de ETA: %s: %s", sid, data)
+    driven = await _driven_trip(sid, data)
+    if driven is None:
+        return
+    client_request_id, _ = driven
 
-    # Emitir actualización de ETA al cliente específico
+    # Emitir actualización de ETA a los participantes del viaje
     await sio.emit(
-        f'eta_update/{data["id_client_request"]}',
+        f'eta_update/{client_request_id}',
         {
             'id_socket': sid,
             'distance': data['distance'],
             'duration': data['duration'],
             'timestamp': datetime.utcnow().isoformat()
-        }
+        },
+        room=trip_room(client_request_id)
     )
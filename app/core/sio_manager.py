@@ -0,0 +1,144 @@
+"""
+Client manager de Socket.IO según SIO_MANAGER:
+
+- "memory": un solo proceso (socketio.AsyncManager). Desarrollo y tests.
+- "redis":  Redis pub/sub entre workers (SIO_REDIS_URL o REDIS_URL). Cada
+            emit se publica en SIO_CHANNEL y cada worker lo entrega a sus
+            sockets conectados.
+
+LocalPubSubManager reproduce el pub/sub de Redis dentro de un proceso: varios
+AsyncServer conectados al mismo LocalPubSubBroker se comportan como workers
+distintos (tests y benchmarks sin Redis).
+"""
+from app.core.config import settings
+from typing import Dict, List, Optional
+import asyncio
+import os
+import pickle
+import time
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+
+class PubSubStatsMixin:
+    """
+    Cuenta mensajes publicados y recibidos por el canal del manager.
+    """
+
+    def _stats(self) -> Dict:
+        if not hasattr(self, "_pubsub_stats"):
+            self._pubsub_stats = {"published": 0, "received": 0,
+                                  "publish_errors": 0, "last_received_at": None}
+        return self._pubsub_stats
+
+    async def _publish(self, data):
+        stats = self._stats()
+        try:
+            result = await super()._publish(data)
+        except Exception:
+            stats["publish_errors"] += 1
+            raise
+        stats["published"] += 1
+        return result
+
+    async def _listen(self):
+        stats = self._stats()
+        async for message in super()._listen():
+            stats["received"] += 1
+            stats["last_received_at"] = time.time()
+            yield message
+
+
+class RedisClientManager(PubSubStatsMixin, socketio.AsyncRedisManager):
+    name = "redis"
+
+
+class LocalPubSubBroker:
+    """
+    Pub/sub en memoria con la semántica de Redis: cada suscriptor del canal
+    recibe una copia serializada de cada mensaje, incluido quien publica.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, List[asyncio.Queue]] = {}
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._queues.setdefault(channel, []).append(queue)
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        if queue in self._queues.get(channel, []):
+            self._queues[channel].remove(queue)
+
+    async def publish(self, channel: str, message: bytes) -> int:
+        queues = list(self._queues.get(channel, []))
+        for queue in queues:
+            queue.put_nowait(message)
+        return len(queues)
+
+
+class _LocalPubSubBase(AsyncPubSubManager):
+    name = "local-pubsub"
+
+    def __init__(self, broker: LocalPubSubBroker, channel: str = "socketio",
+                 write_only: bool = False, logger=None):
+        self.broker = broker
+        super().__init__(channel=channel, write_only=write_only, logger=logger)
+
+    async def _publish(self, data):
+        return await self.broker.publish(self.channel, pickle.dumps(data))
+
+    async def _listen(self):
+        queue = self.broker.subscribe(self.channel)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self.broker.unsubscribe(self.channel, queue)
+
+
+class LocalPubSubManager(PubSubStatsMixin, _LocalPubSubBase):
+    pass
+
+
+def build_client_manager(backend: Optional[str] = None, url: Optional[str] = None):
+    """
+    Construye el client manager según SIO_MANAGER ("memory" o "redis").
+    """
+    backend = backend or settings.SIO_MANAGER
+    if backend == "redis":
+        url = url or settings.SIO_REDIS_URL or settings.REDIS_URL
+        if not url:
+            raise ValueError("SIO_MANAGER=redis requiere definir SIO_REDIS_URL o REDIS_URL")
+        return RedisClientManager(url, channel=settings.SIO_CHANNEL)
+    if backend != "memory":
+        raise ValueError(f"SIO_MANAGER desconocido: {backend}")
+    return socketio.AsyncManager()
+
+
+def get_sio_stats(sio: socketio.AsyncServer) -> Dict:
+    """
+    Estado del servidor de sockets en este worker: conexiones, rooms y, con
+    un manager pub/sub, mensajes del canal y si el listener sigue vivo.
+    """
+    manager = sio.manager
+    namespace = manager.rooms.get("/", {})
+    connected = namespace.get(None, {})
+    stats = {
+        "backend": getattr(manager, "name", "memory"),
+        "worker_pid": os.getpid(),
+        "connected": len(connected),
+        # Sin el room propio de cada socket
+        "rooms": sum(1 for room in namespace if room is not None and room not in connected),
+    }
+    if isinstance(manager, PubSubStatsMixin):
+        listener = getattr(manager, "thread", None)
+        pubsub = dict(manager._stats())
+        last = pubsub.pop("last_received_at")
+        stats.update(pubsub)
+        stats["seconds_since_last_message"] = (
+            round(time.time() - last, 1) if last is not None else None)
+        stats["listener_alive"] = listener is not None and not listener.done()
+    return stats
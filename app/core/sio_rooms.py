@@ -0,0 +1,34 @@
+"""
+Nombres de los rooms de Socket.IO. Los eventos dirigidos a un usuario o a un
+viaje se emiten al room correspondiente en lugar de a todas las conexiones.
+"""
+from uuid import UUID
+from typing import List, Union
+import math
+
+# Celdas de ~5.5 km para la posición de conductores libres
+AREA_CELL_DEGREES = 0.05
+
+
+def user_room(user_id: Union[UUID, str]) -> str:
+    return f"user:{user_id}"
+
+
+def trip_room(client_request_id: Union[UUID, str]) -> str:
+    return f"trip:{client_request_id}"
+
+
+def area_room(lat: float, lng: float) -> str:
+    return f"area:{math.floor(lat / AREA_CELL_DEGREES)}:{math.floor(lng / AREA_CELL_DEGREES)}"
+
+
+def area_rooms_around(lat: float, lng: float) -> List[str]:
+    """
+    Celda de la posición y sus 8 vecinas: quien observa un punto recibe los
+    conductores a una celda de distancia en cualquier dirección.
+    """
+    return [
+        area_room(lat + d_lat * AREA_CELL_DEGREES, lng + d_lng * AREA_CELL_DEGREES)
+        for d_lat in (-1, 0, 1)
+        for d_lng in (-1, 0, 1)
+    ]
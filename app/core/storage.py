@@ -0,0 +1,179 @@
+"""
+Backends de almacenamiento de archivos según STORAGE_BACKEND:
+
+- "local": disco local bajo STORAGE_LOCAL_ROOT (por defecto static/uploads).
+           En producción lo sirve nginx directamente; las URL firmadas son
+           compatibles con el módulo secure_link de nginx.
+- "s3":    bucket S3 o compatible (MinIO, R2, Spaces) con S3_ENDPOINT_URL.
+           Las URL firmadas son URL prefirmadas de S3. Requiere boto3.
+
+Los archivos se guardan por contenido (objects/ab/<sha256>.<ext>): la misma
+llave siempre tiene el mismo contenido, así que se pueden cachear como
+inmutables.
+"""
+from app.core.config import settings
+from typing import Optional
+from urllib.parse import urlsplit
+import base64
+import hashlib
+import os
+import time
+
+# Los archivos por contenido nunca cambian: caché de un año
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def content_key(sha256: str, extension: str = "") -> str:
+    return f"objects/{sha256[:2]}/{sha256}{extension.lower()}"
+
+
+def key_from_url(url: Optional[str]) -> Optional[str]:
+    """
+    Llave del objeto a partir de su URL (o de la llave misma). None para
+    archivos guardados antes del almacenamiento por contenido.
+    """
+    if not url:
+        return None
+    index = url.find("objects/")
+    if index < 0:
+        return None
+    return url[index:].split("?", 1)[0]
+
+
+class LocalStorageBackend:
+    name = "local"
+
+    def __init__(self, root: Optional[str] = None, public_url: Optional[str] = None,
+                 secret: Optional[str] = None):
+        self.root = root or settings.STORAGE_LOCAL_ROOT
+        self.public_url = (public_url or settings.STORAGE_PUBLIC_URL
+                           or settings.STATIC_URL_PREFIX).rstrip("/")
+        self.secret = secret or settings.STORAGE_URL_SECRET
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path_for(key))
+
+    def put_file(self, path: str, key: str, content_type: Optional[str] = None) -> bool:
+        """
+        Mueve el archivo a su llave. Si ya existe (mismo contenido) descarta
+        la copia nueva. Retorna True si se escribió.
+        """
+        target = self.path_for(key)
+        if os.path.exists(target):
+            os.remove(path)
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(path, target)
+        return True
+
+    def delete(self, key: str) -> None:
+        target = self.path_for(key)
+        stem, _ = os.path.splitext(target)
+        for path in (target, f"{stem}_thumb.jpg"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def url_for(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def signed_url(self, key: str, ttl: Optional[int] = None) -> str:
+        """
+        URL con vencimiento para `secure_link` de nginx:
+        secure_link_md5 "$secure_link_expires$uri <secreto>".
+        """
+        if not self.secret:
+            raise ValueError("Las URL firmadas requieren definir STORAGE_URL_SECRET")
+        expires = int(time.time()) + (ttl or settings.STORAGE_SIGNED_URL_TTL)
+        url = self.url_for(key)
+        uri = urlsplit(url).path
+        digest = hashlib.md5(f"{expires}{uri} {self.secret}".encode()).digest()
+        signature = base64.urlsafe_b64encode(digest).decode().rstrip("=")
+        return f"{url}?md5={signature}&expires={expires}"
+
+
+def _is_not_found(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    code = str(response.get("Error", {}).get("Code", ""))
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+class S3StorageBackend:
+    name = "s3"
+
+    def __init__(self, bucket: Optional[str] = None, client=None,
+                 public_url: Optional[str] = None, endpoint_url: Optional[str] = None):
+        self.bucket = bucket or settings.S3_BUCKET
+        if not self.bucket:
+            raise ValueError("STORAGE_BACKEND=s3 requiere definir S3_BUCKET")
+        self.endpoint_url = endpoint_url or settings.S3_ENDPOINT_URL
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise ValueError("STORAGE_BACKEND=s3 requiere instalar boto3")
+            client = boto3.client(
+                "s3",
+                endpoint_url=self.endpoint_url,
+                region_name=settings.S3_REGION,
+                aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            )
+        self.client = client
+        public_url = public_url or settings.STORAGE_PUBLIC_URL
+        if not public_url:
+            public_url = (f"{self.endpoint_url.rstrip('/')}/{self.bucket}" if self.endpoint_url
+                          else f"https://{self.bucket}.s3.amazonaws.com")
+        self.public_url = public_url.rstrip("/")
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+        return True
+
+    def put_file(self, path: str, key: str, content_type: Optional[str] = None) -> bool:
+        try:
+            if self.exists(key):
+                return False
+            extra = {"CacheControl": IMMUTABLE_CACHE_CONTROL}
+            if content_type:
+                extra["ContentType"] = content_type
+            self.client.upload_file(path, self.bucket, key, ExtraArgs=extra)
+            return True
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def url_for(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+    def signed_url(self, key: str, ttl: Optional[int] = None) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key,
+                    "ResponseCacheControl": IMMUTABLE_CACHE_CONTROL},
+            ExpiresIn=ttl or settings.STORAGE_SIGNED_URL_TTL,
+        )
+
+
+def build_storage_backend(backend: Optional[str] = None):
+    """
+    Construye el backend según STORAGE_BACKEND ("local" o "s3").
+    """
+    backend = backend or settings.STORAGE_BACKEND
+    if backend == "s3":
+        return S3StorageBackend()
+    if backend != "local":
+        raise ValueError(f"STORAGE_BACKEND desconocido: {backend}")
+    return LocalStorageBackend()
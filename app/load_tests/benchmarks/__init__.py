@@ -0,0 +1 @@
+# Benchmarks de consultas contra una base de datos local (sin servidor HTTP)
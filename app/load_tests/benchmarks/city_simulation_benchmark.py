@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Simulación de una ciudad sintética contra los servicios reales, sin servidor
+ni llaves de Google.
+
+Siembra sobre la base configurada (DATABASE_URL, un PostGIS local vacío)
+`--drivers` conductores y `--passengers` pasajeros generados con `--seed`, y
+corre en un solo hilo el ciclo completo de `--trips` viajes:
+
+- positions:         DriverPositionService.create_driver_position (`--ticks` por conductor)
+- create_request:    create_client_request
+- driver_search:     DriverSearchService.find_available_drivers
+- nearby_requests:   get_nearby_client_requests_service (por cada conductor que oferta)
+- offer:             DriverTripOfferService.create_offer
+- assign:            assign_driver_service con la oferta más barata
+- trip_status:       update_status_by_driver_service hasta FINISHED
+- chat:              create_chat_message y mark_messages_as_read
+- payment:           update_status_to_paid_service (incluye distribute_earnings)
+
+Las llamadas a Google las responde FakeRoutingProvider. Reporta por etapa
+latencia p50/p95/p99, llamadas por segundo, consultas SQL y llamadas de rutas
+por llamada. Con `--baseline` compara contra un archivo de línea base y sale
+con código 1 si alguna etapa hace más consultas, es más lenta que la
+tolerancia o no está en la línea base (o si la línea base no tiene etapas);
+`--write-baseline` guarda la corrida actual como línea base. El repositorio
+no trae línea base: se graba en la máquina de referencia sobre un PostGIS
+recién creado y se sube el archivo.
+
+La misma semilla sobre una base vacía repite exactamente la misma ciudad,
+así que las consultas por etapa solo cambian cuando cambia el código.
+
+Uso:
+    python -m app.core.migrations upgrade
+    python -m app.load_tests.benchmarks.city_simulation_benchmark --write-baseline
+    # en corridas siguientes, sobre otra base recién creada
+    python -m app.load_tests.benchmarks.city_simulation_benchmark --baseline app/load_tests/baselines/city_simulation.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+import app.models  # noqa: F401  (registra todos los modelos)
+from app.core.db import engine
+from app.load_tests.simulation import City, CityConfig, FakeRoutingProvider, StageRecorder
+from app.models.chat_message import ChatMessageCreate
+from app.models.client_request import ClientRequestCreate
+from app.models.driver_position import DriverPositionCreate
+from app.models.user import User
+from app.services.chat_service import create_chat_message, mark_messages_as_read
+from app.services.client_requests_service import (
+    assign_driver_service,
+    create_client_request,
+    get_nearby_client_requests_service,
+    update_status_by_driver_service,
+    update_status_to_paid_service,
+)
+from app.services.driver_position_service import DriverPositionService
+from app.services.driver_search_service import DriverSearchService
+from app.services.driver_trip_offer_service import DriverTripOfferService
+from app.utils.geo_utils import wkb_to_coords
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent.parent / "baselines" / "city_simulation.json"
+
+TRIP_STATUSES = ["ON_THE_WAY", "ARRIVED", "TRAVELLING", "FINISHED"]
+
+
+def report_positions(city: City, recorder: StageRecorder, session: Session) -> None:
+    service = DriverPositionService(session)
+    for _ in range(city.config.ticks):
+        city.move_drivers()
+        for driver in city.drivers:
+            with recorder.stage("positions"):
+                service.create_driver_position(
+                    DriverPositionCreate(lat=driver.lat, lng=driver.lng), driver.user_id)
+
+
+def run_trip(plan, city: City, recorder: StageRecorder, session: Session,
+             type_service_id: int, outcome: dict) -> None:
+    passenger_id = plan.passenger.user_id
+    with recorder.stage("create_request"):
+        request = create_client_request(session, ClientRequestCreate(
+            fare_offered=plan.fare_offered,
+            pickup_description="Origen simulado",
+            destination_description="Destino simulado",
+            pickup_lat=plan.pickup[0], pickup_lng=plan.pickup[1],
+            destination_lat=plan.destination[0], destination_lng=plan.destination[1],
+            type_service_id=type_service_id,
+        ), passenger_id)
+    request_id = request.id
+
+    with recorder.stage("driver_search"):
+        candidates = DriverSearchService(session).find_available_drivers(*plan.pickup)
+
+    drivers_by_user = {driver.user_id: driver for driver in city.drivers}
+    offers = []
+    for candidate, fare_raise in zip(candidates[:city.config.offers_per_trip], plan.raises):
+        driver = drivers_by_user[candidate["driver"].user_id]
+        with recorder.stage("nearby_requests"):
+            visible = asyncio.run(get_nearby_client_requests_service(
+                driver.lat, driver.lng, session, wkb_to_coords,
+                type_service_ids=[type_service_id], current_driver_id=driver.user_id))
+        # Un conductor solo oferta por lo que ve en su listado
+        if not any(item["id"] == str(request_id) for item in visible):
+            outcome["not_visible"] += 1
+            continue
+        with recorder.stage("offer"):
+            offer = DriverTripOfferService(session).create_offer({
+                "id_driver": driver.user_id,
+                "id_client_request": request_id,
+                "fare_offer": plan.fare_offered + fare_raise,
+                "time": candidate["estimated_time"],
+                "distance": candidate["distance"],
+            })
+        offers.append(offer)
+
+    if not offers:
+        outcome["without_offers"] += 1
+        return
+
+    best = min(offers, key=lambda offer: (offer.fare_offer, offer.time))
+    driver_id, fare = best.id_driver, best.fare_offer
+    with recorder.stage("assign"):
+        assign_driver_service(session, request_id, driver_id, fare)
+
+    for status in TRIP_STATUSES:
+        with recorder.stage("trip_status"):
+            update_status_by_driver_service(session, request_id, status, driver_id)
+        if status == "ARRIVED":
+            with recorder.stage("chat"):
+                create_chat_message(session, driver_id, ChatMessageCreate(
+                    receiver_id=passenger_id, client_request_id=request_id,
+                    message="Ya llegué al punto de recogida"))
+                create_chat_message(session, passenger_id, ChatMessageCreate(
+                    receiver_id=driver_id, client_request_id=request_id,
+                    message="Voy saliendo"))
+                mark_messages_as_read(session, request_id, driver_id)
+                mark_messages_as_read(session, request_id, passenger_id)
+
+    with recorder.stage("payment"):
+        update_status_to_paid_service(session, request_id, passenger_id)
+    outcome["paid"] += 1
+
+
+def run(config: CityConfig) -> dict:
+    with Session(engine) as session:
+        if session.exec(select(func.count(User.id))).one():
+            raise SystemExit(
+                "La base ya tiene usuarios: la simulación necesita una base vacía y migrada "
+                "para que la corrida sea reproducible (DATABASE_URL apuntando a un PostGIS local).")
+
+    routing = FakeRoutingProvider()
+    city = City(config)
+    recorder = StageRecorder(engine, routing)
+    outcome = {"paid": 0, "without_offers": 0, "not_visible": 0, "rejected": 0}
+
+    with routing, Session(engine) as session:
+        type_service_id = city.seed_database(session)
+        plans = city.trip_plans(routing)
+        with recorder.attached():
+            start = time.perf_counter()
+            report_positions(city, recorder, session)
+            for plan in plans:
+                try:
+                    run_trip(plan, city, recorder, session, type_service_id, outcome)
+                except HTTPException as e:
+                    session.rollback()
+                    outcome["rejected"] += 1
+                    print(f"Viaje rechazado: {e.status_code} {e.detail}", file=sys.stderr)
+            elapsed = time.perf_counter() - start
+
+    return {
+        "config": config.as_dict(),
+        "environment": {
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "trips_per_second": round(outcome["paid"] / elapsed, 2) if elapsed else 0,
+        "outcome": outcome,
+        "routing_calls": dict(routing.calls),
+        "stages": recorder.summary(),
+    }
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Retorna las regresiones frente a la línea base: más consultas por
+    llamada (exacto, la corrida es determinista), p95 por encima de la
+    tolerancia o etapas que la línea base no tiene.
+    """
+    if baseline.get("config") != result["config"]:
+        raise SystemExit("La configuración de la corrida no coincide con la de la línea base")
+    if not baseline.get("stages"):
+        raise SystemExit("La línea base no tiene etapas: grabarla con --write-baseline "
+                         "sobre una base recién creada antes de comparar")
+    regressions = []
+    for name, stage in result["stages"].items():
+        expected = baseline["stages"].get(name)
+        if not expected:
+            regressions.append(f"{name}: etapa sin línea base")
+            continue
+        if stage["queries_per_call"] > expected["queries_per_call"]:
+            regressions.append(f"{name}: consultas/llamada {expected['queries_per_call']} -> "
+                               f"{stage['queries_per_call']}")
+        if stage["p95_ms"] > expected["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {expected['p95_ms']} ms -> {stage['p95_ms']} ms")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    defaults = CityConfig()
+    parser.add_argument("--drivers", type=int, default=defaults.drivers)
+    parser.add_argument("--passengers", type=int, default=defaults.passengers)
+    parser.add_argument("--trips", type=int, default=defaults.trips)
+    parser.add_argument("--ticks", type=int, default=defaults.ticks)
+    parser.add_argument("--offers-per-trip", type=int, default=defaults.offers_per_trip)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--baseline", type=Path, help="Comparar contra este archivo de línea base")
+    parser.add_argument("--write-baseline", type=Path, nargs="?", const=DEFAULT_BASELINE,
+                        help=f"Guardar la corrida como línea base (por defecto {DEFAULT_BASELINE.name})")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Aumento de p95 tolerado frente a la línea base (0.25 = 25%%)")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    config = CityConfig(drivers=args.drivers, passengers=args.passengers, trips=args.trips,
+                        ticks=args.ticks, offers_per_trip=args.offers_per_trip, seed=args.seed)
+    result = run(config)
+
+    regressions = []
+    if args.baseline:
+        if not args.baseline.exists():
+            raise SystemExit(f"No existe la línea base {args.baseline}: grabarla con --write-baseline")
+        regressions = compare(result, json.loads(args.baseline.read_text()), args.tolerance)
+    if args.write_baseline:
+        args.write_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.write_baseline.write_text(json.dumps(result, indent=2) + "\n")
+
+    if args.json:
+        print(json.dumps({**result, "regressions": regressions}, indent=2))
+    else:
+        print(f"viajes pagados: {result['outcome']['paid']}  viajes/s: {result['trips_per_second']}  "
+              f"llamadas de rutas: {result['routing_calls']}")
+        print("=" * 96)
+        print(f"{'etapa':<16} {'llamadas':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'llamadas/s':>11} {'consultas/ll':>13} {'rutas/ll':>9}")
+        print("-" * 96)
+        for name, stage in result["stages"].items():
+            print(f"{name:<16} {stage['calls']:>9} {stage['p50_ms']:>8} {stage['p95_ms']:>8} "
+                  f"{stage['p99_ms']:>8} {stage['per_second']:>11} "
+                  f"{stage['queries_per_call']:>13} {stage['routing_calls_per_call']:>9}")
+        for regression in regressions:
+            print(f"REGRESIÓN {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
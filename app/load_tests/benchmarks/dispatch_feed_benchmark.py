@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Carga sobre la base de datos: feed de solicitudes cercanas por polling vs push.
+
+Mide sobre la base configurada (DATABASE_URL) cuántas consultas SQL cuesta
+cada operación, contando las sentencias con un listener de SQLAlchemy:
+
+- poll:      una consulta de GET /client-request/nearby (validación del
+             conductor + búsqueda espacial y enriquecimiento de filas).
+- subscribe: suscripción de un conductor al feed por socket.
+- publish:   publicación de una solicitud nueva a N conductores del índice
+             en memoria (los emits van a un emisor vacío).
+
+Con esos costos calcula las consultas por segundo (QPS) de cada modelo para
+el mismo número de conductores:
+
+    polling = conductores / intervalo_de_poll × consultas_por_poll
+    push    = solicitudes_por_segundo × consultas_por_publicación
+              + reconexiones_por_segundo × (consultas_por_suscripción + consultas_por_poll)
+
+(en push cada reconexión pide una foto por REST).
+
+Requiere una base con el esquema de la app, al menos un conductor aprobado con
+vehículo y una solicitud de viaje. Si GOOGLE_API_KEY está configurada, el
+tiempo del poll incluye las llamadas a Google; el conteo de QPS es solo SQL.
+
+Uso:
+    python -m app.load_tests.benchmarks.dispatch_feed_benchmark --drivers 2000 --poll-interval 5
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+from sqlmodel import Session
+
+import app.models  # noqa: F401  (registra todos los modelos)
+from app.core.db import engine
+from app.models.client_request import ClientRequest
+from app.models.user_has_roles import UserHasRole, RoleStatus
+from app.services.client_requests_service import get_nearby_client_requests_service
+from app.services.config_cache_service import get_type_service
+from app.services.dispatch_feed_service import DispatchFeed, LiveDriverIndex, load_driver_feed_profile
+from app.utils.geo_utils import wkb_to_coords
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+@contextmanager
+def counting_queries():
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+
+def find_driver(session: Session):
+    return session.execute(
+        select(UserHasRole.id_user).where(
+            UserHasRole.id_rol == "DRIVER",
+            UserHasRole.status == RoleStatus.APPROVED,
+            UserHasRole.is_verified == True,
+            UserHasRole.suspension == False,
+        )
+    ).scalars().first()
+
+
+def measure(operation, samples: int):
+    """
+    Corre la operación `samples` veces; retorna (consultas por operación, ms p50).
+    """
+    timings = []
+    with counting_queries() as counter:
+        for _ in range(samples):
+            start = time.perf_counter()
+            operation()
+            timings.append((time.perf_counter() - start) * 1000)
+    return counter.count / samples, statistics.median(timings)
+
+
+def run_benchmark(drivers: int, poll_interval: float, requests_per_minute: float,
+                  reconnects_per_hour: float, samples: int, seed: int) -> dict:
+    random.seed(seed)
+    with Session(engine) as session:
+        driver_id = find_driver(session)
+        client_request = session.execute(
+            select(ClientRequest).order_by(ClientRequest.created_at.desc())).scalars().first()
+        if driver_id is None or client_request is None:
+            raise SystemExit(
+                "Se necesita un conductor aprobado y una solicitud de viaje en la base")
+
+        pickup = wkb_to_coords(client_request.pickup_position)
+        destination = wkb_to_coords(client_request.destination_position) or pickup
+        pickup = (pickup["lat"], pickup["lng"])
+        destination = (destination["lat"], destination["lng"])
+        profile = load_driver_feed_profile(session, driver_id)
+        type_service = get_type_service(session, client_request.type_service_id)
+
+        # ----- polling -----
+        def poll():
+            p = load_driver_feed_profile(session, driver_id)
+            asyncio.run(get_nearby_client_requests_service(
+                pickup[0], pickup[1], session, wkb_to_coords,
+                type_service_ids=p.type_service_ids, current_driver_id=driver_id))
+
+        poll_queries, poll_ms = measure(poll, samples)
+
+        # ----- push -----
+        def subscribe():
+            load_driver_feed_profile(session, driver_id)
+
+        subscribe_queries, subscribe_ms = measure(subscribe, samples)
+
+        async def no_emit(event_name, data, room):
+            pass
+
+        feed = DispatchFeed(emit=no_emit, index=LiveDriverIndex(ttl=3600))
+        for _ in range(drivers):
+            feed.index.upsert(
+                uuid.uuid4(),
+                pickup[0] + random.uniform(-0.05, 0.05),
+                pickup[1] + random.uniform(-0.05, 0.05),
+                type_service.vehicle_type_id if type_service else profile.vehicle_type_id)
+
+        deliveries = []
+
+        def publish():
+            deliveries.append(feed.publish_new_request(
+                session, client_request, pickup, destination))
+
+        publish_queries, publish_ms = measure(publish, samples)
+
+    polling_qps = drivers / poll_interval * poll_queries
+    push_qps = (requests_per_minute / 60 * publish_queries
+                + drivers * reconnects_per_hour / 3600 * (subscribe_queries + poll_queries))
+    return {
+        "drivers": drivers,
+        "poll_interval_s": poll_interval,
+        "requests_per_minute": requests_per_minute,
+        "reconnects_per_driver_hour": reconnects_per_hour,
+        "queries_per_poll": poll_queries,
+        "queries_per_subscribe": subscribe_queries,
+        "queries_per_publish": publish_queries,
+        "poll_p50_ms": round(poll_ms, 2),
+        "subscribe_p50_ms": round(subscribe_ms, 2),
+        "publish_p50_ms": round(publish_ms, 2),
+        "drivers_per_publish": statistics.mean(deliveries) if deliveries else 0,
+        "polling_db_qps": round(polling_qps, 1),
+        "push_db_qps": round(push_qps, 1),
+        "reduction": round(polling_qps / push_qps, 1) if push_qps else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--drivers", type=int, default=2000)
+    parser.add_argument("--poll-interval", type=float, default=5,
+                        help="Segundos entre consultas de cada conductor en polling")
+    parser.add_argument("--requests-per-minute", type=float, default=60,
+                        help="Solicitudes nuevas por minuto")
+    parser.add_argument("--reconnects-per-hour", type=float, default=4,
+                        help="Reconexiones por conductor por hora (push)")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=99)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.drivers, args.poll_interval, args.requests_per_minute,
+                           args.reconnects_per_hour, args.samples, args.seed)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print("=" * 60)
+    print(f"Conductores: {result['drivers']}  poll cada {result['poll_interval_s']}s  "
+          f"solicitudes/min: {result['requests_per_minute']}")
+    print(f"Consultas por poll:        {result['queries_per_poll']:.1f}  (p50 {result['poll_p50_ms']} ms)")
+    print(f"Consultas por suscripción: {result['queries_per_subscribe']:.1f}  (p50 {result['subscribe_p50_ms']} ms)")
+    print(f"Consultas por publicación: {result['queries_per_publish']:.1f}  (p50 {result['publish_p50_ms']} ms, "
+          f"{result['drivers_per_publish']:.0f} conductores)")
+    print("-" * 60)
+    print(f"QPS polling: {result['polling_db_qps']}")
+    print(f"QPS push:    {result['push_db_qps']}")
+    print(f"Reducción:   {result['reduction']}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
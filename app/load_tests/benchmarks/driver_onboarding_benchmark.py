@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Registro de conductores por segundo (DriverService.create_driver).
+
+Registra N conductores nuevos sobre la base configurada (DATABASE_URL) con
+selfie y documentos sintéticos (archivos pequeños en memoria) y mide:
+
+- registros por segundo, en serie y con `--concurrency` registros en paralelo
+  (un hilo con su propio event loop por registro en vuelo).
+- latencia por registro (p50/p95).
+- consultas SQL y commits por registro, contados con listeners de SQLAlchemy.
+  Incluye el commit corto de la referencia de cada archivo subido (fuera de
+  la transacción del registro, que es una sola).
+
+Escribe usuarios, conductores y archivos reales: usar una base de pruebas.
+Requiere los roles DRIVER/CLIENT, project_settings y el tipo de vehículo 1.
+
+Uso:
+    python -m app.load_tests.benchmarks.driver_onboarding_benchmark --registrations 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from fastapi import UploadFile
+from sqlalchemy import event
+from sqlmodel import Session
+
+import app.models  # noqa: F401  (registra todos los modelos)
+from app.core.db import engine
+from app.models.driver import DriverDocumentsInput
+from app.models.driver_info import DriverInfoCreate
+from app.models.user import UserCreate
+from app.models.vehicle_info import VehicleInfoCreate
+from app.services.driver_service import DriverService
+
+
+class Counters:
+    def __init__(self):
+        self.queries = 0
+        self.commits = 0
+        self._lock = threading.Lock()
+
+    def on_query(self, *args, **kwargs):
+        with self._lock:
+            self.queries += 1
+
+    def on_commit(self, *args, **kwargs):
+        with self._lock:
+            self.commits += 1
+
+
+def fake_file(name: str, rng: random.Random) -> UploadFile:
+    # Contenido distinto por archivo para no medir solo la deduplicación
+    data = b"\xff\xd8\xff\xe0" + rng.randbytes(32 * 1024)
+    return UploadFile(io.BytesIO(data), filename=name, headers={"content-type": "image/jpeg"})
+
+
+def registration(rng: random.Random):
+    phone = "3" + "".join(rng.choice("0123456789") for _ in range(9))
+    plate = "".join(rng.choice("ABCDEFGHJKLMNPRSTUVWXYZ") for _ in range(3)) + str(rng.randint(100, 999))
+    expires = date.today() + timedelta(days=365)
+    return dict(
+        user_data=UserCreate(full_name="Conductor Benchmark", country_code="+57", phone_number=phone),
+        driver_info_data=DriverInfoCreate(first_name="Conductor", last_name="Benchmark",
+                                          birth_date=date(1990, 1, 1), email=f"{phone}@bench.test"),
+        vehicle_info_data=VehicleInfoCreate(brand="Renault", model="Logan", model_year=2020,
+                                            color="Gris", plate=plate, vehicle_type_id=1),
+        driver_documents_data=DriverDocumentsInput(
+            property_card_front=fake_file("property_front.jpg", rng),
+            property_card_back=fake_file("property_back.jpg", rng),
+            license_front=fake_file("license_front.jpg", rng),
+            license_back=fake_file("license_back.jpg", rng),
+            license_expiration_date=expires,
+            soat=fake_file("soat.jpg", rng),
+            soat_expiration_date=expires,
+            vehicle_technical_inspection=fake_file("technical.jpg", rng),
+            vehicle_technical_inspection_expiration_date=expires,
+        ),
+        selfie=fake_file("selfie.jpg", rng),
+    )
+
+
+def register_one(data) -> float:
+    start = time.perf_counter()
+    with Session(engine) as session:
+        asyncio.run(DriverService(session).create_driver(**data))
+    return (time.perf_counter() - start) * 1000
+
+
+def run(registrations: int, concurrency: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    payloads = [registration(rng) for _ in range(registrations)]
+    counters = Counters()
+    event.listen(engine, "before_cursor_execute", counters.on_query)
+    event.listen(engine, "commit", counters.on_commit)
+    try:
+        start = time.perf_counter()
+        if concurrency <= 1:
+            latencies = [register_one(data) for data in payloads]
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                latencies = list(pool.map(register_one, payloads))
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", counters.on_query)
+        event.remove(engine, "commit", counters.on_commit)
+
+    latencies.sort()
+    return {
+        "registrations": registrations,
+        "concurrency": concurrency,
+        "registrations_per_second": round(registrations / elapsed, 2),
+        "latency_p50_ms": round(statistics.median(latencies), 1),
+        "latency_p95_ms": round(latencies[max(int(len(latencies) * 0.95) - 1, 0)], 1),
+        "queries_per_registration": round(counters.queries / registrations, 1),
+        "commits_per_registration": round(counters.commits / registrations, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--registrations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--seed", type=int, default=99)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    results = [run(args.registrations, concurrency, args.seed + i)
+               for i, concurrency in enumerate(args.concurrency)]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print("=" * 78)
+    print(f"{'paralelo':>9} {'registros/s':>12} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'consultas/reg':>14} {'commits/reg':>12}")
+    print("-" * 78)
+    for result in results:
+        print(f"{result['concurrency']:>9} {result['registrations_per_second']:>12} "
+              f"{result['latency_p50_ms']:>9} {result['latency_p95_ms']:>9} "
+              f"{result['queries_per_registration']:>14} {result['commits_per_registration']:>12}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Renovaciones de refresh token por segundo (RefreshTokenService.rotate_refresh_token).
+
+Sobre la base configurada (DATABASE_URL) emite un token para cada uno de los
+primeros `--users` usuarios y encadena `--rotations` renovaciones por usuario.
+Mide:
+
+- renovaciones por segundo, en serie y con `--concurrency` hilos (cada uno
+  con su sesión), y latencia p50/p95.
+- consultas SQL por renovación (en PostgreSQL revocar e insertar es una sola
+  sentencia).
+- reintentos con tokens ya rotados: tiempo por rechazo con la caché negativa
+  y sin ella (cada rechazo va a la base).
+
+Escribe filas en refresh_token: usar una base de pruebas.
+
+Uso:
+    python -m app.load_tests.benchmarks.refresh_token_benchmark --users 50 --rotations 20 --concurrency 1 8
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from sqlalchemy import event, select
+from sqlmodel import Session
+
+import app.models  # noqa: F401  (registra todos los modelos)
+from app.core.db import engine
+from app.models.user import User
+from app.services.refresh_token_service import (
+    RefreshTokenService,
+    RevokedTokenCache,
+    set_revoked_token_cache,
+)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            self.queries += 1
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * fraction) - 1, 0)]
+
+
+def rotate_chain(user_id, rotations: int):
+    """
+    Renueva `rotations` veces el token de un usuario. Retorna las latencias
+    (ms) y los tokens ya rotados.
+    """
+    latencies, used = [], []
+    with Session(engine) as session:
+        service = RefreshTokenService(session)
+        token, _ = service.generate_refresh_token(user_id, "benchmark", "127.0.0.1")
+        for _ in range(rotations):
+            start = time.perf_counter()
+            _, new_token = service.rotate_refresh_token(token, "benchmark", "127.0.0.1")
+            latencies.append((time.perf_counter() - start) * 1000)
+            used.append(token)
+            token = new_token
+        service.revoke_refresh_token(token)
+    return latencies, used
+
+
+def replay(tokens) -> float:
+    """
+    Reintenta renovar con tokens ya rotados; retorna ms por rechazo.
+    """
+    with Session(engine) as session:
+        service = RefreshTokenService(session)
+        start = time.perf_counter()
+        for token in tokens:
+            try:
+                service.rotate_refresh_token(token)
+            except HTTPException:
+                pass
+            else:
+                raise AssertionError("Un token rotado fue aceptado")
+        return (time.perf_counter() - start) * 1000 / max(len(tokens), 1)
+
+
+def run(user_ids, rotations: int, concurrency: int) -> dict:
+    set_revoked_token_cache(RevokedTokenCache())
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as pool:
+            chains = list(pool.map(lambda user_id: rotate_chain(user_id, rotations), user_ids))
+        elapsed = time.perf_counter() - start
+        queries = counter.queries
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+
+    latencies = [latency for chain, _ in chains for latency in chain]
+    used = [token for _, tokens in chains for token in tokens]
+    # Con caché: los tokens rotados en este proceso ya están en ella
+    replay_cached_ms = replay(used)
+    set_revoked_token_cache(RevokedTokenCache(ttl=0))
+    replay_uncached_ms = replay(used)
+    set_revoked_token_cache(None)
+
+    total = len(latencies)
+    # Cada cadena hace además un INSERT inicial y un UPDATE final
+    per_rotation = (queries - 2 * len(user_ids)) / total if total else 0
+    return {
+        "users": len(user_ids),
+        "rotations": total,
+        "concurrency": concurrency,
+        "rotations_per_second": round(total / elapsed, 1) if elapsed else 0,
+        "latency_p50_ms": round(statistics.median(latencies), 2),
+        "latency_p95_ms": round(percentile(latencies, 0.95), 2),
+        "queries_per_rotation": round(per_rotation, 2),
+        "replay_reject_cached_ms": round(replay_cached_ms, 3),
+        "replay_reject_uncached_ms": round(replay_uncached_ms, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rotations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user_ids = list(session.execute(
+            select(User.id).where(User.is_active == True).limit(args.users)).scalars())
+    if not user_ids:
+        print("No hay usuarios en la base", file=sys.stderr)
+        return 1
+
+    results = [run(user_ids, args.rotations, concurrency) for concurrency in args.concurrency]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print("=" * 92)
+    print(f"{'paralelo':>9} {'renov/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'consultas/renov':>16} "
+          f"{'rechazo caché ms':>17} {'rechazo BD ms':>14}")
+    print("-" * 92)
+    for result in results:
+        print(f"{result['concurrency']:>9} {result['rotations_per_second']:>9} "
+              f"{result['latency_p50_ms']:>8} {result['latency_p95_ms']:>8} "
+              f"{result['queries_per_rotation']:>16} {result['replay_reject_cached_ms']:>17} "
+              f"{result['replay_reject_uncached_ms']:>14}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Emits de Socket.IO entre workers a través del client manager.
+
+Levanta W AsyncServer en el mismo proceso, cada uno con su manager pub/sub
+(LocalPubSubBroker en memoria o Redis real con --redis-url), reparte N
+sockets sintéticos entre ellos (cada uno en su room de usuario) y emite a
+rooms de usuario desde workers al azar. Mide:
+
+- latencia de entrega: desde el emit hasta que el worker del socket envía
+  el paquete (p50/p95).
+- throughput: emits entregados por segundo con `--concurrency` emits en vuelo.
+- reparto: paquetes enviados y mensajes de pub/sub recibidos por worker.
+
+Como referencia corre lo mismo con un solo worker y el manager en memoria.
+Todos los workers comparten el event loop de este proceso: el resultado mide
+el costo del paso por pub/sub, no la capacidad de workers en paralelo.
+
+Uso:
+    python -m app.load_tests.benchmarks.sio_cross_worker_benchmark --workers 4 --sockets 20000
+    python -m app.load_tests.benchmarks.sio_cross_worker_benchmark --redis-url redis://localhost:6379/15
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+
+import socketio
+
+from app.core.sio_manager import (
+    LocalPubSubBroker,
+    LocalPubSubManager,
+    RedisClientManager,
+    get_sio_stats,
+)
+from app.core.sio_rooms import user_room
+
+
+class Delivery:
+    """
+    Registra cuándo se entrega cada emit (por id de socket de Engine.IO).
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.latencies = []
+        self.done = asyncio.Event()
+        self.expected = 0
+
+    def start(self, eio_sid) -> None:
+        self.pending.setdefault(eio_sid, []).append(time.perf_counter())
+
+    async def send_packet(self, eio_sid, pkt):
+        started = self.pending.get(eio_sid)
+        if started:
+            self.latencies.append((time.perf_counter() - started.pop(0)) * 1000)
+            if len(self.latencies) >= self.expected:
+                self.done.set()
+
+
+def build_workers(workers: int, redis_url, channel: str):
+    broker = LocalPubSubBroker()
+    servers = []
+    for _ in range(workers):
+        if workers == 1 and redis_url is None:
+            manager = socketio.AsyncManager()
+        elif redis_url:
+            manager = RedisClientManager(redis_url, channel=channel)
+        else:
+            manager = LocalPubSubManager(broker, channel=channel)
+        sio = socketio.AsyncServer(async_mode="asgi", client_manager=manager)
+        sio.manager_initialized = True
+        sio.manager.initialize()
+        servers.append(sio)
+    return servers
+
+
+async def run(workers: int, sockets: int, emits: int, concurrency: int,
+              redis_url, seed: int) -> dict:
+    random.seed(seed)
+    channel = f"bench-socketio-{uuid.uuid4().hex[:8]}"
+    servers = build_workers(workers, redis_url, channel)
+    delivery = Delivery()
+    for sio in servers:
+        sio.eio.send_packet = delivery.send_packet
+    # Deja que los listeners se suscriban al canal
+    await asyncio.sleep(0.2 if redis_url else 0.01)
+
+    users = []
+    for i in range(sockets):
+        sio = servers[i % workers]
+        user_id = uuid.uuid4()
+        sid = await sio.manager.connect(f"eio-{i}", "/")
+        await sio.manager.enter_room(sid, "/", user_room(user_id))
+        users.append((f"eio-{i}", user_id))
+
+    targets = [random.choice(users) for _ in range(emits)]
+    delivery.expected = len(targets)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(eio_sid, user_id):
+        async with semaphore:
+            delivery.start(eio_sid)
+            await random.choice(servers).emit(
+                "driver_assigned/bench", {"id": str(user_id)}, room=user_room(user_id))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(eio_sid, user_id) for eio_sid, user_id in targets))
+    try:
+        await asyncio.wait_for(delivery.done.wait(), timeout=60)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - start
+
+    stats = [get_sio_stats(sio) for sio in servers]
+    for sio in servers:
+        thread = getattr(sio.manager, "thread", None)
+        if thread is not None:
+            thread.cancel()
+
+    latencies = sorted(delivery.latencies)
+    return {
+        "workers": workers,
+        "backend": stats[0]["backend"],
+        "sockets": sockets,
+        "emits": emits,
+        "delivered": len(latencies),
+        "emits_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "latency_p50_ms": round(statistics.median(latencies), 3) if latencies else None,
+        "latency_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3) if latencies else None,
+        "per_worker": [
+            {"connected": s["connected"], "received": s.get("received"), "published": s.get("published")}
+            for s in stats
+        ],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sockets", type=int, default=20000)
+    parser.add_argument("--emits", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--redis-url", default=None,
+                        help="Usar Redis real en lugar del broker en memoria")
+    parser.add_argument("--seed", type=int, default=99)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    results = [
+        asyncio.run(run(1, args.sockets, args.emits, args.concurrency, None, args.seed)),
+        asyncio.run(run(args.workers, args.sockets, args.emits, args.concurrency,
+                        args.redis_url, args.seed)),
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print("=" * 78)
+    print(f"{'workers':>8} {'backend':>13} {'entregados':>11} {'emits/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    print("-" * 78)
+    for result in results:
+        print(f"{result['workers']:>8} {result['backend']:>13} "
+              f"{result['delivered']:>5}/{result['emits']:<5} {result['emits_per_second']:>10} "
+              f"{result['latency_p50_ms']:>9} {result['latency_p95_ms']:>9}")
+    print("-" * 78)
+    for i, worker in enumerate(results[-1]["per_worker"]):
+        print(f"worker {i}: {worker['connected']} sockets, "
+              f"{worker['received']} mensajes recibidos, {worker['published']} publicados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Costo de fan-out de Socket.IO: broadcast global vs emits por room.
+
+Registra N sockets sintéticos en un AsyncServer (sin red: el envío de cada
+paquete de Engine.IO se reemplaza por un contador), repartidos como en la
+app: cada socket en su room de usuario, los que están en viaje en el room
+del viaje (cliente + conductor) y los conductores libres en un room de
+zona de Bogotá. Mide, para un ping de GPS:
+
+- broadcast: emit sin room (lo que hacían todos los handlers).
+- trip:      emit al room del viaje (trip_change_driver_position).
+- area:      emit al room de zona (change_driver_position de un conductor libre).
+- user:      emit al room de un usuario (mensajes de chat, asignación).
+
+Reporta paquetes enviados y tiempo por emit.
+
+Uso:
+    python -m app.load_tests.benchmarks.sio_fanout_benchmark --sockets 5000 10000 20000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import uuid
+
+import socketio
+
+from app.core.sio_rooms import area_room, trip_room, user_room
+
+# Caja aproximada de Bogotá
+LAT_RANGE = (4.50, 4.85)
+LNG_RANGE = (-74.25, -73.99)
+
+
+async def build_server(sockets: int, trip_share: float, seed: int):
+    """
+    AsyncServer con `sockets` conexiones sintéticas. Retorna el servidor,
+    el contador de paquetes y una muestra de viajes, zonas y usuarios.
+    """
+    random.seed(seed)
+    sio = socketio.AsyncServer(async_mode="asgi")
+    sent = {"packets": 0}
+
+    async def send_packet(eio_sid, pkt):
+        sent["packets"] += 1
+
+    sio.eio.send_packet = send_packet
+    manager = sio.manager
+
+    trips, areas, users = [], [], []
+    pending_trip = None
+    for i in range(sockets):
+        user_id = uuid.uuid4()
+        sid = await manager.connect(f"eio-{i}", "/")
+        await manager.enter_room(sid, "/", user_room(user_id))
+        users.append(user_id)
+        if random.random() < trip_share:
+            # Cliente y conductor del mismo viaje comparten el room
+            if pending_trip is None:
+                pending_trip = uuid.uuid4()
+                await manager.enter_room(sid, "/", trip_room(pending_trip))
+                continue
+            await manager.enter_room(sid, "/", trip_room(pending_trip))
+            trips.append(trip_room(pending_trip))
+            pending_trip = None
+        else:
+            lat = random.uniform(*LAT_RANGE)
+            lng = random.uniform(*LNG_RANGE)
+            await manager.enter_room(sid, "/", area_room(lat, lng))
+            areas.append(area_room(lat, lng))
+    return sio, sent, trips, areas, users
+
+
+async def measure(sio, sent, rooms, samples: int):
+    payload = {"id_socket": "bench", "lat": 4.65, "lng": -74.06}
+    timings = []
+    sent["packets"] = 0
+    for i in range(samples):
+        room = rooms[i % len(rooms)] if rooms else None
+        start = time.perf_counter()
+        await sio.emit("trip_new_driver_position/bench", payload, room=room)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "packets_per_emit": sent["packets"] / samples,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(sorted(timings)[int(len(timings) * 0.95) - 1], 3),
+    }
+
+
+async def run(sockets: int, trip_share: float, samples: int, seed: int) -> dict:
+    sio, sent, trips, areas, users = await build_server(sockets, trip_share, seed)
+    return {
+        "sockets": sockets,
+        "broadcast": await measure(sio, sent, [], samples),
+        "trip": await measure(sio, sent, trips, samples),
+        "area": await measure(sio, sent, areas, samples),
+        "user": await measure(sio, sent, [user_room(u) for u in users], samples),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sockets", type=int, nargs="+", default=[5000, 10000, 20000])
+    parser.add_argument("--trip-share", type=float, default=0.3,
+                        help="Fracción de sockets en un viaje activo")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=99)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(n, args.trip_share, args.samples, args.seed))
+               for n in args.sockets]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print("=" * 72)
+    print(f"{'sockets':>8} {'emit':>10} {'paquetes/emit':>14} {'p50 ms':>10} {'p95 ms':>10}")
+    print("-" * 72)
+    for result in results:
+        for kind in ("broadcast", "trip", "area", "user"):
+            row = result[kind]
+            print(f"{result['sockets']:>8} {kind:>10} {row['packets_per_emit']:>14.1f} "
+                  f"{row['p50_ms']:>10} {row['p95_ms']:>10}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
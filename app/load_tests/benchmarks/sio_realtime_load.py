@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Generador de carga de Socket.IO para los eventos en tiempo real.
+
+Contra un servidor corriendo (`--url`) conecta conductores y pasajeros
+virtuales (websocket, con access tokens firmados con el SECRET_KEY del
+entorno, el mismo del servidor):
+
+- conductores libres: emiten `change_driver_position` a `--gps-hz`
+  moviéndose por Bogotá; los pasajeros libres observan una zona con
+  `watch_nearby_drivers` y reciben `new_driver_position`.
+- viajes (`--trips`, requiere la misma base que el servidor): se siembran
+  pasajeros, conductores y solicitudes ON_THE_WAY reales, así que al conectar
+  cada socket entra al room de su viaje. El conductor emite
+  `trip_change_driver_position` (incluye la evaluación de estado del
+  servidor) y el pasajero envía `client_to_driver_message` cada
+  `--chat-interval` segundos. Al terminar las solicitudes quedan canceladas.
+
+Mide por tipo de evento la latencia de extremo a extremo (desde el emit del
+emisor hasta que lo recibe cada destinatario, p50/p95/p99) y los eventos
+perdidos (destinatarios esperados según los rooms que no lo recibieron tras
+`--drain` segundos). Con `--server-pid` (uno por worker) mide la CPU del
+servidor durante la ventana de medición y la reporta por cada 1000 sockets.
+
+Todos los sockets viven en este proceso: si la CPU del generador se acerca
+al 100 % las latencias incluyen su propia espera.
+
+Uso:
+    python -m app.load_tests.benchmarks.sio_realtime_load --url http://localhost:8000 --drivers 1000 --passengers 1000 --trips 200 --gps-hz 1 --duration 60 --server-pid 12345
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import List
+
+import psutil
+import socketio
+
+from app.core.sio_rooms import area_room, area_rooms_around
+from app.services.auth_service import AuthService
+
+# Centro y dispersión (grados) de las posiciones simuladas
+CENTER = (4.65, -74.10)
+SPREAD = 0.08
+METERS_PER_DEGREE = 111_320
+
+
+class Tracker:
+    """
+    Cada emit queda pendiente con los destinatarios que deberían recibirlo;
+    lo que siga pendiente al final son eventos perdidos.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.sent = Counter()
+        self.expected = Counter()
+        self.received = Counter()
+        self.unexpected = Counter()
+        self.latencies = defaultdict(list)
+        self.recording = False
+
+    def emitted(self, kind: str, key, expected: int) -> None:
+        if not self.recording:
+            return
+        self.sent[kind] += 1
+        self.expected[kind] += expected
+        if expected:
+            self.pending[key] = [time.perf_counter(), expected]
+
+    def delivered(self, kind: str, key) -> None:
+        entry = self.pending.get(key)
+        if entry is None:
+            # Emitido antes de la ventana de medición o destinatario de más
+            self.unexpected[kind] += 1
+            return
+        self.latencies[kind].append((time.perf_counter() - entry[0]) * 1000)
+        self.received[kind] += 1
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.pending[key]
+
+
+class VirtualUser:
+    def __init__(self, user_id: uuid.UUID, lat: float, lng: float):
+        self.user_id = user_id
+        self.lat = lat
+        self.lng = lng
+        self.client = socketio.AsyncClient(reconnection=False)
+        # Viaje: (id_client_request, id de la otra parte)
+        self.trip = None
+        self.areas: List[str] = []
+        self.seq = 0
+
+    def step(self, rng: random.Random) -> None:
+        meters, heading = rng.uniform(5, 30), rng.uniform(0, 2 * math.pi)
+        self.lat = round(self.lat + meters * math.cos(heading) / METERS_PER_DEGREE, 7)
+        self.lng = round(self.lng + meters * math.sin(heading) / METERS_PER_DEGREE, 7)
+
+
+def random_point(rng: random.Random):
+    return (round(CENTER[0] + rng.uniform(-SPREAD, SPREAD), 7),
+            round(CENTER[1] + rng.uniform(-SPREAD, SPREAD), 7))
+
+
+def seed_trips(count: int, rng: random.Random):
+    """
+    Crea `count` pares pasajero/conductor con una solicitud ON_THE_WAY. El
+    conductor arranca a más de 2 km de la recogida, así que sus posiciones no
+    cambian el estado del viaje. Retorna [(pasajero, conductor, solicitud, recogida)].
+    """
+    from geoalchemy2.shape import from_shape
+    from shapely.geometry import Point
+    from sqlmodel import Session, select
+
+    import app.models  # noqa: F401  (registra todos los modelos)
+    from app.core.db import engine
+    from app.models.client_request import ClientRequest, StatusEnum
+    from app.models.type_service import TypeService
+    from app.models.user import User
+
+    with Session(engine) as session:
+        type_service_id = session.exec(select(TypeService.id)).first()
+        if type_service_id is None:
+            raise SystemExit("No hay tipos de servicio: inicializar la configuración base (init_data)")
+        trips = []
+        for _ in range(count):
+            users = [
+                User(full_name="Carga Socket.IO", country_code="+57", is_verified_phone=True,
+                     is_active=True, phone_number="3" + "".join(rng.choice("0123456789") for _ in range(9)))
+                for _ in range(2)
+            ]
+            session.add_all(users)
+            session.flush()
+            pickup, destination = random_point(rng), random_point(rng)
+            request = ClientRequest(
+                id_client=users[0].id,
+                id_driver_assigned=users[1].id,
+                type_service_id=type_service_id,
+                fare_offered=10000,
+                fare_assigned=10000,
+                status=StatusEnum.ON_THE_WAY,
+                pickup_position=from_shape(Point(pickup[1], pickup[0]), srid=4326),
+                destination_position=from_shape(Point(destination[1], destination[0]), srid=4326),
+            )
+            session.add(request)
+            session.flush()
+            trips.append((users[0].id, users[1].id, request.id, pickup))
+        session.commit()
+    return trips
+
+
+def cancel_trips(request_ids) -> None:
+    """Cancela las solicitudes sembradas (el listener borra su chat)."""
+    from sqlmodel import Session, select
+
+    from app.core.db import engine
+    from app.models.client_request import ClientRequest, StatusEnum
+
+    with Session(engine) as session:
+        for request in session.exec(select(ClientRequest).where(ClientRequest.id.in_(request_ids))):
+            request.status = StatusEnum.CANCELLED
+        session.commit()
+
+
+def build_users(args, rng: random.Random):
+    drivers, passengers = [], []
+    trips = seed_trips(args.trips, rng) if args.trips else []
+    for passenger_id, driver_id, request_id, pickup in trips:
+        passenger = VirtualUser(passenger_id, *pickup)
+        passenger.trip = (request_id, driver_id)
+        # A unos 3 km de la recogida
+        driver = VirtualUser(driver_id, round(pickup[0] + 0.027, 7), pickup[1])
+        driver.trip = (request_id, passenger_id)
+        passengers.append(passenger)
+        drivers.append(driver)
+    for _ in range(max(args.drivers - len(trips), 0)):
+        drivers.append(VirtualUser(uuid.UUID(int=rng.getrandbits(128), version=4), *random_point(rng)))
+    for _ in range(max(args.passengers - len(trips), 0)):
+        passengers.append(VirtualUser(uuid.UUID(int=rng.getrandbits(128), version=4), *random_point(rng)))
+    return drivers, passengers, [request_id for _, _, request_id, _ in trips]
+
+
+def register_handlers(user: VirtualUser, role: str, tracker: Tracker, stats: Counter) -> None:
+    client = user.client
+
+    @client.event
+    async def disconnect(*args):
+        stats["disconnects"] += 1
+
+    if role == "passenger" and user.trip:
+        @client.on(f"trip_new_driver_position/{user.user_id}")
+        async def on_trip_position(data):
+            tracker.delivered("trip_position", (str(user.user_id), data["lat"], data["lng"]))
+    elif role == "passenger":
+        @client.on("new_driver_position")
+        async def on_position(data):
+            tracker.delivered("driver_position", (data["id"], data["lat"], data["lng"]))
+    elif user.trip:
+        @client.on(f"client_message/{user.user_id}")
+        async def on_message(data):
+            tracker.delivered("chat", data["message"])
+
+
+async def connect_all(users, url: str, rate: float, tokens, stats: Counter) -> None:
+    """Conecta a `rate` sockets por segundo como máximo."""
+    async def connect(user: VirtualUser, delay: float):
+        await asyncio.sleep(delay)
+        try:
+            await user.client.connect(url, transports=["websocket"],
+                                      auth={"token": tokens[user.user_id]}, wait_timeout=30)
+            stats["connected"] += 1
+        except Exception:
+            stats["connect_errors"] += 1
+
+    await asyncio.gather(*(connect(user, index / rate) for index, user in enumerate(users)))
+
+
+async def drive(user: VirtualUser, interval: float, until: float, rng: random.Random,
+                tracker: Tracker, watchers: Counter) -> None:
+    loop = asyncio.get_running_loop()
+    next_at = loop.time() + rng.uniform(0, interval)
+    while True:
+        await asyncio.sleep(max(next_at - loop.time(), 0))
+        if loop.time() >= until or not user.client.connected:
+            return
+        user.step(rng)
+        user.seq += 1
+        if user.trip:
+            request_id, passenger_id = user.trip
+            tracker.emitted("trip_position", (str(passenger_id), user.lat, user.lng), 1)
+            await user.client.emit("trip_change_driver_position", {
+                "id_client": str(passenger_id), "id_client_request": str(request_id),
+                "lat": user.lat, "lng": user.lng})
+        else:
+            # El servidor publica el id del usuario autenticado; cada paso
+            # cambia la posición, así que (id, lat, lng) identifica el evento
+            tracker.emitted("driver_position", (str(user.user_id), user.lat, user.lng),
+                            watchers[area_room(user.lat, user.lng)])
+            await user.client.emit("change_driver_position", {
+                "lat": user.lat, "lng": user.lng})
+        next_at += interval
+
+
+async def chat(user: VirtualUser, interval: float, until: float, rng: random.Random,
+               tracker: Tracker) -> None:
+    loop = asyncio.get_running_loop()
+    await asyncio.sleep(rng.uniform(0, interval))
+    while loop.time() < until and user.client.connected:
+        request_id, driver_id = user.trip
+        user.seq += 1
+        message = f"carga {user.user_id} {user.seq}"
+        tracker.emitted("chat", message, 1)
+        await user.client.emit("client_to_driver_message", {
+            "id_driver": str(driver_id), "client_id": str(user.user_id),
+            "client_name": "Carga Socket.IO", "id_client_request": str(request_id),
+            "message": message})
+        await asyncio.sleep(interval)
+
+
+def cpu_seconds(processes) -> float:
+    total = 0.0
+    for process in processes:
+        times = process.cpu_times()
+        total += times.user + times.system
+    return total
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * fraction + 0.5) - 1, 0)]
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    drivers, passengers, request_ids = build_users(args, rng)
+    auth = AuthService(None)
+    tokens = {user.user_id: auth.create_access_token(user.user_id) for user in drivers + passengers}
+    tracker, stats = Tracker(), Counter()
+    for user in drivers:
+        register_handlers(user, "driver", tracker, stats)
+    for user in passengers:
+        register_handlers(user, "passenger", tracker, stats)
+
+    try:
+        start = time.perf_counter()
+        await connect_all(drivers + passengers, args.url, args.connect_rate, tokens, stats)
+        connect_seconds = time.perf_counter() - start
+
+        # Pasajeros libres observando una zona alrededor de su posición
+        watchers = Counter()
+        for user in passengers:
+            if user.trip or not user.client.connected:
+                continue
+            user.areas = area_rooms_around(user.lat, user.lng)
+            await user.client.call("watch_nearby_drivers", {"lat": user.lat, "lng": user.lng}, timeout=30)
+            watchers.update(user.areas)
+
+        server = [psutil.Process(pid) for pid in args.server_pid or []]
+        generator = psutil.Process()
+        server_cpu, generator_cpu = cpu_seconds(server), cpu_seconds([generator])
+        loop = asyncio.get_running_loop()
+        until = loop.time() + args.duration
+        tracker.recording = True
+        measure_start = time.perf_counter()
+        tasks = [drive(user, 1 / args.gps_hz, until, rng, tracker, watchers) for user in drivers]
+        tasks += [chat(user, args.chat_interval, until, rng, tracker)
+                  for user in passengers if user.trip and args.chat_interval > 0]
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - measure_start
+        server_cpu, generator_cpu = cpu_seconds(server) - server_cpu, cpu_seconds([generator]) - generator_cpu
+        tracker.recording = False
+        await asyncio.sleep(args.drain)
+    finally:
+        await asyncio.gather(*(user.client.disconnect() for user in drivers + passengers
+                               if user.client.connected), return_exceptions=True)
+        if request_ids:
+            cancel_trips(request_ids)
+
+    sockets = stats["connected"]
+    events = {}
+    for kind in sorted(tracker.sent):
+        latencies = tracker.latencies[kind]
+        dropped = tracker.expected[kind] - tracker.received[kind]
+        events[kind] = {
+            "sent": tracker.sent[kind],
+            "expected": tracker.expected[kind],
+            "received": tracker.received[kind],
+            "dropped": dropped,
+            "dropped_pct": round(100 * dropped / tracker.expected[kind], 3) if tracker.expected[kind] else 0,
+            "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+            "p95_ms": round(percentile(latencies, 0.95), 2) if latencies else None,
+            "p99_ms": round(percentile(latencies, 0.99), 2) if latencies else None,
+        }
+    server_cpu_pct = 100 * server_cpu / elapsed if server else None
+    return {
+        "sockets": sockets,
+        "connect_errors": stats["connect_errors"],
+        "disconnects_during_run": stats["disconnects"],
+        "connect_seconds": round(connect_seconds, 1),
+        "duration_seconds": round(elapsed, 1),
+        "gps_hz": args.gps_hz,
+        "trips": len(request_ids),
+        "events": events,
+        "server_cpu_pct": round(server_cpu_pct, 1) if server_cpu_pct is not None else None,
+        "server_cpu_pct_per_1k_sockets": (round(server_cpu_pct / (sockets / 1000), 1)
+                                          if server_cpu_pct is not None and sockets else None),
+        "generator_cpu_pct": round(100 * generator_cpu / elapsed, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--drivers", type=int, default=500)
+    parser.add_argument("--passengers", type=int, default=500)
+    parser.add_argument("--trips", type=int, default=0,
+                        help="Pares conductor/pasajero con viaje real (siembra en DATABASE_URL)")
+    parser.add_argument("--gps-hz", type=float, default=1.0, help="Posiciones por segundo por conductor")
+    parser.add_argument("--chat-interval", type=float, default=10.0,
+                        help="Segundos entre mensajes de cada pasajero en viaje (0 = sin chat)")
+    parser.add_argument("--duration", type=float, default=60.0)
+    parser.add_argument("--connect-rate", type=float, default=200.0, help="Conexiones por segundo")
+    parser.add_argument("--drain", type=float, default=5.0,
+                        help="Segundos de espera por eventos en vuelo al terminar")
+    parser.add_argument("--server-pid", type=int, nargs="+", help="PIDs de los workers del servidor")
+    parser.add_argument("--seed", type=int, default=99)
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args()
+    if args.trips > min(args.drivers, args.passengers):
+        parser.error("--trips no puede superar --drivers ni --passengers")
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"sockets: {result['sockets']} (errores {result['connect_errors']}, "
+          f"desconexiones {result['disconnects_during_run']})  viajes: {result['trips']}  "
+          f"duración: {result['duration_seconds']} s")
+    print("=" * 86)
+    print(f"{'evento':<16} {'enviados':>9} {'esperados':>10} {'recibidos':>10} {'perdidos':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    print("-" * 86)
+    for kind, event in result["events"].items():
+        print(f"{kind:<16} {event['sent']:>9} {event['expected']:>10} {event['received']:>10} "
+              f"{event['dropped']:>9} {event['p50_ms']!s:>8} {event['p95_ms']!s:>8} {event['p99_ms']!s:>8}")
+    print("-" * 86)
+    if result["server_cpu_pct"] is not None:
+        print(f"CPU servidor: {result['server_cpu_pct']} % "
+              f"({result['server_cpu_pct_per_1k_sockets']} % por cada 1000 sockets)")
+    print(f"CPU generador: {result['generator_cpu_pct']} %")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark de consultas espaciales de cercanía (PostGIS).
+
+Crea una tabla temporal con N posiciones sintéticas alrededor de Bogotá,
+con los mismos índices que driver_position (GiST sobre geometry y GiST de
+expresión sobre geography), y compara:
+
+- legacy: ST_Distance(position::geography, punto) < radio, sin límite
+  (la forma anterior; no puede usar índice).
+- knn:    ST_DWithin(position::geography, punto, radio)
+          ORDER BY position::geography <-> punto LIMIT k
+
+Verifica con EXPLAIN que la consulta knn use el índice GiST y sale con
+código 1 si no lo hace.
+
+Uso:
+    python -m app.load_tests.benchmarks.spatial_knn_benchmark --positions 100000
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, select, text
+from geoalchemy2 import Geometry
+
+from app.utils.spatial import distance_meters, geography_index, knn_order, make_point, within_meters
+
+TABLE_NAME = "bench_driver_position"
+
+# Caja aproximada de Bogotá
+LAT_RANGE = (4.50, 4.85)
+LNG_RANGE = (-74.25, -73.99)
+
+
+def build_table(metadata: MetaData) -> Table:
+    return Table(
+        TABLE_NAME,
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("position", Geometry(geometry_type="POINT", srid=4326), nullable=False),
+        geography_index(TABLE_NAME, "position"),
+    )
+
+
+def seed_positions(conn, positions: int, seed: int) -> None:
+    """
+    Inserta las posiciones en el servidor con generate_series; setseed hace
+    que el conjunto sea el mismo en cada corrida.
+    """
+    conn.execute(text("SELECT setseed(:seed)"), {"seed": (seed % 1000) / 1000})
+    conn.execute(text(f"""
+        INSERT INTO {TABLE_NAME} (id, position)
+        SELECT g, ST_SetSRID(ST_MakePoint(
+                   :lng_min + random() * (:lng_max - :lng_min),
+                   :lat_min + random() * (:lat_max - :lat_min)), 4326)
+        FROM generate_series(1, :positions) AS g
+    """), {
+        "positions": positions,
+        "lat_min": LAT_RANGE[0], "lat_max": LAT_RANGE[1],
+        "lng_min": LNG_RANGE[0], "lng_max": LNG_RANGE[1],
+    })
+    conn.execute(text(f"ANALYZE {TABLE_NAME}"))
+
+
+def legacy_query(table: Table, lat: float, lng: float, radius_m: float):
+    point = make_point(lat, lng)
+    distance = distance_meters(table.c.position, point)
+    return select(table.c.id, distance.label("distance")).where(distance < radius_m)
+
+
+def knn_query(table: Table, lat: float, lng: float, radius_m: float, limit: int):
+    point = make_point(lat, lng)
+    return (
+        select(table.c.id, distance_meters(table.c.position, point).label("distance"))
+        .where(within_meters(table.c.position, point, radius_m))
+        .order_by(knn_order(table.c.position, point))
+        .limit(limit)
+    )
+
+
+def explain(conn, query) -> dict:
+    compiled = query.compile(conn, compile_kwargs={"literal_binds": True})
+    row = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {compiled}")).scalar()
+    plan = row if isinstance(row, list) else json.loads(row)
+    return plan[0]["Plan"]
+
+
+def plan_indexes(plan: dict) -> set:
+    """
+    Nombres de índices usados en cualquier nodo del plan.
+    """
+    found = set()
+    if plan.get("Index Name"):
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        found |= plan_indexes(child)
+    return found
+
+
+def time_queries(conn, build_query, points, repeat: int) -> dict:
+    durations = []
+    rows = 0
+    for _ in range(repeat):
+        for lat, lng in points:
+            start = time.perf_counter()
+            rows += len(conn.execute(build_query(lat, lng)).all())
+            durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "queries": len(durations),
+        "rows_per_query": rows / len(durations),
+        "p50_ms": round(statistics.median(durations), 3),
+        "p95_ms": round(durations[int(len(durations) * 0.95) - 1], 3),
+        "max_ms": round(durations[-1], 3),
+    }
+
+
+def run_benchmark(database_url: str, positions: int, radius_m: float, limit: int,
+                  queries: int, repeat: int, seed: int) -> bool:
+    engine = create_engine(database_url)
+    metadata = MetaData()
+    table = build_table(metadata)
+    rng = random.Random(seed)
+    points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LNG_RANGE)) for _ in range(queries)]
+    index_name = f"idx_{TABLE_NAME}_position_geog"
+
+    with engine.begin() as conn:
+        metadata.drop_all(conn)
+        metadata.create_all(conn)
+        try:
+            print(f"Insertando {positions} posiciones sintéticas...")
+            seed_positions(conn, positions, seed)
+
+            lat, lng = points[0]
+            knn_plan = explain(conn, knn_query(table, lat, lng, radius_m, limit))
+            legacy_plan = explain(conn, legacy_query(table, lat, lng, radius_m))
+            knn_indexes = plan_indexes(knn_plan)
+
+            print("=" * 60)
+            print(f"Plan legacy: {legacy_plan['Node Type']} "
+                  f"(índices: {sorted(plan_indexes(legacy_plan)) or 'ninguno'})")
+            print(f"Plan knn:    {knn_plan['Node Type']} "
+                  f"(índices: {sorted(knn_indexes) or 'ninguno'})")
+
+            legacy = time_queries(
+                conn, lambda la, ln: legacy_query(table, la, ln, radius_m), points, repeat)
+            knn = time_queries(
+                conn, lambda la, ln: knn_query(table, la, ln, radius_m, limit), points, repeat)
+
+            print("=" * 60)
+            print(f"{'consulta':<10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'filas':>10}")
+            for name, result in (("legacy", legacy), ("knn", knn)):
+                print(f"{name:<10}{result['p50_ms']:>10}{result['p95_ms']:>10}"
+                      f"{result['max_ms']:>10}{result['rows_per_query']:>10.1f}")
+        finally:
+            metadata.drop_all(conn)
+
+    if index_name not in knn_indexes:
+        print(f"ERROR: la consulta knn no usa el índice {index_name}")
+        return False
+    print(f"OK: la consulta knn usa el índice {index_name}")
+    return True
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=None,
+                        help="URL de PostgreSQL/PostGIS (por defecto settings.DATABASE_URL)")
+    parser.add_argument("--positions", type=int, default=100_000)
+    parser.add_argument("--radius", type=float, default=4000, help="Radio en metros")
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=99)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        from app.core.config import settings
+        database_url = settings.DATABASE_URL
+
+    ok = run_benchmark(database_url, args.positions, args.radius, args.limit,
+                       args.queries, args.repeat, args.seed)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
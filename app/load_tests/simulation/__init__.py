@@ -0,0 +1,6 @@
+# Simulador de ciudad sintética para benchmarks sin servidor ni llaves de Google
+from app.load_tests.simulation.city import City, CityConfig, Driver, Passenger
+from app.load_tests.simulation.recorder import StageRecorder
+from app.load_tests.simulation.routing import FakeRoutingProvider
+
+__all__ = ["City", "CityConfig", "Driver", "Passenger", "StageRecorder", "FakeRoutingProvider"]
@@ -0,0 +1,200 @@
+"""
+Ciudad sintética con semilla: conductores que se mueven, pasajeros y el plan
+de viajes. La misma configuración genera siempre la misma ciudad, así que
+dos corridas sobre una base vacía hacen exactamente las mismas consultas.
+"""
+
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import date
+from typing import List, Optional, Tuple
+from uuid import UUID
+
+from sqlmodel import Session, select
+
+from app.core.init_data import (
+    init_document_types,
+    init_payment_methods,
+    init_project_settings,
+    init_roles,
+    init_time_distance_values,
+    init_vehicle_types,
+)
+from app.models.driver_info import DriverInfo
+from app.models.type_service import TypeService
+from app.models.user import User
+from app.models.user_has_roles import RoleStatus, UserHasRole
+from app.models.vehicle_info import VehicleInfo
+from app.models.vehicle_type import VehicleType
+from app.models.verify_mount import VerifyMount
+from app.services.config_cache_service import get_config_cache
+from app.services.type_service_service import TypeServiceService
+
+# Caja aproximada de Bogotá (la misma de spatial_knn_benchmark)
+LAT_RANGE = (4.50, 4.85)
+LNG_RANGE = (-74.25, -73.99)
+
+METERS_PER_DEGREE = 111_320
+
+# Tarifa del tipo de servicio Car_Ride sembrado por init_time_distance_values
+KM_VALUE = 1200.0
+MIN_VALUE = 150.0
+MIN_FARE = 6000.0
+
+
+@dataclass
+class CityConfig:
+    drivers: int = 200
+    passengers: int = 400
+    trips: int = 100
+    # Reportes de posición de cada conductor antes de los viajes
+    ticks: int = 3
+    # Conductores que ofertan por cada solicitud
+    offers_per_trip: int = 3
+    seed: int = 99
+
+    def as_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+@dataclass
+class Driver:
+    index: int
+    phone: str
+    lat: float
+    lng: float
+    user_id: Optional[UUID] = None
+
+
+@dataclass
+class Passenger:
+    index: int
+    phone: str
+    lat: float
+    lng: float
+    user_id: Optional[UUID] = None
+
+
+@dataclass
+class TripPlan:
+    passenger: Passenger
+    pickup: Tuple[float, float]
+    destination: Tuple[float, float]
+    fare_offered: float
+    # Incremento que cada conductor suma a la tarifa al ofertar, en orden
+    raises: List[int] = field(default_factory=list)
+
+
+def _clamp(value: float, bounds: Tuple[float, float]) -> float:
+    return min(max(value, bounds[0]), bounds[1])
+
+
+def _offset(lat: float, lng: float, meters: float, heading: float) -> Tuple[float, float]:
+    dlat = meters * math.cos(heading) / METERS_PER_DEGREE
+    dlng = meters * math.sin(heading) / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+    return _clamp(lat + dlat, LAT_RANGE), _clamp(lng + dlng, LNG_RANGE)
+
+
+def estimate_fare(meters: int, seconds: int) -> float:
+    """Tarifa de referencia de Car_Ride, redondeada a la centena."""
+    fare = meters / 1000 * KM_VALUE + seconds / 60 * MIN_VALUE
+    return float(max(round(fare, -2), MIN_FARE))
+
+
+class City:
+    def __init__(self, config: CityConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.drivers = [
+            Driver(index=i, phone=f"32{i:08d}", lat=self._random_lat(), lng=self._random_lng())
+            for i in range(config.drivers)
+        ]
+        self.passengers = [
+            Passenger(index=i, phone=f"31{i:08d}", lat=self._random_lat(), lng=self._random_lng())
+            for i in range(config.passengers)
+        ]
+
+    def _random_lat(self) -> float:
+        return round(self.rng.uniform(*LAT_RANGE), 6)
+
+    def _random_lng(self) -> float:
+        return round(self.rng.uniform(*LNG_RANGE), 6)
+
+    def move_drivers(self) -> None:
+        """Avanza a cada conductor entre 50 y 250 m en una dirección al azar."""
+        for driver in self.drivers:
+            lat, lng = _offset(driver.lat, driver.lng, self.rng.uniform(50, 250),
+                               self.rng.uniform(0, 2 * math.pi))
+            driver.lat, driver.lng = round(lat, 6), round(lng, 6)
+
+    def trip_plans(self, routing) -> List[TripPlan]:
+        """
+        Un viaje por pasajero (en ronda si hay más viajes que pasajeros):
+        destino entre 1 y 8 km y tarifa ofrecida según la ruta falsa.
+        """
+        plans = []
+        for i in range(self.config.trips):
+            passenger = self.passengers[i % len(self.passengers)]
+            pickup = (passenger.lat, passenger.lng)
+            destination = tuple(round(value, 6) for value in _offset(
+                *pickup, self.rng.uniform(1000, 8000), self.rng.uniform(0, 2 * math.pi)))
+            meters, seconds = routing.route(pickup, destination)
+            raises = [self.rng.choice([0, 500, 1000, 2000]) for _ in range(self.config.offers_per_trip)]
+            plans.append(TripPlan(passenger, pickup, destination,
+                                  estimate_fare(meters, seconds), raises))
+            # El pasajero queda en su destino para el siguiente viaje
+            passenger.lat, passenger.lng = destination
+        return plans
+
+    def seed_database(self, session: Session) -> int:
+        """
+        Siembra la configuración base y los usuarios de la ciudad: pasajeros
+        con rol CLIENT y conductores aprobados con vehículo y saldo. Retorna
+        el id del tipo de servicio Car_Ride.
+        """
+        engine = session.get_bind()
+        init_roles()
+        init_document_types()
+        init_vehicle_types(engine)
+        TypeServiceService(session).init_default_types()
+        init_time_distance_values(engine)
+        init_project_settings()
+        init_payment_methods(session)
+        get_config_cache().invalidate()
+
+        car_type = session.exec(select(VehicleType).where(VehicleType.name == "Car")).one()
+        car_service = session.exec(
+            select(TypeService).where(TypeService.name == "Car_Ride")).one()
+
+        for passenger in self.passengers:
+            user = User(full_name=f"Pasajero {passenger.index}", country_code="+57",
+                        phone_number=passenger.phone, is_verified_phone=True, is_active=True)
+            session.add(user)
+            session.flush()
+            passenger.user_id = user.id
+            session.add(UserHasRole(id_user=user.id, id_rol="CLIENT",
+                                    is_verified=True, status=RoleStatus.APPROVED))
+
+        for driver in self.drivers:
+            user = User(full_name=f"Conductor {driver.index}", country_code="+57",
+                        phone_number=driver.phone, is_verified_phone=True, is_active=True)
+            session.add(user)
+            session.flush()
+            driver.user_id = user.id
+            driver_info = DriverInfo(user_id=user.id, first_name="Conductor",
+                                     last_name=str(driver.index), birth_date=date(1990, 1, 1))
+            session.add(driver_info)
+            session.flush()
+            session.add_all([
+                UserHasRole(id_user=user.id, id_rol="CLIENT",
+                            is_verified=True, status=RoleStatus.APPROVED),
+                UserHasRole(id_user=user.id, id_rol="DRIVER",
+                            is_verified=True, status=RoleStatus.APPROVED),
+                VehicleInfo(brand="Renault", model="Logan", model_year=2020, color="Gris",
+                            plate=f"S{driver.index:05d}", vehicle_type_id=car_type.id,
+                            driver_info_id=driver_info.id),
+                VerifyMount(user_id=user.id, mount=1_000_000),
+            ])
+        session.commit()
+        return car_service.id
@@ -0,0 +1,85 @@
+"""
+Registro por etapa de latencias, consultas SQL y llamadas de rutas.
+
+La simulación corre en un solo hilo, así que las consultas de cada etapa son
+la diferencia del contador del engine antes y después de la llamada.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.load_tests.simulation.routing import FakeRoutingProvider
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(int(len(ordered) * fraction + 0.5) - 1, 0)]
+
+
+class StageRecorder:
+    """
+    Uso:
+        recorder = StageRecorder(engine, routing)
+        with recorder.attached():
+            with recorder.stage("driver_search"):
+                ...
+        recorder.summary()
+    """
+
+    def __init__(self, engine: Engine, routing: Optional[FakeRoutingProvider] = None):
+        self.engine = engine
+        self.routing = routing
+        self.queries = 0
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.stage_queries: Dict[str, int] = defaultdict(int)
+        self.stage_routing: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def _on_query(self, *args, **kwargs):
+        self.queries += 1
+
+    @contextmanager
+    def attached(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_query)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._on_query)
+
+    @contextmanager
+    def stage(self, name: str):
+        queries = self.queries
+        routing = self.routing.total_calls() if self.routing else 0
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors[name] += 1
+            raise
+        finally:
+            self.latencies[name].append((time.perf_counter() - start) * 1000)
+            self.stage_queries[name] += self.queries - queries
+            if self.routing:
+                self.stage_routing[name] += self.routing.total_calls() - routing
+
+    def summary(self) -> Dict[str, dict]:
+        result = {}
+        for name, latencies in self.latencies.items():
+            calls = len(latencies)
+            total_ms = sum(latencies)
+            result[name] = {
+                "calls": calls,
+                "errors": self.errors.get(name, 0),
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "per_second": round(calls / (total_ms / 1000), 1) if total_ms else 0,
+                "queries_per_call": round(self.stage_queries[name] / calls, 2),
+                "routing_calls_per_call": round(self.stage_routing[name] / calls, 2),
+            }
+        return result
@@ -0,0 +1,112 @@
+"""
+Proveedor de rutas falso: responde las llamadas a Google (Distance Matrix y
+Geocoding) sin red ni llave.
+
+Los servicios llaman `requests.get` directamente, así que el proveedor
+reemplaza esa función mientras está activo y deja pasar cualquier otra URL.
+La distancia es la de Haversine por un factor de desvío y la duración sale
+de una velocidad fija: el mismo par de puntos siempre da la misma respuesta.
+"""
+
+import threading
+from collections import Counter
+from typing import Tuple
+
+import requests
+
+from app.utils.geo_utils import get_distance_meters
+
+GOOGLE_MAPS_PREFIX = "https://maps.googleapis.com/maps/api/"
+
+
+class FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self) -> dict:
+        return self._payload
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code}")
+
+
+def _parse_point(value: str) -> Tuple[float, float]:
+    lat, lng = value.split(",")
+    return float(lat), float(lng)
+
+
+class FakeRoutingProvider:
+    """
+    Uso:
+        with FakeRoutingProvider() as routing:
+            ...  # los servicios consultan "Google" sin salir a la red
+        routing.calls["distancematrix"]
+    """
+
+    def __init__(self, detour_factor: float = 1.3, speed_kmh: float = 25.0):
+        self.detour_factor = detour_factor
+        self.speed_kmh = speed_kmh
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._original_get = None
+
+    def route(self, origin: Tuple[float, float], destination: Tuple[float, float]) -> Tuple[int, int]:
+        """Retorna (distancia_en_metros, duracion_en_segundos)."""
+        meters = get_distance_meters(*origin, *destination) * self.detour_factor
+        seconds = meters / (self.speed_kmh * 1000 / 3600)
+        return int(round(meters)), int(round(seconds))
+
+    def _element(self, origin, destination) -> dict:
+        meters, seconds = self.route(origin, destination)
+        return {
+            "status": "OK",
+            "distance": {"value": meters, "text": f"{meters / 1000:.1f} km"},
+            "duration": {"value": seconds, "text": f"{max(round(seconds / 60), 1)} min"},
+        }
+
+    def distance_matrix(self, params: dict) -> dict:
+        origins = [_parse_point(p) for p in params["origins"].split("|")]
+        destinations = [_parse_point(p) for p in params["destinations"].split("|")]
+        return {
+            "status": "OK",
+            "origin_addresses": [self.address(*origin) for origin in origins],
+            "destination_addresses": [self.address(*destination) for destination in destinations],
+            "rows": [
+                {"elements": [self._element(origin, destination) for destination in destinations]}
+                for origin in origins
+            ],
+        }
+
+    def address(self, lat: float, lng: float) -> str:
+        # Una "dirección" estable por celda de ~100 m
+        return f"Calle {int(abs(lat) * 1000) % 200} # {int(abs(lng) * 1000) % 100}-{int(abs(lat * lng) * 100) % 90 + 10}, Bogotá"
+
+    def geocode(self, params: dict) -> dict:
+        lat, lng = _parse_point(params["latlng"])
+        return {"status": "OK", "results": [{"formatted_address": self.address(lat, lng)}]}
+
+    def get(self, url, params=None, **kwargs):
+        if not str(url).startswith(GOOGLE_MAPS_PREFIX):
+            return self._original_get(url, params=params, **kwargs)
+        api = str(url)[len(GOOGLE_MAPS_PREFIX):].split("/")[0]
+        with self._lock:
+            self.calls[api] += 1
+        if api == "distancematrix":
+            return FakeResponse(self.distance_matrix(params or {}))
+        if api == "geocode":
+            return FakeResponse(self.geocode(params or {}))
+        return FakeResponse({"status": "INVALID_REQUEST"}, status_code=400)
+
+    def total_calls(self) -> int:
+        with self._lock:
+            return sum(self.calls.values())
+
+    def __enter__(self) -> "FakeRoutingProvider":
+        self._original_get = requests.get
+        requests.get = self.get
+        return self
+
+    def __exit__(self, *exc) -> None:
+        requests.get = self._original_get
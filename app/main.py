@@ -3,6 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 
+# Configurar logging antes de importar el resto de módulos
+from app.core.logging_config import configure_logging
+configure_logging()
+
 # Imports de routers
 from app.routers import users, auth, drivers, client_request, trip_stops, driver_position, config_service_value, driver_trip_offer, withdrawal, driver_savings, referrals, user_fcm_token, chat, login_admin, verify_docs, config_service_value_admin, withdrawal_admin, project_settings, admin_statistics, admin_drivers, transaction_admin
 from app.routers.transaction import router as transaction_router
@@ -12,35 +16,61 @@ from app.routers.test_runner import router as test_runner_router
 from app.routers.metrics import router as metrics_router
 from app.routers.admin_logs import router as admin_logs_router
 
-from .core.db import create_all_tables, get_environment_info
+from .core.db import migrate_database, get_environment_info
 from .core.config import settings
 from .core.init_data import init_data
 from .core.middleware.auth import JWTAuthMiddleware
 from .core.middleware.metrics import MetricsMiddleware
 from .core.middleware.admin_logs import create_admin_log_middleware
 from .core.sio_events import sio
+from .services.push_dispatch_service import shutdown_push_dispatcher
+from .services.config_cache_service import shutdown_config_cache
+from .services.eta_tracking_service import start_eta_tracking, shutdown_eta_tracking
+from .services.dispatch_feed_service import start_dispatch_feed, shutdown_dispatch_feed
+from .services.maintenance_service import start_maintenance, shutdown_maintenance
+from .services.request_expiry_service import start_request_expiry, shutdown_request_expiry
 import socketio
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("🚀 Iniciando la aplicación...")
+    logger.info("🚀 Iniciando la aplicación...")
 
     # Mostrar información del entorno
     env_info = get_environment_info()
-    print(f"🌍 Entorno: {env_info['environment']}")
-    print(f"📊 Base de datos: {env_info['database_url']}")
-    print(f"🔒 Seguro para inicialización: {env_info['safe_for_init']}")
+    logger.info("🌍 Entorno: %s", env_info['environment'])
+    logger.info("📊 Base de datos: %s", env_info['database_url'])
+    logger.info("🔒 Seguro para inicialización: %s", env_info['safe_for_init'])
 
-    # Crear tablas
-    create_all_tables()
+    # Aplicar migraciones de esquema
+    migrate_database()
 
     # Inicializar datos (con validaciones automáticas)
     init_data()
 
-    print("✅ Aplicación iniciada correctamente")
+    # Motor de ETA de los viajes activos
+    await start_eta_tracking()
+    # Feed de solicitudes cercanas por socket
+    start_dispatch_feed()
+    # Vencimiento de solicitudes sin conductor
+    await start_request_expiry()
+    # Jobs de mantenimiento periódicos
+    await start_maintenance()
+
+    logger.info("✅ Aplicación iniciada correctamente")
     yield
-    print("🔚 Cerrando la aplicación...")
+    logger.info("🔚 Cerrando la aplicación...")
+
+    await shutdown_maintenance()
+    await shutdown_request_expiry()
+    await shutdown_eta_tracking()
+    shutdown_dispatch_feed()
+    # Enviar las notificaciones push pendientes antes de salir
+    shutdown_push_dispatcher()
+    shutdown_config_cache()
 
 fastapi_app = FastAPI(
     lifespan=lifespan,
@@ -27,6 +27,11 @@ from .config_service_value import ConfigServiceValue, VehicleTypeConfigurationCr
 from .withdrawal import Withdrawal, WithdrawalStatus
 from .penality_user import PenalityUser, statusEnum
 from .refresh_token import RefreshToken
-from .chat_message import ChatMessage, ChatMessageCreate, ChatMessageRead, UnreadCountResponse, MessageStatus
+from .chat_message import ChatMessage, ChatMessageCreate, ChatMessageRead, UnreadCountResponse, MessageStatus, ChatUnreadCounter
 from .administrador import Administrador, AdminRole
 from .admin_log import AdminLog, AdminLogCreate, AdminLogRead, AdminLogUpdate, AdminLogFilter, AdminLogStatistics, AdminActionType, LogSeverity
+from .rating_summary import RatingSummary
+from .geocoded_address import GeocodedAddress
+from .stored_file import StoredFile
+from .verification_counter import VerificationCounter
+from .maintenance_job_run import MaintenanceJobRun
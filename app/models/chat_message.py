@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from datetime import datetime, timedelta
 from uuid import UUID, uuid4
 from enum import Enum
@@ -49,6 +50,13 @@ class ChatMessage(SQLModel, table=True):
     client_request: Optional["ClientRequest"] = Relationship(
         back_populates="chat_messages")
 
+    __table_args__ = (
+        Index("idx_chat_message_request_created",
+              "client_request_id", "created_at"),
+        Index("idx_chat_message_unread", "receiver_id", "client_request_id",
+              postgresql_where=text("is_read = false")),
+    )
+
 
 class ChatMessageCreate(SQLModel):
     receiver_id: UUID = Field(...,
@@ -84,3 +92,26 @@ class UnreadCountResponse(SQLModel):
 
     class Config:
         from_attributes = True
+
+
+class ChatUnreadCounter(SQLModel, table=True):
+    """
+    Contador de mensajes no leídos por (usuario receptor, conversación).
+    Se incrementa al enviar un mensaje y se reinicia al marcar como leídos,
+    de modo que los eventos de socket no recorren el historial de viajes.
+    """
+    __tablename__ = "chat_unread_counter"
+
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    client_request_id: UUID = Field(
+        foreign_key="client_request.id", primary_key=True)
+    unread_count: int = Field(default=0, nullable=False)
+    last_message: Optional[str] = Field(default=None, max_length=500)
+    last_sender_id: Optional[UUID] = Field(
+        default=None, foreign_key="user.id")
+    last_message_time: Optional[datetime] = Field(default=None)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(COLOMBIA_TZ),
+        nullable=False,
+        sa_column_kwargs={"onupdate": lambda: datetime.now(COLOMBIA_TZ)}
+    )
@@ -1,15 +1,19 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, Enum, event, String
+from sqlalchemy import Column, Enum, event, String, Index, text
 from app.models.chat_message import ChatMessage
 import enum
 from datetime import datetime, timezone
 from typing import Optional, List
 from pydantic import Field as PydanticField  # Renombrar para evitar conflictos
 from geoalchemy2 import Geometry
+from app.utils.spatial import geography_index
 from uuid import UUID, uuid4
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, object_session
 from sqlalchemy import inspect
 import pytz
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Modelo de entrada (lo que el usuario envía)
 
@@ -55,6 +59,24 @@ class StatusEnum(str, enum.Enum):
 # Modelo de base de datos
 class ClientRequest(SQLModel, table=True):
     __tablename__ = "client_request"
+    __table_args__ = (
+        geography_index("client_request", "pickup_position"),
+        # Solicitudes abiertas: feed de cercanía, expiración y búsqueda de conductores
+        Index("idx_client_request_open_created", "created_at", "type_service_id",
+              postgresql_where=text("status IN ('CREATED', 'PENDING')")),
+        # Viaje activo / historial del conductor
+        Index("idx_client_request_driver_status", "id_driver_assigned", "status",
+              postgresql_where=text("id_driver_assigned IS NOT NULL")),
+        # Historial y validaciones del cliente
+        Index("idx_client_request_client_status_created",
+              "id_client", "status", "created_at"),
+        Index("idx_client_request_busy_driver", "assigned_busy_driver_id",
+              postgresql_where=text("assigned_busy_driver_id IS NOT NULL")),
+        # Historial paginado del conductor (más recientes primero)
+        Index("idx_client_request_driver_status_created",
+              "id_driver_assigned", "status", "created_at",
+              postgresql_where=text("id_driver_assigned IS NOT NULL")),
+    )
 
     id: Optional[UUID] = Field(
         default_factory=uuid4, primary_key=True, unique=True)
@@ -165,6 +187,29 @@ class ClientRequest(SQLModel, table=True):
         back_populates="pending_request"
     )
 
+# Solicitudes que salieron del feed en la transacción en curso (id -> estado)
+_CLOSED_REQUESTS_KEY = "dispatch_feed_closed_requests"
+
+
+def _publish_closed_requests(closed: dict) -> None:
+    from app.services.dispatch_feed_service import get_dispatch_feed
+    for client_request_id, status in closed.items():
+        try:
+            get_dispatch_feed().publish_request_closed(client_request_id, status)
+        except Exception as e:
+            logger.error("Error publicando cierre de %s en el feed: %s", client_request_id, e)
+
+
+def after_commit_listener(session):
+    closed = session.info.pop(_CLOSED_REQUESTS_KEY, None)
+    if closed:
+        _publish_closed_requests(closed)
+
+
+def after_rollback_listener(session):
+    session.info.pop(_CLOSED_REQUESTS_KEY, None)
+
+
 # Definir el listener para el evento after_update
 
 
@@ -172,6 +217,7 @@ def after_update_listener(mapper, connection, target):
     from app.services.earnings_service import distribute_earnings  # Import aquí, no arriba
     # Import aquí, no arriba
     from app.services.chat_service import cleanup_chat_messages_for_request
+    from app.services.rating_summary_service import record_paid_trip_ratings
     # Obtener el estado del objeto para verificar cambios
     state = inspect(target)
     attr = state.attrs.status
@@ -179,20 +225,38 @@ def after_update_listener(mapper, connection, target):
     if attr.history.has_changes():
         old_value = attr.history.deleted[0] if attr.history.deleted else None
         new_value = attr.value
+        # La solicitud deja de estar abierta: quitarla del feed de los conductores
+        # cuando la transacción confirme (si se revierte no se avisa)
+        if old_value in [StatusEnum.CREATED, StatusEnum.PENDING] and new_value not in [StatusEnum.CREATED, StatusEnum.PENDING]:
+            # Algunos servicios asignan el estado como texto
+            closed_status = StatusEnum(new_value).value
+            session = object_session(target)
+            if session is not None:
+                session.info.setdefault(_CLOSED_REQUESTS_KEY, {})[target.id] = closed_status
+            else:
+                _publish_closed_requests({target.id: closed_status})
+        if old_value == StatusEnum.CREATED and new_value != StatusEnum.CREATED:
+            from app.services.request_expiry_service import get_request_expiry
+            get_request_expiry().discard(target.id)
         if new_value in [StatusEnum.PAID, StatusEnum.CANCELLED] and old_value not in [StatusEnum.PAID, StatusEnum.CANCELLED]:
             session = Session(bind=connection)
             try:
                 # Solo distribuir ganancias si es PAID
                 if new_value == StatusEnum.PAID:
                     distribute_earnings(session, target)
+                    # Calificaciones registradas antes de quedar PAID
+                    record_paid_trip_ratings(session, target)
                 # Limpiar mensajes de chat automáticamente en ambos estados
                 cleanup_chat_messages_for_request(session, target.id)
-                print(
-                    f"✅ Chat messages eliminados automáticamente para ClientRequest {target.id} (status: {new_value})")
+                logger.info(
+                    "✅ Chat messages eliminados automáticamente para ClientRequest %s (status: %s)", target.id, new_value)
             except Exception as e:
-                print(f"Error en after_update_listener: {e}")
+                logger.error("Error en after_update_listener: %s", e)
                 raise
 
 
 # Registrar el evento después de definir la clase
 event.listen(ClientRequest, 'after_update', after_update_listener)
+# Aplica a todas las sesiones (incluida la de sqlmodel, que hereda de Session)
+event.listen(Session, 'after_commit', after_commit_listener)
+event.listen(Session, 'after_rollback', after_rollback_listener)
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index
 from datetime import datetime
 from typing import Optional
 from enum import Enum
@@ -28,6 +28,13 @@ class DriverDocumentsBase(SQLModel):
 
 class DriverDocuments(DriverDocumentsBase, table=True):
     __tablename__ = "driver_documents"
+    __table_args__ = (
+        # Cola de revisión: documentos por estado, del más antiguo al más reciente
+        Index("idx_driver_documents_status_created",
+              "status", "created_at", "driver_info_id"),
+        # Documentos de un conductor por estado
+        Index("idx_driver_documents_driver_info_status", "driver_info_id", "status"),
+    )
     id: Optional[UUID] = Field(
         default_factory=uuid4, primary_key=True, unique=True)
     driver_info_id: UUID = Field(foreign_key="driver_info.id", nullable=False)
@@ -1,5 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Index
 from typing import Optional, TYPE_CHECKING, List
 from datetime import date, datetime
 from uuid import UUID, uuid4
@@ -22,6 +22,9 @@ class DriverInfoBase(SQLModel):
 
 class DriverInfo(DriverInfoBase, table=True):
     __tablename__ = "driver_info"
+    __table_args__ = (
+        Index("idx_driver_info_user", "user_id"),
+    )
     id: Optional[UUID] = Field(
         default_factory=uuid4, primary_key=True, unique=True)
     user_id: UUID = Field(foreign_key="user.id")
@@ -2,6 +2,7 @@ from typing import Optional, Any
 from sqlmodel import SQLModel, Field, Relationship
 from sqlalchemy import Column
 from geoalchemy2 import Geometry
+from app.utils.spatial import geography_index
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
@@ -13,6 +14,7 @@ COLOMBIA_TZ = pytz.timezone("America/Bogota")
 
 class DriverPosition(SQLModel, table=True):
     __tablename__ = "driver_position"
+    __table_args__ = (geography_index("driver_position", "position"),)
     id_driver: UUID = Field(foreign_key="user.id", primary_key=True)
     position: Optional[Any] = Field(
         sa_column=Column(
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from datetime import datetime
 from pydantic import BaseModel
@@ -32,6 +33,13 @@ class DriverTripOffer(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(
         COLOMBIA_TZ), nullable=False, sa_column_kwargs={"onupdate": lambda: datetime.now(COLOMBIA_TZ)})
 
+    __table_args__ = (
+        Index("idx_driver_trip_offer_request_created",
+              "id_client_request", "created_at"),
+        Index("idx_driver_trip_offer_driver_request",
+              "id_driver", "id_client_request"),
+    )
+
 
 class DriverTripOfferResponse(BaseModel):
     id: UUID
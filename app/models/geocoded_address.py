@@ -0,0 +1,19 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+import pytz
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+
+class GeocodedAddress(SQLModel, table=True):
+    """
+    Dirección legible ya resuelta con Google Geocoding, por coordenada
+    redondeada (ver address_service.coord_key). Evita geocodificar en cada
+    lectura del historial o del feed.
+    """
+    __tablename__ = "geocoded_address"
+
+    coord_key: str = Field(primary_key=True, max_length=32)
+    address: str = Field(max_length=255, nullable=False)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(COLOMBIA_TZ), nullable=False)
@@ -0,0 +1,20 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Column, JSON
+from datetime import datetime
+from typing import Any, Dict, Optional
+import pytz
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+
+class MaintenanceJobRun(SQLModel, table=True):
+    """
+    Último resultado de un job de mantenimiento. Lo escribe el worker líder
+    y lo lee cualquier worker (p. ej. el resumen de suspensiones).
+    """
+    __tablename__ = "maintenance_job_run"
+
+    name: str = Field(primary_key=True, max_length=50)
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    finished_at: datetime = Field(
+        default_factory=lambda: datetime.now(COLOMBIA_TZ), nullable=False)
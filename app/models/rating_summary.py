@@ -0,0 +1,26 @@
+from sqlmodel import SQLModel, Field
+from datetime import datetime
+from uuid import UUID
+import pytz
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+
+class RatingSummary(SQLModel, table=True):
+    """
+    Acumulado de calificaciones por usuario y rol ("driver" o "passenger"),
+    sobre viajes PAID. Se mantiene al calificar y al pasar un viaje a PAID,
+    para no recalcular AVG sobre todo el historial en cada consulta.
+    """
+    __tablename__ = "rating_summary"
+
+    user_id: UUID = Field(foreign_key="user.id", primary_key=True)
+    role: str = Field(max_length=10, primary_key=True)
+    rating_sum: float = Field(default=0, nullable=False)
+    rating_count: int = Field(default=0, nullable=False)
+    average: float = Field(default=0, nullable=False)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(COLOMBIA_TZ),
+        nullable=False,
+        sa_column_kwargs={"onupdate": lambda: datetime.now(COLOMBIA_TZ)}
+    )
@@ -8,13 +8,19 @@ COLOMBIA_TZ = pytz.timezone("America/Bogota")
 
 
 class RefreshToken(SQLModel, table=True):
+    """
+    Refresh token (solo el hash). En PostgreSQL la tabla está particionada
+    por mes de expires_at (ver refresh_token_service), por eso expires_at
+    forma parte de la llave primaria.
+    """
     __tablename__ = "refresh_token"
+    __table_args__ = {"postgresql_partition_by": "RANGE (expires_at)"}
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     user_id: UUID = Field(foreign_key="user.id", index=True)
     # Hash del token para seguridad
     token_hash: str = Field(max_length=255, index=True)
-    expires_at: datetime = Field(index=True)
+    expires_at: datetime = Field(primary_key=True, index=True)
     is_revoked: bool = Field(default=False, index=True)
     created_at: datetime = Field(
         default_factory=lambda: datetime.now(COLOMBIA_TZ))
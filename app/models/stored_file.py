@@ -0,0 +1,29 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
+from datetime import datetime
+from typing import Optional
+import pytz
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+
+class StoredFile(SQLModel, table=True):
+    """
+    Archivo del almacenamiento por contenido (ver app/core/storage.py) con el
+    número de documentos que lo referencian. Los que llegan a 0 los borra el
+    job collect_stored_files pasado el periodo de gracia.
+    """
+    __tablename__ = "stored_file"
+    __table_args__ = (
+        Index("idx_stored_file_unreferenced", "ref_count", "updated_at"),
+    )
+
+    key: str = Field(primary_key=True, max_length=255)
+    sha256: str = Field(max_length=64, nullable=False)
+    size: int = Field(nullable=False)
+    content_type: Optional[str] = Field(default=None, max_length=100)
+    ref_count: int = Field(default=0, nullable=False)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(COLOMBIA_TZ), nullable=False)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(COLOMBIA_TZ), nullable=False)
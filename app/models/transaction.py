@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
 from typing import Optional, TYPE_CHECKING, ClassVar, List
 from sqlalchemy.orm import relationship
+from sqlalchemy import Index
 from enum import Enum
 from datetime import datetime
 from pydantic import BaseModel, validator
@@ -65,6 +66,13 @@ class Transaction(SQLModel, table=True):
     withdrawal: Optional["Withdrawal"] = Relationship()
     bank_account: Optional["BankAccount"] = Relationship()
 
+    __table_args__ = (
+        # Saldos por usuario y tipo: los importes van incluidos en el índice
+        Index("idx_transaction_user_type", "user_id", "type",
+              postgresql_include=["income", "expense"]),
+        Index("idx_transaction_client_request", "client_request_id"),
+    )
+
     @validator('bank_account_id')
     def validate_bank_account_id(cls, v, values):
         """Valida que bank_account_id sea requerido para transacciones de tipo WITHDRAWAL"""
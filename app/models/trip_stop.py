@@ -1,6 +1,7 @@
 from sqlmodel import SQLModel, Field, Relationship
 from sqlalchemy import Column, Enum
 from geoalchemy2 import Geometry
+from app.utils.spatial import geography_index
 from uuid import UUID, uuid4
 from datetime import datetime
 from typing import Optional
@@ -22,6 +23,7 @@ class StopStatus(str, enum.Enum):
 
 class TripStop(SQLModel, table=True):
     __tablename__ = "trip_stop"
+    __table_args__ = (geography_index("trip_stop", "position"),)
 
     id: Optional[UUID] = Field(
         default_factory=uuid4, primary_key=True, unique=True)
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import Optional
 from uuid import UUID, uuid4
 from datetime import datetime
@@ -26,5 +27,11 @@ class UserFCMToken(SQLModel, table=True):
     updated_at: datetime = Field(default_factory=lambda: datetime.now(COLOMBIA_TZ),
                                  nullable=False, sa_column_kwargs={"onupdate": lambda: datetime.now(COLOMBIA_TZ)})
 
+    __table_args__ = (
+        Index("idx_user_fcm_token_user_active", "user_id",
+              postgresql_where=text("is_active = true")),
+        Index("idx_user_fcm_token_token", "fcm_token"),
+    )
+
     # Relación inversa (opcional, si quieres acceder desde User)
     # user: Optional["User"] = Relationship(back_populates="fcm_tokens")
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from datetime import datetime
 from enum import Enum
@@ -29,3 +30,9 @@ class UserHasRole(SQLModel, table=True):
         default_factory=lambda: datetime.now(COLOMBIA_TZ), nullable=False)
     updated_at: datetime = Field(default_factory=lambda: datetime.now(
         COLOMBIA_TZ), nullable=False, sa_column_kwargs={"onupdate": lambda: datetime.now(COLOMBIA_TZ)})
+
+    # (id_user, id_rol) ya está cubierto por la llave primaria
+    __table_args__ = (
+        Index("idx_user_has_role_role_status",
+              "id_rol", "status", "is_verified", "suspension"),
+    )
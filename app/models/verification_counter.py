@@ -0,0 +1,196 @@
+from sqlmodel import SQLModel, Field
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session, attributes
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Set
+import pytz
+import random
+
+from app.models.driver_documents import DriverDocuments, DriverStatus
+from app.models.driver_info import DriverInfo
+from app.models.user_has_roles import UserHasRole, RoleStatus
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+TOTAL_DRIVERS = "total_drivers"
+VERIFIED_DRIVERS = "verified_drivers"
+APPROVED_DRIVERS = "approved_drivers"
+DRIVERS_WITH_PENDING_DOCS = "drivers_with_pending_docs"
+COUNTER_NAMES = (TOTAL_DRIVERS, VERIFIED_DRIVERS, APPROVED_DRIVERS, DRIVERS_WITH_PENDING_DOCS)
+
+DRIVER_ROLE = "DRIVER"
+
+# Filas por contador: cada flush suma en una al azar, así los registros y
+# aprobaciones concurrentes no esperan todos el bloqueo de la misma fila.
+# El valor del contador es la suma de sus filas.
+COUNTER_SHARDS = 8
+
+
+class VerificationCounter(SQLModel, table=True):
+    """
+    Contadores del tablero de verificación de conductores, repartidos en
+    COUNTER_SHARDS filas por contador. Se ajustan en el mismo flush que
+    cambia user_has_role o driver_documents (listeners de abajo) y el job
+    reconcile_verification_counters los corrige contra la base.
+    """
+    __tablename__ = "verification_counter"
+
+    name: str = Field(primary_key=True, max_length=50)
+    shard: int = Field(default=0, primary_key=True)
+    value: int = Field(default=0, nullable=False)
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(COLOMBIA_TZ), nullable=False)
+
+
+def _values(obj, key: str):
+    """
+    (valor antes del flush, valor después) de un atributo.
+    """
+    history = attributes.get_history(obj, key)
+    current = getattr(obj, key)
+    before = history.deleted[0] if history.deleted else current
+    after = history.added[0] if history.added else current
+    return before, after
+
+
+def _is_driver_role(obj) -> bool:
+    return isinstance(obj, UserHasRole) and obj.id_rol == DRIVER_ROLE
+
+
+def _role_deltas(session: Session) -> Counter:
+    deltas = Counter()
+    for obj in session.new:
+        if _is_driver_role(obj):
+            deltas[TOTAL_DRIVERS] += 1
+            deltas[VERIFIED_DRIVERS] += int(bool(obj.is_verified))
+            deltas[APPROVED_DRIVERS] += int(obj.status == RoleStatus.APPROVED)
+    for obj in session.deleted:
+        if _is_driver_role(obj):
+            deltas[TOTAL_DRIVERS] -= 1
+            deltas[VERIFIED_DRIVERS] -= int(bool(_values(obj, "is_verified")[0]))
+            deltas[APPROVED_DRIVERS] -= int(_values(obj, "status")[0] == RoleStatus.APPROVED)
+    for obj in session.dirty:
+        if not _is_driver_role(obj):
+            continue
+        verified_before, verified_after = _values(obj, "is_verified")
+        deltas[VERIFIED_DRIVERS] += int(bool(verified_after)) - int(bool(verified_before))
+        status_before, status_after = _values(obj, "status")
+        deltas[APPROVED_DRIVERS] += (int(status_after == RoleStatus.APPROVED)
+                                     - int(status_before == RoleStatus.APPROVED))
+    return deltas
+
+
+def _pending_driver_infos(session: Session) -> Set:
+    """
+    DriverInfo (driver_info_id) cuyo "tiene documentos pendientes" puede
+    cambiar con este flush.
+    """
+    affected = set()
+    for obj in session.new:
+        if isinstance(obj, DriverDocuments) and obj.status == DriverStatus.PENDING:
+            affected.add(obj.driver_info_id)
+    for obj in session.deleted:
+        if isinstance(obj, DriverDocuments):
+            affected.add(_values(obj, "driver_info_id")[0])
+    for obj in session.dirty:
+        if not isinstance(obj, DriverDocuments):
+            continue
+        status_before, status_after = _values(obj, "status")
+        owner_before, owner_after = _values(obj, "driver_info_id")
+        if owner_before != owner_after or (
+                status_before != status_after and DriverStatus.PENDING in (status_before, status_after)):
+            affected.update((owner_before, owner_after))
+    affected.discard(None)
+    return affected
+
+
+def _driver_users(session: Session, driver_info_ids: Set) -> Set:
+    """
+    Usuarios dueños de esos DriverInfo: un conductor con varios vehículos
+    tiene un DriverInfo por cada uno, pero cuenta una sola vez.
+    """
+    if not driver_info_ids:
+        return set()
+    table = DriverInfo.__table__
+    return set(session.connection().execute(
+        select(table.c.user_id).where(table.c.id.in_(driver_info_ids)).distinct()
+    ).scalars())
+
+
+def _with_pending(session: Session, user_ids: Set) -> Set:
+    if not user_ids:
+        return set()
+    documents = DriverDocuments.__table__
+    driver_infos = DriverInfo.__table__
+    return set(session.connection().execute(
+        select(driver_infos.c.user_id)
+        .join(documents, documents.c.driver_info_id == driver_infos.c.id)
+        .where(
+            driver_infos.c.user_id.in_(user_ids),
+            documents.c.status == DriverStatus.PENDING
+        ).distinct()
+    ).scalars())
+
+
+def apply_counter_deltas(bind, deltas: Dict[str, int], shard: Optional[int] = None) -> None:
+    """
+    Suma los deltas a los contadores en la fila `shard` de cada uno (al azar
+    si no se indica; UPDATE atómico, INSERT si la fila no existe). `bind`
+    puede ser una sesión o una conexión. No hace commit.
+    """
+    table = VerificationCounter.__table__
+    now = datetime.now(COLOMBIA_TZ)
+    if shard is None:
+        shard = random.randrange(COUNTER_SHARDS)
+    # Siempre en el mismo orden de filas (name, shard) que la reconciliación
+    for name, delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        result = bind.execute(
+            update(table).where(table.c.name == name, table.c.shard == shard).values(
+                value=table.c.value + delta, updated_at=now))
+        if result.rowcount == 0:
+            bind.execute(insert(table).values(name=name, shard=shard, value=delta, updated_at=now))
+
+
+_FLUSH_STATE_KEY = "verification_counter_flush"
+
+
+def before_flush_listener(session: Session, flush_context, instances):
+    # Estado de un flush anterior que falló
+    session.info.pop(_FLUSH_STATE_KEY, None)
+    with session.no_autoflush:
+        deltas = _role_deltas(session)
+        affected = _driver_users(session, _pending_driver_infos(session))
+        if not affected and not any(deltas.values()):
+            return
+        pending_before = _with_pending(session, affected)
+    session.info[_FLUSH_STATE_KEY] = (deltas, affected, pending_before)
+
+
+def after_flush_listener(session: Session, flush_context):
+    state = session.info.pop(_FLUSH_STATE_KEY, None)
+    if state is None:
+        return
+    deltas, affected, pending_before = state
+    if affected:
+        deltas[DRIVERS_WITH_PENDING_DOCS] += (
+            len(_with_pending(session, affected)) - len(pending_before))
+    if any(deltas.values()):
+        apply_counter_deltas(session.connection(), deltas)
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# active_history: al asignar un atributo expirado (p. ej. después de un
+# commit) se carga el valor anterior, necesario para calcular el delta
+for _attribute in (UserHasRole.is_verified, UserHasRole.status,
+                   DriverDocuments.status, DriverDocuments.driver_info_id):
+    event.listen(_attribute, "set", _keep_previous_value, active_history=True, retval=True)
+
+# Aplica a todas las sesiones (incluida la de sqlmodel, que hereda de Session)
+event.listen(Session, "before_flush", before_flush_listener)
+event.listen(Session, "after_flush", after_flush_listener)
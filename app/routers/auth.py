@@ -6,6 +6,8 @@ from app.models.user import UserRead
 from app.core.dependencies.auth import get_current_user
 import logging
 
+logger = logging.getLogger(__name__)
+
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -125,7 +127,6 @@ async def refresh_token_endpoint(
     request: Request,
     session: SessionDep
 ):
-    print("[DEBUG] /auth/refresh llamado con refresh_token:", data.refresh_token)
     service = AuthService(session)
     try:
         user_agent = request.headers.get("user-agent")
@@ -9,6 +9,9 @@ from app.services.bank_account_service import BankAccountService
 from typing import List, Optional
 from uuid import UUID
 from app.core.dependencies.auth import get_current_user
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/bank-accounts", tags=["bank-accounts"])
 bearer_scheme = HTTPBearer()
@@ -74,17 +77,17 @@ def patch_bank_account(
     current_user=Depends(get_current_user)
 ):
     try:
-        print(f"PATCH request received for account_id: {account_id}")
+        logger.debug("PATCH request received for account_id: %s", account_id)
         user_id = request.state.user_id
-        print(f"User ID: {user_id}")
+        logger.debug("User ID: %s", user_id)
 
         update_dict = update_data.dict(exclude_unset=True)
-        print(f"Filtered update data: {update_dict}")
+        logger.debug("Filtered update data: %s", update_dict)
 
         service = BankAccountService(session)
         return service.update_bank_account(user_id, account_id, update_dict)
     except Exception as e:
-        print(f"Error in patch_bank_account: {str(e)}")
+        logger.error("Error in patch_bank_account: %s", str(e))
         raise
 
 
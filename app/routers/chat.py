@@ -14,6 +14,9 @@ from uuid import UUID
 from typing import List
 import traceback
 from sqlalchemy.sql import select
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/chat",
@@ -95,8 +98,8 @@ def send_message(
         # Re-lanzar HTTPException sin modificar (preservar código de estado)
         raise
     except Exception as e:
-        print(f"[ERROR] Exception en send_message: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("[ERROR] Exception en send_message: %s", str(e))
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500, detail=f"Error al enviar mensaje: {str(e)}")
 
@@ -188,8 +191,8 @@ def get_conversation(
         # Re-lanzar HTTPException sin modificar (preservar código de estado)
         raise
     except Exception as e:
-        print(f"[ERROR] Exception en get_conversation: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("[ERROR] Exception en get_conversation: %s", str(e))
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500, detail=f"Error al obtener conversación: {str(e)}")
 
@@ -254,8 +257,9 @@ def mark_conversation_as_read(
         # Re-lanzar HTTPException sin modificar (preservar código de estado)
         raise
     except Exception as e:
-        print(f"[ERROR] Exception en mark_conversation_as_read: {str(e)}")
-        print(traceback.format_exc())
+        logger.error(
+            "[ERROR] Exception en mark_conversation_as_read: %s", str(e))
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500, detail=f"Error al marcar mensajes como leídos: {str(e)}")
 
@@ -319,7 +323,8 @@ def get_unread_messages_count(
         # Re-lanzar HTTPException sin modificar (preservar código de estado)
         raise
     except Exception as e:
-        print(f"[ERROR] Exception en get_unread_messages_count: {str(e)}")
-        print(traceback.format_exc())
+        logger.error(
+            "[ERROR] Exception en get_unread_messages_count: %s", str(e))
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500, detail=f"Error al obtener conteo de mensajes: {str(e)}")
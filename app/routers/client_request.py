@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Request, Query, Body, Path
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Query, Body, Path, BackgroundTasks
 from fastapi.responses import JSONResponse
 from app.core.db import get_session
 from app.core.dependencies.admin_auth import get_current_admin
 from app.models.client_request import ClientRequest, ClientRequestCreate, StatusEnum
 from app.models.type_service import TypeService
+from app.services.config_cache_service import get_type_service, get_type_services_by_vehicle_type
 from app.core.db import SessionDep
 from app.services.client_requests_service import (
     check_and_lift_driver_suspension,
@@ -37,8 +38,17 @@ from app.utils.geo_utils import wkb_to_coords, get_time_and_distance_from_google
 from datetime import datetime, timedelta
 from app.utils.geo import wkb_to_coords
 from uuid import UUID
+from typing import Optional
 from app.core.dependencies.auth import get_current_user
+from app.services.trip_history_service import get_trip_history, HISTORY_PAGE_SIZE, HISTORY_MAX_PAGE_SIZE
+from app.services.address_service import warm_addresses_in_background
+from app.services.eta_tracking_service import get_eta_tracker
+from app.services.dispatch_feed_service import load_driver_feed_profile
 import pytz
+import logging
+
+logger = logging.getLogger(__name__)
+
 COLOMBIA_TZ = pytz.timezone("America/Bogota")
 
 bearer_scheme = HTTPBearer()
@@ -102,7 +112,8 @@ class ETAResponse(BaseModel):
 
 @router.post("/eta/start-tracking", tags=["Passengers", "Drivers"], description="""
 Inicia el seguimiento en tiempo real del ETA (tiempo estimado de llegada) del conductor.
-Este endpoint configura las actualizaciones automáticas por WebSocket.
+El servidor sigue automáticamente los viajes con conductor en camino y emite el ETA cuando
+el conductor avanza o pasa el tiempo máximo; este endpoint fuerza una emisión inmediata.
 
 **Parámetros:**
 - `client_request_id`: ID de la solicitud de viaje.
@@ -111,6 +122,7 @@ Este endpoint configura las actualizaciones automáticas por WebSocket.
 - `success`: True si el seguimiento se inició correctamente.
 - `message`: Mensaje descriptivo.
 - `socket_event`: Nombre del evento WebSocket a escuchar.
+- `eta`: Último ETA calculado (null si aún no hay).
 
 **Nota:** El cliente debe conectarse al WebSocket y escuchar el evento `eta_update/{client_request_id}`.
 """)
@@ -125,8 +137,8 @@ def start_eta_tracking(
     import traceback
 
     try:
-        print(
-            f"🔍 DEBUG ETA TRACKING: Iniciando seguimiento para client_request_id: {client_request_id}")
+        logger.debug(
+            "🔍 DEBUG ETA TRACKING: Iniciando seguimiento para client_request_id: %s", client_request_id)
 
         # Verificar que la solicitud existe y tiene conductor asignado
         from app.models.client_request import ClientRequest
@@ -142,11 +154,18 @@ def start_eta_tracking(
             raise HTTPException(
                 status_code=400, detail="No hay conductor asignado a esta solicitud")
 
-        print(
-            f"✅ DEBUG ETA TRACKING: Seguimiento iniciado para solicitud {client_request_id}")
+        # El motor de ETA ya sigue los viajes activos; se fuerza una emisión
+        # inmediata para que el cliente reciba el primer valor sin esperar
+        tracker = get_eta_tracker()
+        tracker.request_refresh(client_request_id)
+        snapshot = tracker.latest(client_request_id)
+
+        logger.debug(
+            "✅ DEBUG ETA TRACKING: Seguimiento iniciado para solicitud %s", client_request_id)
 
         return {
             "success": True,
+            "eta": snapshot.payload() if snapshot else None,
             "message": "Seguimiento de ETA iniciado correctamente",
             "socket_event": f"eta_update/{client_request_id}",
             "instructions": {
@@ -163,12 +182,12 @@ def start_eta_tracking(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ ERROR en start_eta_tracking:")
-        print(f"Tipo de error: {type(e).__name__}")
-        print(f"Mensaje: {str(e)}")
-        print("=== TRACEBACK COMPLETO ===")
+        logger.error("❌ ERROR en start_eta_tracking:")
+        logger.error("Tipo de error: %s", type(e).__name__)
+        logger.debug("Mensaje: %s", str(e))
+        logger.error("=== TRACEBACK COMPLETO ===")
         traceback.print_exc()
-        print("=== FIN TRACEBACK ===")
+        logger.error("=== FIN TRACEBACK ===")
         raise HTTPException(
             status_code=500, detail=f"Error iniciando seguimiento: {str(e)}")
 
@@ -194,90 +213,62 @@ def get_eta(
     import traceback
 
     try:
-        print(
-            f"🔍 DEBUG ETA: Iniciando cálculo ETA para client_request_id: {client_request_id}")
-        print(f"🔍 DEBUG ETA: Tipo de session: {type(session)}")
+        logger.debug(
+            "🔍 DEBUG ETA: Iniciando cálculo ETA para client_request_id: %s", client_request_id)
+        logger.debug("🔍 DEBUG ETA: Tipo de session: %s", type(session))
+
+        # Último ETA del motor de seguimiento; solo se calcula aquí si el
+        # motor aún no tiene valor para el viaje
+        snapshot = get_eta_tracker().latest(client_request_id)
+        if snapshot is not None:
+            return ETAResponse(distance=snapshot.distance, duration=snapshot.duration)
 
         result = get_eta_service(session, client_request_id)
-        print(f"✅ DEBUG ETA: Resultado del servicio: {result}")
+        logger.debug("✅ DEBUG ETA: Resultado del servicio: %s", result)
 
         response = ETAResponse(**result)
-        print(f"✅ DEBUG ETA: Respuesta final: {response}")
+        logger.debug("✅ DEBUG ETA: Respuesta final: %s", response)
         return response
 
     except Exception as e:
-        print(f"❌ ERROR en get_eta:")
-        print(f"Tipo de error: {type(e).__name__}")
-        print(f"Mensaje: {str(e)}")
-        print("=== TRACEBACK COMPLETO ===")
+        logger.error("❌ ERROR en get_eta:")
+        logger.error("Tipo de error: %s", type(e).__name__)
+        logger.debug("Mensaje: %s", str(e))
+        logger.error("=== TRACEBACK COMPLETO ===")
         traceback.print_exc()
-        print("=== FIN TRACEBACK ===")
+        logger.error("=== FIN TRACEBACK ===")
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/nearby", tags=["Drivers"], description="""
 Obtiene las solicitudes de viaje cercanas a un conductor en un radio de 5 km, filtrando por el tipo de servicio del vehículo del conductor.
+
+Las solicitudes nuevas, cancelaciones y ofertas llegan por socket (evento `subscribe_nearby_feed`);
+este endpoint sirve como foto completa al abrir la app o reconectar.
 """)
 async def get_nearby_client_requests(
     request: Request,
+    background_tasks: BackgroundTasks,
     driver_lat: float = Query(..., example=4.708822,
                               description="Latitud del conductor"),
     driver_lng: float = Query(..., example=-74.076542,
                               description="Longitud del conductor"),
+    include_eta: bool = Query(
+        True, description="Incluir tiempo y distancia de Google Distance Matrix (false para una foto rápida al reconectar)"),
     session=Depends(get_session)
 ):
     try:
         user_id = getattr(request.state, 'user_id', None)
         if user_id is None:
             raise Exception("user_id no está presente en request.state")
-        # 1. Verificar que el usuario es DRIVER
-        from app.models.user_has_roles import UserHasRole, RoleStatus
-        user_role = session.query(UserHasRole).filter(
-            UserHasRole.id_user == user_id,
-            UserHasRole.id_rol == "DRIVER"
-        ).first()
-
-        # ✅ CORREGIDO: Validación completa del conductor
-        if not user_role:
-            raise HTTPException(
-                status_code=400, detail="El usuario no tiene el rol de conductor.")
-
-        if user_role.status != RoleStatus.APPROVED:
-            raise HTTPException(
-                status_code=400, detail="El usuario no tiene el rol de conductor aprobado.")
-
-        if not user_role.is_verified:
-            raise HTTPException(
-                status_code=400, detail="El conductor no está completamente verificado. Faltan documentos por aprobar.")
-
-        if user_role.suspension:
-            raise HTTPException(
-                status_code=400, detail="El conductor está suspendido y no puede operar.")
-        # 2. Obtener el DriverInfo del conductor
-        from app.models.driver_info import DriverInfo
-        driver_info = session.query(DriverInfo).filter(
-            DriverInfo.user_id == user_id).first()
-        if not driver_info:
-            raise HTTPException(
-                status_code=400, detail="El conductor no tiene información de conductor registrada")
-        # 2b. Obtener el vehículo del conductor
-        from app.models.vehicle_info import VehicleInfo
-        driver_vehicle = session.query(VehicleInfo).filter(
-            VehicleInfo.driver_info_id == driver_info.id).first()
-        if not driver_vehicle:
-            raise HTTPException(
-                status_code=400, detail="El conductor no tiene un vehículo registrado")
-        # 3. Obtener los tipos de servicio para ese tipo de vehículo
-        from app.models.type_service import TypeService
-        type_services = session.query(TypeService).filter(
-            TypeService.vehicle_type_id == driver_vehicle.vehicle_type_id).all()
-        if not type_services:
-            raise HTTPException(
-                status_code=400, detail="No hay servicios disponibles para el tipo de vehículo del conductor")
-        type_service_ids = [ts.id for ts in type_services]
-        # 4. Buscar las solicitudes cercanas filtrando por esos type_service_ids
+        # 1. Verificar que el usuario es un conductor habilitado y obtener los
+        # tipos de servicio de su vehículo (una sola consulta)
+        profile = load_driver_feed_profile(session, user_id)
+        type_service_ids = profile.type_service_ids
+        # 2. Buscar las solicitudes cercanas filtrando por esos type_service_ids
         results = await get_nearby_client_requests_service(
-            driver_lat, driver_lng, session, wkb_to_coords, type_service_ids=type_service_ids, current_driver_id=user_id
+            driver_lat, driver_lng, session, wkb_to_coords, type_service_ids=type_service_ids, current_driver_id=user_id,
+            background_tasks=background_tasks
         )
         if not results:
             return JSONResponse(
@@ -287,6 +278,8 @@ async def get_nearby_client_requests(
                     "data": []
                 }
             )
+        if not include_eta:
+            return JSONResponse(content=results, status_code=200)
         # Google Distance Matrix
         pickup_positions = [
             f"{r['pickup_position']['lat']},{r['pickup_position']['lng']}" for r in results]
@@ -321,8 +314,8 @@ async def get_nearby_client_requests(
             results[index]['google_distance_matrix'] = element
         return JSONResponse(content=results, status_code=200)
     except Exception as e:
-        print("[ERROR] Exception en /nearby:")
-        print(traceback.format_exc())
+        logger.error("[ERROR] Exception en /nearby:")
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500, detail=f"Error al buscar solicitudes cercanas: {str(e)}")
 
@@ -390,12 +383,12 @@ def get_nearby_drivers(
         return JSONResponse(content=results, status_code=200)
 
     except HTTPException as e:
-        print(f"[HTTPException] {e.detail}")
-        print(traceback.format_exc())
+        logger.error("[HTTPException] %s", e.detail)
+        logger.error("Traceback:", exc_info=True)
         raise e
     except Exception as e:
-        print(f"[ERROR] Exception en get_nearby_drivers: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("[ERROR] Exception en get_nearby_drivers: %s", str(e))
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error al buscar conductores cercanos: {str(e)}"
@@ -558,6 +551,64 @@ def get_driver_requests_by_status(
     return get_driver_requests_by_status_service(session, user_id, status)
 
 
+@router.get("/history/{status}", tags=["Passengers"], description="""
+Historial paginado de solicitudes de viaje del usuario autenticado con el estado indicado,
+de la más reciente a la más antigua.
+
+**Parámetros:**
+- `status`: Estado por el cual filtrar (mismos valores que `/by-status/{status}`).
+- `limit`: Cantidad de viajes por página (máximo 100).
+- `cursor`: Valor `next_cursor` de la página anterior (omitir para la primera página).
+
+**Respuesta:**
+`items` con el mismo formato de `/by-status/{status}` y `next_cursor` (null si no hay más páginas).
+""")
+def get_client_trip_history(
+    request: Request,
+    session: SessionDep,
+    status: str = Path(..., description="Estado por el cual filtrar las solicitudes"),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente")
+):
+    user_id = request.state.user_id
+    if status not in StatusEnum.__members__:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Status inválido. Debe ser uno de: {', '.join(StatusEnum.__members__.keys())}"
+        )
+    return get_trip_history(session, user_id, "client", status, limit, cursor)
+
+
+@router.get("/driver-history/{status}", tags=["Drivers"], description="""
+Historial paginado de solicitudes de viaje del conductor autenticado con el estado indicado,
+de la más reciente a la más antigua.
+
+**Parámetros:**
+- `status`: Estado por el cual filtrar (mismos valores que `/by-driver-status/{status}`).
+- `limit`: Cantidad de viajes por página (máximo 100).
+- `cursor`: Valor `next_cursor` de la página anterior (omitir para la primera página).
+
+**Respuesta:**
+`items` con el mismo formato de `/by-driver-status/{status}` y `next_cursor` (null si no hay más páginas).
+""")
+def get_driver_trip_history(
+    request: Request,
+    session: SessionDep,
+    status: str = Path(..., description="Estado por el cual filtrar las solicitudes"),
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente")
+):
+    user_id = request.state.user_id
+    valid_states = {"ON_THE_WAY", "ARRIVED",
+                    "TRAVELLING", "FINISHED", "PAID", "CANCELLED"}
+    if status not in valid_states:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Status inválido. Debe ser uno de: {', '.join(valid_states)}"
+        )
+    return get_trip_history(session, user_id, "driver", status, limit, cursor)
+
+
 @router.post("/", response_model=ClientRequestResponse, status_code=status.HTTP_201_CREATED, tags=["Passengers"], description="""
 Crea una nueva solicitud de viaje para un cliente.
 
@@ -577,6 +628,7 @@ Devuelve la solicitud de viaje creada con toda su información.
 """)
 def create_request(
     request: Request,
+    background_tasks: BackgroundTasks,
     request_data: ClientRequestCreate = Body(
         ...,
         example={
@@ -606,11 +658,16 @@ def create_request(
             )
         db_obj = create_client_request(
             session, request_data, id_client=user_id)
+        # Direcciones para el historial y el feed, fuera del tiempo de respuesta
+        background_tasks.add_task(warm_addresses_in_background, [
+            (request_data.pickup_lat, request_data.pickup_lng),
+            (request_data.destination_lat, request_data.destination_lng)
+        ])
         # Lógica de asignación de conductores ocupados/disponibles usando el nuevo DriverSearchService
-        print(f"\n🔍 DEBUGGING: Buscando conductores óptimos...")
-        print(f"   - Client Lat: {request_data.pickup_lat}")
-        print(f"   - Client Lng: {request_data.pickup_lng}")
-        print(f"   - Type Service ID: {request_data.type_service_id}")
+        logger.debug("\n🔍 DEBUGGING: Buscando conductores óptimos...")
+        logger.debug("   - Client Lat: %s", request_data.pickup_lat)
+        logger.debug("   - Client Lng: %s", request_data.pickup_lng)
+        logger.debug("   - Type Service ID: %s", request_data.type_service_id)
 
         optimal_drivers = find_optimal_drivers_with_search_service(
             session,
@@ -619,24 +676,25 @@ def create_request(
             request_data.type_service_id
         )
 
-        print(f"   - Conductores encontrados: {len(optimal_drivers)}")
+        logger.debug("   - Conductores encontrados: %s", len(optimal_drivers))
         for i, driver in enumerate(optimal_drivers):
-            print(
-                f"   - Driver {i+1}: {driver.get('type', 'unknown')} - {driver.get('user_id', 'unknown')}")
+            logger.debug(
+                "   - Driver %s: %s - %s", i + 1, driver.get('type', 'unknown'), driver.get('user_id', 'unknown'))
 
         assigned = False
         for driver in optimal_drivers:
             if driver["type"] == "available":
-                print(
-                    f"   ✅ Asignando conductor disponible: {driver.get('user_id')}")
+                logger.info(
+                    "   ✅ Asignando conductor disponible: %s", driver.get('user_id'))
                 assigned = True
                 break
         if not assigned:
-            print(f"   ⚠️ No hay conductores disponibles, buscando ocupados...")
+            logger.warning(
+                "   ⚠️ No hay conductores disponibles, buscando ocupados...")
             for driver in optimal_drivers:
                 if driver["type"] == "busy":
-                    print(
-                        f"   🔄 Asignando conductor ocupado: {driver.get('user_id')}")
+                    logger.debug(
+                        "   🔄 Asignando conductor ocupado: %s", driver.get('user_id'))
                     estimated_pickup_time = datetime.now(
                     ) + timedelta(seconds=driver["estimated_time"])
                     success = assign_busy_driver(
@@ -647,16 +705,15 @@ def create_request(
                         driver["current_trip_remaining_time"],
                         driver["transit_time"]
                     )
-                    print(
-                        f"   - Resultado asignación: {'✅ Éxito' if success else '❌ Falló'}")
+                    logger.debug(
+                        "   - Resultado asignación: %s", '✅ Éxito' if success else '❌ Falló')
                     assigned = True
                     break
             if not assigned:
-                print(f"   ❌ No se encontraron conductores disponibles ni ocupados")
+                logger.error(
+                    "   ❌ No se encontraron conductores disponibles ni ocupados")
         # Obtener el nombre del tipo de servicio
-        from app.models.type_service import TypeService
-        type_service = session.query(TypeService).filter(
-            TypeService.id == db_obj.type_service_id).first()
+        type_service = get_type_service(session, db_obj.type_service_id)
         response = {
             "id": db_obj.id,
             "id_client": db_obj.id_client,
@@ -676,7 +733,7 @@ def create_request(
         }
         return response
     except Exception as e:
-        print(traceback.format_exc())
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500, detail=f"Error al crear la solicitud de viaje: {str(e)}"
         )
@@ -715,12 +772,12 @@ def assign_driver(
             request_data.fare_assigned
         )
     except HTTPException as e:
-        print("[HTTPException]", e.detail)
-        print(traceback.format_exc())
+        logger.error("[HTTPException] %s", e.detail)
+        logger.error("Traceback:", exc_info=True)
         raise e
     except Exception as e:
-        print("[ERROR] Exception en assign_driver:")
-        print(traceback.format_exc())
+        logger.error("[ERROR] Exception en assign_driver:")
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error al asignar el conductor: {str(e)}"
@@ -823,11 +880,12 @@ def check_driver_suspension_api(
         result = check_and_lift_driver_suspension(session, driver_id)
         return result
     except ValueError as e:
-        print(f"ValueError: {str(e)}")
+        logger.debug("ValueError: %s", str(e))
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"[ERROR] Exception en check_driver_suspension: {str(e)}")
-        print(traceback.format_exc())
+        logger.error(
+            "[ERROR] Exception en check_driver_suspension: %s", str(e))
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
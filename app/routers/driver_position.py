@@ -5,11 +5,15 @@ from app.models.driver_position import DriverPositionCreate, DriverPositionRead
 from app.core.db import get_session
 from app.services.driver_position_service import DriverPositionService
 from app.models.project_settings import ProjectSettings
+from app.services.config_cache_service import get_project_settings
 from uuid import UUID
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.models.driver_info import DriverInfo
 from app.models.user_has_roles import UserHasRole, RoleStatus
 from app.core.dependencies.auth import get_current_user
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/drivers-position", tags=["drivers-position"])
 
@@ -48,11 +52,11 @@ def create_driver_position(
         UserHasRole.id_rol == "DRIVER",
         UserHasRole.status == RoleStatus.APPROVED
     ).first()
-    print(
-        f"[DEBUG][/drivers-position/] user_id={user_id}, driver_role={driver_role}")
+    logger.debug(
+        "[DEBUG][/drivers-position/] user_id=%s, driver_role=%s", user_id, driver_role)
     if driver_role:
-        print(
-            f"[DEBUG][/drivers-position/] status={driver_role.status}, is_verified={getattr(driver_role, 'is_verified', None)}")
+        logger.debug(
+            "[DEBUG][/drivers-position/] status=%s, is_verified=%s", driver_role.status, getattr(driver_role, 'is_verified', None))
 
     if not driver_role:
         raise HTTPException(
@@ -115,7 +119,7 @@ def delete_my_driver_position(
 ):
     # Obtener el user_id desde el token
     user_id = request.state.user_id
-    print(f"user_id: {user_id}")
+    logger.debug("user_id: %s", user_id)
     # Buscar el driver_info correspondiente a este usuario
     driver_info = session.query(DriverInfo).filter(
         DriverInfo.user_id == user_id).first()
@@ -160,7 +164,7 @@ def get_nearby_drivers(
 ):
     # Si no se especifica max_distance, obtener el valor de ProjectSettings id=1
     if max_distance is None:
-        setting = session.get(ProjectSettings, 1)
+        setting = get_project_settings(session)
         if setting is not None:
             try:
                 max_distance = float(setting.driver_dist)
@@ -192,10 +196,10 @@ def get_drivers_by_client_request(
         UserHasRole.status == RoleStatus.APPROVED
     ).first()
     if not user_has_role:
-        print(f"[ERROR] El usuario {user_id} no tiene rol aprobado")
+        logger.error("[ERROR] El usuario %s no tiene rol aprobado", user_id)
         raise HTTPException(
             status_code=403, detail="No tiene rol asignado o aprobado")
     user_role = user_has_role.id_rol  # 'DRIVER' o 'CLIENT'
-    print(f"[DEBUG] user_id: {user_id}, user_role: {user_role}")
+    logger.debug("[DEBUG] user_id: %s, user_role: %s", user_id, user_role)
     service = DriverPositionService(session)
     return service.get_nearby_drivers_by_client_request(id_client_request, user_id, user_role)
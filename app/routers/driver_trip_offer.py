@@ -7,6 +7,9 @@ from uuid import UUID
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from app.core.dependencies.auth import get_current_user
 from app.models.user_has_roles import UserHasRole, RoleStatus
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/driver-trip-offers", tags=["driver-trip-offers"])
 
@@ -61,10 +64,10 @@ def get_offers_by_client_request(
         UserHasRole.status == RoleStatus.APPROVED
     ).first()
     if not user_has_role:
-        print(f"[ERROR] El usuario {user_id} no tiene rol aprobado")
+        logger.error("[ERROR] El usuario %s no tiene rol aprobado", user_id)
         raise HTTPException(
             status_code=403, detail="No tiene rol asignado o aprobado")
     user_role = user_has_role.id_rol  # 'DRIVER' o 'CLIENT'
-    print(f"[DEBUG] user_id: {user_id}, user_role: {user_role}")
+    logger.debug("[DEBUG] user_id: %s, user_role: %s", user_id, user_role)
     service = DriverTripOfferService(session)
     return service.get_offers_by_client_request(id_client_request, user_id, user_role)
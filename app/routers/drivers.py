@@ -16,6 +16,7 @@ from app.services.driver_service import DriverService
 from app.models.driver_full_read import DriverFullRead
 from app.models.driver_response import DriverFullResponse, UserResponse, DriverInfoResponse, VehicleInfoResponse, DriverDocumentsResponse
 from app.utils.uploads import uploader
+from app.services.file_storage_service import release_reference
 from app.models.driver_info import DriverInfo
 from app.models.vehicle_info import VehicleInfo
 from app.models.driver_documents import DriverDocuments
@@ -24,6 +25,9 @@ from app.models.document_type import DocumentType
 from app.core.config import settings
 from app.core.dependencies.auth import get_current_user
 from app.services.user_service import UserService
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/drivers", tags=["Drivers"])
 
@@ -314,11 +318,12 @@ async def update_driver(
                 )
             ).scalars().first()
             if doc:
-                if side == "front":
-                    doc.document_front_url = url
-                elif side == "back":
+                # El archivo anterior pierde una referencia
+                if side == "back":
+                    release_reference(session, doc.document_back_url)
                     doc.document_back_url = url
                 else:
+                    release_reference(session, doc.document_front_url)
                     doc.document_front_url = url
             else:
                 session.add(DriverDocuments(
@@ -387,15 +392,15 @@ async def update_driver(
     # Actualizar selfie del usuario si se recibe un archivo
     if selfie is not None:
         try:
-            print(
-                f"[DEBUG PATCH] Actualizando selfie para user_id={user_id}, archivo={selfie.filename}")
+            logger.debug(
+                "[DEBUG PATCH] Actualizando selfie para user_id=%s, archivo=%s", user_id, selfie.filename)
             UserService(session).update_selfie(user_id, selfie)
             user = session.exec(select(User).where(
                 User.id == user_id)).scalars().first()
-            print(
-                f"[DEBUG PATCH] selfie_url actualizado: {user.selfie_url if user else 'Usuario no encontrado'}")
+            logger.debug(
+                "[DEBUG PATCH] selfie_url actualizado: %s", user.selfie_url if user else 'Usuario no encontrado')
         except Exception as e:
-            print(f"[ERROR PATCH] Error actualizando selfie: {e}")
+            logger.error("[ERROR PATCH] Error actualizando selfie: %s", e)
             traceback.print_exc()
 
     # Guardar todos los cambios en la base de datos
@@ -492,34 +497,34 @@ async def accept_pending_request(
     """
     import traceback
     try:
-        print(f"🔍 DEBUG: accept_pending_request endpoint llamado")
-        print(f"   - client_request_id: {client_request_id}")
+        logger.debug("🔍 DEBUG: accept_pending_request endpoint llamado")
+        logger.debug("   - client_request_id: %s", client_request_id)
 
         # Obtener el user_id desde el token
         user_id = request.state.user_id
-        print(f"   - user_id del token: {user_id}")
+        logger.debug("   - user_id del token: %s", user_id)
 
         # Usar el servicio para aceptar la solicitud pendiente
         service = DriverService(session)
-        print(
-            f"   - Llamando service.accept_pending_request({user_id}, {client_request_id})")
+        logger.debug(
+            "   - Llamando service.accept_pending_request(%s, %s)", user_id, client_request_id)
         success = service.accept_pending_request(user_id, client_request_id)
-        print(f"   - Resultado del servicio: {success}")
+        logger.debug("   - Resultado del servicio: %s", success)
 
         if success:
-            print(f"✅ Solicitud pendiente aceptada correctamente")
+            logger.info("✅ Solicitud pendiente aceptada correctamente")
             return {"message": "Solicitud pendiente aceptada correctamente"}
         else:
-            print(f"❌ No se pudo aceptar la solicitud pendiente")
+            logger.error("❌ No se pudo aceptar la solicitud pendiente")
             raise HTTPException(
                 status_code=400, detail="No se pudo aceptar la solicitud pendiente")
 
     except HTTPException:
-        print(f"⚠️ HTTPException capturada y re-lanzada")
+        logger.error("⚠️ HTTPException capturada y re-lanzada")
         raise
     except Exception as e:
-        print(f"❌ Error aceptando solicitud pendiente: {e}")
-        print(f"   - Traceback completo:")
+        logger.error("❌ Error aceptando solicitud pendiente: %s", e)
+        logger.error("   - Traceback completo:")
         traceback.print_exc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -565,7 +570,7 @@ async def complete_pending_request(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error completando solicitud pendiente: {e}")
+        logger.error("Error completando solicitud pendiente: %s", e)
         traceback.print_exc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -609,7 +614,7 @@ async def cancel_pending_request(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error cancelando solicitud pendiente: {e}")
+        logger.error("Error cancelando solicitud pendiente: %s", e)
         traceback.print_exc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -649,7 +654,7 @@ async def get_pending_request(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error obteniendo solicitud pendiente: {e}")
+        logger.error("Error obteniendo solicitud pendiente: %s", e)
         traceback.print_exc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -735,7 +740,7 @@ async def make_pending_request_offer(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error creando oferta de solicitud pendiente: {e}")
+        logger.error("Error creando oferta de solicitud pendiente: %s", e)
         traceback.print_exc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -828,7 +833,7 @@ async def client_accept_pending_request_offer(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error aceptando oferta del conductor: {e}")
+        logger.error("Error aceptando oferta del conductor: %s", e)
         traceback.print_exc()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,4 +1,7 @@
 from fastapi import APIRouter, Response, Depends
+from fastapi.responses import JSONResponse
+from app.core.sio_manager import get_sio_stats
+from app.services.maintenance_service import get_maintenance_scheduler
 from app.utils.metrics import metrics
 from app.core.dependencies.admin_auth import get_current_admin
 from app.core.db import SessionDep
@@ -15,6 +18,9 @@ async def get_metrics():
     Endpoint para métricas de Prometheus
     """
     metrics_data = metrics.get_metrics()
+    job_lines = get_maintenance_scheduler().prometheus_lines()
+    if job_lines:
+        metrics_data = metrics_data + "\n" + "\n".join(job_lines)
     return Response(content=metrics_data, media_type="text/plain")
 
 
@@ -29,6 +35,31 @@ async def health_check():
     }
 
 
+@router.get("/health/socketio", tags=["Monitoring"])
+async def socketio_health():
+    """
+    Estado de Socket.IO en el worker que atiende: conexiones, rooms y, con
+    SIO_MANAGER=redis, mensajes del canal y si el listener sigue activo.
+    """
+    from app.core.sio_events import sio
+    stats = get_sio_stats(sio)
+    healthy = stats.get("listener_alive", True)
+    return JSONResponse(
+        status_code=200 if healthy else 503,
+        content={"status": "healthy" if healthy else "degraded", **stats}
+    )
+
+
+@router.get("/health/maintenance", tags=["Monitoring"])
+async def maintenance_health():
+    """
+    Jobs de mantenimiento de este worker: ejecuciones, fallas, tiempos y
+    último resultado. En los workers que no son líder las ejecuciones
+    aparecen como omitidas.
+    """
+    return {"jobs": get_maintenance_scheduler().stats()}
+
+
 @router.get("/business-metrics", tags=["Monitoring"])
 async def get_business_metrics():
     """
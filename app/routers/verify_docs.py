@@ -1,6 +1,6 @@
-from fastapi import APIRouter, Depends, status, Request, HTTPException, Security
+from fastapi import APIRouter, Depends, status, Request, HTTPException, Security, Query
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from app.core.dependencies.admin_auth import get_current_admin
 from app.models.user import UserRead
@@ -9,7 +9,10 @@ from app.core.db import SessionDep
 from app.services.verify_docs_service import (
     VerifyDocsService,
     UserWithDocs,
-    UserWithExpiringDocsResponse
+    UserWithDocsPage,
+    UserWithExpiringDocsResponse,
+    REVIEW_PAGE_SIZE,
+    REVIEW_MAX_PAGE_SIZE
 )
 from app.models.driver_documents import DocumentsUpdate, DriverDocumentsCreateRequest
 from app.models.user import User
@@ -28,19 +31,27 @@ def get_verify_docs_service(session: SessionDep) -> VerifyDocsService:
     return VerifyDocsService(session)
 
 
-@router.get("/pending", response_model=List[UserWithDocs])
+@router.get("/pending", response_model=UserWithDocsPage)
 def get_users_with_pending_docs(
     request: Request,
     session: SessionDep,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=REVIEW_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente")
 ):
     """
-    Obtiene usuarios con documentos pendientes y sus documentos asociados.
+    Obtiene usuarios con documentos pendientes y sus documentos asociados,
+    primero los que más llevan esperando revisión.
+
+    **Parámetros:**
+    - `limit`: Cantidad de conductores por página (máximo 200).
+    - `cursor`: Valor `next_cursor` de la página anterior (omitir para la primera página).
 
     **Respuesta:**
-    Devuelve una lista de usuarios con sus documentos pendientes de aprobación.
+    `items` con los usuarios, sus documentos pendientes y `waiting_since`
+    (fecha del documento pendiente más antiguo), y `next_cursor` (null si no hay más páginas).
     """
     service = VerifyDocsService(session)
-    return service.get_users_with_pending_docs()
+    return service.get_users_with_pending_docs(limit, cursor)
 
 
 
@@ -66,26 +77,30 @@ def get_verification_status(
     return service.get_verification_status()
 
 
-# @router.get("/rejected", response_model=List[UserWithDocs])
+# @router.get("/rejected", response_model=UserWithDocsPage)
 def get_users_with_rejected_docs(
     request: Request,
-    session: SessionDep
+    session: SessionDep,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=REVIEW_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente")
 ):
     """Obtiene usuarios con documentos rechazados y sus documentos asociados"""
     service = VerifyDocsService(session)
-    return service.get_users_with_rejected_docs()
+    return service.get_users_with_rejected_docs(limit, cursor)
 
 
 
-# @router.get("/expired", response_model=List[UserWithDocs])
+# @router.get("/expired", response_model=UserWithDocsPage)
 
 def get_users_with_expired_docs(
     request: Request,
-    session: SessionDep
+    session: SessionDep,
+    limit: int = Query(REVIEW_PAGE_SIZE, ge=1, le=REVIEW_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Cursor de la página siguiente")
 ):
     """Obtiene usuarios con documentos expirados y sus documentos asociados"""
     service = VerifyDocsService(session)
-    return service.get_users_with_expired_docs()
+    return service.get_users_with_expired_docs(limit, cursor)
 
 
 
@@ -0,0 +1,87 @@
+from sqlmodel import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from app.models.geocoded_address import GeocodedAddress
+from app.utils.geo_utils import get_address_from_coords
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 4 decimales ≈ 11 m: suficiente para una dirección de calle
+COORD_PRECISION = 4
+
+# Respuestas de get_address_from_coords que no se deben guardar
+_UNRESOLVED = {"Dirección no encontrada",
+               "Error al obtener dirección", "Error al procesar dirección"}
+
+
+def coord_key(lat: float, lng: float) -> str:
+    return f"{lat:.{COORD_PRECISION}f},{lng:.{COORD_PRECISION}f}"
+
+
+def get_cached_addresses(session: Session, coords: Iterable[Tuple[float, float]]) -> Dict[str, str]:
+    """
+    Direcciones ya geocodificadas para varias coordenadas en una sola consulta.
+    Retorna {coord_key: dirección}; las coordenadas sin dirección no aparecen.
+    No llama a servicios externos.
+    """
+    keys = list({coord_key(lat, lng) for lat, lng in coords})
+    if not keys:
+        return {}
+    rows = session.execute(
+        select(GeocodedAddress.coord_key, GeocodedAddress.address)
+        .where(GeocodedAddress.coord_key.in_(keys))
+    ).all()
+    return {key: address for key, address in rows}
+
+
+def resolve_address(session: Session, lat: float, lng: float) -> Optional[str]:
+    """
+    Dirección de una coordenada: desde la tabla geocoded_address o, si no
+    está, con Google Geocoding (y se guarda para las siguientes lecturas).
+    Solo hace flush: el commit queda a cargo de quien maneja la sesión.
+    El insert va en un savepoint: si otra petición guardó la misma
+    coordenada primero, se conserva la suya y la transacción sigue sana.
+    """
+    key = coord_key(lat, lng)
+    cached = session.get(GeocodedAddress, key)
+    if cached is not None:
+        return cached.address
+
+    address = get_address_from_coords(lat, lng)
+    if address and address not in _UNRESOLVED:
+        try:
+            with session.begin_nested():
+                session.add(GeocodedAddress(coord_key=key, address=address[:255]))
+        except IntegrityError:
+            logger.debug("Dirección %s ya guardada por otra petición", key)
+    return address
+
+
+def warm_addresses(session: Session, coords: Iterable[Tuple[float, float]]) -> None:
+    """
+    Geocodifica y guarda las coordenadas que aún no tengan dirección.
+    Pensado para correr en segundo plano al crear una solicitud.
+    """
+    coords = [(lat, lng) for lat, lng in coords if lat is not None and lng is not None]
+    cached = get_cached_addresses(session, coords)
+    for lat, lng in coords:
+        if coord_key(lat, lng) not in cached:
+            try:
+                resolve_address(session, lat, lng)
+                session.commit()
+            except Exception as e:
+                logger.warning(
+                    "No se pudo geocodificar %s,%s: %s", lat, lng, e)
+                session.rollback()
+
+
+def warm_addresses_in_background(coords: Iterable[Tuple[float, float]]) -> None:
+    """
+    Igual que warm_addresses pero con una sesión propia (para BackgroundTasks).
+    """
+    from app.core.db import engine
+
+    with Session(engine) as session:
+        warm_addresses(session, list(coords))
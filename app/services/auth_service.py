@@ -17,6 +17,9 @@ from sqlalchemy.orm import joinedload
 from uuid import UUID
 from .refresh_token_service import RefreshTokenService
 import pytz
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class AuthService:
@@ -68,8 +71,8 @@ class AuthService:
                 ]
             }
         }
-        print("saber que se envia:",
-              f"{settings.WHATSAPP_API_URL}/{settings.WHATSAPP_PHONE_ID}/messages")
+        logger.debug(
+            "saber que se envia: %s/%s/messages", settings.WHATSAPP_API_URL, settings.WHATSAPP_PHONE_ID)
         try:
             async with httpx.AsyncClient() as client:
                 response = await client.post(
@@ -77,9 +80,9 @@ class AuthService:
                     headers=headers,
                     json=payload
                 )
-                print("Payload enviado:", payload)
-                print("Respuesta de WhatsApp:",
-                      response.status_code, response.text)
+                logger.debug("Payload enviado: %s", payload)
+                logger.debug(
+                    "Respuesta de WhatsApp: %s %s", response.status_code, response.text)
                 response.raise_for_status()
                 return True
         except httpx.RequestError as e:
@@ -382,10 +385,10 @@ class AuthService:
 
             # Enviar mensaje
             api_response = api_instance.sms_send_post(message_list)
-            print(str(api_response))
+            logger.debug("%s", str(api_response))
 
         except Exception as e:
-            print(f"Error sending SMS: {str(e)}")
+            logger.error("Error sending SMS: %s", str(e))
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to send SMS: {str(e)}"
@@ -10,6 +10,9 @@ from app.models.user_has_roles import UserHasRole, RoleStatus
 from datetime import datetime, timedelta
 from app.utils.encryption import encryption_service
 import traceback
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class BankAccountService:
@@ -119,24 +122,26 @@ class BankAccountService:
         No permite modificar campos sensibles como user_id o is_verified.
         """
         try:
-            print(
-                f"Service: update_bank_account called with user_id={user_id}, account_id={account_id}")
-            print(f"Service: update_data={update_data}")
+            logger.debug(
+                "Service: update_bank_account called with user_id=%s, account_id=%s", user_id, account_id)
+            logger.debug("Service: update_data=%s", update_data)
 
             # Verificar rol del usuario
             self.verify_user_role(user_id)
 
             bank_account = self.session.get(BankAccount, account_id)
-            print(f"Service: bank_account found: {bank_account is not None}")
+            logger.debug(
+                "Service: bank_account found: %s", bank_account is not None)
 
             if not bank_account:
-                print(f"Service: Bank account not found with ID {account_id}")
+                logger.debug(
+                    "Service: Bank account not found with ID %s", account_id)
                 raise HTTPException(
                     status_code=404, detail="Bank account not found")
 
             if bank_account.user_id != user_id:
-                print(
-                    f"Service: Bank account belongs to {bank_account.user_id}, not {user_id}")
+                logger.debug(
+                    "Service: Bank account belongs to %s, not %s", bank_account.user_id, user_id)
                 raise HTTPException(
                     status_code=403, detail="Not authorized to access this bank account")
 
@@ -148,7 +153,7 @@ class BankAccountService:
             ).first()
 
             if pending_withdrawals:
-                print(f"Service: Bank account has pending withdrawals")
+                logger.debug("Service: Bank account has pending withdrawals")
                 raise HTTPException(
                     status_code=400,
                     detail="Cannot update bank account with pending withdrawals"
@@ -161,25 +166,27 @@ class BankAccountService:
             for field in protected_fields:
                 update_data.pop(field, None)
 
-            print(f"Service: After removing protected fields: {update_data}")
+            logger.debug(
+                "Service: After removing protected fields: %s", update_data)
 
             # Si se modifica el número de cuenta, requiere re-verificación y encriptación
             if "account_number" in update_data:
-                print(f"Service: Encrypting account_number")
+                logger.debug("Service: Encrypting account_number")
                 update_data["account_number"] = encryption_service.encrypt(
                     update_data["account_number"])
                 update_data["verification_date"] = None
 
             # Si se modifica la cédula, requiere encriptación
             if "identification_number" in update_data:
-                print(f"Service: Encrypting identification_number")
+                logger.debug("Service: Encrypting identification_number")
                 update_data["identification_number"] = encryption_service.encrypt(
                     update_data["identification_number"])
 
             # Actualizar campos
-            print(f"Service: Updating fields: {list(update_data.keys())}")
+            logger.debug(
+                "Service: Updating fields: %s", list(update_data.keys()))
             for key, value in update_data.items():
-                print(f"Service: Setting {key}={value}")
+                logger.debug("Service: Setting %s=%s", key, value)
                 setattr(bank_account, key, value)
 
             bank_account.updated_at = datetime.utcnow()
@@ -187,11 +194,11 @@ class BankAccountService:
             self.session.commit()
             self.session.refresh(bank_account)
 
-            print(f"Service: Bank account updated successfully")
+            logger.debug("Service: Bank account updated successfully")
             return BankAccountRead.from_orm(bank_account)
         except Exception as e:
-            print(f"Service Error: {str(e)}")
-            print(traceback.format_exc())
+            logger.error("Service Error: %s", str(e))
+            logger.error("Traceback:", exc_info=True)
             raise
 
     def delete_bank_account(self, user_id: UUID, account_id: UUID) -> dict:
@@ -1,11 +1,15 @@
 from sqlmodel import Session, select, and_, or_, func
-from app.models.chat_message import ChatMessage, ChatMessageCreate, MessageStatus, UnreadCountResponse
+from sqlalchemy import update, delete
+from app.models.chat_message import ChatMessage, ChatMessageCreate, MessageStatus, UnreadCountResponse, ChatUnreadCounter
 from app.models.user import User
 from app.models.client_request import ClientRequest
 from datetime import datetime, timedelta
 from uuid import UUID
 import pytz
 from typing import List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 COLOMBIA_TZ = pytz.timezone("America/Bogota")
 
@@ -49,6 +53,7 @@ def create_chat_message(session: Session, sender_id: UUID, message_data: ChatMes
         )
 
         fresh_session.add(chat_message)
+        _increment_unread_counter(fresh_session, chat_message)
         fresh_session.commit()
         fresh_session.refresh(chat_message)
 
@@ -67,9 +72,9 @@ def get_conversation_messages(session: Session, client_request_id: UUID, user_id
     Si el ClientRequest está en estado PAID, retorna lista vacía.
     Usa el mismo patrón del listener para manejar sesiones consistentes.
     """
-    print(f"🔍 DEBUG get_conversation_messages:")
-    print(f"  - client_request_id: {client_request_id}")
-    print(f"  - user_id: {user_id}")
+    logger.debug("🔍 DEBUG get_conversation_messages:")
+    logger.debug("  - client_request_id: %s", client_request_id)
+    logger.debug("  - user_id: %s", user_id)
 
     # Obtener la conexión actual para crear una sesión fresca
     connection = session.bind
@@ -81,22 +86,23 @@ def get_conversation_messages(session: Session, client_request_id: UUID, user_id
         # Verificar que el usuario tiene acceso a esta conversación
         client_request = fresh_session.get(ClientRequest, client_request_id)
         if not client_request:
-            print(f"  ❌ ClientRequest no encontrado")
+            logger.error("  ❌ ClientRequest no encontrado")
             raise ValueError("Solicitud de viaje no encontrada")
 
-        print(f"  - ClientRequest encontrado: {client_request.id}")
-        print(f"  - Estado: {client_request.status}")
-        print(f"  - id_client: {client_request.id_client}")
-        print(f"  - id_driver_assigned: {client_request.id_driver_assigned}")
+        logger.debug("  - ClientRequest encontrado: %s", client_request.id)
+        logger.debug("  - Estado: %s", client_request.status)
+        logger.debug("  - id_client: %s", client_request.id_client)
+        logger.debug(
+            "  - id_driver_assigned: %s", client_request.id_driver_assigned)
 
         if client_request.id_client != user_id and client_request.id_driver_assigned != user_id:
-            print(f"  ❌ Usuario no tiene acceso")
+            logger.error("  ❌ Usuario no tiene acceso")
             raise ValueError("No tienes acceso a esta conversación")
 
         # Si el viaje está completado (PAID) o cancelado (CANCELLED), no hay mensajes (se eliminaron automáticamente)
         if client_request.status in ["PAID", "CANCELLED"]:
-            print(
-                f"  ✅ Estado {client_request.status} - retornando lista vacía")
+            logger.info(
+                "  ✅ Estado %s - retornando lista vacía", client_request.status)
             return []
 
         # Obtener mensajes ordenados por fecha de creación
@@ -105,11 +111,11 @@ def get_conversation_messages(session: Session, client_request_id: UUID, user_id
         ).order_by(ChatMessage.created_at.asc())
 
         messages = fresh_session.exec(statement).all()
-        print(f"  - Mensajes encontrados: {len(messages)}")
+        logger.debug("  - Mensajes encontrados: %s", len(messages))
 
         for i, msg in enumerate(messages):
-            print(
-                f"    Mensaje {i+1}: {msg.message} (sender: {msg.sender_id})")
+            logger.debug(
+                "    Mensaje %s: %s (sender: %s)", i + 1, msg.message, msg.sender_id)
 
         return messages
 
@@ -133,107 +139,198 @@ def mark_messages_as_read(session: Session, client_request_id: UUID, user_id: UU
     if client_request.id_client != user_id and client_request.id_driver_assigned != user_id:
         raise ValueError("No tienes acceso a esta conversación")
 
-    # Marcar mensajes como leídos
-    statement = select(ChatMessage).where(
-        and_(
-            ChatMessage.client_request_id == client_request_id,
-            ChatMessage.receiver_id == user_id,
-            ChatMessage.is_read == False
-        )
+    # Marcar mensajes como leídos en un solo UPDATE
+    result = session.execute(
+        update(ChatMessage).where(
+            and_(
+                ChatMessage.client_request_id == client_request_id,
+                ChatMessage.receiver_id == user_id,
+                ChatMessage.is_read == False
+            )
+        ).values(
+            is_read=True,
+            status=MessageStatus.READ
+        ).execution_options(synchronize_session=False)
     )
 
-    unread_messages = session.exec(statement).all()
+    _reset_unread_counter(session, user_id, client_request_id)
+    session.commit()
 
-    for message in unread_messages:
-        message.is_read = True
-        message.status = MessageStatus.READ
+    return result.rowcount
 
-    session.commit()
 
-    return len(unread_messages)
+def _unread_summary_statement(user_id: Optional[UUID] = None):
+    """
+    Resumen de mensajes no leídos por (receptor, conversación) en una sola consulta.
+    Usa funciones de ventana para obtener el conteo y el último mensaje de cada grupo
+    sin recorrer las solicitudes de viaje del usuario.
+    """
+    partition = (ChatMessage.receiver_id, ChatMessage.client_request_id)
+    conditions = [ChatMessage.is_read == False]
+    if user_id is not None:
+        conditions.append(ChatMessage.receiver_id == user_id)
+
+    ranked = select(
+        ChatMessage.receiver_id.label("receiver_id"),
+        ChatMessage.client_request_id.label("client_request_id"),
+        ChatMessage.sender_id.label("sender_id"),
+        ChatMessage.message.label("message"),
+        ChatMessage.created_at.label("created_at"),
+        func.count().over(partition_by=partition).label("unread_count"),
+        func.row_number().over(
+            partition_by=partition,
+            order_by=ChatMessage.created_at.desc()
+        ).label("message_rank")
+    ).where(and_(*conditions)).subquery()
+
+    return select(
+        ranked.c.receiver_id,
+        ranked.c.client_request_id,
+        ranked.c.sender_id,
+        ranked.c.message,
+        ranked.c.created_at,
+        ranked.c.unread_count,
+        User.full_name
+    ).outerjoin(
+        User, User.id == ranked.c.sender_id
+    ).where(
+        ranked.c.message_rank == 1
+    ).order_by(ranked.c.created_at.desc())
 
 
 def get_unread_count(session: Session, user_id: UUID) -> List[UnreadCountResponse]:
     """
     Obtiene el conteo de mensajes no leídos para todas las conversaciones del usuario
     """
-    # Obtener todas las conversaciones donde el usuario participa
-    client_requests_statement = select(ClientRequest).where(
-        or_(
-            ClientRequest.id_client == user_id,
-            ClientRequest.id_driver_assigned == user_id
+    rows = session.exec(_unread_summary_statement(user_id)).all()
+
+    return [
+        UnreadCountResponse(
+            conversation_id=row.client_request_id,
+            unread_count=row.unread_count,
+            last_message=row.message,
+            other_user_name=row.full_name or "Usuario",
+            last_message_time=row.created_at
         )
-    )
+        for row in rows
+    ]
+
 
-    client_requests = session.exec(client_requests_statement).all()
-    unread_counts = []
+def get_conversation_unread_count(session: Session, user_id: UUID, client_request_id: UUID) -> int:
+    """
+    Retorna el contador de mensajes no leídos de una conversación para un usuario.
+    Lee una sola fila de chat_unread_counter, por lo que su costo no depende
+    del historial de viajes del usuario.
+    """
+    counter = session.get(ChatUnreadCounter, (user_id, client_request_id))
+    return counter.unread_count if counter else 0
 
-    for client_request in client_requests:
-        # Obtener el último mensaje no leído
-        last_message_statement = select(ChatMessage).where(
+
+def _increment_unread_counter(session: Session, chat_message: ChatMessage) -> None:
+    """
+    Incrementa el contador del receptor para la conversación del mensaje.
+    Si aún no existe, se inicializa con el conteo real de no leídos.
+    """
+    values = {
+        "last_message": chat_message.message,
+        "last_sender_id": chat_message.sender_id,
+        "last_message_time": chat_message.created_at,
+        "updated_at": datetime.now(COLOMBIA_TZ)
+    }
+    result = session.execute(
+        update(ChatUnreadCounter).where(
             and_(
-                ChatMessage.client_request_id == client_request.id,
-                ChatMessage.receiver_id == user_id,
-                ChatMessage.is_read == False
+                ChatUnreadCounter.user_id == chat_message.receiver_id,
+                ChatUnreadCounter.client_request_id == chat_message.client_request_id
             )
-        ).order_by(ChatMessage.created_at.desc()).limit(1)
-
-        last_message = session.exec(last_message_statement).first()
+        ).values(unread_count=ChatUnreadCounter.unread_count + 1, **values)
+    )
 
-        if last_message:
-            # Contar mensajes no leídos
-            count_statement = select(func.count(ChatMessage.id)).where(
+    if result.rowcount == 0:
+        session.flush()
+        unread_count = session.exec(
+            select(func.count(ChatMessage.id)).where(
                 and_(
-                    ChatMessage.client_request_id == client_request.id,
-                    ChatMessage.receiver_id == user_id,
+                    ChatMessage.client_request_id == chat_message.client_request_id,
+                    ChatMessage.receiver_id == chat_message.receiver_id,
                     ChatMessage.is_read == False
                 )
             )
+        ).one()
+        session.add(ChatUnreadCounter(
+            user_id=chat_message.receiver_id,
+            client_request_id=chat_message.client_request_id,
+            unread_count=unread_count,
+            **values
+        ))
 
-            unread_count = session.exec(count_statement).first()
 
-            # Obtener nombre del otro usuario
-            other_user_id = last_message.sender_id
-            other_user = session.get(User, other_user_id)
-            other_user_name = other_user.full_name if other_user else "Usuario"
+def _reset_unread_counter(session: Session, user_id: UUID, client_request_id: UUID) -> None:
+    """
+    Reinicia el contador de no leídos de una conversación para un usuario.
+    """
+    session.execute(
+        update(ChatUnreadCounter).where(
+            and_(
+                ChatUnreadCounter.user_id == user_id,
+                ChatUnreadCounter.client_request_id == client_request_id
+            )
+        ).values(unread_count=0, updated_at=datetime.now(COLOMBIA_TZ))
+    )
+
 
-            unread_counts.append(UnreadCountResponse(
-                conversation_id=client_request.id,
-                unread_count=unread_count,
-                last_message=last_message.message,
-                other_user_name=other_user_name,
-                last_message_time=last_message.created_at
-            ))
+def rebuild_unread_counters(session: Session, user_id: Optional[UUID] = None) -> int:
+    """
+    Reconstruye los contadores de no leídos a partir de chat_message.
+    Si se indica user_id solo reconstruye los de ese usuario.
+    Retorna el número de contadores generados.
+    """
+    delete_statement = delete(ChatUnreadCounter)
+    if user_id is not None:
+        delete_statement = delete_statement.where(
+            ChatUnreadCounter.user_id == user_id)
+    session.execute(delete_statement)
+
+    rows = session.exec(_unread_summary_statement(user_id)).all()
+    now = datetime.now(COLOMBIA_TZ)
+    session.add_all([
+        ChatUnreadCounter(
+            user_id=row.receiver_id,
+            client_request_id=row.client_request_id,
+            unread_count=row.unread_count,
+            last_message=row.message,
+            last_sender_id=row.sender_id,
+            last_message_time=row.created_at,
+            updated_at=now
+        )
+        for row in rows
+    ])
+    session.commit()
 
-    return unread_counts
+    return len(rows)
 
 
 def cleanup_chat_messages_for_request(session: Session, client_request_id: UUID) -> int:
     """
     Elimina todos los mensajes de chat de una solicitud específica.
-    Se usa cuando el ClientRequest cambia a estado PAID.
+    Se usa cuando el ClientRequest cambia a estado PAID o CANCELLED.
+    Ejecuta un único DELETE por client_request_id, sin cargar los mensajes.
     Retorna el número de mensajes eliminados
     """
-    statement = select(ChatMessage).where(
-        ChatMessage.client_request_id == client_request_id
+    result = session.execute(
+        delete(ChatMessage).where(
+            ChatMessage.client_request_id == client_request_id
+        ).execution_options(synchronize_session=False)
     )
 
-    # Verificar si es una sesión de SQLModel o SQLAlchemy
-    if hasattr(session, 'exec'):
-        # Es una sesión de SQLModel
-        messages = session.exec(statement).all()
-    else:
-        # Es una sesión de SQLAlchemy
-        messages = session.execute(statement).scalars().all()
-
-    count = len(messages)
-
-    for message in messages:
-        session.delete(message)
-
+    session.execute(
+        delete(ChatUnreadCounter).where(
+            ChatUnreadCounter.client_request_id == client_request_id
+        ).execution_options(synchronize_session=False)
+    )
     session.commit()
 
-    return count
+    return result.rowcount
 
 
 def get_conversation_participants(session: Session, client_request_id: UUID) -> tuple[UUID, UUID]:
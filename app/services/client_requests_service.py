@@ -8,8 +8,8 @@ from app.models.penality_user import PenalityUser, statusEnum
 from app.models.project_settings import ProjectSettings
 from app.models.user import User
 from app.models.verify_mount import VerifyMount
-from sqlalchemy import func, text
-from geoalchemy2.functions import ST_Distance
+from sqlalchemy import and_, func, or_, select, text
+from app.utils.spatial import make_point, distance_meters, within_meters, knn_order
 from datetime import datetime, timedelta, timezone
 import requests
 from fastapi import HTTPException, status
@@ -19,9 +19,15 @@ from app.models.driver_info import DriverInfo
 from app.models.vehicle_info import VehicleInfo
 from app.models.driver_position import DriverPosition
 from app.services.driver_trip_offer_service import get_average_rating
+from app.services.rating_summary_service import record_rating, get_average_ratings, DRIVER_ROLE, PASSENGER_ROLE
+from app.models.rating_summary import RatingSummary
 from sqlalchemy.orm import selectinload
 import traceback
-from app.utils.geo_utils import wkb_to_coords, get_address_from_coords, get_time_and_distance_from_google
+from app.utils.geo_utils import wkb_to_coords, get_time_and_distance_from_google
+from app.services.address_service import coord_key, get_cached_addresses, warm_addresses_in_background
+from app.services.trip_history_service import get_trip_history
+from app.services.dispatch_feed_service import get_dispatch_feed
+from app.services.request_expiry_service import get_request_expiry
 from app.models.type_service import TypeService
 from uuid import UUID
 from typing import Dict, Set, Optional, List
@@ -33,6 +39,7 @@ from app.services.driver_search_service import DriverSearchService
 import logging
 import pytz
 from app.services.config_service_value_service import ConfigServiceValueService
+from app.services.config_cache_service import get_project_settings, get_type_service, get_type_services_by_vehicle_type
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +82,18 @@ def create_client_request(db: Session, data: ClientRequestCreate, id_client: UUI
         intermediate_stops=data.intermediate_stops
     )
 
+    # Enviar la solicitud a los conductores cercanos suscritos al feed
+    try:
+        get_dispatch_feed().publish_new_request(
+            db, db_obj,
+            (data.pickup_lat, data.pickup_lng),
+            (data.destination_lat, data.destination_lng))
+    except Exception as e:
+        logger.error(
+            "Error publicando la solicitud %s en el feed: %s", db_obj.id, e)
+    # Programar su vencimiento si ningún conductor la toma
+    get_request_expiry().schedule(db_obj.id, db_obj.created_at)
+
     return db_obj
 
 
@@ -97,20 +116,63 @@ def get_time_and_distance_service(origin_lat, origin_lng, destination_lat, desti
     return data
 
 
-async def get_nearby_client_requests_service(driver_lat, driver_lng, session: Session, wkb_to_coords, type_service_ids=None, current_driver_id=None):
-    print(
-        f"\n[DEBUG] Calculando distancias para conductor en lat={driver_lat}, lng={driver_lng}")
-    driver_point = func.ST_GeomFromText(
-        f'POINT({driver_lng} {driver_lat})', 4326)
+# Viajes en los que el usuario sigue participando (rooms de socket del viaje)
+SOCKET_TRIP_STATUSES = (
+    StatusEnum.CREATED, StatusEnum.PENDING, StatusEnum.ACCEPTED,
+    StatusEnum.ARRIVED, StatusEnum.ON_THE_WAY, StatusEnum.TRAVELLING,
+    StatusEnum.FINISHED,
+)
+
+
+def get_active_trip_ids(session: Session, user_id: UUID) -> List[UUID]:
+    """
+    Ids de los viajes activos del usuario como cliente o como conductor
+    asignado, en una sola consulta.
+    """
+    return list(session.execute(
+        select(ClientRequest.id).where(
+            or_(ClientRequest.id_client == user_id,
+                ClientRequest.id_driver_assigned == user_id),
+            ClientRequest.status.in_(SOCKET_TRIP_STATUSES)
+        )
+    ).scalars().all())
+
+
+def is_trip_participant(session: Session, client_request_id: UUID, user_id: UUID) -> bool:
+    return session.execute(
+        select(ClientRequest.id).where(
+            ClientRequest.id == client_request_id,
+            or_(ClientRequest.id_client == user_id,
+                ClientRequest.id_driver_assigned == user_id)
+        )
+    ).first() is not None
+
+
+def get_assigned_trip_client(session: Session, client_request_id: UUID, driver_id: UUID) -> Optional[UUID]:
+    """
+    id_client del viaje si `driver_id` es su conductor asignado; None si no.
+    """
+    return session.execute(
+        select(ClientRequest.id_client).where(
+            ClientRequest.id == client_request_id,
+            ClientRequest.id_driver_assigned == driver_id
+        )
+    ).scalar()
+
+
+async def get_nearby_client_requests_service(driver_lat, driver_lng, session: Session, wkb_to_coords, type_service_ids=None, current_driver_id=None, background_tasks=None):
+    logger.debug(
+        "\n[DEBUG] Calculando distancias para conductor en lat=%s, lng=%s", driver_lat, driver_lng)
+    driver_point = make_point(driver_lat, driver_lng)
 
     # Obtener el timeout de project_settings
-    project_settings = session.query(ProjectSettings).first()
+    project_settings = get_project_settings(session)
     timeout_minutes = project_settings.request_timeout_minutes if project_settings else 5
 
     time_limit = datetime.now(COLOMBIA_TZ) - timedelta(minutes=timeout_minutes)
     distance_limit = 4000
-    print(
-        f"[DEBUG] Límite de distancia configurado: {distance_limit} metros (1.35km)")
+    logger.debug(
+        "[DEBUG] Límite de distancia configurado: %s metros (1.35km)", distance_limit)
 
     # --- INICIO DEL NUEVO FILTRO ---
     from app.models.driver_trip_offer import DriverTripOffer
@@ -129,14 +191,19 @@ async def get_nearby_client_requests_service(driver_lat, driver_lng, session: Se
             User.country_code,
             User.phone_number,
             TypeService.name.label("type_service_name"),
-            # ✅ CORREGIDO: Usar ST_Distance para PostgreSQL en lugar de ST_Distance_Sphere de MySQL
-            ST_Distance(ClientRequest.pickup_position,
-                        driver_point).label("distance"),
+            distance_meters(ClientRequest.pickup_position,
+                            driver_point).label("distance"),
             # ✅ CORREGIDO: Usar EXTRACT para PostgreSQL en lugar de timestampdiff de MySQL
-            (func.extract('epoch', func.now() - ClientRequest.created_at) / 60.0).label("time_difference")
+            (func.extract('epoch', func.now() - ClientRequest.created_at) / 60.0).label("time_difference"),
+            # Calificación precalculada del pasajero
+            func.coalesce(RatingSummary.average, 0.0).label("client_average_rating")
         )
         .join(User, User.id == ClientRequest.id_client)
         .join(TypeService, TypeService.id == ClientRequest.type_service_id)
+        .outerjoin(RatingSummary, and_(
+            RatingSummary.user_id == ClientRequest.id_client,
+            RatingSummary.role == PASSENGER_ROLE
+        ))
         .filter(
             ClientRequest.status.in_(["CREATED", "PENDING"]),
             ClientRequest.created_at > time_limit
@@ -150,23 +217,40 @@ async def get_nearby_client_requests_service(driver_lat, driver_lng, session: Se
         base_query = base_query.filter(~ClientRequest.id.in_(subquery))
     # --- FIN FILTRO DE OFERTAS ---
 
-    print(f"[DEBUG] Query SQL: {str(base_query)}")
+    logger.debug("[DEBUG] Query SQL: %s", base_query)
 
-    base_query = base_query.where(ST_Distance(ClientRequest.pickup_position, driver_point) < distance_limit)
+    # Radio en metros con ST_DWithin (índice GiST) y las más cercanas primero (KNN)
+    base_query = base_query.where(
+        within_meters(ClientRequest.pickup_position, driver_point, distance_limit)
+    ).order_by(knn_order(ClientRequest.pickup_position, driver_point))
     results = []
     query_results = base_query.all()
 
-    print(f"\n[DEBUG] Resultados encontrados: {len(query_results)}")
-    for row in query_results:
-        cr, full_name, country_code, phone_number, type_service_name, distance, time_difference = row
-        pickup_coords = wkb_to_coords(cr.pickup_position)
-        destination_coords = wkb_to_coords(cr.destination_position)
+    logger.debug("\n[DEBUG] Resultados encontrados: %s", len(query_results))
+    positions = {row[0].id: (wkb_to_coords(row[0].pickup_position),
+                             wkb_to_coords(row[0].destination_position))
+                 for row in query_results}
+    coords = [(c['lat'], c['lng'])
+              for pair in positions.values() for c in pair if c]
+    # Direcciones ya guardadas en una sola consulta; las que falten se
+    # geocodifican fuera de la respuesta y mientras tanto se usa la
+    # descripción que envió el cliente
+    addresses = get_cached_addresses(session, coords)
+    missing = [c for c in coords if coord_key(*c) not in addresses]
+    if missing and background_tasks is not None:
+        background_tasks.add_task(warm_addresses_in_background, missing)
+
+    def address_for(coords, description):
+        if not coords:
+            return "No disponible"
+        return (addresses.get(coord_key(coords['lat'], coords['lng']))
+                or description or "No disponible")
 
-        # Obtener direcciones desde coordenadas
-        pickup_address = get_address_from_coords(
-            pickup_coords['lat'], pickup_coords['lng']) if pickup_coords else "No disponible"
-        destination_address = get_address_from_coords(
-            destination_coords['lat'], destination_coords['lng']) if destination_coords else "No disponible"
+    for row in query_results:
+        cr, full_name, country_code, phone_number, type_service_name, distance, time_difference, client_average_rating = row
+        pickup_coords, destination_coords = positions[cr.id]
+        pickup_address = address_for(pickup_coords, cr.pickup_description)
+        destination_address = address_for(destination_coords, cr.destination_description)
 
         # Obtener método de pago
         payment_method_obj = None
@@ -217,14 +301,13 @@ async def get_nearby_client_requests_service(driver_lat, driver_lng, session: Se
                             if fair_price_response:
                                 fair_price = fair_price_response.recommended_value
                         except Exception as e:
-                            print(
-                                f"[ERROR] No se pudo calcular el precio justo: {e}")
+                            logger.error(
+                                "[ERROR] No se pudo calcular el precio justo: %s", e)
             except Exception as e:
-                print(
-                    f"[ERROR] Google Distance Matrix (trayecto cliente): {e}")
+                logger.error(
+                    "[ERROR] Google Distance Matrix (trayecto cliente): %s", e)
 
-        average_rating = get_average_rating(
-            session, "passenger", cr.id_client) if cr.id_client else 0.0
+        average_rating = float(client_average_rating)
         result = {
             "id": str(cr.id),
             "id_client": str(cr.id_client),
@@ -268,36 +351,38 @@ def assign_driver_service(session: Session, id: UUID, id_driver_assigned: UUID,
             UserHasRole.id_rol == "DRIVER"
         ).first()
 
-        print("DEBUG user_role:", user_role)
+        logger.debug("DEBUG user_role: %s", user_role)
         if user_role:
-            print("DEBUG user_role.status:", user_role.status)
-            print("DEBUG user_role.is_verified:", user_role.is_verified)
-            print("DEBUG user_role.suspension:", user_role.suspension)
+            logger.debug("DEBUG user_role.status: %s", user_role.status)
+            logger.debug(
+                "DEBUG user_role.is_verified: %s", user_role.is_verified)
+            logger.debug(
+                "DEBUG user_role.suspension: %s", user_role.suspension)
 
         # ✅ CORREGIDO: Validación completa del conductor
         if not user_role:
-            print("DEBUG: No tiene rol DRIVER")
+            logger.debug("DEBUG: No tiene rol DRIVER")
             raise HTTPException(
                 status_code=400,
                 detail="El usuario no tiene el rol de conductor"
             )
 
         if user_role.status != RoleStatus.APPROVED:
-            print("DEBUG: No tiene status APPROVED")
+            logger.debug("DEBUG: No tiene status APPROVED")
             raise HTTPException(
                 status_code=400,
                 detail="El usuario no tiene el rol de conductor aprobado"
             )
 
         if not user_role.is_verified:
-            print("DEBUG: No está completamente verificado")
+            logger.debug("DEBUG: No está completamente verificado")
             raise HTTPException(
                 status_code=400,
                 detail="El conductor no está completamente verificado. Faltan documentos por aprobar"
             )
 
         if user_role.suspension:
-            print("DEBUG: Está suspendido")
+            logger.debug("DEBUG: Está suspendido")
             raise HTTPException(
                 status_code=400,
                 detail="El conductor está suspendido y no puede operar"
@@ -314,25 +399,27 @@ def assign_driver_service(session: Session, id: UUID, id_driver_assigned: UUID,
         ).first()
 
         driver_current_balance = driver_balance.mount if driver_balance else 0
-        print(f"💰 Saldo actual del conductor: ${driver_current_balance:,}")
+        logger.debug(
+            "💰 Saldo actual del conductor: $%s", format(driver_current_balance, ','))
 
         # Calcular comisión estimada (10% del valor del viaje)
         commission_percentage = 0.10
         estimated_commission = float(
             fare_assigned or client_request.fare_offered or 0) * commission_percentage
-        print(f"💸 Comisión estimada (10%): ${estimated_commission:,.0f}")
+        logger.debug(
+            "💸 Comisión estimada (10%%): $%s", format(estimated_commission, ',.0f'))
 
         # Validar que el conductor tenga saldo suficiente
         if driver_current_balance < estimated_commission:
-            print(
-                f"❌ Saldo insuficiente: ${driver_current_balance:,} < ${estimated_commission:,.0f}")
+            logger.error(
+                "❌ Saldo insuficiente: $%s < $%s", format(driver_current_balance, ','), format(estimated_commission, ',.0f'))
             raise HTTPException(
                 status_code=400,
                 detail=f"No se puede asignar el conductor porque su saldo (${driver_current_balance:,}) es insuficiente para cubrir la comisión estimada (${estimated_commission:,.0f}) del viaje."
             )
 
-        print(
-            f"✅ Saldo suficiente para comisión: ${driver_current_balance:,} >= ${estimated_commission:,.0f}")
+        logger.info(
+            "✅ Saldo suficiente para comisión: $%s >= $%s", format(driver_current_balance, ','), format(estimated_commission, ',.0f'))
 
         client_request.id_driver_assigned = id_driver_assigned
         client_request.status = "ACCEPTED"
@@ -367,8 +454,8 @@ def assign_driver_service(session: Session, id: UUID, id_driver_assigned: UUID,
 
         return {"success": True, "message": "Conductor asignado correctamente"}
     except Exception as e:
-        print("TRACEBACK:")
-        print(traceback.format_exc())
+        logger.error("TRACEBACK:")
+        logger.error("Traceback:", exc_info=True)
         raise
 
 
@@ -487,8 +574,7 @@ def get_client_request_detail_service(session: Session, client_request_id: UUID,
         }
 
         # Obtener el nombre del tipo de servicio
-        type_service = session.query(TypeService).filter(
-            TypeService.id == cr.type_service_id).first()
+        type_service = get_type_service(session, cr.type_service_id)
         if type_service:
             response["type_service_name"] = type_service.name
 
@@ -530,7 +616,7 @@ def get_client_request_detail_service(session: Session, client_request_id: UUID,
 
         return response
     except Exception as e:
-        print("ERROR EN SERIALIZACION DE CLIENT REQUEST")
+        logger.error("ERROR EN SERIALIZACION DE CLIENT REQUEST")
         traceback.print_exc()
         raise
 
@@ -540,140 +626,18 @@ def get_client_requests_by_status_service(session: Session, status: str, user_id
     Devuelve una lista de client_request filtrados por el estatus enviado en el parámetro y el user_id.
     Solo devuelve las solicitudes del usuario autenticado.
     Incluye información del conductor asignado para el historial.
+    Para listas largas usar la versión paginada (trip_history_service.get_trip_history).
     """
-    from app.models.client_request import ClientRequest
-    from app.models.payment_method import PaymentMethod
-    from app.models.user import User
-
-    # Obtener las solicitudes con sus métodos de pago
-    results = session.query(ClientRequest).filter(
-        ClientRequest.status == status,
-        ClientRequest.id_client == user_id  # Filtrar por el usuario autenticado
-    ).all()
-
-    # Crear un diccionario de métodos de pago para evitar múltiples consultas
-    payment_methods = {}
-    for cr in results:
-        if cr.payment_method_id and cr.payment_method_id not in payment_methods:
-            pm = session.query(PaymentMethod).filter(
-                PaymentMethod.id == cr.payment_method_id).first()
-            if pm:
-                payment_methods[cr.payment_method_id] = {
-                    "id": pm.id,
-                    "name": pm.name
-                }
-
-    # Crear un diccionario de conductores para evitar múltiples consultas
-    drivers = {}
-    for cr in results:
-        if cr.id_driver_assigned and cr.id_driver_assigned not in drivers:
-            driver = session.query(User).filter(
-                User.id == cr.id_driver_assigned).first()
-            if driver:
-                drivers[cr.id_driver_assigned] = {
-                    "id": str(driver.id),
-                    "full_name": driver.full_name,
-                    "phone_number": driver.phone_number,
-                    "country_code": driver.country_code,
-                    "selfie_url": driver.selfie_url
-                }
-
-    # Construir la respuesta
-    response_list = []
-    for cr in results:
-        pickup_coords = wkb_to_coords(cr.pickup_position)
-        destination_coords = wkb_to_coords(cr.destination_position)
-
-        # Obtener direcciones desde coordenadas
-        pickup_address = get_address_from_coords(
-            pickup_coords['lat'], pickup_coords['lng']) if pickup_coords else "No disponible"
-        destination_address = get_address_from_coords(
-            destination_coords['lat'], destination_coords['lng']) if destination_coords else "No disponible"
-
-        response_list.append({
-            "id": cr.id,
-            "id_client": cr.id_client,
-            "id_driver_assigned": cr.id_driver_assigned,
-            "fare_offered": cr.fare_offered,
-            "fare_assigned": cr.fare_assigned,
-            "pickup_description": cr.pickup_description,
-            "destination_description": cr.destination_description,
-            "client_rating": cr.client_rating,
-            "driver_rating": cr.driver_rating,
-            "status": str(cr.status),
-            "pickup_position": pickup_coords,
-            "destination_position": destination_coords,
-            "pickup_address": pickup_address,
-            "destination_address": destination_address,
-            "created_at": cr.created_at.isoformat(),
-            "updated_at": cr.updated_at.isoformat(),
-            "review": cr.review,
-            "payment_method": payment_methods.get(cr.payment_method_id) if cr.payment_method_id else None,
-            "driver": drivers.get(cr.id_driver_assigned) if cr.id_driver_assigned else None
-        })
-    return response_list
+    return get_trip_history(session, user_id, "client", status, limit=None)["items"]
 
 
 def get_driver_requests_by_status_service(session: Session, id_driver_assigned: str, status: str):
     """
     Devuelve una lista de solicitudes de viaje asociadas a un conductor filtradas por el estado.
     Incluye información del cliente para el historial del conductor.
+    Para listas largas usar la versión paginada (trip_history_service.get_trip_history).
     """
-    from app.models.client_request import ClientRequest
-    from app.models.user import User
-
-    # Consulta las solicitudes
-    results = session.query(ClientRequest).filter(
-        ClientRequest.id_driver_assigned == id_driver_assigned,
-        ClientRequest.status == status
-    ).all()
-
-    # Crear un diccionario de clientes para evitar múltiples consultas
-    clients = {}
-    for cr in results:
-        if cr.id_client and cr.id_client not in clients:
-            client = session.query(User).filter(
-                User.id == cr.id_client).first()
-            if client:
-                clients[cr.id_client] = {
-                    "id": str(client.id),
-                    "full_name": client.full_name,
-                    "selfie_url": client.selfie_url
-                }
-
-    # Construir la respuesta con conversión de campos geoespaciales
-    response_list = []
-    for cr in results:
-        pickup_coords = wkb_to_coords(cr.pickup_position)
-        destination_coords = wkb_to_coords(cr.destination_position)
-
-        # Obtener direcciones desde coordenadas
-        pickup_address = get_address_from_coords(
-            pickup_coords['lat'], pickup_coords['lng']) if pickup_coords else "No disponible"
-        destination_address = get_address_from_coords(
-            destination_coords['lat'], destination_coords['lng']) if destination_coords else "No disponible"
-
-        response_list.append({
-            "id": cr.id,
-            "id_client": cr.id_client,
-            "id_driver_assigned": cr.id_driver_assigned,
-            "fare_offered": cr.fare_offered,
-            "fare_assigned": cr.fare_assigned,
-            "pickup_description": cr.pickup_description,
-            "destination_description": cr.destination_description,
-            "client_rating": cr.client_rating,
-            "driver_rating": cr.driver_rating,
-            "status": str(cr.status),
-            "pickup_position": pickup_coords,
-            "destination_position": destination_coords,
-            "pickup_address": pickup_address,
-            "destination_address": destination_address,
-            "created_at": cr.created_at.isoformat(),
-            "updated_at": cr.updated_at.isoformat(),
-            "review": cr.review,
-            "client": clients.get(cr.id_client) if cr.id_client else None
-        })
-    return response_list
+    return get_trip_history(session, id_driver_assigned, "driver", status, limit=None)["items"]
 
 
 def update_client_rating_service(session: Session, id_client_request: UUID, client_rating: float, user_id: UUID):
@@ -734,6 +698,8 @@ def update_client_rating_service(session: Session, id_client_request: UUID, clie
 
     client_request.client_rating = client_rating
     client_request.updated_at = datetime.utcnow()
+    record_rating(session, client_request.id_client,
+                  PASSENGER_ROLE, client_rating)
     session.commit()
     return {"success": True, "message": "Calificación del cliente actualizada correctamente"}
 
@@ -796,6 +762,8 @@ def update_driver_rating_service(session: Session, id_client_request: UUID, driv
 
     client_request.driver_rating = driver_rating
     client_request.updated_at = datetime.utcnow()
+    record_rating(session, client_request.id_driver_assigned,
+                  DRIVER_ROLE, driver_rating)
     session.commit()
     return {"success": True, "message": "Calificación del conductor actualizada correctamente"}
 
@@ -857,9 +825,8 @@ def get_nearby_requests(self, driver_id: UUID, lat: float, lng: float, max_dista
         )
 
     # Obtener el tipo de servicio que puede manejar el conductor
-    type_services = self.session.query(TypeService).filter(
-        TypeService.vehicle_type_id == driver_vehicle.vehicle_type_id
-    ).all()
+    type_services = get_type_services_by_vehicle_type(
+        self.session, driver_vehicle.vehicle_type_id)
 
     if not type_services:
         raise HTTPException(
@@ -870,15 +837,13 @@ def get_nearby_requests(self, driver_id: UUID, lat: float, lng: float, max_dista
     type_service_ids = [ts.id for ts in type_services]
 
     # Obtener las solicitudes cercanas del tipo de servicio correspondiente
+    driver_point = make_point(lat, lng)
     nearby_requests = self.session.query(ClientRequest).filter(
         ClientRequest.status == StatusEnum.CREATED,
         ClientRequest.type_service_id.in_(type_service_ids),
-        func.ST_Distance(
-            func.ST_SetSRID(func.ST_MakePoint(
-                ClientRequest.pickup_lng, ClientRequest.pickup_lat), 4326),
-            func.ST_SetSRID(func.ST_MakePoint(lng, lat), 4326)
-        ) <= max_distance
-    ).all()
+        within_meters(ClientRequest.pickup_position,
+                      driver_point, max_distance * 1000)  # km a metros
+    ).order_by(knn_order(ClientRequest.pickup_position, driver_point)).all()
 
     return nearby_requests
 
@@ -905,9 +870,7 @@ def get_nearby_drivers_service(
     """
     try:
         # 1. Obtener el tipo de servicio para validar el tipo de vehículo
-        type_service = session.query(TypeService).filter(
-            TypeService.id == type_service_id
-        ).first()
+        type_service = get_type_service(session, type_service_id)
 
         if not type_service:
             raise HTTPException(
@@ -916,8 +879,7 @@ def get_nearby_drivers_service(
             )
 
         # 2. Crear punto del cliente
-        client_point = func.ST_GeomFromText(
-            f'POINT({client_lng} {client_lat})', 4326)
+        client_point = make_point(client_lat, client_lng)
 
         # 3. Consulta base para obtener conductores cercanos
         base_query = (
@@ -926,8 +888,8 @@ def get_nearby_drivers_service(
                 DriverInfo,
                 VehicleInfo,
                 DriverPosition,
-                ST_Distance(DriverPosition.position,
-                            client_point).label("distance")
+                distance_meters(DriverPosition.position,
+                                client_point).label("distance")
             )
             .join(UserHasRole, UserHasRole.id_user == User.id)
             .join(DriverInfo, DriverInfo.user_id == User.id)
@@ -944,24 +906,24 @@ def get_nearby_drivers_service(
             )
         )
 
-        # 4. Filtrar por distancia (5km)
+        # 4. Filtrar por distancia (5km) y ordenar por cercanía (KNN)
         distance_limit = 5000  # 5km en metros
-        base_query = base_query.having(text(f"distance < {distance_limit}"))
+        base_query = base_query.filter(
+            within_meters(DriverPosition.position, client_point, distance_limit)
+        ).order_by(knn_order(DriverPosition.position, client_point))
 
         # 5. Ejecutar consulta
         results = []
         query_results = base_query.all()
 
+        # Calificación promedio de todos los conductores en una sola consulta
+        driver_ratings = get_average_ratings(
+            session, DRIVER_ROLE, [row[0].id for row in query_results])
+
         for row in query_results:
             user, driver_info, vehicle_info, driver_position, distance = row
 
-            # Calcular calificación promedio del conductor
-            avg_rating = session.query(
-                func.avg(ClientRequest.driver_rating)
-            ).filter(
-                ClientRequest.id_driver_assigned == user.id,
-                ClientRequest.driver_rating.isnot(None)
-            ).scalar() or 0.0
+            avg_rating = driver_ratings.get(user.id, 0.0)
 
             result = {
                 "id": str(user.id),
@@ -1021,8 +983,9 @@ def get_nearby_drivers_service(
     except HTTPException as e:
         raise e
     except Exception as e:
-        print(f"[ERROR] Exception en get_nearby_drivers_service: {str(e)}")
-        print(traceback.format_exc())
+        logger.error(
+            "[ERROR] Exception en get_nearby_drivers_service: %s", str(e))
+        logger.error("Traceback:", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error al buscar conductores cercanos: {str(e)}"
@@ -1214,7 +1177,7 @@ def client_canceled_service(session: Session, id_client_request: UUID, user_id:
         )
 
     # Obtener configuración del proyecto para las penalizaciones
-    config = session.query(ProjectSettings).get(1)
+    config = get_project_settings(session)
     if not config:
         raise ValueError(
             "No se encontró la configuración del proyecto con ID 1")
@@ -1432,18 +1395,18 @@ def driver_canceled_service(session: Session, id_client_request: UUID, user_id:
         )
 
     # Validación explícita del conductor asignado
-    print(
-        f"🔍 DEBUG SERVICE: client_request.id_driver_assigned: {client_request.id_driver_assigned}")
-    print(f"🔍 DEBUG SERVICE: user_id: {user_id}")
-    print(
-        f"🔍 DEBUG SERVICE: client_request.id_driver_assigned type: {type(client_request.id_driver_assigned)}")
-    print(f"🔍 DEBUG SERVICE: user_id type: {type(user_id)}")
-    print(
-        f"🔍 DEBUG SERVICE: Comparación directa: {client_request.id_driver_assigned == user_id}")
-    print(
-        f"🔍 DEBUG SERVICE: Comparación con str: {client_request.id_driver_assigned == str(user_id)}")
-    print(
-        f"🔍 DEBUG SERVICE: Comparación con UUID: {client_request.id_driver_assigned == UUID(str(user_id))}")
+    logger.debug(
+        "🔍 DEBUG SERVICE: client_request.id_driver_assigned: %s", client_request.id_driver_assigned)
+    logger.debug("🔍 DEBUG SERVICE: user_id: %s", user_id)
+    logger.debug(
+        "🔍 DEBUG SERVICE: client_request.id_driver_assigned type: %s", type(client_request.id_driver_assigned))
+    logger.debug("🔍 DEBUG SERVICE: user_id type: %s", type(user_id))
+    logger.debug(
+        "🔍 DEBUG SERVICE: Comparación directa: %s", client_request.id_driver_assigned == user_id)
+    logger.debug(
+        "🔍 DEBUG SERVICE: Comparación con str: %s", client_request.id_driver_assigned == str(user_id))
+    logger.debug(
+        "🔍 DEBUG SERVICE: Comparación con UUID: %s", client_request.id_driver_assigned == UUID(str(user_id)))
 
     if client_request.id_driver_assigned != user_id:
         raise HTTPException(
@@ -1459,7 +1422,7 @@ def driver_canceled_service(session: Session, id_client_request: UUID, user_id:
         )
 
     # Obtener configuración del proyecto
-    config = session.query(ProjectSettings).get(1)
+    config = get_project_settings(session)
     if not config:
         raise ValueError(
             "No se encontró la configuración del proyecto con ID 1")
@@ -1557,16 +1520,16 @@ def record_driver_cancellation(session: Session, driver_id: UUID, client_request
     """
     Registra la cancelación del conductor en la tabla de registros.
     """
-    print(
-        f"DEBUG: record_driver_cancellation - driver_id: {driver_id}, client_request_id: {client_request_id}")
+    logger.debug(
+        "DEBUG: record_driver_cancellation - driver_id: %s, client_request_id: %s", driver_id, client_request_id)
 
     cancellation_record = DriverCancellation(
         id_driver=driver_id,
         id_client_request=client_request_id
     )
     session.add(cancellation_record)
-    print(
-        f"DEBUG: record_driver_cancellation - cancellation_record created with cancelled_at: {cancellation_record.cancelled_at}")
+    logger.debug(
+        "DEBUG: record_driver_cancellation - cancellation_record created with cancelled_at: %s", cancellation_record.cancelled_at)
     # No hacer flush aquí, el commit se hará después de registrar
 
 
@@ -1579,19 +1542,22 @@ def get_daily_cancellation_count(session: Session, driver_id: UUID) -> int:
         hour=0, minute=0, second=0, microsecond=0)
 
     # Debug: Imprimir información de la consulta
-    print(f"DEBUG: get_daily_cancellation_count - driver_id: {driver_id}")
-    print(f"DEBUG: get_daily_cancellation_count - today_start: {today_start}")
+    logger.debug(
+        "DEBUG: get_daily_cancellation_count - driver_id: %s", driver_id)
+    logger.debug(
+        "DEBUG: get_daily_cancellation_count - today_start: %s", today_start)
 
     # Obtener todos los registros para debug
     all_cancellations = session.query(DriverCancellation).filter(
         DriverCancellation.id_driver == driver_id
     ).all()
-    print(
-        f"DEBUG: get_daily_cancellation_count - total cancellations for driver: {len(all_cancellations)}")
+    logger.debug(
+        "DEBUG: get_daily_cancellation_count - total cancellations for driver: %s", len(all_cancellations))
 
-    for cancellation in all_cancellations:
-        print(
-            f"DEBUG: Cancellation - id: {cancellation.id}, cancelled_at: {cancellation.cancelled_at}, tzinfo: {cancellation.cancelled_at.tzinfo}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for cancellation in all_cancellations:
+            logger.debug(
+                "DEBUG: Cancellation - id: %s, cancelled_at: %s, tzinfo: %s", cancellation.id, cancellation.cancelled_at, cancellation.cancelled_at.tzinfo)
 
     # Consulta filtrada por fecha - manejar zona horaria
     daily_cancellations = []
@@ -1604,8 +1570,8 @@ def get_daily_cancellation_count(session: Session, driver_id: UUID) -> int:
         if cancelled_at >= today_start:
             daily_cancellations.append(cancellation)
 
-    print(
-        f"DEBUG: get_daily_cancellation_count - daily cancellations: {len(daily_cancellations)}")
+    logger.debug(
+        "DEBUG: get_daily_cancellation_count - daily cancellations: %s", len(daily_cancellations))
 
     return len(daily_cancellations)
 
@@ -1670,7 +1636,7 @@ def check_and_lift_driver_suspension(session: Session, driver_id: UUID):
         dict: Información sobre el estado de la suspensión
     """
     # Obtener la configuración del proyecto para los días de suspensión
-    config = session.query(ProjectSettings).get(1)
+    config = get_project_settings(session)
     if not config:
         raise ValueError(
             "No se encontró la configuración del proyecto con ID 1")
@@ -1758,7 +1724,7 @@ def get_busy_driver_config(session: Session) -> Dict[str, float]:
     """
     Obtiene la configuración para conductores ocupados desde project_settings
     """
-    settings = session.query(ProjectSettings).first()
+    settings = get_project_settings(session)
     if not settings:
         # Valores por defecto si no hay configuración
         return {
@@ -1904,7 +1870,8 @@ def find_optimal_drivers_with_search_service(
         return all_drivers
 
     except Exception as e:
-        print(f"Error en find_optimal_drivers_with_search_service: {e}")
+        logger.error(
+            "Error en find_optimal_drivers_with_search_service: %s", e)
         traceback.print_exc()
         # Fallback a la función original si hay error
         return find_optimal_drivers(session, client_lat, client_lng, type_service_id, max_distance)
@@ -1923,8 +1890,7 @@ def find_available_drivers(
     from app.models.driver_position import DriverPosition
     from app.utils.geo_utils import wkb_to_coords
 
-    client_point = func.ST_GeomFromText(
-        f'POINT({client_lng} {client_lat})', 4326)
+    client_point = make_point(client_lat, client_lng)
 
     # Buscar conductores que:
     # 1. Tienen rol DRIVER aprobado
@@ -1937,8 +1903,8 @@ def find_available_drivers(
             DriverInfo,
             VehicleInfo,
             DriverPosition,
-            ST_Distance(DriverPosition.position,
-                        client_point).label("distance")
+            distance_meters(DriverPosition.position,
+                            client_point).label("distance")
         )
         .join(UserHasRole, User.id == UserHasRole.id_user)
         .join(DriverInfo, User.id == DriverInfo.user_id)
@@ -1949,35 +1915,37 @@ def find_available_drivers(
             UserHasRole.status == RoleStatus.APPROVED,
             UserHasRole.is_verified == True,
             DriverInfo.pending_request_id.is_(None),  # Sin solicitud pendiente
-            VehicleInfo.vehicle_type_id == type_service_id
+            VehicleInfo.vehicle_type_id == type_service_id,
+            within_meters(DriverPosition.position, client_point,
+                          max_distance * 1000)  # Convertir km a metros
         )
+        .order_by(knn_order(DriverPosition.position, client_point))
     )
 
     results = []
     for user, driver_info, vehicle_info, driver_position, distance in query.all():
-        if distance <= max_distance * 1000:  # Convertir km a metros
-            # Obtener coordenadas del conductor desde DriverPosition
-            driver_coords = wkb_to_coords(driver_position.position)
-            if not driver_coords:
-                continue  # Saltar si no hay coordenadas válidas
+        # Obtener coordenadas del conductor desde DriverPosition
+        driver_coords = wkb_to_coords(driver_position.position)
+        if not driver_coords:
+            continue  # Saltar si no hay coordenadas válidas
 
-            # Calcular tiempo estimado directo
-            estimated_time = calculate_direct_time(
-                client_lat, client_lng, driver_coords["lat"], driver_coords["lng"])
+        # Calcular tiempo estimado directo
+        estimated_time = calculate_direct_time(
+            client_lat, client_lng, driver_coords["lat"], driver_coords["lng"])
 
-            results.append({
-                "user_id": user.id,
-                "driver_info_id": driver_info.id,
-                "full_name": user.full_name,
-                "phone_number": user.phone_number,
-                "distance": distance,
-                "estimated_time": estimated_time,
-                "vehicle_info": {
-                    "brand": vehicle_info.brand,
-                    "model": vehicle_info.model,
-                    "plate": vehicle_info.plate
-                }
-            })
+        results.append({
+            "user_id": user.id,
+            "driver_info_id": driver_info.id,
+            "full_name": user.full_name,
+            "phone_number": user.phone_number,
+            "distance": distance,
+            "estimated_time": estimated_time,
+            "vehicle_info": {
+                "brand": vehicle_info.brand,
+                "model": vehicle_info.model,
+                "plate": vehicle_info.plate
+            }
+        })
 
     return results
 
@@ -1995,8 +1963,7 @@ def find_busy_drivers(
     from app.models.driver_position import DriverPosition
     from app.utils.geo_utils import wkb_to_coords
 
-    client_point = func.ST_GeomFromText(
-        f'POINT({client_lng} {client_lat})', 4326)
+    client_point = make_point(client_lat, client_lng)
 
     # Buscar conductores que:
     # 1. Tienen rol DRIVER aprobado
@@ -2010,8 +1977,8 @@ def find_busy_drivers(
             VehicleInfo,
             ClientRequest,
             DriverPosition,
-            ST_Distance(DriverPosition.position,
-                        client_point).label("distance")
+            distance_meters(DriverPosition.position,
+                            client_point).label("distance")
         )
         .join(UserHasRole, User.id == UserHasRole.id_user)
         .join(DriverInfo, User.id == DriverInfo.user_id)
@@ -2027,41 +1994,43 @@ def find_busy_drivers(
             VehicleInfo.vehicle_type_id == type_service_id,
             ClientRequest.status.in_(
                 # En viaje activo y puede aceptar solicitudes PENDING
-                ["ARRIVED", "TRAVELLING"])
+                ["ARRIVED", "TRAVELLING"]),
+            within_meters(DriverPosition.position, client_point,
+                          config["max_distance"] * 1000)  # Convertir km a metros
         )
+        .order_by(knn_order(DriverPosition.position, client_point))
     )
 
     results = []
     for user, driver_info, vehicle_info, current_request, driver_position, distance in query.all():
-        if distance <= config["max_distance"] * 1000:  # Convertir km a metros
-            # Obtener coordenadas del conductor desde DriverPosition
-            driver_coords = wkb_to_coords(driver_position.position)
-            if not driver_coords:
-                continue  # Saltar si no hay coordenadas válidas
-
-            # Calcular tiempo total para conductor ocupado
-            total_time = calculate_busy_driver_total_time(
-                session, driver_info, current_request, client_lat, client_lng, config
-            )
+        # Obtener coordenadas del conductor desde DriverPosition
+        driver_coords = wkb_to_coords(driver_position.position)
+        if not driver_coords:
+            continue  # Saltar si no hay coordenadas válidas
 
-            # Convertir minutos a segundos
-            if total_time <= config["max_wait_time"] * 60:
-                results.append({
-                    "user_id": user.id,
-                    "driver_info_id": driver_info.id,
-                    "full_name": user.full_name,
-                    "phone_number": user.phone_number,
-                    "distance": distance,
-                    "estimated_time": total_time,
-                    "current_trip_remaining_time": calculate_remaining_trip_time(current_request),
-                    "transit_time": calculate_transit_time(current_request, client_lat, client_lng),
-                    "vehicle_info": {
-                        "brand": vehicle_info.brand,
-                        "model": vehicle_info.model,
-                        "plate": vehicle_info.plate
-                    },
-                    "current_request_id": current_request.id
-                })
+        # Calcular tiempo total para conductor ocupado
+        total_time = calculate_busy_driver_total_time(
+            session, driver_info, current_request, client_lat, client_lng, config
+        )
+
+        # Convertir minutos a segundos
+        if total_time <= config["max_wait_time"] * 60:
+            results.append({
+                "user_id": user.id,
+                "driver_info_id": driver_info.id,
+                "full_name": user.full_name,
+                "phone_number": user.phone_number,
+                "distance": distance,
+                "estimated_time": total_time,
+                "current_trip_remaining_time": calculate_remaining_trip_time(current_request),
+                "transit_time": calculate_transit_time(current_request, client_lat, client_lng),
+                "vehicle_info": {
+                    "brand": vehicle_info.brand,
+                    "model": vehicle_info.model,
+                    "plate": vehicle_info.plate
+                },
+                "current_request_id": current_request.id
+            })
 
     return results
 
@@ -2214,8 +2183,8 @@ def validate_busy_driver(driver_info: DriverInfo, config: Dict[str, float]) -> b
 
 
 def assign_busy_driver(session, client_request_id, driver_id, estimated_pickup_time, remaining_time, transit_time):
-    print(
-        f"DEBUG: assign_busy_driver called with client_request_id={client_request_id}, driver_id={driver_id}")
+    logger.debug(
+        "DEBUG: assign_busy_driver called with client_request_id=%s, driver_id=%s", client_request_id, driver_id)
 
     from app.models.client_request import ClientRequest
     from app.models.driver_info import DriverInfo
@@ -2223,11 +2192,12 @@ def assign_busy_driver(session, client_request_id, driver_id, estimated_pickup_t
 
     # 1. Obtener configuraciones dinámicas
     config = get_busy_driver_config(session)
-    print(f"🔧 Configuraciones de validación:")
-    print(f"   - Tiempo máximo de espera: {config['max_wait_time']} minutos")
-    print(f"   - Distancia máxima: {config['max_distance']} km")
-    print(
-        f"   - Tiempo máximo de tránsito: {config['max_transit_time']} minutos")
+    logger.debug("🔧 Configuraciones de validación:")
+    logger.debug(
+        "   - Tiempo máximo de espera: %s minutos", config['max_wait_time'])
+    logger.debug("   - Distancia máxima: %s km", config['max_distance'])
+    logger.debug(
+        "   - Tiempo máximo de tránsito: %s minutos", config['max_transit_time'])
 
     # 2. Obtener datos necesarios
     client_request = session.query(ClientRequest).filter(
@@ -2236,7 +2206,8 @@ def assign_busy_driver(session, client_request_id, driver_id, estimated_pickup_t
         DriverInfo.user_id == driver_id).first()
 
     if not client_request or not driver_info:
-        print(f"DEBUG: assign_busy_driver - client_request or driver_info not found")
+        logger.debug(
+            "DEBUG: assign_busy_driver - client_request or driver_info not found")
         return False
 
     # 3. Obtener viaje activo del conductor
@@ -2246,7 +2217,8 @@ def assign_busy_driver(session, client_request_id, driver_id, estimated_pickup_t
     ).first()
 
     if not active_request:
-        print(f"DEBUG: assign_busy_driver - No active request found for driver")
+        logger.debug(
+            "DEBUG: assign_busy_driver - No active request found for driver")
         return False
 
     # 4. Calcular distancia entre cliente y conductor
@@ -2258,7 +2230,8 @@ def assign_busy_driver(session, client_request_id, driver_id, estimated_pickup_t
         ).first()
 
         if not driver_position or not driver_position.position:
-            print(f"DEBUG: assign_busy_driver - No driver position found")
+            logger.debug(
+                "DEBUG: assign_busy_driver - No driver position found")
             return False
 
         # Obtener coordenadas del conductor
@@ -2270,55 +2243,55 @@ def assign_busy_driver(session, client_request_id, driver_id, estimated_pickup_t
         client_lat, client_lng = client_coords["lat"], client_coords["lng"]
 
         # Calcular distancia en metros
-        from sqlalchemy import func
-        client_point = func.ST_GeomFromText(
-            f'POINT({client_lng} {client_lat})', 4326)
-        vehicle_point = func.ST_GeomFromText(
-            f'POINT({driver_lng} {driver_lat})', 4326)
+        client_point = make_point(client_lat, client_lng)
+        vehicle_point = make_point(driver_lat, driver_lng)
 
         distance_result = session.query(
-            func.ST_Distance(vehicle_point, client_point)
+            distance_meters(vehicle_point, client_point)
         ).scalar()
 
         distance_km = distance_result / 1000  # Convertir a km
-        print(f"🔍 Distancia calculada: {distance_km:.2f} km")
+        logger.debug("🔍 Distancia calculada: %.2f km", distance_km)
 
         # 5. VALIDAR DISTANCIA
         if distance_km > config["max_distance"]:
-            print(
-                f"❌ Distancia excede el límite: {distance_km:.2f} km > {config['max_distance']} km")
+            logger.error(
+                "❌ Distancia excede el límite: %.2f km > %s km", distance_km, config['max_distance'])
             return False
 
         # 6. VALIDAR TIEMPO TOTAL
         # Los valores ya están en minutos (vienen del router)
         total_time_minutes = remaining_time + transit_time
-        print(f"🔍 Tiempo total calculado: {total_time_minutes:.2f} minutos")
+        logger.debug(
+            "🔍 Tiempo total calculado: %.2f minutos", total_time_minutes)
 
         if total_time_minutes > config["max_wait_time"]:
-            print(
-                f"❌ Tiempo total excede el límite: {total_time_minutes:.2f} min > {config['max_wait_time']} min")
+            logger.error(
+                "❌ Tiempo total excede el límite: %.2f min > %s min", total_time_minutes, config['max_wait_time'])
             return False
 
         # 7. VALIDAR TIEMPO DE TRÁNSITO
         transit_time_minutes = transit_time  # Ya está en minutos
-        print(f"🔍 Tiempo de tránsito: {transit_time_minutes:.2f} minutos")
+        logger.debug(
+            "🔍 Tiempo de tránsito: %.2f minutos", transit_time_minutes)
 
         if transit_time_minutes > config["max_transit_time"]:
-            print(
-                f"❌ Tiempo de tránsito excede el límite: {transit_time_minutes:.2f} min > {config['max_transit_time']} min")
+            logger.error(
+                "❌ Tiempo de tránsito excede el límite: %.2f min > %s min", transit_time_minutes, config['max_transit_time'])
             return False
 
-        print(f"✅ Todas las validaciones pasaron - Procediendo con asignación")
+        logger.info(
+            "✅ Todas las validaciones pasaron - Procediendo con asignación")
 
     except Exception as e:
-        print(f"❌ Error calculando validaciones: {e}")
+        logger.error("❌ Error calculando validaciones: %s", e)
         return False
 
     # 8. Si pasa todas las validaciones, proceder con la asignación
-    print(
-        f"DEBUG: Before assignment - driver_info.id={driver_info.id}, driver_info.user_id={driver_info.user_id}, driver_info.pending_request_id={driver_info.pending_request_id}")
-    print(
-        f"DEBUG: Before assignment - client_request.id={client_request.id}, client_request.assigned_busy_driver_id={client_request.assigned_busy_driver_id}")
+    logger.debug(
+        "DEBUG: Before assignment - driver_info.id=%s, driver_info.user_id=%s, driver_info.pending_request_id=%s", driver_info.id, driver_info.user_id, driver_info.pending_request_id)
+    logger.debug(
+        "DEBUG: Before assignment - client_request.id=%s, client_request.assigned_busy_driver_id=%s", client_request.id, client_request.assigned_busy_driver_id)
 
     # ✅ ACTUALIZAR: Cambiar estado a PENDING cuando se asigna conductor ocupado
     client_request.status = StatusEnum.PENDING
@@ -2334,10 +2307,10 @@ def assign_busy_driver(session, client_request_id, driver_id, estimated_pickup_t
     session.refresh(driver_info)
     session.refresh(client_request)
 
-    print(
-        f"DEBUG: After assignment - driver_info.id={driver_info.id}, driver_info.user_id={driver_info.user_id}, driver_info.pending_request_id={driver_info.pending_request_id}")
-    print(
-        f"DEBUG: After assignment - client_request.id={client_request.id}, client_request.assigned_busy_driver_id={client_request.assigned_busy_driver_id}")
+    logger.debug(
+        "DEBUG: After assignment - driver_info.id=%s, driver_info.user_id=%s, driver_info.pending_request_id=%s", driver_info.id, driver_info.user_id, driver_info.pending_request_id)
+    logger.debug(
+        "DEBUG: After assignment - client_request.id=%s, client_request.assigned_busy_driver_id=%s", client_request.id, client_request.assigned_busy_driver_id)
 
     return True
 
@@ -2402,60 +2375,19 @@ def get_eta_service(session, client_request_id):
 
         # Si la Google API falla, usar valores por defecto basados en distancia directa
         if distance is None or duration is None:
-            print("⚠️ Google API no disponible, usando cálculo aproximado")
-            # Calcular distancia directa usando fórmula de Haversine
-            from math import radians, cos, sin, asin, sqrt
-
-            def haversine_distance(lat1, lon1, lat2, lon2):
-                """Calcula la distancia entre dos puntos usando fórmula de Haversine"""
-                R = 6371000  # Radio de la Tierra en metros
-
-                lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-                dlat = lat2 - lat1
-                dlon = lon2 - lon1
+            logger.warning(
+                "⚠️ Google API no disponible, usando cálculo aproximado")
+            from app.services.eta_tracking_service import estimate_from_route
+            from app.utils.geo_utils import get_distance_meters
 
-                a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-                c = 2 * asin(sqrt(a))
-                distance = R * c
+            distance, duration, _ = estimate_from_route(None, get_distance_meters(
+                driver_lat, driver_lng, pickup_coords["lat"], pickup_coords["lng"]))
 
-                return distance
-
-            # Calcular distancia aproximada
-            distance = haversine_distance(
-                driver_lat, driver_lng, pickup_coords["lat"], pickup_coords["lng"])
-
-            # Estimar tiempo basado en velocidad promedio (30 km/h = 8.33 m/s)
-            avg_speed_ms = 8.33  # metros por segundo
-            duration = distance / avg_speed_ms
-
-            print(
-                f"📏 Distancia calculada: {distance:.0f}m, Tiempo estimado: {duration:.0f}s")
+            logger.debug(
+                "📏 Distancia calculada: %.0fm, Tiempo estimado: %.0fs", distance, duration)
 
+        # Las actualizaciones eta_update/{id} las emite el motor de ETA
         result = {"distance": distance, "duration": duration}
-        # Emitir actualización por WebSocket si está disponible
-        try:
-            from app.core.sio_events import sio
-            import asyncio
-
-            async def emit_eta_update():
-                await sio.emit(
-                    f'eta_update/{client_request_id}',
-                    {
-                        'distance': distance,
-                        'duration': duration,
-                        'timestamp': datetime.utcnow().isoformat()
-                    }
-                )
-            try:
-                loop = asyncio.get_event_loop()
-                if loop.is_running():
-                    asyncio.create_task(emit_eta_update())
-                else:
-                    loop.run_until_complete(emit_eta_update())
-            except RuntimeError:
-                asyncio.run(emit_eta_update())
-        except Exception:
-            pass
         return result
     except Exception as e:
         traceback.print_exc()
@@ -2500,9 +2432,8 @@ def assign_busy_driver_with_validation(session: Session, client_request_id: UUID
                 status_code=404, detail="Solicitud no encontrada")
 
         # 3. Obtener el tipo de servicio de la solicitud
-        type_service = session.query(TypeService).filter(
-            TypeService.id == client_request.type_service_id
-        ).first()
+        type_service = get_type_service(
+            session, client_request.type_service_id)
         if not type_service:
             raise HTTPException(
                 status_code=404, detail="Tipo de servicio no encontrado")
@@ -2591,7 +2522,7 @@ def assign_busy_driver_with_validation(session: Session, client_request_id: UUID
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error en assign_busy_driver_with_validation: {e}")
+        logger.error("Error en assign_busy_driver_with_validation: %s", e)
         raise HTTPException(
             status_code=500,
             detail=f"Error al asignar el conductor ocupado: {str(e)}"
@@ -2641,18 +2572,18 @@ def evaluate_and_update_trip_state(session, client_request_id, driver_position):
     elif current_status == StatusEnum.ON_THE_WAY:
         # Calcular distancia al punto de recogida
         pickup_coords = None
-        print(
-            f"🔍 DEBUG evaluate_and_update_trip_state: Estado actual: {current_status}")
-        print(
-            f"🔍 DEBUG evaluate_and_update_trip_state: pickup_position existe: {hasattr(client_request, 'pickup_position')}")
-        print(
-            f"🔍 DEBUG evaluate_and_update_trip_state: pickup_position es None: {client_request.pickup_position is None}")
+        logger.debug(
+            "🔍 DEBUG evaluate_and_update_trip_state: Estado actual: %s", current_status)
+        logger.debug(
+            "🔍 DEBUG evaluate_and_update_trip_state: pickup_position existe: %s", hasattr(client_request, 'pickup_position'))
+        logger.debug(
+            "🔍 DEBUG evaluate_and_update_trip_state: pickup_position es None: %s", client_request.pickup_position is None)
 
         if hasattr(client_request, 'pickup_position') and client_request.pickup_position is not None:
             from app.utils.geo_utils import wkb_to_coords
             pickup_coords = wkb_to_coords(client_request.pickup_position)
-            print(
-                f"🔍 DEBUG evaluate_and_update_trip_state: pickup_coords extraídas: {pickup_coords}")
+            logger.debug(
+                "🔍 DEBUG evaluate_and_update_trip_state: pickup_coords extraídas: %s", pickup_coords)
 
         if pickup_coords:
             distance = get_distance_meters(
@@ -2661,26 +2592,26 @@ def evaluate_and_update_trip_state(session, client_request_id, driver_position):
                 driver_position['lat'],
                 driver_position['lng']
             )
-            print(
-                f"🔍 DEBUG evaluate_and_update_trip_state: Distancia calculada: {distance} metros")
-            print(
-                f"🔍 DEBUG evaluate_and_update_trip_state: Driver position: {driver_position}")
-            print(
-                f"🔍 DEBUG evaluate_and_update_trip_state: Pickup coords: {pickup_coords}")
+            logger.debug(
+                "🔍 DEBUG evaluate_and_update_trip_state: Distancia calculada: %s metros", distance)
+            logger.debug(
+                "🔍 DEBUG evaluate_and_update_trip_state: Driver position: %s", driver_position)
+            logger.debug(
+                "🔍 DEBUG evaluate_and_update_trip_state: Pickup coords: %s", pickup_coords)
 
             if distance < 50:
-                print(
-                    f"🔍 DEBUG evaluate_and_update_trip_state: ¡Distancia < 50m! Cambiando a ARRIVED")
+                logger.debug(
+                    "🔍 DEBUG evaluate_and_update_trip_state: ¡Distancia < 50m! Cambiando a ARRIVED")
                 client_request.status = StatusEnum.ARRIVED
                 client_request.arrived_position_lat = driver_position['lat']
                 client_request.arrived_position_lng = driver_position['lng']
                 updated = True
             else:
-                print(
-                    f"🔍 DEBUG evaluate_and_update_trip_state: Distancia {distance}m >= 50m, manteniendo ON_THE_WAY")
+                logger.debug(
+                    "🔍 DEBUG evaluate_and_update_trip_state: Distancia %sm >= 50m, manteniendo ON_THE_WAY", distance)
         else:
-            print(
-                f"🔍 DEBUG evaluate_and_update_trip_state: No se pudieron obtener pickup_coords")
+            logger.debug(
+                "🔍 DEBUG evaluate_and_update_trip_state: No se pudieron obtener pickup_coords")
 
     # Transición ARRIVED → TRAVELLING
     elif current_status == StatusEnum.ARRIVED:
@@ -0,0 +1,219 @@
+from sqlmodel import Session, select
+from app.models.project_settings import ProjectSettings
+from app.models.config_service_value import ConfigServiceValue
+from app.models.type_service import TypeService
+from app.models.role import Role
+from app.core.config import settings
+from app.core.pubsub import LocalInvalidationBus, RedisInvalidationBus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import threading
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+PROJECT_SETTINGS_KEY = "project_settings"
+CONFIG_SERVICE_VALUE_KEY = "config_service_value"
+TYPE_SERVICE_KEY = "type_service"
+ROLE_KEY = "role"
+
+
+def _snapshot(row):
+    """
+    Copia desacoplada de la sesión: el valor cacheado se comparte entre
+    requests y no debe quedar ligado a la sesión que lo cargó.
+    """
+    return type(row).model_validate(row.model_dump())
+
+
+def build_invalidation_bus():
+    """
+    Construye el canal de invalidación según CONFIG_CACHE_BACKEND ("local" o "redis").
+    """
+    if settings.CONFIG_CACHE_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError(
+                "CONFIG_CACHE_BACKEND=redis requiere definir REDIS_URL")
+        return RedisInvalidationBus(settings.REDIS_URL, settings.CONFIG_CACHE_CHANNEL,
+                                    label="invalidación de caché de configuración")
+    return LocalInvalidationBus()
+
+
+class ConfigCache:
+    """
+    Caché en memoria del proceso para tablas de configuración que cambian
+    pocas veces al mes.
+
+    - Cada entrada vence a los `ttl` segundos.
+    - Cada invalidación sube la versión de la llave; una carga que empezó
+      antes de la invalidación no se guarda, para no cachear un valor viejo.
+    - Las invalidaciones locales se publican en el canal (bus) para que los
+      demás workers descarten su copia.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, bus=None):
+        self.ttl = settings.CONFIG_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.bus = bus or LocalInvalidationBus()
+        self.origin = uuid.uuid4().hex
+        self._entries: Dict[str, Tuple[int, float, Any]] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        self.bus.subscribe(self._on_message)
+
+    def version(self, key: str) -> int:
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            version = self._versions.get(key, 0)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self.stats["hits"] += 1
+                return entry[2]
+            self.stats["misses"] += 1
+
+        value = loader()
+
+        with self._lock:
+            if self._versions.get(key, 0) == version:
+                self._entries[key] = (version, time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, *keys: str, publish: bool = True) -> None:
+        """
+        Descarta las llaves indicadas (todas si no se indica ninguna) y, si
+        publish es True, avisa a los demás workers.
+        """
+        with self._lock:
+            targets = keys or tuple(set(self._entries) | set(self._versions))
+            for key in targets:
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._entries.pop(key, None)
+            self.stats["invalidations"] += 1
+        if publish:
+            self.bus.publish({"origin": self.origin, "keys": list(keys)})
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        if message.get("origin") == self.origin:
+            return
+        self.invalidate(*message.get("keys", []), publish=False)
+
+    def close(self) -> None:
+        self.bus.close()
+
+
+_cache: Optional[ConfigCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_config_cache() -> ConfigCache:
+    """
+    Retorna la caché de configuración del proceso, creándola la primera vez.
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ConfigCache(bus=build_invalidation_bus())
+        return _cache
+
+
+def set_config_cache(cache: Optional[ConfigCache]) -> None:
+    """
+    Reemplaza la caché del proceso (por ejemplo, con otro TTL en tests).
+    """
+    global _cache
+    with _cache_lock:
+        previous, _cache = _cache, cache
+    if previous is not None and previous is not cache:
+        previous.close()
+
+
+def shutdown_config_cache() -> None:
+    set_config_cache(None)
+
+
+# ----- lecturas tipadas -----
+
+def get_project_settings(session: Session) -> Optional[ProjectSettings]:
+    """
+    Retorna la configuración del proyecto (fila única) desde la caché.
+    El objeto es de solo lectura: para modificarla usar project_settings_service.
+    """
+    def load():
+        row = session.execute(
+            select(ProjectSettings).order_by(ProjectSettings.id)).scalars().first()
+        return _snapshot(row) if row else None
+
+    return get_config_cache().get_or_load(PROJECT_SETTINGS_KEY, load)
+
+
+def _config_service_values(session: Session) -> Dict[int, ConfigServiceValue]:
+    def load():
+        rows = session.execute(select(ConfigServiceValue)).scalars().all()
+        return {row.service_type_id: _snapshot(row) for row in rows}
+
+    return get_config_cache().get_or_load(CONFIG_SERVICE_VALUE_KEY, load)
+
+
+def get_config_service_value(session: Session, service_type_id: int) -> Optional[ConfigServiceValue]:
+    """
+    Tarifas de un tipo de servicio, desde la caché.
+    """
+    return _config_service_values(session).get(service_type_id)
+
+
+def get_config_service_values(session: Session) -> List[ConfigServiceValue]:
+    return list(_config_service_values(session).values())
+
+
+def _type_services(session: Session) -> Dict[int, TypeService]:
+    def load():
+        rows = session.execute(select(TypeService)).scalars().all()
+        return {row.id: _snapshot(row) for row in rows}
+
+    return get_config_cache().get_or_load(TYPE_SERVICE_KEY, load)
+
+
+def get_type_service(session: Session, type_service_id: int) -> Optional[TypeService]:
+    """
+    Tipo de servicio por id, desde la caché. Solo incluye columnas (sin relaciones).
+    """
+    return _type_services(session).get(type_service_id)
+
+
+def get_type_services_by_vehicle_type(session: Session, vehicle_type_id: int) -> List[TypeService]:
+    return [
+        type_service for type_service in _type_services(session).values()
+        if type_service.vehicle_type_id == vehicle_type_id
+    ]
+
+
+def get_roles(session: Session) -> Dict[str, Role]:
+    """
+    Roles por id (DRIVER, CLIENT, ...), desde la caché.
+    """
+    def load():
+        rows = session.execute(select(Role)).scalars().all()
+        return {row.id: _snapshot(row) for row in rows}
+
+    return get_config_cache().get_or_load(ROLE_KEY, load)
+
+
+def invalidate_project_settings() -> None:
+    get_config_cache().invalidate(PROJECT_SETTINGS_KEY)
+
+
+def invalidate_config_service_values() -> None:
+    get_config_cache().invalidate(CONFIG_SERVICE_VALUE_KEY)
+
+
+def invalidate_type_services() -> None:
+    get_config_cache().invalidate(TYPE_SERVICE_KEY)
+
+
+def invalidate_roles() -> None:
+    get_config_cache().invalidate(ROLE_KEY)
@@ -2,9 +2,16 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 from sqlmodel import Session, select
 from app.models.config_service_value import ConfigServiceValue, FareCalculationResponse
-from app.models.project_settings import ProjectSettings
+from app.services.config_cache_service import (
+    get_config_service_value,
+    get_project_settings,
+    invalidate_config_service_values
+)
 import requests
 from app.utils.geo_utils import get_time_and_distance_from_google
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class ConfigServiceValueService:
@@ -30,6 +37,7 @@ class ConfigServiceValueService:
         self.session.add(config_service_value)
         self.session.commit()
         self.session.refresh(config_service_value)
+        invalidate_config_service_values()
         return config_service_value
 
     def get_config_service_value_by_id(self, id: int) -> Optional[ConfigServiceValue]:
@@ -72,6 +80,7 @@ class ConfigServiceValueService:
         config_service_value.updated_at = datetime.utcnow()
         self.session.commit()
         self.session.refresh(config_service_value)
+        invalidate_config_service_values()
         return config_service_value
 
     def update_by_vehicle_type_id(self, vehicle_type_id: int, update_data: dict):
@@ -92,6 +101,7 @@ class ConfigServiceValueService:
         config.updated_at = datetime.utcnow()
         self.session.commit()
         self.session.refresh(config)
+        invalidate_config_service_values()
         return config
 
     def get_google_distance_data(self, origin_lat, origin_lng, destination_lat, destination_lng, api_key):
@@ -118,8 +128,8 @@ class ConfigServiceValueService:
         """
 
         try:
-            # Obtener el registro de tarifas
-            config_service_value = self.get_config_service_value_by_id(id)
+            # Obtener el registro de tarifas (desde la caché de configuración)
+            config_service_value = get_config_service_value(self.session, id)
             if not config_service_value:
                 return None
 
@@ -149,14 +159,14 @@ class ConfigServiceValueService:
             )
 
         except Exception as e:
-            print(f"Error al calcular el valor total: {str(e)}")
+            logger.error("Error al calcular el valor total: %s", str(e))
             return None
 
     def get_max_busy_driver_time(self) -> float:
         """
         Obtiene el tiempo máximo configurado para conductores ocupados desde project_settings
         """
-        settings = self.session.exec(select(ProjectSettings)).first()
+        settings = get_project_settings(self.session)
         if not settings:
             return 15.0  # Valor por defecto
 
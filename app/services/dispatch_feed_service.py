@@ -0,0 +1,467 @@
+from sqlmodel import Session
+from sqlalchemy import and_, func, select
+from fastapi import HTTPException
+from app.models.client_request import ClientRequest, StatusEnum
+from app.models.user import User
+from app.models.user_has_roles import UserHasRole, RoleStatus
+from app.models.driver_info import DriverInfo
+from app.models.vehicle_info import VehicleInfo
+from app.models.rating_summary import RatingSummary
+from app.services.rating_summary_service import PASSENGER_ROLE
+from app.services.config_cache_service import get_type_service, get_type_services_by_vehicle_type
+from app.core.config import settings
+from app.core.pubsub import RedisInvalidationBus
+from app.core.sio_rooms import user_room
+from app.utils.geo_utils import get_distance_meters
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Mismo radio que GET /client-request/nearby
+FEED_RADIUS_METERS = 5000
+
+# Eventos que recibe el conductor en su room
+NEW_REQUEST_EVENT = "nearby_request/new"
+REMOVED_REQUEST_EVENT = "nearby_request/removed"
+OFFER_EVENT = "nearby_request/offer"
+
+# Estados en los que una solicitud aparece en el feed
+OPEN_STATUSES = (StatusEnum.CREATED, StatusEnum.PENDING)
+
+
+@dataclass
+class DriverFeedProfile:
+    user_id: UUID
+    vehicle_type_id: int
+    type_service_ids: List[int]
+
+
+def load_driver_feed_profile(session: Session, user_id: UUID) -> DriverFeedProfile:
+    """
+    Valida en una consulta que el usuario sea un conductor aprobado,
+    verificado, no suspendido y con vehículo, y retorna los tipos de servicio
+    que puede atender. Lanza HTTPException 400 con el motivo si no cumple.
+    """
+    row = session.execute(
+        select(UserHasRole, DriverInfo.id, VehicleInfo.vehicle_type_id)
+        .outerjoin(DriverInfo, DriverInfo.user_id == UserHasRole.id_user)
+        .outerjoin(VehicleInfo, VehicleInfo.driver_info_id == DriverInfo.id)
+        .where(UserHasRole.id_user == user_id, UserHasRole.id_rol == "DRIVER")
+    ).first()
+
+    if not row:
+        raise HTTPException(
+            status_code=400, detail="El usuario no tiene el rol de conductor.")
+    user_role, driver_info_id, vehicle_type_id = row
+    if user_role.status != RoleStatus.APPROVED:
+        raise HTTPException(
+            status_code=400, detail="El usuario no tiene el rol de conductor aprobado.")
+    if not user_role.is_verified:
+        raise HTTPException(
+            status_code=400, detail="El conductor no está completamente verificado. Faltan documentos por aprobar.")
+    if user_role.suspension:
+        raise HTTPException(
+            status_code=400, detail="El conductor está suspendido y no puede operar.")
+    if driver_info_id is None:
+        raise HTTPException(
+            status_code=400, detail="El conductor no tiene información de conductor registrada")
+    if vehicle_type_id is None:
+        raise HTTPException(
+            status_code=400, detail="El conductor no tiene un vehículo registrado")
+
+    type_services = get_type_services_by_vehicle_type(session, vehicle_type_id)
+    if not type_services:
+        raise HTTPException(
+            status_code=400, detail="No hay servicios disponibles para el tipo de vehículo del conductor")
+    return DriverFeedProfile(user_id, vehicle_type_id, [ts.id for ts in type_services])
+
+
+@dataclass
+class LiveDriver:
+    user_id: UUID
+    lat: float
+    lng: float
+    vehicle_type_id: int
+    updated_at: float
+    cell: Tuple[int, int] = (0, 0)
+
+
+class LiveDriverIndex:
+    """
+    Índice en memoria de los conductores suscritos al feed, agrupados en una
+    grilla de ~1 km para buscar candidatos cercanos sin ir a la base de datos.
+    Las entradas sin actualización de posición en `ttl` segundos se ignoran.
+    """
+
+    CELL_DEGREES = 0.01
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = settings.DISPATCH_DRIVER_TTL_SECONDS if ttl is None else ttl
+        self._drivers: Dict[UUID, LiveDriver] = {}
+        self._cells: Dict[Tuple[int, int], Set[UUID]] = {}
+        self._lock = threading.Lock()
+
+    def _cell(self, lat: float, lng: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.CELL_DEGREES), math.floor(lng / self.CELL_DEGREES))
+
+    def __len__(self) -> int:
+        return len(self._drivers)
+
+    def __contains__(self, user_id: UUID) -> bool:
+        return user_id in self._drivers
+
+    def upsert(self, user_id: UUID, lat: float, lng: float, vehicle_type_id: Optional[int] = None) -> bool:
+        """
+        Registra o mueve al conductor. Sin vehicle_type_id solo actualiza
+        conductores ya suscritos; retorna False si el conductor no está.
+        """
+        cell = self._cell(lat, lng)
+        with self._lock:
+            driver = self._drivers.get(user_id)
+            if driver is None:
+                if vehicle_type_id is None:
+                    return False
+                driver = LiveDriver(user_id, lat, lng, vehicle_type_id, time.monotonic(), cell)
+                self._drivers[user_id] = driver
+            else:
+                self._cells.get(driver.cell, set()).discard(user_id)
+                driver.lat, driver.lng, driver.cell = lat, lng, cell
+                driver.updated_at = time.monotonic()
+                if vehicle_type_id is not None:
+                    driver.vehicle_type_id = vehicle_type_id
+            self._cells.setdefault(cell, set()).add(user_id)
+            return True
+
+    def remove(self, user_id: UUID) -> None:
+        with self._lock:
+            driver = self._drivers.pop(user_id, None)
+            if driver is not None:
+                self._cells.get(driver.cell, set()).discard(user_id)
+
+    def nearby(self, lat: float, lng: float, radius_meters: float, vehicle_type_id: int) -> List[Tuple[UUID, float]]:
+        """
+        Conductores del tipo de vehículo dentro del radio, del más cercano al
+        más lejano, como (user_id, distancia_en_metros).
+        """
+        now = time.monotonic()
+        lat_cells = math.ceil(radius_meters / 111_000 / self.CELL_DEGREES)
+        lng_cells = math.ceil(
+            radius_meters / (111_000 * max(math.cos(math.radians(lat)), 0.01)) / self.CELL_DEGREES)
+        center = self._cell(lat, lng)
+        found = []
+        with self._lock:
+            for d_lat in range(-lat_cells, lat_cells + 1):
+                for d_lng in range(-lng_cells, lng_cells + 1):
+                    for user_id in self._cells.get((center[0] + d_lat, center[1] + d_lng), ()):
+                        driver = self._drivers[user_id]
+                        if driver.vehicle_type_id != vehicle_type_id or now - driver.updated_at > self.ttl:
+                            continue
+                        distance = get_distance_meters(lat, lng, driver.lat, driver.lng)
+                        if distance <= radius_meters:
+                            found.append((user_id, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+
+class DispatchFeed:
+    """
+    Feed de solicitudes cercanas por push para conductores.
+
+    - El conductor se suscribe por socket (queda en el índice en memoria y en
+      su room `user:{id}`); sus movimientos actualizan el índice.
+    - Al crearse una solicitud se buscan en el índice los conductores elegibles
+      dentro del radio y se emite solo a sus rooms, con los datos ya guardados
+      en la solicitud (sin geocodificar ni consultar Distance Matrix).
+    - Cancelaciones, asignaciones y ofertas se envían como deltas a los
+      conductores que recibieron la solicitud.
+    - GET /client-request/nearby queda como foto completa para reconexiones.
+    - Con varios workers cada uno tiene su índice (los conductores conectados
+      a él); las publicaciones viajan por `bus` y cada worker las cruza con
+      su índice.
+    """
+
+    def __init__(self, emit: Optional[Callable[[str, Dict, str], Awaitable]] = None,
+                 index: Optional[LiveDriverIndex] = None, max_tracked_requests: int = 5000,
+                 bus=None):
+        self._emit = emit
+        self.index = index or LiveDriverIndex()
+        self._bus = bus
+        if bus is not None:
+            bus.subscribe(self._on_message)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Conductores que recibieron cada solicitud abierta (para los deltas)
+        self._recipients: "OrderedDict[UUID, Set[UUID]]" = OrderedDict()
+        self._max_tracked_requests = max_tracked_requests
+        self._lock = threading.Lock()
+        self.stats = {"published": 0, "deliveries": 0, "removed": 0, "offers": 0}
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Event loop del servidor; permite publicar desde handlers síncronos
+        (que corren en el threadpool).
+        """
+        self._loop = loop
+
+    # ----- suscripción de conductores -----
+
+    def subscribe(self, profile: DriverFeedProfile, lat: float, lng: float) -> None:
+        self.index.upsert(profile.user_id, lat, lng, profile.vehicle_type_id)
+
+    def unsubscribe(self, user_id: UUID) -> None:
+        self.index.remove(user_id)
+
+    def driver_moved(self, user_id: UUID, lat: float, lng: float) -> None:
+        self.index.upsert(user_id, lat, lng)
+
+    # ----- publicación -----
+
+    def _schedule(self, emits: List[Tuple[str, Dict, str]]) -> None:
+        if not emits:
+            return
+        emit = self._emit or _sio_emit
+
+        async def send():
+            for event, data, room in emits:
+                try:
+                    await emit(event, data, room)
+                except Exception as e:
+                    logger.error("Error emitiendo %s a %s: %s", event, room, e)
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None:
+            running.create_task(send())
+        elif self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(send(), self._loop)
+        else:
+            asyncio.run(send())
+
+    def _track(self, client_request_id: UUID, drivers: Set[UUID]) -> None:
+        with self._lock:
+            self._recipients[client_request_id] = drivers
+            self._recipients.move_to_end(client_request_id)
+            while len(self._recipients) > self._max_tracked_requests:
+                self._recipients.popitem(last=False)
+
+    def recipients(self, client_request_id: UUID) -> Set[UUID]:
+        """
+        Conductores a los que se envió la solicitud (vacío si ya se cerró).
+        """
+        with self._lock:
+            return set(self._recipients.get(client_request_id, set()))
+
+    def build_request_payload(self, session: Session, client_request: ClientRequest,
+                              pickup: Tuple[float, float], destination: Tuple[float, float]) -> Dict:
+        """
+        Datos de la solicitud para el feed: una sola consulta (cliente y su
+        calificación precalculada); el tipo de servicio sale de la caché.
+        """
+        client_row = session.execute(
+            select(User.full_name, User.selfie_url,
+                   func.coalesce(RatingSummary.average, 0.0))
+            .outerjoin(RatingSummary, and_(
+                RatingSummary.user_id == User.id,
+                RatingSummary.role == PASSENGER_ROLE
+            ))
+            .where(User.id == client_request.id_client)
+        ).first()
+        full_name, selfie_url, average_rating = client_row or (None, None, 0.0)
+        type_service = get_type_service(session, client_request.type_service_id)
+        return {
+            "id": str(client_request.id),
+            "id_client": str(client_request.id_client),
+            "fare_offered": client_request.fare_offered,
+            "pickup_description": client_request.pickup_description,
+            "destination_description": client_request.destination_description,
+            "pickup_position": {"lat": pickup[0], "lng": pickup[1]},
+            "destination_position": {"lat": destination[0], "lng": destination[1]},
+            "type_service_id": client_request.type_service_id,
+            "type_service_name": type_service.name if type_service else None,
+            "payment_method_id": client_request.payment_method_id,
+            "created_at": client_request.created_at.isoformat() if client_request.created_at else None,
+            "client": {
+                "full_name": full_name,
+                "selfie_url": selfie_url,
+                "average_rating": float(average_rating),
+            },
+        }
+
+    def publish_new_request(self, session: Session, client_request: ClientRequest,
+                            pickup: Tuple[float, float], destination: Tuple[float, float]) -> int:
+        """
+        Envía la solicitud recién creada a los conductores elegibles cercanos.
+        Retorna a cuántos conductores se envió desde este worker (con bus, la
+        entrega ocurre al recibir el mensaje y retorna 0).
+        """
+        type_service = get_type_service(session, client_request.type_service_id)
+        if type_service is None:
+            return 0
+        self.stats["published"] += 1
+        if self._bus is not None:
+            self._bus.publish({
+                "type": "new",
+                "id": str(client_request.id),
+                "vehicle_type_id": type_service.vehicle_type_id,
+                "pickup": list(pickup),
+                "payload": self.build_request_payload(session, client_request, pickup, destination),
+            })
+            return 0
+        return self._deliver_new(
+            client_request.id, type_service.vehicle_type_id, pickup,
+            lambda: self.build_request_payload(session, client_request, pickup, destination))
+
+    def _deliver_new(self, client_request_id: UUID, vehicle_type_id: int,
+                     pickup: Tuple[float, float], build_payload: Callable[[], Dict]) -> int:
+        candidates = self.index.nearby(
+            pickup[0], pickup[1], FEED_RADIUS_METERS, vehicle_type_id)
+        self._track(client_request_id, {user_id for user_id, _ in candidates})
+        if not candidates:
+            return 0
+
+        payload = build_payload()
+        emits = [
+            (NEW_REQUEST_EVENT, {**payload, "distance": round(distance, 1)}, user_room(user_id))
+            for user_id, distance in candidates
+        ]
+        self.stats["deliveries"] += len(emits)
+        self._schedule(emits)
+        return len(emits)
+
+    def publish_request_closed(self, client_request_id: UUID, status: str) -> int:
+        """
+        La solicitud salió del feed (cancelada, asignada, expirada): avisa a
+        los conductores que la recibieron.
+        """
+        if self._bus is not None:
+            self._bus.publish({"type": "closed", "id": str(client_request_id), "status": status})
+            return 0
+        return self._deliver_closed(client_request_id, status)
+
+    def _deliver_closed(self, client_request_id: UUID, status: str) -> int:
+        with self._lock:
+            drivers = self._recipients.pop(client_request_id, set())
+        if not drivers:
+            return 0
+        data = {"id": str(client_request_id), "status": status}
+        self.stats["removed"] += 1
+        self._schedule([(REMOVED_REQUEST_EVENT, data, user_room(user_id)) for user_id in drivers])
+        return len(drivers)
+
+    def publish_offer(self, client_request_id: UUID, driver_id: UUID, offers_count: int) -> int:
+        """
+        Nueva oferta sobre la solicitud: los demás conductores que la recibieron
+        ven el número de ofertas actualizado.
+        """
+        if self._bus is not None:
+            self._bus.publish({"type": "offer", "id": str(client_request_id),
+                               "driver_id": str(driver_id), "offers_count": offers_count})
+            return 0
+        return self._deliver_offer(client_request_id, driver_id, offers_count)
+
+    def _deliver_offer(self, client_request_id: UUID, driver_id: UUID, offers_count: int) -> int:
+        drivers = self.recipients(client_request_id)
+        drivers.discard(driver_id)
+        if not drivers:
+            return 0
+        data = {"id": str(client_request_id), "offers_count": offers_count}
+        self.stats["offers"] += 1
+        self._schedule([(OFFER_EVENT, data, user_room(user_id)) for user_id in drivers])
+        return len(drivers)
+
+    def publish_to_recipients(self, client_request_id: UUID, event: str, data: Dict) -> int:
+        """
+        Reenvía un evento a los conductores que recibieron la solicitud, estén
+        conectados a este worker o a otro (con bus cada worker entrega a los
+        suyos y retorna 0).
+        """
+        if self._bus is not None:
+            self._bus.publish({"type": "relay", "id": str(client_request_id),
+                               "event": event, "data": data})
+            return 0
+        return self._deliver_relay(client_request_id, event, data)
+
+    def _deliver_relay(self, client_request_id: UUID, event: str, data: Dict) -> int:
+        drivers = self.recipients(client_request_id)
+        self._schedule([(event, data, user_room(user_id)) for user_id in drivers])
+        return len(drivers)
+
+    def _on_message(self, message: Dict) -> None:
+        """
+        Publicación recibida por el bus (de cualquier worker, incluido este).
+        """
+        client_request_id = UUID(message["id"])
+        if message["type"] == "new":
+            self._deliver_new(client_request_id, message["vehicle_type_id"],
+                              tuple(message["pickup"]), lambda: message["payload"])
+        elif message["type"] == "closed":
+            self._deliver_closed(client_request_id, message["status"])
+        elif message["type"] == "offer":
+            self._deliver_offer(client_request_id, UUID(message["driver_id"]),
+                                message["offers_count"])
+        elif message["type"] == "relay":
+            self._deliver_relay(client_request_id, message["event"], message["data"])
+
+    def close(self) -> None:
+        if self._bus is not None:
+            self._bus.close()
+
+
+async def _sio_emit(event: str, data: Dict, room: str) -> None:
+    from app.core.sio_events import sio
+    await sio.emit(event, data, room=room)
+
+
+_feed: Optional[DispatchFeed] = None
+_feed_lock = threading.Lock()
+
+
+def build_dispatch_bus():
+    """
+    Con SIO_MANAGER=redis las publicaciones del feed se reparten entre
+    workers por Redis pub/sub; en un solo proceso no hace falta bus.
+    """
+    if settings.SIO_MANAGER != "redis":
+        return None
+    url = settings.SIO_REDIS_URL or settings.REDIS_URL
+    if not url:
+        raise ValueError("SIO_MANAGER=redis requiere definir SIO_REDIS_URL o REDIS_URL")
+    return RedisInvalidationBus(url, settings.DISPATCH_FEED_CHANNEL, label="feed de despacho")
+
+
+def get_dispatch_feed() -> DispatchFeed:
+    """
+    Retorna el feed de despacho del proceso, creándolo la primera vez.
+    """
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = DispatchFeed(bus=build_dispatch_bus())
+        return _feed
+
+
+def set_dispatch_feed(feed: Optional[DispatchFeed]) -> None:
+    global _feed
+    with _feed_lock:
+        _feed = feed
+
+
+def start_dispatch_feed() -> None:
+    get_dispatch_feed().bind_loop(asyncio.get_running_loop())
+
+
+def shutdown_dispatch_feed() -> None:
+    global _feed
+    with _feed_lock:
+        if _feed is not None:
+            _feed.close()
+            _feed = None
@@ -8,8 +8,14 @@ from sqlalchemy import select, text, func
 from app.models.user_has_roles import UserHasRole, RoleStatus
 from app.models.role import Role
 from app.utils.geo import wkb_to_coords
+from app.utils.spatial import make_point, distance_meters, within_meters, knn_order
+from app.services.config_cache_service import get_type_service
+from app.services.dispatch_feed_service import get_dispatch_feed
 from uuid import UUID
 import traceback
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class DriverPositionService:
@@ -52,6 +58,9 @@ class DriverPositionService:
             DriverPosition.id_driver == user_id
         ).first()
 
+        # Mover al conductor en el índice del feed de solicitudes (si está suscrito)
+        get_dispatch_feed().driver_moved(user_id, data.lat, data.lng)
+
         if existing:
             existing.position = point
             self.session.commit()
@@ -68,22 +77,22 @@ class DriverPositionService:
 
     def get_nearby_drivers(self, lat: float, lng: float, max_distance_km: float):
         max_distance_m = max_distance_km * 1000  # Convertir a metros
-        driver_point = func.ST_GeomFromText(f'POINT({lng} {lat})', 4326)
+        driver_point = make_point(lat, lng)
+        # Radio con ST_DWithin sobre geography (metros reales, usa el índice
+        # GiST) y orden KNN con <-> en lugar de ordenar por la distancia calculada
         query = (
             self.session.query(
                 DriverPosition.id_driver,
                 func.ST_X(DriverPosition.position).label("lng"),
                 func.ST_Y(DriverPosition.position).label("lat"),
-                # ✅ CORREGIDO: Usar ST_Distance para PostgreSQL en lugar de ST_Distance_Sphere de MySQL
-                (func.ST_Distance(DriverPosition.position,
+                (distance_meters(DriverPosition.position,
                  driver_point) / 1000).label("distance_km")
             )
             .filter(
-                # ✅ CORREGIDO: Usar ST_Distance para PostgreSQL
-                func.ST_Distance(
-                    DriverPosition.position, driver_point) <= max_distance_m
+                within_meters(DriverPosition.position,
+                              driver_point, max_distance_m)
             )
-            .order_by("distance_km")
+            .order_by(knn_order(DriverPosition.position, driver_point))
         )
         results = query.all()
         drivers = []
@@ -112,7 +121,6 @@ class DriverPositionService:
 
     def get_nearby_drivers_by_client_request(self, id_client_request: UUID, user_id: UUID, user_role: str):
         from app.models.client_request import ClientRequest
-        from app.models.type_service import TypeService
         from app.models.vehicle_info import VehicleInfo
         from app.models.driver_info import DriverInfo
         from app.models.user import User
@@ -127,8 +135,8 @@ class DriverPositionService:
                 status_code=404, detail="Client request no encontrada")
 
         # 2. Obtener el tipo de servicio
-        type_service = self.session.query(TypeService).filter(
-            TypeService.id == client_request.type_service_id).first()
+        type_service = get_type_service(
+            self.session, client_request.type_service_id)
         if not type_service:
             raise HTTPException(
                 status_code=404, detail="Tipo de servicio no encontrado")
@@ -182,24 +190,26 @@ class DriverPositionService:
 
         # Filtrado según el rol
         # Ahora usando los strings 'DRIVER' y 'CLIENT' según la tabla de roles
-        print(
-            f"[DEBUG] user_role: {user_role}, user_id: {user_id}, client_request.id_client: {client_request.id_client}")
+        logger.debug(
+            "[DEBUG] user_role: %s, user_id: %s, client_request.id_client: %s", user_role, user_id, client_request.id_client)
         try:
             if user_role == "DRIVER":  # Conductor
-                print(f"[DEBUG] Es DRIVER, filtrando por user_id")
+                logger.debug("[DEBUG] Es DRIVER, filtrando por user_id")
                 drivers = [d for d in drivers if d["user_id"] == user_id]
             elif user_role == "CLIENT":  # Cliente
-                print(f"[DEBUG] Es CLIENT, validando dueño de la solicitud")
+                logger.debug(
+                    "[DEBUG] Es CLIENT, validando dueño de la solicitud")
                 if client_request.id_client != user_id:
-                    print(f"[ERROR] Cliente no autorizado para ver esta solicitud")
+                    logger.error(
+                        "[ERROR] Cliente no autorizado para ver esta solicitud")
                     raise HTTPException(
                         status_code=403, detail="No autorizado para ver esta solicitud")
                 # El cliente dueño ve todos
             else:
-                print(f"[ERROR] Rol no autorizado: {user_role}")
+                logger.error("[ERROR] Rol no autorizado: %s", user_role)
                 raise HTTPException(status_code=403, detail="No autorizado")
         except Exception as e:
-            print(f"[TRACEBACK] {traceback.format_exc()}")
+            logger.error("Traceback:", exc_info=True)
             raise
 
         return {
@@ -3,9 +3,13 @@ from app.models.driver_savings import DriverSavings, SavingsType
 from datetime import datetime
 from app.models.transaction import Transaction, TransactionType
 from app.models.project_settings import ProjectSettings
+from app.services.config_cache_service import get_project_settings
 from fastapi import HTTPException
 from app.models.user import User
 from app.models.user_has_roles import UserHasRole, RoleStatus
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class DriverSavingsService:
@@ -14,19 +18,19 @@ class DriverSavingsService:
     _minimum_withdrawal_amount = _DEFAULT_MINIMUM_WITHDRAWAL_AMOUNT
 
     def __init__(self, session: Session):
-        print("DriverSavingsService.__init__: session =", session)
+        logger.debug("DriverSavingsService.__init__: session = %s", session)
         self.session = session
         from app.services.transaction_service import TransactionService
         self.transaction_service = TransactionService(session)
-        print("DriverSavingsService.__init__: self.transaction_service =",
-              self.transaction_service)
+        logger.debug(
+            "DriverSavingsService.__init__: self.transaction_service = %s", self.transaction_service)
         # Actualizar el valor mínimo al inicializar el servicio
         self._update_minimum_withdrawal_amount()
 
     def _get_current_minimum_amount(self) -> int:
         """Obtiene el valor mínimo actual desde la base de datos"""
         try:
-            settings = self.session.exec(select(ProjectSettings)).first()
+            settings = get_project_settings(self.session)
             if settings and settings.amount:
                 return int(settings.amount)
         except Exception:
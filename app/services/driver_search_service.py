@@ -3,11 +3,15 @@ from typing import List, Dict, Optional, Tuple
 from app.models.driver_info import DriverInfo
 from app.models.client_request import ClientRequest, StatusEnum
 from app.models.project_settings import ProjectSettings
+from app.services.config_cache_service import get_project_settings
 from app.models.driver_position import DriverPosition
 from app.services.config_service_value_service import ConfigServiceValueService
 from app.utils.geo_utils import get_time_and_distance_from_google, wkb_to_coords
 from datetime import datetime, timedelta
 import pytz
+import logging
+
+logger = logging.getLogger(__name__)
 
 COLOMBIA_TZ = pytz.timezone("America/Bogota")
 
@@ -41,7 +45,8 @@ class DriverSearchService:
                 }
             return None
         except Exception as e:
-            print(f"Error obteniendo posición del conductor {driver_id}: {e}")
+            logger.error(
+                "Error obteniendo posición del conductor %s: %s", driver_id, e)
             return None
 
     def find_available_drivers(
@@ -127,7 +132,7 @@ class DriverSearchService:
             return drivers_with_distance
 
         except Exception as e:
-            print(f"Error buscando conductores disponibles: {e}")
+            logger.error("Error buscando conductores disponibles: %s", e)
             return []
 
     def find_nearby_busy_drivers(
@@ -150,9 +155,9 @@ class DriverSearchService:
         """
         try:
             # Obtener configuraciones desde ProjectSettings
-            settings = self.session.exec(select(ProjectSettings)).first()
+            settings = get_project_settings(self.session)
             if not settings:
-                print(
+                logger.warning(
                     "⚠️ No se encontraron configuraciones de ProjectSettings, usando valores por defecto")
                 max_wait_time = 15.0
                 max_distance = 2.0
@@ -162,11 +167,12 @@ class DriverSearchService:
                 max_distance = settings.max_distance_for_busy_driver or 2.0
                 max_transit_time = settings.max_transit_time_for_busy_driver or 5.0
 
-            print(f"🔧 Configuraciones de validación:")
-            print(f"   - Tiempo máximo de espera: {max_wait_time} minutos")
-            print(f"   - Distancia máxima: {max_distance} km")
-            print(
-                f"   - Tiempo máximo de tránsito: {max_transit_time} minutos")
+            logger.debug("🔧 Configuraciones de validación:")
+            logger.debug(
+                "   - Tiempo máximo de espera: %s minutos", max_wait_time)
+            logger.debug("   - Distancia máxima: %s km", max_distance)
+            logger.debug(
+                "   - Tiempo máximo de tránsito: %s minutos", max_transit_time)
 
             # Buscar conductores que estén ocupados (ARRIVED, TRAVELLING) pero NO tengan solicitudes pendientes
             query = select(DriverInfo).join(ClientRequest).where(
@@ -187,15 +193,16 @@ class DriverSearchService:
                 )
 
             busy_drivers = self.session.exec(query).all()
-            print(
-                f"🔍 Encontrados {len(busy_drivers)} conductores ocupados (ARRIVED/TRAVELLING) SIN solicitudes pendientes")
+            logger.debug(
+                "🔍 Encontrados %s conductores ocupados (ARRIVED/TRAVELLING) SIN solicitudes pendientes", len(busy_drivers))
 
             valid_busy_drivers = []
             for driver in busy_drivers:
                 # Obtener posición del conductor desde DriverPosition
                 driver_pos = self._get_driver_position(driver.user_id)
                 if not driver_pos:
-                    print(f"❌ Conductor {driver.id}: Sin posición registrada")
+                    logger.error(
+                        "❌ Conductor %s: Sin posición registrada", driver.id)
                     continue
 
                 # Calcular distancia al cliente
@@ -204,8 +211,8 @@ class DriverSearchService:
                     driver_pos["lat"], driver_pos["lng"]
                 )
                 if distance_data[0] is None or distance_data[1] is None:
-                    print(
-                        f"❌ Conductor {driver.id}: No se pudo obtener distancia/tiempo de Google")
+                    logger.error(
+                        "❌ Conductor %s: No se pudo obtener distancia/tiempo de Google", driver.id)
                     continue
 
                 distance = distance_data[0] / 1000  # Convertir metros a km
@@ -214,14 +221,14 @@ class DriverSearchService:
 
                 # Validación 1: Distancia máxima
                 if distance > max_distance:
-                    print(
-                        f"❌ Conductor {driver.id}: Distancia {distance:.2f}km > {max_distance}km")
+                    logger.error(
+                        "❌ Conductor %s: Distancia %.2fkm > %skm", driver.id, distance, max_distance)
                     continue
 
                 # Validación 2: Tiempo de tránsito máximo
                 if transit_time > max_transit_time:
-                    print(
-                        f"❌ Conductor {driver.id}: Tiempo de tránsito {transit_time:.2f}min > {max_transit_time}min")
+                    logger.error(
+                        "❌ Conductor %s: Tiempo de tránsito %.2fmin > %smin", driver.id, transit_time, max_transit_time)
                     continue
 
                 # Validación 3: Tiempo total máximo
@@ -229,15 +236,15 @@ class DriverSearchService:
                     driver, latitude, longitude
                 )
                 if total_time > max_wait_time:
-                    print(
-                        f"❌ Conductor {driver.id}: Tiempo total {total_time:.2f}min > {max_wait_time}min")
+                    logger.error(
+                        "❌ Conductor %s: Tiempo total %.2fmin > %smin", driver.id, total_time, max_wait_time)
                     continue
 
-                print(
-                    f"✅ Conductor {driver.id} cumple todas las validaciones:")
-                print(f"   - Distancia: {distance:.2f}km")
-                print(f"   - Tiempo de tránsito: {transit_time:.2f}min")
-                print(f"   - Tiempo total: {total_time:.2f}min")
+                logger.info(
+                    "✅ Conductor %s cumple todas las validaciones:", driver.id)
+                logger.debug("   - Distancia: %.2fkm", distance)
+                logger.debug("   - Tiempo de tránsito: %.2fmin", transit_time)
+                logger.debug("   - Tiempo total: %.2fmin", total_time)
 
                 valid_busy_drivers.append({
                     "driver": driver,
@@ -248,13 +255,14 @@ class DriverSearchService:
 
             # Ordenar por tiempo total (menor tiempo primero)
             valid_busy_drivers.sort(key=lambda x: x["total_time"])
-            print(
-                f"✅ {len(valid_busy_drivers)} conductores ocupados válidos encontrados")
+            logger.info(
+                "✅ %s conductores ocupados válidos encontrados", len(valid_busy_drivers))
 
             return valid_busy_drivers
 
         except Exception as e:
-            print(f"❌ Error buscando conductores ocupados cercanos: {e}")
+            logger.error(
+                "❌ Error buscando conductores ocupados cercanos: %s", e)
             import traceback
             traceback.print_exc()
             return []
@@ -330,7 +338,7 @@ class DriverSearchService:
             return drivers
 
         except Exception as e:
-            print(f"Error calculando prioridades: {e}")
+            logger.error("Error calculando prioridades: %s", e)
             return drivers
 
     def validate_max_time(self, total_time: float, max_time: int) -> bool:
@@ -382,7 +390,7 @@ class DriverSearchService:
             return total_time
 
         except Exception as e:
-            print(f"Error calculando tiempo total: {e}")
+            logger.error("Error calculando tiempo total: %s", e)
             return 0.0
 
     def _calculate_remaining_trip_time(self, driver: DriverInfo) -> float:
@@ -441,7 +449,8 @@ class DriverSearchService:
             return 0.0
 
         except Exception as e:
-            print(f"Error calculando tiempo restante del viaje actual: {e}")
+            logger.error(
+                "Error calculando tiempo restante del viaje actual: %s", e)
             return 0.0
 
     def _calculate_transit_time(
@@ -498,5 +507,5 @@ class DriverSearchService:
             return transit_time
 
         except Exception as e:
-            print(f"Error calculando tiempo de tránsito: {e}")
+            logger.error("Error calculando tiempo de tránsito: %s", e)
             return 0.0
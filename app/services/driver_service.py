@@ -2,6 +2,7 @@ from sqlmodel import Session, select
 from fastapi import HTTPException, status, UploadFile
 from app.models.driver_documents import DriverDocuments, DriverDocumentsCreate
 from app.models.project_settings import ProjectSettings
+from app.services.config_cache_service import get_project_settings, get_roles
 from app.models.user import User, UserCreate, UserRead
 from app.models.role import Role
 from app.models.driver_info import DriverInfo, DriverInfoCreate
@@ -9,11 +10,12 @@ from app.models.vehicle_info import VehicleInfo, VehicleInfoCreate
 from app.models.driver import DriverFullRead, DriverDocumentsInput
 from app.core.db import engine
 from app.services.upload_service import upload_service, DocumentType
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from app.models.driver_response import (
     DriverFullResponse, UserResponse, DriverInfoResponse, VehicleInfoResponse, DriverDocumentsResponse
 )
 from app.utils.uploads import uploader
+from app.services.file_storage_service import get_content_store, release_reference
 from decimal import Decimal
 import traceback
 from app.models.verify_mount import VerifyMount
@@ -27,14 +29,88 @@ from app.models.user_has_roles import UserHasRole, RoleStatus
 from datetime import datetime
 import pytz
 from uuid import UUID
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
 
 COLOMBIA_TZ = pytz.timezone("America/Bogota")
 
+# Documentos del registro: (tipo, campos de archivo con su lado, campo de vencimiento)
+ONBOARDING_DOCUMENTS = (
+    ("property_card", (("property_card_front", "front"), ("property_card_back", "back")), None),
+    ("license", (("license_front", "front"), ("license_back", "back")), "license_expiration_date"),
+    ("soat", (("soat", None),), "soat_expiration_date"),
+    ("technical_inspections", (("vehicle_technical_inspection", None),),
+     "vehicle_technical_inspection_expiration_date"),
+)
+ONBOARDING_DOCUMENT_TYPE_IDS = {
+    "property_card": 1,  # Tarjeta de propiedad
+    "license": 2,  # Licencia
+    "soat": 3,  # SOAT
+    "technical_inspections": 4,  # Tecnomecánica
+}
+
 
 class DriverService:
     def __init__(self, session: Session):
         self.session = session
 
+    async def _upload_driver_files(
+        self,
+        selfie: UploadFile,
+        driver_documents_data: DriverDocumentsInput
+    ) -> Tuple[str, Dict[str, Optional[str]], List[str]]:
+        """
+        Sube la selfie y los documentos antes de abrir la transacción (en
+        paralelo, por bloques). Retorna la URL de la selfie, la URL de cada
+        documento por campo (los campos sin archivo toman la URL enviada) y
+        las URL subidas en esta llamada, que son las únicas con una
+        referencia propia que liberar si el registro falla.
+        """
+        uploads = [("selfie", get_content_store().put_upload(selfie))]
+        for document_type_name, side_fields, _ in ONBOARDING_DOCUMENTS:
+            for field, side in side_fields:
+                file = getattr(driver_documents_data, field)
+                if file:
+                    uploads.append((field, upload_service.save_document_dbtype(
+                        file=file,
+                        driver_id=None,
+                        document_type=document_type_name,
+                        side=side,
+                        description=f"{document_type_name} {side if side else ''}"
+                    )))
+        results = await asyncio.gather(
+            *(upload for _, upload in uploads), return_exceptions=True)
+        urls = {}
+        for (field, _), result in zip(uploads, results):
+            if isinstance(result, BaseException):
+                continue
+            urls[field] = result.url if field == "selfie" else uploader.get_file_url(result["url"])
+        failures = [result for result in results if isinstance(result, BaseException)]
+        uploaded_urls = list(urls.values())
+        if failures:
+            self._release_uploads(uploaded_urls)
+            raise failures[0]
+        selfie_url = urls.pop("selfie")
+        for _, side_fields, _ in ONBOARDING_DOCUMENTS:
+            for field, _ in side_fields:
+                if field not in urls:
+                    urls[field] = getattr(driver_documents_data, f"{field}_url")
+        return selfie_url, urls, uploaded_urls
+
+    def _release_uploads(self, urls) -> None:
+        """
+        Quita la referencia de archivos ya subidos cuando el registro falla.
+        """
+        try:
+            with Session(engine) as session:
+                for url in urls:
+                    release_reference(session, url)
+                session.commit()
+        except Exception as e:
+            logger.error("No se pudieron liberar los archivos subidos: %s", e)
+
     async def create_driver(
         self,
         user_data: UserCreate,
@@ -43,328 +119,159 @@ class DriverService:
         driver_documents_data: DriverDocumentsInput,
         selfie: UploadFile = None
     ) -> DriverFullResponse:
-        print("\n=== INICIANDO CREACIÓN DE DRIVER ===")
+        """
+        Registra un conductor en una sola transacción.
+
+        1. Validaciones de solo lectura (usuario existente, roles, vehículo).
+        2. Subida de archivos fuera de la transacción.
+        3. Una unidad de trabajo con usuario, ahorro, roles, VerifyMount con
+           el bono, transacción del bono, DriverInfo, VehicleInfo y documentos;
+           si algo falla no queda nada a medias y los archivos se liberan.
+        """
+        logger.debug("\n=== INICIANDO CREACIÓN DE DRIVER ===")
+        # --- SELFIE OBLIGATORIA ---
+        if not selfie:
+            raise HTTPException(
+                status_code=400,
+                detail="El campo 'selfie' es obligatorio para crear un conductor."
+            )
         with Session(engine) as session:
+            uploaded_urls = []
             try:
-                print("1. Verificando usuario existente...")
-                # Buscar usuario por teléfono y país
+                logger.debug("1. Validando usuario existente y roles...")
+                roles = get_roles(session)
+                for role_id in ("DRIVER", "CLIENT"):
+                    if role_id not in roles:
+                        raise HTTPException(
+                            status_code=500, detail=f"Rol {role_id} no existe")
+
                 existing_user = session.exec(
                     select(User).where(
                         User.phone_number == user_data.phone_number,
                         User.country_code == user_data.country_code
                     )
                 ).first()
-
+                user_roles = {}
                 if existing_user:
-                    print(f"Usuario existente encontrado: {existing_user.id}")
-                    # Verificar si ya tiene el rol DRIVER
-                    driver_role = session.exec(
-                        select(Role).where(Role.id == "DRIVER")).first()
-                    if not driver_role:
-                        raise HTTPException(
-                            status_code=500, detail="Rol DRIVER no existe")
-
-                    # Verificar si ya tiene rol CLIENT
-                    client_role = session.exec(
-                        select(Role).where(Role.id == "CLIENT")).first()
-                    if not client_role:
-                        raise HTTPException(
-                            status_code=500, detail="Rol CLIENT no existe")
-
-                    # Verificar si ya tiene rol DRIVER asignado
-                    existing_driver_role = session.exec(
-                        select(UserHasRole).where(
-                            UserHasRole.id_user == existing_user.id,
-                            UserHasRole.id_rol == "DRIVER"
-                        )
-                    ).first()
-
+                    logger.debug(
+                        "Usuario existente encontrado: %s", existing_user.id)
+                    user_roles = {
+                        row.id_rol: row for row in session.exec(
+                            select(UserHasRole).where(
+                                UserHasRole.id_user == existing_user.id,
+                                UserHasRole.id_rol.in_(("DRIVER", "CLIENT"))
+                            )
+                        ).all()
+                    }
+                    existing_driver_role = user_roles.get("DRIVER")
                     # ✅ NUEVA VALIDACIÓN: Verificar si el usuario está suspendido
                     if existing_driver_role and existing_driver_role.suspension:
                         raise HTTPException(
                             status_code=400,
                             detail="No se puede crear un conductor para un usuario suspendido. Contacte al administrador para levantar la suspensión."
                         )
-
-                    # Verificar si ya tiene rol CLIENT asignado
-                    existing_client_role = session.exec(
-                        select(UserHasRole).where(
-                            UserHasRole.id_user == existing_user.id,
-                            UserHasRole.id_rol == "CLIENT"
-                        )
-                    ).first()
-
                     if existing_driver_role:
-                        # Ya es conductor, verificar si ya tiene driver_info
-                        existing_driver = session.exec(
-                            select(DriverInfo)
-                            .where(DriverInfo.user_id == existing_user.id)
+                        # Ya es conductor, verificar si ya tiene vehículo tipo carro
+                        has_car = session.exec(
+                            select(VehicleInfo.id)
+                            .join(DriverInfo, DriverInfo.id == VehicleInfo.driver_info_id)
+                            .where(
+                                DriverInfo.user_id == existing_user.id,
+                                VehicleInfo.vehicle_type_id == 1
+                            )
                         ).first()
-                        if existing_driver:
-                            driver_info = session.exec(
-                                select(DriverInfo).where(
-                                    DriverInfo.id == existing_driver.id)
-                            ).first()
-                            vehicle_info = session.exec(
-                                select(VehicleInfo).where(
-                                    VehicleInfo.driver_info_id == driver_info.id,
-                                    VehicleInfo.vehicle_type_id == 1
-                                )
-                            ).first()
-                            if vehicle_info:
-                                raise HTTPException(
-                                    status_code=400,
-                                    detail="Ya existe un conductor de tipo carro para este usuario.")
-                        user = existing_user
-                    else:
-                        # Asignar el rol DRIVER
-                        existing_user.roles.append(driver_role)
-
-                        # Si no tiene rol CLIENT, asignarlo también
-                        if not existing_client_role:
-                            existing_user.roles.append(client_role)
-                            print("Rol CLIENT asignado automáticamente al conductor")
-
-                        session.add(existing_user)
-                        session.commit()
-                        session.refresh(existing_user)
-                        user = existing_user
-                else:
-                    print("2. Creando nuevo usuario...")
-                    # Crear el Usuario
-                    user = User(**user_data.dict())
-                    session.add(user)
-                    session.commit()
-                    session.refresh(user)
-                    print(f"Usuario creado con ID: {user.id}")
-
-                    print("3. Creando DriverSavings...")
-                    # Crear DriverSavings con mount=0
-                    driver_savings = DriverSavings(
-                        mount=0, user_id=user.id, status=SavingsType.SAVING)
-                    session.add(driver_savings)
-                    session.commit()
-                    session.refresh(driver_savings)
-                    print("DriverSavings creado")
-
-                    print("4. Asignando roles DRIVER y CLIENT...")
-                    # Asignar el rol DRIVER
-                    driver_role = session.exec(
-                        select(Role).where(Role.id == "DRIVER")).first()
-                    if not driver_role:
-                        raise HTTPException(
-                            status_code=500, detail="Rol DRIVER no existe")
+                        if has_car:
+                            raise HTTPException(
+                                status_code=400,
+                                detail="Ya existe un conductor de tipo carro para este usuario.")
+                project_settings = get_project_settings(session)
+                # Liberar la conexión mientras se suben los archivos
+                session.rollback()
 
-                    # Asignar el rol CLIENT también
-                    client_role = session.exec(
-                        select(Role).where(Role.id == "CLIENT")).first()
-                    if not client_role:
-                        raise HTTPException(
-                            status_code=500, detail="Rol CLIENT no existe")
+                logger.debug("2. Subiendo selfie y documentos...")
+                selfie_url, document_urls, uploaded_urls = await self._upload_driver_files(
+                    selfie, driver_documents_data)
 
-                    # Asignar ambos roles
-                    user.roles.append(driver_role)
-                    user.roles.append(client_role)
+                logger.debug("3. Registrando conductor en una transacción...")
+                bonus = Decimal(project_settings.bonus)
+                verify_mount = None
+                if existing_user:
+                    user = session.get(User, existing_user.id)
+                    release_reference(session, user.selfie_url)
+                    user.selfie_url = selfie_url
                     session.add(user)
-                    session.commit()
-                    session.refresh(user)
-                    print("Roles DRIVER y CLIENT asignados")
-
-                print("5. Procesando selfie...")
-                # --- SELFIE OBLIGATORIA Y GUARDADO ---
-                if not selfie:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="El campo 'selfie' es obligatorio para crear un conductor."
-                    )
-                selfie_dir = os.path.join("static", "uploads", "users")
-                os.makedirs(selfie_dir, exist_ok=True)
-                selfie_ext = os.path.splitext(selfie.filename)[-1] or ".jpg"
-                selfie_filename = f"selfie_{user.phone_number}_{uuid.uuid4().hex}{selfie_ext}"
-                selfie_path = os.path.join(selfie_dir, selfie_filename)
-                # Evitar sobrescribir
-                while os.path.exists(selfie_path):
-                    selfie_filename = f"selfie_{user.phone_number}_{uuid.uuid4().hex}{selfie_ext}"
-                    selfie_path = os.path.join(selfie_dir, selfie_filename)
-                print(f"Guardando selfie en: {selfie_path}")
-                with open(selfie_path, "wb") as f:
-                    f.write(await selfie.read())
-                selfie_url = f"{settings.STATIC_URL_PREFIX}/users/{selfie_filename}"
-                user.selfie_url = selfie_url
-                session.add(user)
-                session.commit()
-                session.refresh(user)
-                print("Selfie guardada y URL actualizada")
-
-                print("6. Creando VerifyMount...")
-                # Crear VerifyMount con mount=0
-                verify_mount = VerifyMount(user_id=user.id, mount=0)
+                    verify_mount = session.exec(
+                        select(VerifyMount).where(VerifyMount.user_id == user.id)
+                    ).first()
+                else:
+                    user = User(**user_data.dict())
+                    user.selfie_url = selfie_url
+                    session.add(user)
+                    # El usuario va primero: las demás filas lo referencian
+                    session.flush()
+                    session.add(DriverSavings(
+                        mount=0, user_id=user.id, status=SavingsType.SAVING))
+                # Roles DRIVER y CLIENT (los que falten)
+                session.add_all([
+                    UserHasRole(id_user=user.id, id_rol=role_id)
+                    for role_id in ("DRIVER", "CLIENT") if role_id not in user_roles
+                ])
+
+                # Bono de bienvenida: transacción y saldo en VerifyMount
+                if verify_mount is None:
+                    verify_mount = VerifyMount(user_id=user.id, mount=bonus)
+                else:
+                    verify_mount.mount += bonus
                 session.add(verify_mount)
-                session.commit()
-                session.refresh(verify_mount)
-                print("VerifyMount creado")
+                session.add(Transaction(
+                    user_id=user.id,
+                    income=bonus,
+                    expense=0,
+                    type=TransactionType.BONUS,
+                    client_request_id=None
+                ))
+                session.flush()
 
-                print("7. Creando DriverInfo...")
-                # 4. Crear el DriverInfo (ya no maneja selfie_url)
                 driver_info = DriverInfo(
                     **driver_info_data.dict(),
                     user_id=user.id
                 )
                 session.add(driver_info)
-                session.commit()
-                session.refresh(driver_info)
-                print(f"DriverInfo creado con ID: {driver_info.id}")
-
-                print("8. Creando VehicleInfo...")
-                # 5. Crear el VehicleInfo
+                session.flush()
                 vehicle_info = VehicleInfo(
                     **vehicle_info_data.dict(),
                     driver_info_id=driver_info.id
                 )
                 session.add(vehicle_info)
-                session.commit()
-                session.refresh(vehicle_info)
-                print(f"VehicleInfo creado con ID: {vehicle_info.id}")
-
-                print("9. Procesando documentos...")
-                # 6. Manejar los documentos
-                docs = []
-
-                # Función auxiliar para manejar la subida de documentos
-                async def handle_document_upload(
-                    file: Optional[UploadFile],
-                    doc_type: str,
-                    side: Optional[str] = None,
-                    existing_url: Optional[str] = None
-                ) -> Optional[str]:
-                    if file:
-                        doc_info = await upload_service.save_document_dbtype(
-                            file=file,
-                            driver_id=driver_info.id,
-                            document_type=doc_type,
-                            side=side,
-                            description=f"{doc_type} {side if side else ''}"
-                        )
-                        return uploader.get_file_url(doc_info["url"])
-                    return existing_url
-
-                # Tarjeta de propiedad
-                if driver_documents_data.property_card_front or driver_documents_data.property_card_back:
-                    property_front_url = await handle_document_upload(
-                        driver_documents_data.property_card_front,
-                        "property_card",
-                        "front",
-                        driver_documents_data.property_card_front_url
-                    )
-                    property_back_url = await handle_document_upload(
-                        driver_documents_data.property_card_back,
-                        "property_card",
-                        "back",
-                        driver_documents_data.property_card_back_url
-                    )
-                    docs.append(DriverDocuments(
+                session.flush()
+
+                docs = {}
+                for document_type_name, side_fields, expiration_field in ONBOARDING_DOCUMENTS:
+                    expiration_date = getattr(
+                        driver_documents_data, expiration_field) if expiration_field else None
+                    has_files = any(getattr(driver_documents_data, field)
+                                    for field, _ in side_fields)
+                    if not has_files and expiration_date is None:
+                        continue
+                    urls = [document_urls[field] for field, _ in side_fields]
+                    docs[document_type_name] = DriverDocuments(
                         driver_info_id=driver_info.id,
                         vehicle_info_id=vehicle_info.id,
-                        document_type_id=1,  # 1 = Tarjeta de propiedad
-                        document_front_url=property_front_url,
-                        document_back_url=property_back_url,
-                        expiration_date=None
-                    ))
-
-                # Licencia de conducir
-                if (driver_documents_data.license_front or driver_documents_data.license_back or
-                        driver_documents_data.license_expiration_date):
-                    license_front_url = await handle_document_upload(
-                        driver_documents_data.license_front,
-                        "license",
-                        "front",
-                        driver_documents_data.license_front_url
-                    )
-                    license_back_url = await handle_document_upload(
-                        driver_documents_data.license_back,
-                        "license",
-                        "back",
-                        driver_documents_data.license_back_url
+                        document_type_id=ONBOARDING_DOCUMENT_TYPE_IDS[document_type_name],
+                        document_front_url=urls[0],
+                        document_back_url=urls[1] if len(urls) > 1 else None,
+                        expiration_date=expiration_date
                     )
-                    docs.append(DriverDocuments(
-                        driver_info_id=driver_info.id,
-                        vehicle_info_id=vehicle_info.id,
-                        document_type_id=2,  # 2 = Licencia
-                        document_front_url=license_front_url,
-                        document_back_url=license_back_url,
-                        expiration_date=driver_documents_data.license_expiration_date
-                    ))
-
-                # SOAT
-                if driver_documents_data.soat or driver_documents_data.soat_expiration_date:
-                    soat_url = await handle_document_upload(
-                        driver_documents_data.soat,
-                        "soat",
-                        None,
-                        driver_documents_data.soat_url
-                    )
-                    docs.append(DriverDocuments(
-                        driver_info_id=driver_info.id,
-                        vehicle_info_id=vehicle_info.id,
-                        document_type_id=3,  # 3 = SOAT
-                        document_front_url=soat_url,
-                        expiration_date=driver_documents_data.soat_expiration_date
-                    ))
-
-                # Tecnomecánica
-                if (driver_documents_data.vehicle_technical_inspection or
-                        driver_documents_data.vehicle_technical_inspection_expiration_date):
-                    tech_url = await handle_document_upload(
-                        driver_documents_data.vehicle_technical_inspection,
-                        "technical_inspections",
-                        None,
-                        driver_documents_data.vehicle_technical_inspection_url
-                    )
-                    docs.append(DriverDocuments(
-                        driver_info_id=driver_info.id,
-                        vehicle_info_id=vehicle_info.id,
-                        document_type_id=4,  # 4 = Tecnomecánica
-                        document_front_url=tech_url,
-                        expiration_date=driver_documents_data.vehicle_technical_inspection_expiration_date
-                    ))
-
-                for doc in docs:
-                    session.add(doc)
+                session.add_all(list(docs.values()))
                 session.commit()
-
-                # Consultar documentos actualizados desde la base de datos
-                property_card_doc = session.exec(
-                    select(DriverDocuments).where(
-                        DriverDocuments.driver_info_id == driver_info.id,
-                        DriverDocuments.document_type_id == 1
-                    )
-                ).first()
-
-                license_doc = session.exec(
-                    select(DriverDocuments).where(
-                        DriverDocuments.driver_info_id == driver_info.id,
-                        DriverDocuments.document_type_id == 2
-                    )
-                ).first()
-
-                soat_doc = session.exec(
-                    select(DriverDocuments).where(
-                        DriverDocuments.driver_info_id == driver_info.id,
-                        DriverDocuments.document_type_id == 3
-                    )
-                ).first()
-
-                vehicle_tech_doc = session.exec(
-                    select(DriverDocuments).where(
-                        DriverDocuments.driver_info_id == driver_info.id,
-                        DriverDocuments.document_type_id == 4
-                    )
-                ).first()
-
-                session.refresh(user)
-                print(
-                    f"DEBUG selfie_url del usuario REFRESH: {user.selfie_url}")
-                response = DriverFullResponse(
+                logger.debug("Conductor registrado: usuario %s, DriverInfo %s",
+                             user.id, driver_info.id)
+
+                property_card_doc = docs.get("property_card")
+                license_doc = docs.get("license")
+                soat_doc = docs.get("soat")
+                vehicle_tech_doc = docs.get("technical_inspections")
+                return DriverFullResponse(
                     user=UserResponse(
                         id=user.id,
                         full_name=user.full_name,
@@ -402,34 +309,16 @@ class DriverService:
                             vehicle_tech_doc.expiration_date) if vehicle_tech_doc and vehicle_tech_doc.expiration_date else None
                     )
                 )
-                existing_user = session.exec(
-                    select(ProjectSettings).where(ProjectSettings.id == 1)).first()
-                bonus = Decimal(existing_user.bonus)
-                # Crear transacción de bono y actualizar mount
-                bonus_transaction = Transaction(
-                    user_id=user.id,
-                    income=bonus,
-                    expense=0,
-                    type=TransactionType.BONUS,
-                    client_request_id=None
-                )
-                session.add(bonus_transaction)
-                session.commit()
-                # Actualizar el mount en VerifyMount
-                verify_mount.mount += bonus
-                session.add(verify_mount)
-                session.commit()
-
-                return response
 
             except HTTPException:
                 # Re-lanzar HTTPException sin modificar (preservar código de estado)
                 session.rollback()
+                self._release_uploads(uploaded_urls)
                 raise
             except Exception as e:
                 session.rollback()
-                print(f"Error en create_driver: {str(e)}")
-                print(traceback.format_exc())
+                self._release_uploads(uploaded_urls)
+                logger.exception("Error en create_driver: %s", e)
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Error al crear el conductor: {str(e)}"
@@ -545,7 +434,7 @@ class DriverService:
 
         except Exception as e:
             self.session.rollback()
-            print(f"Error accepting pending request: {e}")
+            logger.error("Error accepting pending request: %s", e)
             return False
 
     def complete_pending_request(self, user_id: UUID) -> bool:
@@ -554,23 +443,24 @@ class DriverService:
         Usa el precio de la oferta aceptada por el cliente, o el precio base si no hay oferta
         """
         try:
-            print(f"DEBUG: Completing pending request for user {user_id}")
+            logger.debug(
+                "DEBUG: Completing pending request for user %s", user_id)
             driver_info = self.session.query(DriverInfo).filter(
                 DriverInfo.user_id == user_id
             ).first()
-            print(
-                f"DEBUG: Driver pending_request_id: {driver_info.pending_request_id if driver_info else None}")
+            logger.debug(
+                "DEBUG: Driver pending_request_id: %s", driver_info.pending_request_id if driver_info else None)
             if not driver_info or driver_info.pending_request_id is None:
-                print(f"DEBUG: No pending request for user {user_id}")
+                logger.debug("DEBUG: No pending request for user %s", user_id)
                 return False
             client_request = self.session.query(ClientRequest).filter(
                 ClientRequest.id == driver_info.pending_request_id
             ).first()
-            print(
-                f"DEBUG: Found client request: {client_request.id if client_request else None}")
+            logger.debug(
+                "DEBUG: Found client request: %s", client_request.id if client_request else None)
             if not client_request:
-                print(
-                    f"DEBUG: Client request {driver_info.pending_request_id} not found")
+                logger.debug(
+                    "DEBUG: Client request %s not found", driver_info.pending_request_id)
                 return False
 
             # Buscar la oferta aceptada del conductor para esta solicitud
@@ -583,13 +473,13 @@ class DriverService:
             if accepted_offer:
                 # Usar el precio de la oferta aceptada
                 client_request.fare_assigned = accepted_offer.fare_offer
-                print(
-                    f"DEBUG: Using accepted offer price - fare_assigned: {accepted_offer.fare_offer}")
+                logger.debug(
+                    "DEBUG: Using accepted offer price - fare_assigned: %s", accepted_offer.fare_offer)
             else:
                 # Si no hay oferta aceptada, usar el precio base del cliente
                 client_request.fare_assigned = client_request.fare_offered
-                print(
-                    f"DEBUG: Using client's offered price - fare_assigned: {client_request.fare_assigned}")
+                logger.debug(
+                    "DEBUG: Using client's offered price - fare_assigned: %s", client_request.fare_assigned)
 
             # ✅ ACTUALIZAR: Cambiar de PENDING a ACCEPTED cuando el conductor completa su viaje actual
             client_request.id_driver_assigned = user_id
@@ -603,16 +493,16 @@ class DriverService:
             self.session.add(driver_info)
             self.session.add(client_request)
             self.session.commit()
-            print(
-                f"DEBUG: Pending request completed and cleaned for user {user_id}")
-            print(
-                f"DEBUG: After complete - driver_info.pending_request_id: {driver_info.pending_request_id}")
-            print(
-                f"DEBUG: After complete - client_request.id_driver_assigned: {client_request.id_driver_assigned}, status: {client_request.status}, fare_assigned: {client_request.fare_assigned}")
+            logger.debug(
+                "DEBUG: Pending request completed and cleaned for user %s", user_id)
+            logger.debug(
+                "DEBUG: After complete - driver_info.pending_request_id: %s", driver_info.pending_request_id)
+            logger.debug(
+                "DEBUG: After complete - client_request.id_driver_assigned: %s, status: %s, fare_assigned: %s", client_request.id_driver_assigned, client_request.status, client_request.fare_assigned)
             return True
         except Exception as e:
             self.session.rollback()
-            print(f"Error completing pending request: {e}")
+            logger.error("Error completing pending request: %s", e)
             return False
 
     def cancel_pending_request(self, user_id: UUID) -> bool:
@@ -620,24 +510,25 @@ class DriverService:
         Cancela la solicitud pendiente de un conductor
         """
         try:
-            print(f"DEBUG: Canceling pending request for user {user_id}")
+            logger.debug(
+                "DEBUG: Canceling pending request for user %s", user_id)
             driver_info = self.session.query(DriverInfo).filter(
                 DriverInfo.user_id == user_id
             ).first()
-            print(
-                f"DEBUG: Driver pending_request_id before cancel: {driver_info.pending_request_id if driver_info else None}")
+            logger.debug(
+                "DEBUG: Driver pending_request_id before cancel: %s", driver_info.pending_request_id if driver_info else None)
             if not driver_info or driver_info.pending_request_id is None:
-                print(
-                    f"DEBUG: No pending request to cancel for user {user_id}")
+                logger.debug(
+                    "DEBUG: No pending request to cancel for user %s", user_id)
                 return False
             client_request = self.session.query(ClientRequest).filter(
                 ClientRequest.id == driver_info.pending_request_id
             ).first()
-            print(
-                f"DEBUG: Client request before cancel: {client_request.id if client_request else None}")
+            logger.debug(
+                "DEBUG: Client request before cancel: %s", client_request.id if client_request else None)
             if not client_request:
-                print(
-                    f"DEBUG: No client request found to cancel for user {user_id}")
+                logger.debug(
+                    "DEBUG: No client request found to cancel for user %s", user_id)
                 return False
             client_request.assigned_busy_driver_id = None
             client_request.estimated_pickup_time = None
@@ -648,39 +539,40 @@ class DriverService:
             self.session.add(driver_info)
             self.session.add(client_request)
             self.session.commit()
-            print(f"DEBUG: Pending request canceled for user {user_id}")
+            logger.debug(
+                "DEBUG: Pending request canceled for user %s", user_id)
             return True
         except Exception as e:
             self.session.rollback()
-            print(f"Error canceling pending request: {e}")
+            logger.error("Error canceling pending request: %s", e)
             return False
 
     def get_driver_status(self, driver_id: UUID) -> Dict:
         """
         Obtiene el estado completo de un conductor
         """
-        print(f"DEBUG: Getting status for driver {driver_id}")
+        logger.debug("DEBUG: Getting status for driver %s", driver_id)
         driver_info = self.session.query(DriverInfo).filter(
             DriverInfo.user_id == driver_id
         ).first()
-        print(f"DEBUG: Driver info: {driver_info}")
+        logger.debug("DEBUG: Driver info: %s", driver_info)
         if not driver_info:
-            print(f"DEBUG: Driver not found: {driver_id}")
+            logger.debug("DEBUG: Driver not found: %s", driver_id)
             return {"status": "not_found"}
         active_request = self.session.query(ClientRequest).filter(
             ClientRequest.id_driver_assigned == driver_id,
             ClientRequest.status.in_([
                 StatusEnum.ON_THE_WAY, StatusEnum.ARRIVED, StatusEnum.TRAVELLING])
         ).first()
-        print(
-            f"DEBUG: Active request: {active_request.id if active_request else None}")
+        logger.debug(
+            "DEBUG: Active request: %s", active_request.id if active_request else None)
         pending_request = None
         if driver_info.pending_request_id:
             pending_request = self.session.query(ClientRequest).filter(
                 ClientRequest.id == driver_info.pending_request_id
             ).first()
-        print(
-            f"DEBUG: Pending request: {pending_request.id if pending_request else None}")
+        logger.debug(
+            "DEBUG: Pending request: %s", pending_request.id if pending_request else None)
         status = "available"
         if active_request:
             if pending_request:
@@ -689,7 +581,7 @@ class DriverService:
                 status = "busy_available"
         elif pending_request:
             status = "pending_only"
-        print(f"DEBUG: Status for driver {driver_id}: {status}")
+        logger.debug("DEBUG: Status for driver %s: %s", driver_id, status)
         return {
             "status": status,
             "active_request": active_request.id if active_request else None,
@@ -701,26 +593,27 @@ class DriverService:
         """
         Obtiene los detalles de la solicitud pendiente de un conductor
         """
-        print(
-            f"DEBUG: get_driver_pending_request called for user {user_id}")
+        logger.debug(
+            "DEBUG: get_driver_pending_request called for user %s", user_id)
         driver_info = self.session.query(DriverInfo).filter(
             DriverInfo.user_id == user_id
         ).first()
-        print(
-            f"DEBUG: Driver {user_id} - pending_request_id: {driver_info.pending_request_id if driver_info else None}")
+        logger.debug(
+            "DEBUG: Driver %s - pending_request_id: %s", user_id, driver_info.pending_request_id if driver_info else None)
         if not driver_info or driver_info.pending_request_id is None:
-            print(f"DEBUG: No pending request for user {user_id}")
+            logger.debug("DEBUG: No pending request for user %s", user_id)
             return None
         client_request = self.session.query(ClientRequest).filter(
             ClientRequest.id == driver_info.pending_request_id
         ).first()
-        print(
-            f"DEBUG: Found pending request: {client_request.id if client_request else None}")
+        logger.debug(
+            "DEBUG: Found pending request: %s", client_request.id if client_request else None)
         if not client_request:
-            print(
-                f"DEBUG: Pending request {driver_info.pending_request_id} not found")
+            logger.debug(
+                "DEBUG: Pending request %s not found", driver_info.pending_request_id)
             return None
-        print(f"DEBUG: Returning pending request data for user {user_id}")
+        logger.debug(
+            "DEBUG: Returning pending request data for user %s", user_id)
         return {
             "request_id": str(client_request.id),
             "client_id": str(client_request.id_client),
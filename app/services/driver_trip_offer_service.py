@@ -18,6 +18,9 @@ import requests
 from app.core.config import settings
 from app.utils.geo_utils import wkb_to_coords, get_time_and_distance_from_google
 from app.services.notification_service import NotificationService
+from app.services.rating_summary_service import get_rating_summary
+from app.services.offer_view_service import get_offer_views, get_offer_view_cache
+from app.services.dispatch_feed_service import get_dispatch_feed
 import logging
 from app.models.user_has_roles import RoleStatus
 
@@ -29,15 +32,15 @@ class DriverTripOfferService:
         self.session = session
 
     def create_offer(self, data: dict) -> DriverTripOffer:
-        print(f"\n=== DEBUG CREATE_OFFER ===")
-        print(f"Datos recibidos: {data}")
+        logger.debug("\n=== DEBUG CREATE_OFFER ===")
+        logger.debug("Datos recibidos: %s", data)
 
         # Validar que el driver exista y tenga el rol DRIVER
         user = self.session.get(User, data["id_driver"])
-        print(f"Usuario encontrado: {user is not None}")
+        logger.debug("Usuario encontrado: %s", user is not None)
         if not user:
-            print(
-                f"ERROR: Conductor no encontrado con ID: {data['id_driver']}")
+            logger.error(
+                "ERROR: Conductor no encontrado con ID: %s", data['id_driver'])
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Conductor no encontrado")
 
@@ -47,69 +50,75 @@ class DriverTripOfferService:
                 UserHasRole.id_rol == "DRIVER"
             )
         ).first()
-        print(f"Rol de conductor encontrado: {driver_role is not None}")
+        logger.debug(
+            "Rol de conductor encontrado: %s", driver_role is not None)
         if not driver_role:
-            print(f"ERROR: Usuario {data['id_driver']} no tiene rol DRIVER")
+            logger.error(
+                "ERROR: Usuario %s no tiene rol DRIVER", data['id_driver'])
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="El usuario no tiene el rol de conductor")
 
         # ✅ AGREGADO: Validación completa del conductor
         if driver_role.status != RoleStatus.APPROVED:
-            print(
-                f"ERROR: Usuario {data['id_driver']} no tiene status APPROVED")
+            logger.error(
+                "ERROR: Usuario %s no tiene status APPROVED", data['id_driver'])
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="El usuario no tiene el rol de conductor aprobado")
 
         if not driver_role.is_verified:
-            print(
-                f"ERROR: Usuario {data['id_driver']} no está completamente verificado")
+            logger.error(
+                "ERROR: Usuario %s no está completamente verificado", data['id_driver'])
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="El conductor no está completamente verificado. Faltan documentos por aprobar")
 
         if driver_role.suspension:
-            print(f"ERROR: Usuario {data['id_driver']} está suspendido")
+            logger.error(
+                "ERROR: Usuario %s está suspendido", data['id_driver'])
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="El conductor está suspendido y no puede operar")
 
         # Validar que la solicitud exista y esté en estado CREATED
         client_request = self.session.get(
             ClientRequest, data["id_client_request"])
-        print(f"Client request encontrada: {client_request is not None}")
+        logger.debug(
+            "Client request encontrada: %s", client_request is not None)
         if not client_request:
-            print(
-                f"ERROR: Client request no encontrada con ID: {data['id_client_request']}")
+            logger.error(
+                "ERROR: Client request no encontrada con ID: %s", data['id_client_request'])
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail="Solicitud de cliente no encontrada")
 
-        print(f"Estado de client request: {client_request.status}")
+        logger.debug("Estado de client request: %s", client_request.status)
         # ✅ ACTUALIZAR: Permitir ofertas en solicitudes CREATED y PENDING
         if client_request.status not in [StatusEnum.CREATED, StatusEnum.PENDING]:
-            print(
-                f"ERROR: Client request no está en estado CREATED o PENDING, está en: {client_request.status}")
+            logger.error(
+                "ERROR: Client request no está en estado CREATED o PENDING, está en: %s", client_request.status)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                                 detail="La solicitud debe estar en estado CREATED o PENDING para recibir ofertas")
 
         # Validar que el precio ofrecido no sea menor al precio base
-        print(f"Fare offered en client request: {client_request.fare_offered}")
-        print(f"Fare offer en data: {data.get('fare_offer')}")
+        logger.debug(
+            "Fare offered en client request: %s", client_request.fare_offered)
+        logger.debug("Fare offer en data: %s", data.get('fare_offer'))
 
         if client_request.fare_offered is None:
-            print(f"ERROR: Client request no tiene fare_offered definido")
+            logger.error(
+                "ERROR: Client request no tiene fare_offered definido")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La solicitud de cliente no tiene un precio base definido"
             )
 
         if float(data["fare_offer"]) < float(client_request.fare_offered):
-            print(
-                f"ERROR: Oferta {data['fare_offer']} es menor que precio base {client_request.fare_offered}")
+            logger.error(
+                "ERROR: Oferta %s es menor que precio base %s", data['fare_offer'], client_request.fare_offered)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="La oferta debe ser mayor o igual al precio base"
             )
 
         # ✅ NUEVA VALIDACIÓN: Verificar saldo del conductor para cubrir comisión
-        print(f"🔍 Validando saldo del conductor para comisión...")
+        logger.debug("🔍 Validando saldo del conductor para comisión...")
 
         # Obtener saldo del conductor
         driver_balance = self.session.query(VerifyMount).filter(
@@ -117,25 +126,27 @@ class DriverTripOfferService:
         ).first()
 
         driver_current_balance = driver_balance.mount if driver_balance else 0
-        print(f"💰 Saldo actual del conductor: ${driver_current_balance:,}")
+        logger.debug(
+            "💰 Saldo actual del conductor: $%s", format(driver_current_balance, ','))
 
         # Calcular comisión estimada (10% del valor del viaje según earnings_service.py)
         commission_percentage = 0.10  # 10%
         estimated_commission = float(
             data["fare_offer"]) * commission_percentage
-        print(f"💸 Comisión estimada (10%): ${estimated_commission:,.0f}")
+        logger.debug(
+            "💸 Comisión estimada (10%%): $%s", format(estimated_commission, ',.0f'))
 
         # Validar que el conductor tenga saldo suficiente
         if driver_current_balance < estimated_commission:
-            print(
-                f"❌ Saldo insuficiente: ${driver_current_balance:,} < ${estimated_commission:,.0f}")
+            logger.error(
+                "❌ Saldo insuficiente: $%s < $%s", format(driver_current_balance, ','), format(estimated_commission, ',.0f'))
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"No puedes ofertar porque tu saldo (${driver_current_balance:,}) es insuficiente para cubrir la comisión estimada (${estimated_commission:,.0f}) del viaje. Recarga tu billetera para continuar."
             )
 
-        print(
-            f"✅ Saldo suficiente para comisión: ${driver_current_balance:,} >= ${estimated_commission:,.0f}")
+        logger.info(
+            "✅ Saldo suficiente para comisión: $%s >= $%s", format(driver_current_balance, ','), format(estimated_commission, ',.0f'))
 
         # Validar que no exista una oferta previa del mismo conductor para esta solicitud
         existing_offer = self.session.exec(
@@ -144,16 +155,17 @@ class DriverTripOfferService:
                 DriverTripOffer.id_driver == data["id_driver"]
             )
         ).first()
-        print(f"Oferta existente encontrada: {existing_offer is not None}")
+        logger.debug(
+            "Oferta existente encontrada: %s", existing_offer is not None)
         if existing_offer:
-            print(
-                f"ERROR: Ya existe una oferta del conductor {data['id_driver']} para la solicitud {data['id_client_request']}")
+            logger.error(
+                "ERROR: Ya existe una oferta del conductor %s para la solicitud %s", data['id_driver'], data['id_client_request'])
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Ya existe una oferta para esta solicitud"
             )
 
-        print(f"Todas las validaciones pasaron, creando oferta...")
+        logger.debug("Todas las validaciones pasaron, creando oferta...")
 
         # Obtener la posición actual del conductor
         driver_position = self.session.query(DriverPosition).filter(
@@ -185,14 +197,14 @@ class DriverTripOfferService:
             distance_to_return = distance_to_pickup if distance_to_pickup is not None else data.get(
                 "distance", 5.0)  # Default a 5km si falla
 
-            print(
-                f"DEBUG: Conductor {data['id_driver']} - Distancia calculada: {distance_to_return}m, Tiempo: {time_to_return}min")
+            logger.debug(
+                "DEBUG: Conductor %s - Distancia calculada: %sm, Tiempo: %smin", data['id_driver'], distance_to_return, time_to_return)
         else:
             # Si no hay posición del conductor, usar los valores guardados en la oferta
             time_to_return = data.get("time", 0)
             distance_to_return = data.get("distance", 0)
-            print(
-                f"WARNING: Conductor {data['id_driver']} no tiene posición definida, usando valores guardados: {distance_to_return}m, {time_to_return}min")
+            logger.warning(
+                "WARNING: Conductor %s no tiene posición definida, usando valores guardados: %sm, %smin", data['id_driver'], distance_to_return, time_to_return)
 
         data["time"] = time_to_return
         data["distance"] = distance_to_return
@@ -201,7 +213,19 @@ class DriverTripOfferService:
         self.session.add(offer)
         self.session.commit()
         self.session.refresh(offer)
-        print(f"Oferta creada exitosamente con ID: {offer.id}")
+        logger.debug("Oferta creada exitosamente con ID: %s", offer.id)
+        get_offer_view_cache().invalidate(offer.id_client_request)
+
+        # Los demás conductores que ven la solicitud reciben el nuevo conteo
+        try:
+            offers_count = self.session.exec(
+                select(func.count(DriverTripOffer.id)).where(
+                    DriverTripOffer.id_client_request == offer.id_client_request)
+            ).one()
+            get_dispatch_feed().publish_offer(
+                offer.id_client_request, offer.id_driver, offers_count)
+        except Exception as e:
+            logger.error("Error publicando oferta en el feed: %s", e)
 
         # Enviar notificación al cliente sobre la nueva oferta
         try:
@@ -226,114 +250,23 @@ class DriverTripOfferService:
             raise HTTPException(
                 status_code=404, detail="Solicitud de cliente no encontrada")
 
-        offers = self.session.query(DriverTripOffer).filter(
-            DriverTripOffer.id_client_request == id_client_request
-        ).all()
-        result = []
-
-        # Obtener coordenadas del punto de recogida del cliente
-        pickup_coords = wkb_to_coords(client_request.pickup_position)
-
-        for offer in offers:
-            user = self.session.query(User).options(
-                selectinload(User.driver_info).selectinload(
-                    DriverInfo.vehicle_info),
-                selectinload(User.roles)
-            ).filter(User.id == offer.id_driver).first()
-
-            driver_info_obj = user.driver_info if user else None
-            vehicle_info_obj = driver_info_obj.vehicle_info if driver_info_obj and hasattr(
-                driver_info_obj, 'vehicle_info') else None
-
-            vehicle_info_response = VehicleInfoResponse(
-                brand=vehicle_info_obj.brand,
-                model=vehicle_info_obj.model,
-                model_year=vehicle_info_obj.model_year,
-                color=vehicle_info_obj.color,
-                plate=vehicle_info_obj.plate,
-                vehicle_type_id=vehicle_info_obj.vehicle_type_id
-            ) if vehicle_info_obj else None
-
-            driver_info_response = DriverInfoResponse(
-                first_name=driver_info_obj.first_name,
-                last_name=driver_info_obj.last_name,
-                birth_date=str(driver_info_obj.birth_date),
-                email=driver_info_obj.email
-            ) if driver_info_obj else None
-
-            user_response = UserResponse(
-                id=user.id,
-                full_name=user.full_name,
-                country_code=user.country_code,
-                phone_number=user.phone_number,
-                selfie_url=user.selfie_url
-            ) if user else None
-
-            average_rating = get_average_rating(
-                self.session, "driver", user.id) if user else 0.0
-
-            # Obtener la posición actual del conductor
-            driver_position = self.session.query(DriverPosition).filter(
-                DriverPosition.id_driver == offer.id_driver
-            ).first()
-
-            # Calcular distancia y tiempo desde el conductor hasta el punto de recogida
-            if driver_position and driver_position.position:
-                driver_coords = wkb_to_coords(driver_position.position)
-
-                # Calcular usando Google Maps API
-                distance_to_pickup, time_to_pickup = get_time_and_distance_from_google(
-                    # Posición del conductor
-                    driver_coords['lat'], driver_coords['lng'],
-                    # Punto de recogida
-                    pickup_coords['lat'], pickup_coords['lng']
-                )
-
-                # Convertir tiempo de segundos a minutos
-                time_to_pickup_minutes = (
-                    time_to_pickup / 60) if time_to_pickup is not None else 0
-
-                # Usar los valores calculados o los valores guardados en la oferta como fallback
-                time_to_return = time_to_pickup_minutes if time_to_pickup_minutes > 0 else (
-                    offer.time or 15)
-                distance_to_return = distance_to_pickup if distance_to_pickup is not None else (
-                    offer.distance or 5.0)
-
-                print(
-                    f"DEBUG: Conductor {offer.id_driver} - Distancia calculada: {distance_to_return}m, Tiempo: {time_to_return}min")
-            else:
-                # Si no hay posición del conductor, usar los valores guardados en la oferta
-                time_to_return = offer.time
-                distance_to_return = offer.distance
-                print(
-                    f"WARNING: Conductor {offer.id_driver} no tiene posición definida, usando valores guardados: {distance_to_return}m, {time_to_return}min")
-
-            result.append(DriverTripOfferResponse(
-                id=offer.id,
-                client_request_id=offer.id_client_request,
-                fare_offer=offer.fare_offer,
-                time=time_to_return,
-                distance=distance_to_return,
-                created_at=str(offer.created_at),
-                updated_at=str(offer.updated_at),
-                user=user_response,
-                driver_info=driver_info_response,
-                vehicle_info=vehicle_info_response,
-                average_rating=average_rating
-            ))
-
-        if user_role == "DRIVER":
-            # Solo ve su propia oferta
-            result = [r for r in result if r.user.id == user_id]
-        elif user_role == "CLIENT":
+        if user_role == "CLIENT":
             # Solo el cliente dueño puede ver todas
             if client_request.id_client != user_id:
                 raise HTTPException(
                     status_code=403, detail="No autorizado para ver las ofertas de esta solicitud")
-            # El cliente dueño ve todas
-        else:
+        elif user_role != "DRIVER":
             raise HTTPException(status_code=403, detail="No autorizado")
 
+        # Ofertas con conductor, vehículo, posición, calificación y ETA en
+        # lote; la vista se reutiliza mientras no lleguen ofertas nuevas
+        result = list(get_offer_views(self.session, client_request))
+
+        if user_role == "DRIVER":
+            # Solo ve su propia oferta
+            result = [r for r in result if r.user.id == user_id]
+        # El cliente dueño ve todas
+
         return result
 
 
@@ -344,20 +277,17 @@ def get_average_rating(session, role: str, id_user: UUID) -> float:
             detail="El parámetro 'role' debe ser 'driver' o 'passenger'"
         )
 
-    if role == "passenger":
-        # Buscar por id_client y calcular promedio de client_rating
-        avg_rating = session.query(func.avg(ClientRequest.client_rating))\
-            .filter(
-                ClientRequest.id_client == id_user,
-                ClientRequest.status == StatusEnum.PAID
-        ).scalar()
-    else:  # role == "driver"
-        # Buscar por id_driver_assigned y calcular promedio de driver_rating
-        avg_rating = session.query(func.avg(ClientRequest.driver_rating))\
-            .filter(
-                ClientRequest.id_driver_assigned == id_user,
-                ClientRequest.status == StatusEnum.PAID
-        ).scalar()
-
-    # Si no hay calificaciones, devolver 0 o None según prefieras
-    return avg_rating if avg_rating is not None else 0.0
+    # Promedio precalculado en rating_summary (ver rating_summary_service)
+    summary = get_rating_summary(session, id_user, role)
+
+    # Si no hay calificaciones, devolver 0
+    return summary.average if summary is not None else 0.0
+
+
+def has_driver_offer(session: Session, client_request_id: UUID, driver_id: UUID) -> bool:
+    return session.execute(
+        select(DriverTripOffer.id).where(
+            DriverTripOffer.id_client_request == client_request_id,
+            DriverTripOffer.id_driver == driver_id
+        )
+    ).first() is not None
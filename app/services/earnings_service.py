@@ -7,6 +7,7 @@ from app.models.penality_user import PenalityUser, statusEnum
 from app.models.referral_chain import Referral
 from app.models.transaction import Transaction
 from app.models.project_settings import ProjectSettings
+from app.services.config_cache_service import get_project_settings
 from app.models.user import User
 from app.models.driver_savings import DriverSavings
 from app.models.company_account import CompanyAccount
@@ -16,6 +17,9 @@ from datetime import datetime
 from app.services.transaction_service import TransactionService
 from sqlalchemy.orm import Session as SQLAlchemySession
 import traceback
+import logging
+
+logger = logging.getLogger(__name__)
 
 # Id especial (o None) para la empresa
 COMPANY_ID: int | None = None
@@ -26,8 +30,7 @@ def get_config_percentages(session: SQLAlchemySession):
     Devuelve un diccionario con los porcentajes configurados en la tabla project_settings.
     Ahora busca la configuración con ID = 1.
     """
-    config = session.query(ProjectSettings).get(
-        1)  # Asume que la configuración está en la fila con ID 1
+    config = get_project_settings(session)  # Fila única, desde la caché
     if not config:
         raise ValueError(
             "No se encontró la configuración del proyecto con ID 1")
@@ -92,8 +95,8 @@ def distribute_earnings(session: SQLAlchemySession, request: ClientRequest) -> N
         driver_income = (
             fare * driver_income_pct).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
-        print(
-            f"[DEBUG] Creando transacción SERVICE ingreso para conductor: user_id={request.id_driver_assigned}, income={int(driver_income)}")
+        logger.debug(
+            "[DEBUG] Creando transacción SERVICE ingreso para conductor: user_id=%s, income=%s", request.id_driver_assigned, int(driver_income))
         transaction_service.create_transaction(
             user_id=request.id_driver_assigned,
             income=int(driver_income),
@@ -106,8 +109,8 @@ def distribute_earnings(session: SQLAlchemySession, request: ClientRequest) -> N
         driver_expense = (
             fare * driver_expense_pct).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
-        print(
-            f"[DEBUG] Creando transacción COMMISSION egreso para conductor: user_id={request.id_driver_assigned}, expense={int(driver_expense)}")
+        logger.debug(
+            "[DEBUG] Creando transacción COMMISSION egreso para conductor: user_id=%s, expense=%s", request.id_driver_assigned, int(driver_expense))
         transaction_service.create_transaction(
             user_id=request.id_driver_assigned,
             expense=int(driver_expense),
@@ -0,0 +1,409 @@
+from sqlmodel import Session
+from sqlalchemy import func, select
+from app.models.client_request import ClientRequest, StatusEnum
+from app.models.driver_position import DriverPosition
+from app.core.config import settings
+from app.core.leader_lock import LeaderLock
+from app.core.pubsub import RedisInvalidationBus
+from app.core.sio_rooms import trip_room
+from app.utils.geo_utils import get_distance_meters, get_times_and_distances_from_google
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Estados en los que el pasajero espera al conductor en el punto de recogida
+TRACKED_STATUSES = (StatusEnum.ACCEPTED, StatusEnum.ON_THE_WAY)
+
+# Solo un worker calcula y emite los ETA
+ETA_LEADER_LOCK_KEY = 99_000_002
+
+# Sin ruta de Google: distancia por vías ≈ 1.3 × línea recta, a 30 km/h
+ROAD_FACTOR = 1.3
+AVERAGE_SPEED_MS = 8.33
+
+
+@dataclass
+class TrackedTrip:
+    client_request_id: UUID
+    driver_id: UUID
+    driver: Tuple[float, float]
+    pickup: Tuple[float, float]
+
+
+@dataclass
+class CachedRoute:
+    """
+    Última ruta de Google para el viaje, con la distancia en línea recta de ese
+    momento: permite escalar distancia y duración mientras el conductor avanza.
+    """
+    distance: float
+    duration: float
+    straight: float
+    fetched_at: float
+
+
+@dataclass
+class EtaSnapshot:
+    distance: float
+    duration: float
+    source: str  # "google", "route" (ruta escalada) o "haversine"
+    driver: Tuple[float, float]
+    computed_at: float
+    timestamp: str
+
+    def payload(self) -> Dict:
+        return {
+            "distance": self.distance,
+            "duration": self.duration,
+            "source": self.source,
+            "timestamp": self.timestamp,
+        }
+
+
+def estimate_from_route(route: Optional[CachedRoute], straight: float) -> Tuple[float, float, str]:
+    """
+    ETA sin llamar a Google: escala la última ruta conocida por la distancia en
+    línea recta actual o, si no hay ruta, usa haversine con velocidad promedio.
+    """
+    if route is not None and route.straight > 0 and route.distance > 0:
+        distance = route.distance * straight / route.straight
+        duration = route.duration * distance / route.distance
+        return distance, duration, "route"
+    distance = straight * ROAD_FACTOR
+    return distance, distance / AVERAGE_SPEED_MS, "haversine"
+
+
+def load_tracked_trips(session: Session) -> List[TrackedTrip]:
+    """
+    Viajes con conductor en camino al punto de recogida y la posición actual
+    del conductor, en una sola consulta.
+    """
+    rows = session.execute(
+        select(
+            ClientRequest.id,
+            ClientRequest.id_driver_assigned,
+            func.ST_Y(DriverPosition.position),
+            func.ST_X(DriverPosition.position),
+            func.ST_Y(ClientRequest.pickup_position),
+            func.ST_X(ClientRequest.pickup_position),
+        )
+        .join(DriverPosition, DriverPosition.id_driver == ClientRequest.id_driver_assigned)
+        .where(ClientRequest.status.in_(TRACKED_STATUSES))
+    ).all()
+    return [
+        TrackedTrip(request_id, driver_id, (driver_lat, driver_lng), (pickup_lat, pickup_lng))
+        for request_id, driver_id, driver_lat, driver_lng, pickup_lat, pickup_lng in rows
+        if None not in (driver_lat, driver_lng, pickup_lat, pickup_lng)
+    ]
+
+
+def fetch_google_route(driver: Tuple[float, float], pickup: Tuple[float, float]) -> Tuple[Optional[float], Optional[float]]:
+    return get_times_and_distances_from_google([driver], pickup[0], pickup[1])[0]
+
+
+class EtaTracker:
+    """
+    Motor de ETA para los viajes activos (conductor asignado, camino al punto
+    de recogida).
+
+    - Cada `tick` lee en una consulta los viajes activos y la posición de sus
+      conductores; el costo depende de los viajes activos, no de cuántas veces
+      consulten los clientes.
+    - Un viaje se recalcula solo si el conductor se movió más de
+      ETA_MOVE_THRESHOLD_METERS o pasaron ETA_MAX_AGE_SECONDS desde el último
+      cálculo; entonces se emite `eta_update/{id_client_request}` al room
+      del viaje.
+    - Google Distance Matrix se consulta como máximo cada
+      ETA_ROUTE_REFRESH_SECONDS por viaje y ETA_MAX_ROUTE_CALLS_PER_TICK por
+      tick; entre consultas se escala la última ruta o se usa haversine.
+    - Los viajes que dejan de estar activos se descartan.
+    - Con varios workers solo el líder calcula. Las solicitudes de recálculo
+      y las posiciones del socket le llegan por `bus`, y él publica cada ETA
+      nuevo para que `latest` responda igual en todos los workers.
+    """
+
+    def __init__(self, emit: Optional[Callable[[str, Dict, str], Awaitable]] = None,
+                 fetch_route: Callable = fetch_google_route,
+                 session_factory: Optional[Callable[[], Session]] = None,
+                 leader_lock: Optional[LeaderLock] = None,
+                 interval: Optional[float] = None,
+                 bus=None):
+        self._emit = emit
+        self._fetch_route = fetch_route
+        self._session_factory = session_factory
+        self._leader_lock = leader_lock
+        self._bus = bus
+        self.origin = uuid.uuid4().hex
+        if bus is not None:
+            bus.subscribe(self._on_message)
+        self.interval = settings.ETA_TICK_SECONDS if interval is None else interval
+        self.move_threshold = settings.ETA_MOVE_THRESHOLD_METERS
+        self.max_age = settings.ETA_MAX_AGE_SECONDS
+        self.route_refresh = settings.ETA_ROUTE_REFRESH_SECONDS
+        self.max_route_calls = settings.ETA_MAX_ROUTE_CALLS_PER_TICK
+        self._routes: Dict[UUID, CachedRoute] = {}
+        self._snapshots: Dict[UUID, EtaSnapshot] = {}
+        self._forced: set = set()
+        self._position_hints: Dict[UUID, Tuple[float, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"ticks": 0, "emitted": 0,
+                      "google_calls": 0, "skipped": 0}
+
+    # ----- consultas -----
+
+    def latest(self, client_request_id: UUID) -> Optional[EtaSnapshot]:
+        """
+        Último ETA calculado para el viaje (None si aún no se ha calculado).
+        """
+        return self._snapshots.get(client_request_id)
+
+    def request_refresh(self, client_request_id: UUID) -> None:
+        """
+        Fuerza el recálculo y la emisión del viaje en el siguiente tick
+        (del líder, aunque la petición llegue a otro worker).
+        """
+        if self._bus is not None:
+            self._bus.publish({"type": "refresh", "id": str(client_request_id)})
+            return
+        self._forced.add(client_request_id)
+
+    def observe_driver_position(self, client_request_id: UUID, lat: float, lng: float) -> None:
+        """
+        Posición del conductor del viaje reportada por socket, más reciente que
+        la de driver_position. Solo guarda el valor: el recálculo ocurre en el
+        siguiente tick.
+        """
+        if self._bus is not None:
+            self._bus.publish({"type": "position", "id": str(client_request_id),
+                               "lat": lat, "lng": lng})
+            return
+        self._position_hints[client_request_id] = (lat, lng)
+
+    def _on_message(self, message: Dict) -> None:
+        """
+        Mensaje recibido por el bus (de cualquier worker, incluido este).
+        Recálculos y posiciones solo los usa el líder; los demás los
+        descartan en su siguiente tick.
+        """
+        client_request_id = UUID(message["id"])
+        if message["type"] == "refresh":
+            self._forced.add(client_request_id)
+        elif message["type"] == "position":
+            self._position_hints[client_request_id] = (message["lat"], message["lng"])
+        elif message["type"] == "snapshot" and message.get("origin") != self.origin:
+            self._snapshots[client_request_id] = EtaSnapshot(
+                distance=message["distance"],
+                duration=message["duration"],
+                source=message["source"],
+                driver=tuple(message["driver"]),
+                computed_at=time.monotonic(),
+                timestamp=message["timestamp"]
+            )
+        elif message["type"] == "gone" and message.get("origin") != self.origin:
+            self._snapshots.pop(client_request_id, None)
+            self._position_hints.pop(client_request_id, None)
+            self._forced.discard(client_request_id)
+
+    def _publish_snapshots(self, updates: List[Tuple[UUID, EtaSnapshot]], gone: set) -> None:
+        if self._bus is None:
+            return
+        for client_request_id, snapshot in updates:
+            self._bus.publish({"type": "snapshot", "id": str(client_request_id),
+                               "origin": self.origin, "driver": list(snapshot.driver),
+                               **snapshot.payload()})
+        for client_request_id in gone:
+            self._bus.publish({"type": "gone", "id": str(client_request_id),
+                               "origin": self.origin})
+
+    def _follow(self) -> None:
+        """
+        Tick de un worker que no es líder: los ETA le llegan por el bus. Se
+        descartan los que el líder dejó de publicar (el viaje terminó o cambió
+        el líder) y los recálculos y posiciones, que atiende el líder.
+        """
+        limit = time.monotonic() - 3 * self.max_age
+        for client_request_id, snapshot in list(self._snapshots.items()):
+            if snapshot.computed_at < limit:
+                self._snapshots.pop(client_request_id, None)
+        self._position_hints.clear()
+        self._forced.clear()
+
+    # ----- cálculo -----
+
+    def _load(self) -> List[TrackedTrip]:
+        if self._session_factory is not None:
+            session = self._session_factory()
+        else:
+            from app.core.db import engine
+            session = Session(engine)
+        try:
+            return load_tracked_trips(session)
+        finally:
+            session.close()
+
+    def _due(self, trip: TrackedTrip, now: float) -> bool:
+        snapshot = self._snapshots.get(trip.client_request_id)
+        if snapshot is None or trip.client_request_id in self._forced:
+            return True
+        if now - snapshot.computed_at >= self.max_age:
+            return True
+        moved = get_distance_meters(*snapshot.driver, *trip.driver)
+        return moved >= self.move_threshold
+
+    def compute(self, trips: List[TrackedTrip], now: Optional[float] = None) -> List[Tuple[UUID, EtaSnapshot]]:
+        """
+        Recalcula los viajes que lo necesitan y retorna los ETA nuevos.
+        Bloqueante (puede llamar a Google): correr fuera del event loop.
+        """
+        now = time.monotonic() if now is None else now
+        active = {trip.client_request_id for trip in trips}
+        for stale in set(self._snapshots) - active:
+            self._snapshots.pop(stale, None)
+            self._routes.pop(stale, None)
+        for stale in set(self._position_hints) - active:
+            self._position_hints.pop(stale, None)
+        for trip in trips:
+            trip.driver = self._position_hints.get(trip.client_request_id, trip.driver)
+
+        updates = []
+        route_calls = 0
+        for trip in trips:
+            if not self._due(trip, now):
+                self.stats["skipped"] += 1
+                continue
+            self._forced.discard(trip.client_request_id)
+
+            straight = get_distance_meters(*trip.driver, *trip.pickup)
+            route = self._routes.get(trip.client_request_id)
+            distance = duration = None
+            source = None
+            if (route is None or now - route.fetched_at >= self.route_refresh) and route_calls < self.max_route_calls:
+                route_calls += 1
+                self.stats["google_calls"] += 1
+                distance, duration = self._fetch_route(trip.driver, trip.pickup)
+                if distance is not None and duration is not None:
+                    self._routes[trip.client_request_id] = CachedRoute(
+                        distance, duration, straight, now)
+                    source = "google"
+            if source is None:
+                distance, duration, source = estimate_from_route(route, straight)
+
+            snapshot = EtaSnapshot(
+                distance=float(distance),
+                duration=float(duration),
+                source=source,
+                driver=trip.driver,
+                computed_at=now,
+                timestamp=datetime.utcnow().isoformat()
+            )
+            self._snapshots[trip.client_request_id] = snapshot
+            updates.append((trip.client_request_id, snapshot))
+        return updates
+
+    async def tick(self) -> int:
+        """
+        Un ciclo del motor: carga, recalcula y emite. Retorna cuántos ETA emitió.
+        """
+        if self._leader_lock is not None:
+            is_leader = await asyncio.to_thread(self._leader_lock.acquire)
+            if not is_leader:
+                self._follow()
+                return 0
+        self.stats["ticks"] += 1
+        trips = await asyncio.to_thread(self._load)
+        gone = set(self._snapshots) - {trip.client_request_id for trip in trips}
+        updates = await asyncio.to_thread(self.compute, trips)
+        self._publish_snapshots(updates, gone)
+        emit = self._emit or _sio_emit
+        for client_request_id, snapshot in updates:
+            try:
+                await emit(f"eta_update/{client_request_id}", snapshot.payload(),
+                           trip_room(client_request_id))
+                self.stats["emitted"] += 1
+            except Exception as e:
+                logger.error(
+                    "Error emitiendo ETA de %s: %s", client_request_id, e)
+        return len(updates)
+
+    # ----- ciclo de vida -----
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error en el ciclo de ETA: %s", e, exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._leader_lock is not None:
+            await asyncio.to_thread(self._leader_lock.release)
+        if self._bus is not None:
+            self._bus.close()
+
+
+async def _sio_emit(event: str, data: Dict, room: str) -> None:
+    from app.core.sio_events import sio
+    await sio.emit(event, data, room=room)
+
+
+_tracker: Optional[EtaTracker] = None
+
+
+def build_eta_bus():
+    """
+    Con SIO_MANAGER=redis los workers que no calculan ETA reciben los del
+    líder (y le envían recálculos y posiciones) por Redis pub/sub.
+    """
+    if settings.SIO_MANAGER != "redis":
+        return None
+    url = settings.SIO_REDIS_URL or settings.REDIS_URL
+    if not url:
+        raise ValueError("SIO_MANAGER=redis requiere definir SIO_REDIS_URL o REDIS_URL")
+    return RedisInvalidationBus(url, settings.ETA_CHANNEL, label="seguimiento de ETA")
+
+
+def get_eta_tracker() -> EtaTracker:
+    """
+    Retorna el motor de ETA del proceso, creándolo la primera vez.
+    """
+    global _tracker
+    if _tracker is None:
+        _tracker = EtaTracker(leader_lock=LeaderLock(ETA_LEADER_LOCK_KEY),
+                              bus=build_eta_bus())
+    return _tracker
+
+
+def set_eta_tracker(tracker: Optional[EtaTracker]) -> None:
+    global _tracker
+    _tracker = tracker
+
+
+async def start_eta_tracking() -> None:
+    if settings.ETA_TRACKING_ENABLED:
+        get_eta_tracker().start()
+
+
+async def shutdown_eta_tracking() -> None:
+    if _tracker is not None:
+        await _tracker.stop()
@@ -0,0 +1,196 @@
+from sqlmodel import Session
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from fastapi import UploadFile
+from app.core.config import settings
+from app.core.storage import LocalStorageBackend, build_storage_backend, content_key, key_from_url
+from app.models.stored_file import StoredFile
+from app.utils.uploads import SavedUpload, save_upload_stream, save_upload_stream_sync, schedule_thumbnail
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import BinaryIO, Dict, Optional
+import asyncio
+import logging
+import os
+import threading
+import uuid
+import pytz
+
+logger = logging.getLogger(__name__)
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+
+@dataclass
+class StoredObject:
+    key: str
+    sha256: str
+    size: int
+    url: str
+
+
+def add_reference(session: Session, key: str, saved: SavedUpload,
+                  content_type: Optional[str]) -> None:
+    """
+    Suma una referencia al archivo, creando su fila si no existe.
+    No hace commit.
+    """
+    table = StoredFile.__table__
+    now = datetime.now(COLOMBIA_TZ)
+    result = session.execute(
+        update(table).where(table.c.key == key).values(
+            ref_count=table.c.ref_count + 1, updated_at=now))
+    if result.rowcount:
+        return
+    try:
+        with session.begin_nested():
+            session.execute(insert(table).values(
+                key=key, sha256=saved.sha256, size=saved.size,
+                content_type=content_type, ref_count=1,
+                created_at=now, updated_at=now))
+    except IntegrityError:
+        # Otra subida del mismo contenido creó la fila entre tanto
+        session.execute(
+            update(table).where(table.c.key == key).values(
+                ref_count=table.c.ref_count + 1, updated_at=now))
+
+
+def release_reference(session: Session, url_or_key: Optional[str]) -> bool:
+    """
+    Resta una referencia al archivo de esa URL. Las URL de archivos previos al
+    almacenamiento por contenido se ignoran. No hace commit.
+    """
+    key = key_from_url(url_or_key)
+    if key is None:
+        return False
+    table = StoredFile.__table__
+    result = session.execute(
+        update(table).where(table.c.key == key, table.c.ref_count > 0).values(
+            ref_count=table.c.ref_count - 1, updated_at=datetime.now(COLOMBIA_TZ)))
+    return bool(result.rowcount)
+
+
+class ContentStore:
+    """
+    Almacenamiento de subidas por contenido.
+
+    - La subida se escribe por bloques en un archivo temporal mientras se
+      calcula su SHA-256; la llave es el hash, así que el mismo documento
+      subido dos veces ocupa un solo archivo.
+    - Cada subida suma una referencia en stored_file y reemplazar o borrar un
+      documento la resta (release). La referencia se registra antes de mover
+      el archivo, así el recolector nunca borra un archivo recién subido.
+    - Las URL son estables e inmutables (caché de un año); signed_url da una
+      URL con vencimiento para documentos privados.
+    """
+
+    def __init__(self, backend=None, staging_dir: Optional[str] = None):
+        self.backend = backend or build_storage_backend()
+        self.staging_dir = staging_dir or settings.STORAGE_STAGING_DIR
+
+    def _staging_path(self) -> str:
+        return os.path.join(self.staging_dir, uuid.uuid4().hex)
+
+    def _commit(self, staging: str, saved: SavedUpload, extension: str,
+                content_type: Optional[str], session: Optional[Session]) -> StoredObject:
+        key = content_key(saved.sha256, extension)
+        try:
+            if session is None:
+                from app.core.db import engine
+                with Session(engine) as own_session:
+                    add_reference(own_session, key, saved, content_type)
+                    own_session.commit()
+                    try:
+                        written = self.backend.put_file(staging, key, content_type)
+                    except Exception:
+                        release_reference(own_session, key)
+                        own_session.commit()
+                        raise
+            else:
+                add_reference(session, key, saved, content_type)
+                written = self.backend.put_file(staging, key, content_type)
+        finally:
+            if os.path.exists(staging):
+                os.remove(staging)
+        if written and isinstance(self.backend, LocalStorageBackend):
+            schedule_thumbnail(self.backend.path_for(key))
+        return StoredObject(key, saved.sha256, saved.size, self.backend.url_for(key))
+
+    async def put_upload(self, file: UploadFile, max_size: Optional[int] = None,
+                         session: Optional[Session] = None) -> StoredObject:
+        staging = self._staging_path()
+        saved = await save_upload_stream(file, staging, max_size=max_size)
+        extension = os.path.splitext(file.filename or "")[1]
+        return await asyncio.to_thread(
+            self._commit, staging, saved, extension, file.content_type, session)
+
+    def put_upload_sync(self, source: BinaryIO, filename: Optional[str],
+                        content_type: Optional[str] = None, max_size: Optional[int] = None,
+                        session: Optional[Session] = None) -> StoredObject:
+        staging = self._staging_path()
+        saved = save_upload_stream_sync(source, staging, max_size=max_size)
+        extension = os.path.splitext(filename or "")[1]
+        return self._commit(staging, saved, extension, content_type, session)
+
+    def url_for(self, key: str) -> str:
+        return self.backend.url_for(key)
+
+    def signed_url(self, url_or_key: str, ttl: Optional[int] = None) -> str:
+        key = key_from_url(url_or_key)
+        if key is None:
+            return url_or_key
+        return self.backend.signed_url(key, ttl)
+
+    def collect_garbage(self, session: Session, grace_seconds: Optional[float] = None,
+                        limit: int = 500) -> int:
+        """
+        Borra los archivos sin referencias desde hace más de `grace_seconds`.
+        Las filas se bloquean (FOR UPDATE SKIP LOCKED) mientras se borra el
+        archivo: una subida concurrente del mismo contenido espera y vuelve a
+        crear la fila y el archivo.
+        """
+        grace = grace_seconds if grace_seconds is not None else settings.STORAGE_GC_GRACE_SECONDS
+        cutoff = datetime.now(COLOMBIA_TZ) - timedelta(seconds=grace)
+        table = StoredFile.__table__
+        keys = session.execute(
+            select(table.c.key)
+            .where(table.c.ref_count <= 0, table.c.updated_at < cutoff)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        deleted = []
+        for key in keys:
+            try:
+                self.backend.delete(key)
+                deleted.append(key)
+            except Exception as e:
+                logger.error("No se pudo borrar el archivo %s: %s", key, e)
+        if deleted:
+            session.execute(delete(table).where(table.c.key.in_(deleted)))
+        session.commit()
+        return len(deleted)
+
+
+def collect_stored_files_job(session: Session) -> Dict:
+    return {"deleted_files": get_content_store().collect_garbage(session)}
+
+
+_store: Optional[ContentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_content_store() -> ContentStore:
+    """
+    Retorna el almacenamiento del proceso, creándolo la primera vez.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ContentStore()
+        return _store
+
+
+def set_content_store(store: Optional[ContentStore]) -> None:
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,118 @@
+from sqlmodel import Session
+from app.core.config import settings
+from app.core.leader_lock import LeaderLock
+from app.core.scheduler import MaintenanceScheduler
+from app.models.maintenance_job_run import COLOMBIA_TZ, MaintenanceJobRun
+from app.services.statistics_service import StatisticsService
+from app.services.verify_docs_service import VerifyDocsService
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.request_expiry_service import expire_stale_requests_job
+from app.services.file_storage_service import collect_stored_files_job
+from app.services.verification_counter_service import reconcile_verification_counters_job
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Solo un worker ejecuta los jobs de mantenimiento
+MAINTENANCE_LEADER_LOCK_KEY = 99_000_003
+
+
+def _with_session(job: Callable[[Session], Any]) -> Any:
+    from app.core.db import engine
+    with Session(engine) as session:
+        return job(session)
+
+
+def record_job_run(session: Session, name: str, result: Dict) -> None:
+    """
+    Guarda el último resultado del job para que lo lean todos los workers.
+    """
+    session.merge(MaintenanceJobRun(name=name, result=result,
+                                    finished_at=datetime.now(COLOMBIA_TZ)))
+    session.commit()
+
+
+def get_last_job_run(session: Session, name: str) -> Optional[MaintenanceJobRun]:
+    return session.get(MaintenanceJobRun, name)
+
+
+def lift_suspensions_job(session: Session) -> Dict:
+    """
+    Levanta las suspensiones de conductores cuyo tiempo ya se cumplió.
+    """
+    result = StatisticsService(session).batch_check_all_suspended_drivers()
+    summary = {
+        "total_suspended_drivers": result["total_suspended_drivers"],
+        "suspensions_lifted": result["suspensions_lifted"],
+        "still_suspended": result["still_suspended"],
+    }
+    record_job_run(session, "lift_suspensions", summary)
+    return summary
+
+
+def expire_documents_job(session: Session) -> Dict:
+    return {"expired_documents": VerifyDocsService(session).update_expired_documents()}
+
+
+def cleanup_refresh_tokens_job(session: Session) -> Dict:
+    """
+    En PostgreSQL crea las particiones de los próximos meses y elimina las
+    vencidas; luego borra los tokens vencidos que queden (mes en curso,
+    partición por defecto u otros motores).
+    """
+    service = RefreshTokenService(session)
+    result = service.maintain_partitions()
+    result["deleted_tokens"] = service.cleanup_expired_tokens()
+    return result
+
+
+def build_maintenance_scheduler() -> MaintenanceScheduler:
+    scheduler = MaintenanceScheduler(
+        leader_lock=LeaderLock(MAINTENANCE_LEADER_LOCK_KEY))
+    jitter = settings.MAINTENANCE_JITTER
+    scheduler.add_job("lift_suspensions", partial(_with_session, lift_suspensions_job),
+                      settings.SUSPENSION_SWEEP_SECONDS, jitter)
+    scheduler.add_job("expire_documents", partial(_with_session, expire_documents_job),
+                      settings.DOCUMENT_EXPIRY_SWEEP_SECONDS, jitter)
+    scheduler.add_job("cleanup_refresh_tokens", partial(_with_session, cleanup_refresh_tokens_job),
+                      settings.REFRESH_TOKEN_CLEANUP_SECONDS, jitter)
+    scheduler.add_job("collect_stored_files", partial(_with_session, collect_stored_files_job),
+                      settings.STORAGE_GC_SECONDS, jitter)
+    scheduler.add_job("reconcile_verification_counters",
+                      partial(_with_session, reconcile_verification_counters_job),
+                      settings.VERIFICATION_COUNTERS_RECONCILE_SECONDS, jitter)
+    if settings.REQUEST_EXPIRY_ENABLED:
+        scheduler.add_job("expire_client_requests", partial(_with_session, expire_stale_requests_job),
+                          settings.REQUEST_EXPIRY_SWEEP_SECONDS, jitter)
+    return scheduler
+
+
+_scheduler: Optional[MaintenanceScheduler] = None
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    """
+    Retorna el planificador de mantenimiento del proceso, creándolo la primera vez.
+    """
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = build_maintenance_scheduler()
+    return _scheduler
+
+
+def set_maintenance_scheduler(scheduler: Optional[MaintenanceScheduler]) -> None:
+    global _scheduler
+    _scheduler = scheduler
+
+
+async def start_maintenance() -> None:
+    if settings.MAINTENANCE_ENABLED:
+        get_maintenance_scheduler().start()
+
+
+async def shutdown_maintenance() -> None:
+    if _scheduler is not None:
+        await _scheduler.stop()
@@ -69,14 +69,15 @@ class NotificationService:
                 logger.warning(f"No hay tokens activos para usuario {user_id}")
                 return {"success": 0, "failed": 0, "error": "No tokens available"}
 
-            result = self.fcm_service.send_notification(
+            result = self.fcm_service.enqueue_notification(
+                user_id=user_id,
                 tokens=tokens,
                 title=notification_data["title"],
                 body=notification_data["body"],
                 data=notification_data.get("data", {})
             )
 
-            logger.info(f"Notificación enviada a usuario {user_id}: {result}")
+            logger.info(f"Notificación encolada para usuario {user_id}: {result}")
             return result
 
         except Exception as e:
@@ -84,6 +85,74 @@ class NotificationService:
                 f"Error enviando notificación a usuario {user_id}: {e}")
             return {"success": 0, "failed": 0, "error": str(e)}
 
+    def _get_tokens_by_user(self, user_ids: List[UUID]) -> Dict[UUID, List[str]]:
+        """
+        Obtiene los tokens FCM activos de varios usuarios en una sola consulta.
+
+        Args:
+            user_ids: IDs de los usuarios
+
+        Returns:
+            Diccionario user_id -> lista de tokens activos
+        """
+        tokens_by_user: Dict[UUID, List[str]] = {}
+        if not user_ids:
+            return tokens_by_user
+
+        rows = self.session.exec(
+            select(UserFCMToken.user_id, UserFCMToken.fcm_token).where(
+                UserFCMToken.user_id.in_(set(user_ids)),
+                UserFCMToken.is_active == True
+            )
+        ).all()
+        for user_id, fcm_token in rows:
+            tokens_by_user.setdefault(user_id, []).append(fcm_token)
+        return tokens_by_user
+
+    def _get_drivers_info(self, driver_ids: List[UUID]) -> Dict[UUID, Dict[str, Any]]:
+        """
+        Obtiene la información de varios conductores para las notificaciones,
+        con una consulta por entidad (User, DriverInfo, VehicleInfo).
+
+        Args:
+            driver_ids: IDs de los conductores
+
+        Returns:
+            Diccionario driver_id -> información del conductor
+        """
+        unique_ids = set(driver_ids)
+        if not unique_ids:
+            return {}
+
+        users = self.session.exec(
+            select(User).where(User.id.in_(unique_ids))
+        ).all()
+        driver_infos = self.session.exec(
+            select(DriverInfo).where(DriverInfo.user_id.in_(unique_ids))
+        ).all()
+        driver_info_by_user = {info.user_id: info for info in driver_infos}
+
+        vehicle_by_driver_info = {}
+        if driver_infos:
+            vehicles = self.session.exec(
+                select(VehicleInfo).where(VehicleInfo.driver_info_id.in_(
+                    [info.id for info in driver_infos]))
+            ).all()
+            vehicle_by_driver_info = {
+                vehicle.driver_info_id: vehicle for vehicle in vehicles}
+
+        drivers = {}
+        for driver in users:
+            driver_info = driver_info_by_user.get(driver.id)
+            vehicle_info = vehicle_by_driver_info.get(
+                driver_info.id) if driver_info else None
+            drivers[driver.id] = {
+                "name": f"{driver_info.first_name} {driver_info.last_name}" if driver_info else "Conductor",
+                "vehicle": f"{vehicle_info.brand} {vehicle_info.model} - {vehicle_info.plate}" if vehicle_info else "Vehículo",
+                "full_name": driver.full_name
+            }
+        return drivers
+
     def _get_driver_info(self, driver_id: UUID) -> Optional[Dict[str, Any]]:
         """
         Obtiene información del conductor para las notificaciones.
@@ -95,29 +164,106 @@ class NotificationService:
             Diccionario con información del conductor
         """
         try:
-            driver = self.session.get(User, driver_id)
-            if not driver:
-                return None
+            return self._get_drivers_info([driver_id]).get(driver_id)
+        except Exception as e:
+            logger.error(
+                f"Error obteniendo información del conductor {driver_id}: {e}")
+            return None
+
+    # ===== ENVÍO MASIVO =====
 
-            driver_info = self.session.exec(
-                select(DriverInfo).where(DriverInfo.user_id == driver_id)
-            ).first()
+    def send_batch_notification(self, user_ids: List[UUID], notification_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Envía una misma notificación ya renderizada a muchos usuarios.
+        Los tokens de todos los destinatarios se resuelven en una sola consulta
+        y el despachador agrupa los envíos en lotes.
+
+        Args:
+            user_ids: IDs de los usuarios destinatarios
+            notification_data: Datos de la notificación (title, body, data)
 
-            vehicle_info = None
-            if driver_info:
-                vehicle_info = self.session.exec(
-                    select(VehicleInfo).where(VehicleInfo.user_id == driver_id)
-                ).first()
+        Returns:
+            Resultado agregado del encolado
+        """
+        try:
+            tokens_by_user = self._get_tokens_by_user(user_ids)
+            queued = 0
+            for user_id, tokens in tokens_by_user.items():
+                result = self.fcm_service.enqueue_notification(
+                    user_id=user_id,
+                    tokens=tokens,
+                    title=notification_data["title"],
+                    body=notification_data["body"],
+                    data=notification_data.get("data", {})
+                )
+                queued += result.get("queued", 0)
 
+            recipients = len(tokens_by_user)
+            logger.info(
+                f"Notificación masiva encolada para {recipients} de {len(set(user_ids))} usuarios ({queued} tokens)")
             return {
-                "name": f"{driver_info.first_name} {driver_info.last_name}" if driver_info else "Conductor",
-                "vehicle": f"{vehicle_info.brand} {vehicle_info.model} - {vehicle_info.plate}" if vehicle_info else "Vehículo",
-                "full_name": driver.full_name
+                "success": 0,
+                "failed": 0,
+                "queued": queued,
+                "recipients": recipients,
+                "without_tokens": len(set(user_ids)) - recipients
             }
+        except Exception as e:
+            logger.error(f"Error enviando notificación masiva: {e}")
+            return {"success": 0, "failed": 0, "error": str(e)}
+
+    def notify_new_request_nearby(self, request_id: UUID, driver_ids: List[UUID]) -> Dict[str, Any]:
+        """
+        Notifica a un conjunto de conductores (por ejemplo, los cercanos) que
+        hay una nueva solicitud de viaje. La plantilla se renderiza una sola vez.
+
+        Args:
+            request_id: ID de la solicitud
+            driver_ids: IDs de los conductores a notificar
+
+        Returns:
+            Resultado agregado del envío
+        """
+        try:
+            client_request = self.session.get(ClientRequest, request_id)
+            if not client_request:
+                logger.error(f"Solicitud {request_id} no encontrada")
+                return {"success": 0, "failed": 0, "error": "Request not found"}
+
+            notification = NotificationTemplates.new_request_nearby(
+                request_id=request_id,
+                pickup_address=client_request.pickup_description or "Punto de recogida",
+                destination_address=client_request.destination_description or "Destino",
+                fare=client_request.fare_offered or 0
+            )
+
+            return self.send_batch_notification(driver_ids, notification)
+
+        except Exception as e:
+            logger.error(f"Error notificando nueva solicitud cercana: {e}")
+            return {"success": 0, "failed": 0, "error": str(e)}
+
+    def notify_drivers(self, driver_ids: List[UUID], template_name: str, **template_args) -> Dict[str, Any]:
+        """
+        Renderiza una vez una plantilla de NotificationTemplates y la envía a
+        varios conductores (por ejemplo, todos los que tienen solicitudes pendientes).
+
+        Args:
+            driver_ids: IDs de los conductores
+            template_name: Nombre del método de NotificationTemplates
+            template_args: Argumentos de la plantilla
+
+        Returns:
+            Resultado agregado del envío
+        """
+        try:
+            template = getattr(NotificationTemplates, template_name)
+            notification = template(**template_args)
+            return self.send_batch_notification(driver_ids, notification)
         except Exception as e:
             logger.error(
-                f"Error obteniendo información del conductor {driver_id}: {e}")
-            return None
+                f"Error notificando a conductores con plantilla {template_name}: {e}")
+            return {"success": 0, "failed": 0, "error": str(e)}
 
     # ===== MÉTODOS DE NOTIFICACIONES PARA CLIENTES =====
 
@@ -441,6 +587,12 @@ class NotificationService:
             logger.error(f"Error enviando notificación personalizada: {e}")
             return {"success": 0, "failed": 0, "error": str(e)}
 
+    def send_push_notification(self, user_id: UUID, title: str, body: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Alias de send_custom_notification usado por los eventos de Socket.IO.
+        """
+        return self.send_custom_notification(user_id, title, body, data)
+
     # ===== MÉTODOS DE NOTIFICACIONES PARA SOLICITUDES PENDIENTES =====
 
     def notificar_solicitud_pendiente(self, request_id: UUID, driver_id: UUID, estimated_wait_time: int) -> Dict[str, Any]:
@@ -0,0 +1,193 @@
+from sqlmodel import Session
+from sqlalchemy import and_, func, select
+from app.models.client_request import ClientRequest
+from app.models.driver_trip_offer import DriverTripOffer, DriverTripOfferResponse
+from app.models.driver_response import UserResponse, DriverInfoResponse, VehicleInfoResponse
+from app.models.user import User
+from app.models.driver_info import DriverInfo
+from app.models.vehicle_info import VehicleInfo
+from app.models.driver_position import DriverPosition
+from app.models.rating_summary import RatingSummary
+from app.services.rating_summary_service import DRIVER_ROLE
+from app.utils.geo_utils import wkb_to_coords, get_times_and_distances_from_google
+from app.core.config import settings
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+from uuid import UUID
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def offer_set_version(session: Session, id_client_request: UUID) -> Tuple:
+    """
+    Versión del conjunto de ofertas de una solicitud: cambia cuando llega una
+    oferta nueva o se modifica una existente.
+    """
+    count, last_update = session.execute(
+        select(func.count(DriverTripOffer.id), func.max(DriverTripOffer.updated_at))
+        .where(DriverTripOffer.id_client_request == id_client_request)
+    ).one()
+    return (count, last_update)
+
+
+def build_offer_views(session: Session, client_request: ClientRequest) -> List[DriverTripOfferResponse]:
+    """
+    Construye la lista de ofertas de una solicitud con una sola consulta
+    (oferta, conductor, vehículo, posición y calificación precalculada) y una
+    sola consulta a Distance Matrix con todos los conductores como origen.
+    """
+    rows = session.execute(
+        select(
+            DriverTripOffer,
+            User,
+            DriverInfo,
+            VehicleInfo,
+            DriverPosition.position,
+            func.coalesce(RatingSummary.average, 0.0)
+        )
+        .join(User, User.id == DriverTripOffer.id_driver)
+        .outerjoin(DriverInfo, DriverInfo.user_id == User.id)
+        .outerjoin(VehicleInfo, VehicleInfo.driver_info_id == DriverInfo.id)
+        .outerjoin(DriverPosition, DriverPosition.id_driver == User.id)
+        .outerjoin(RatingSummary, and_(
+            RatingSummary.user_id == User.id,
+            RatingSummary.role == DRIVER_ROLE
+        ))
+        .where(DriverTripOffer.id_client_request == client_request.id)
+        .order_by(DriverTripOffer.created_at)
+    ).all()
+
+    # Tiempo y distancia hasta el punto de recogida para todos los conductores con posición
+    pickup_coords = wkb_to_coords(client_request.pickup_position)
+    driver_coords = [wkb_to_coords(row[4]) for row in rows]
+    located = [index for index, coords in enumerate(driver_coords) if coords]
+    etas = [(None, None)] * len(rows)
+    if located and pickup_coords:
+        matrix = get_times_and_distances_from_google(
+            [(driver_coords[i]['lat'], driver_coords[i]['lng']) for i in located],
+            pickup_coords['lat'], pickup_coords['lng']
+        )
+        for index, eta in zip(located, matrix):
+            etas[index] = eta
+
+    result = []
+    for (offer, user, driver_info, vehicle_info, _, average_rating), coords, (distance_to_pickup, time_to_pickup) in zip(rows, driver_coords, etas):
+        if coords:
+            # Convertir tiempo de segundos a minutos
+            time_to_pickup_minutes = (
+                time_to_pickup / 60) if time_to_pickup is not None else 0
+            # Usar los valores calculados o los valores guardados en la oferta como fallback
+            time_to_return = time_to_pickup_minutes if time_to_pickup_minutes > 0 else (
+                offer.time or 15)
+            distance_to_return = distance_to_pickup if distance_to_pickup is not None else (
+                offer.distance or 5.0)
+        else:
+            # Si no hay posición del conductor, usar los valores guardados en la oferta
+            time_to_return = offer.time
+            distance_to_return = offer.distance
+            logger.warning(
+                "Conductor %s no tiene posición definida, usando valores guardados: %sm, %smin", offer.id_driver, distance_to_return, time_to_return)
+
+        result.append(DriverTripOfferResponse(
+            id=offer.id,
+            client_request_id=offer.id_client_request,
+            fare_offer=offer.fare_offer,
+            time=time_to_return,
+            distance=distance_to_return,
+            created_at=str(offer.created_at),
+            updated_at=str(offer.updated_at),
+            user=UserResponse(
+                id=user.id,
+                full_name=user.full_name,
+                country_code=user.country_code,
+                phone_number=user.phone_number,
+                selfie_url=user.selfie_url
+            ),
+            driver_info=DriverInfoResponse(
+                first_name=driver_info.first_name,
+                last_name=driver_info.last_name,
+                birth_date=str(driver_info.birth_date),
+                email=driver_info.email
+            ) if driver_info else None,
+            vehicle_info=VehicleInfoResponse(
+                brand=vehicle_info.brand,
+                model=vehicle_info.model,
+                model_year=vehicle_info.model_year,
+                color=vehicle_info.color,
+                plate=vehicle_info.plate,
+                vehicle_type_id=vehicle_info.vehicle_type_id
+            ) if vehicle_info else None,
+            average_rating=float(average_rating)
+        ))
+    return result
+
+
+class OfferViewCache:
+    """
+    Memoriza la vista de ofertas por (solicitud, versión del conjunto de ofertas).
+    Mientras el pasajero consulta la lista y no llegan ofertas nuevas se reutiliza
+    la misma respuesta; pasados `ttl` segundos se recalcula para refrescar los ETA.
+    """
+
+    def __init__(self, ttl: Optional[float] = None, max_entries: int = 1000):
+        self.ttl = settings.OFFER_VIEW_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[UUID, Tuple[Tuple, float, List[DriverTripOfferResponse]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get_or_build(self, id_client_request: UUID, version: Tuple,
+                     builder: Callable[[], List[DriverTripOfferResponse]]) -> List[DriverTripOfferResponse]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(id_client_request)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(id_client_request)
+                self.stats["hits"] += 1
+                return entry[2]
+            self.stats["misses"] += 1
+
+        views = builder()
+
+        with self._lock:
+            self._entries[id_client_request] = (
+                version, time.monotonic() + self.ttl, views)
+            self._entries.move_to_end(id_client_request)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return views
+
+    def invalidate(self, id_client_request: UUID) -> None:
+        with self._lock:
+            self._entries.pop(id_client_request, None)
+
+
+_cache: Optional[OfferViewCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_offer_view_cache() -> OfferViewCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OfferViewCache()
+        return _cache
+
+
+def set_offer_view_cache(cache: Optional[OfferViewCache]) -> None:
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def get_offer_views(session: Session, client_request: ClientRequest) -> List[DriverTripOfferResponse]:
+    """
+    Vista de ofertas de la solicitud, memorizada mientras no cambien sus ofertas.
+    """
+    version = offer_set_version(session, client_request.id)
+    return get_offer_view_cache().get_or_build(
+        client_request.id, version,
+        lambda: build_offer_views(session, client_request))
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.models.project_settings import ProjectSettings, ProjectSettingsUpdate, ProjectSettingsCreate
+from app.services.config_cache_service import get_project_settings, invalidate_project_settings
 from datetime import datetime
 from typing import Dict
 
@@ -9,7 +10,7 @@ def get_busy_driver_config(session: Session) -> Dict[str, float]:
     """
     Obtiene la configuración para conductores ocupados desde project_settings
     """
-    settings = session.query(ProjectSettings).first()
+    settings = get_project_settings(session)
     if not settings:
         # Valores por defecto si no hay configuración
         return {
@@ -55,6 +56,7 @@ def update_project_settings_service(session: Session, settings_data: ProjectSett
         session.add(settings)
         session.commit()
         session.refresh(settings)
+        invalidate_project_settings()
         return settings
     except Exception as e:
         session.rollback()
@@ -95,6 +97,7 @@ def create_project_settings_service(session: Session, settings_data: ProjectSett
         session.add(settings)
         session.commit()
         session.refresh(settings)
+        invalidate_project_settings()
         return settings
     except Exception as e:
         session.rollback()
@@ -0,0 +1,368 @@
+from sqlmodel import Session
+from sqlalchemy import update
+from app.models.user_fcm_token import UserFCMToken
+from app.core.config import settings
+from app.core import firebase_config  # Inicializa Firebase al importar el módulo
+from firebase_admin import messaging
+from dataclasses import dataclass, field
+from uuid import UUID
+from typing import List, Optional, Dict, Any, Tuple
+import threading
+import logging
+import queue
+import time
+
+logger = logging.getLogger(__name__)
+
+# Límite de tokens por llamada a FCM (restricción de la API de Firebase)
+MAX_TOKENS_PER_BATCH = 500
+
+
+class FirebasePushClient:
+    """
+    Cliente de envío real contra Firebase Cloud Messaging.
+    """
+
+    def send(self, tokens: List[str], title: str, body: str, data: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """
+        Envía una notificación a un lote de tokens (máximo MAX_TOKENS_PER_BATCH).
+        Retorna un dict con success, failed e invalid_tokens (tokens que FCM
+        reporta como no registrados y deben desactivarse).
+        """
+        message = messaging.MulticastMessage(
+            tokens=tokens,
+            notification=messaging.Notification(title=title, body=body),
+            data=data or {}
+        )
+        try:
+            response = messaging.send_each_for_multicast(message)
+        except ValueError as e:
+            # Firebase no está configurado (caso de tests)
+            if "The default Firebase app does not exist" in str(e):
+                logger.warning(
+                    "Firebase no configurado - simulando envío de notificación")
+                return {"success": len(tokens), "failed": 0, "invalid_tokens": [], "simulated": True}
+            raise
+
+        invalid_tokens = [
+            token for token, token_response in zip(tokens, response.responses)
+            if not token_response.success and isinstance(
+                token_response.exception,
+                (messaging.UnregisteredError, messaging.SenderIdMismatchError)
+            )
+        ]
+        return {
+            "success": response.success_count,
+            "failed": response.failure_count,
+            "invalid_tokens": invalid_tokens
+        }
+
+
+class FakePushClient:
+    """
+    Cliente local que no contacta a Firebase. Registra los lotes enviados y
+    reporta como no registrados los tokens indicados en invalid_tokens.
+    Se usa en tests y benchmarks.
+    """
+
+    def __init__(self, invalid_tokens: Optional[List[str]] = None, latency: float = 0.0):
+        self.invalid_tokens = set(invalid_tokens or [])
+        self.latency = latency
+        self.sent: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def send(self, tokens: List[str], title: str, body: str, data: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        invalid = [token for token in tokens if token in self.invalid_tokens]
+        with self._lock:
+            self.sent.append({
+                "tokens": list(tokens),
+                "title": title,
+                "body": body,
+                "data": dict(data or {})
+            })
+        return {
+            "success": len(tokens) - len(invalid),
+            "failed": len(invalid),
+            "invalid_tokens": invalid
+        }
+
+
+def build_push_client():
+    """
+    Construye el cliente de envío según PUSH_CLIENT_BACKEND ("firebase" o "fake").
+    """
+    if settings.PUSH_CLIENT_BACKEND == "fake":
+        return FakePushClient()
+    return FirebasePushClient()
+
+
+def deactivate_invalid_tokens(session: Session, tokens: List[str]) -> int:
+    """
+    Desactiva en un solo UPDATE los tokens que FCM reportó como no registrados.
+    Retorna el número de tokens desactivados.
+    """
+    if not tokens:
+        return 0
+    result = session.execute(
+        update(UserFCMToken).where(
+            UserFCMToken.fcm_token.in_(tokens),
+            UserFCMToken.is_active == True
+        ).values(is_active=False).execution_options(synchronize_session=False)
+    )
+    session.commit()
+    return result.rowcount
+
+
+def send_in_batches(client, tokens: List[str], title: str, body: str, data: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Envía una notificación partiendo los tokens en lotes de MAX_TOKENS_PER_BATCH
+    y acumula el resultado de todos los lotes.
+    """
+    result = {"success": 0, "failed": 0, "invalid_tokens": []}
+    unique_tokens = list(dict.fromkeys(tokens))
+    for start in range(0, len(unique_tokens), MAX_TOKENS_PER_BATCH):
+        batch = unique_tokens[start:start + MAX_TOKENS_PER_BATCH]
+        try:
+            batch_result = client.send(batch, title, body, data)
+        except Exception as e:
+            logger.error(f"Error enviando lote FCM de {len(batch)} tokens: {e}")
+            result["failed"] += len(batch)
+            result["error"] = str(e)
+            continue
+        result["success"] += batch_result.get("success", 0)
+        result["failed"] += batch_result.get("failed", 0)
+        result["invalid_tokens"].extend(
+            batch_result.get("invalid_tokens", []))
+        if batch_result.get("simulated"):
+            result["simulated"] = True
+    return result
+
+
+@dataclass
+class PushMessage:
+    user_id: UUID
+    tokens: List[str]
+    title: str
+    body: str
+    data: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def coalesce_key(self) -> Tuple[UUID, Tuple]:
+        # Solo se fusionan duplicados exactos para el mismo usuario: dos
+        # notificaciones distintas (p. ej. dos ofertas) se envían ambas
+        return (self.user_id, self.payload_key)
+
+    @property
+    def payload_key(self) -> Tuple[str, str, Tuple]:
+        return (self.title, self.body, tuple(sorted(self.data.items())))
+
+
+class PushDispatcher:
+    """
+    Despacho no bloqueante de notificaciones push.
+
+    - Cola de salida atendida por un pool de hilos, para no bloquear
+      handlers HTTP ni eventos de socket.
+    - Un mensaje idéntico a otro pendiente para el mismo usuario se descarta.
+    - Los mensajes con idéntico contenido se agrupan en lotes de hasta
+      MAX_TOKENS_PER_BATCH tokens por llamada.
+    - Los tokens no registrados se desactivan en la base de datos.
+    """
+
+    def __init__(self, client=None, workers: Optional[int] = None, linger: Optional[float] = None, session_factory=None):
+        self.client = client or build_push_client()
+        self.workers = workers or settings.PUSH_DISPATCH_WORKERS
+        self.linger = settings.PUSH_DISPATCH_LINGER_MS / 1000 if linger is None else linger
+        self._session_factory = session_factory
+        self._pending: Dict[Tuple[UUID, Tuple], PushMessage] = {}
+        self._queue: "queue.Queue[Optional[Tuple[UUID, Tuple]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+        self._in_flight = 0
+        self._idle = threading.Condition(self._lock)
+        self.stats = {"enqueued": 0, "coalesced": 0,
+                      "sent": 0, "failed": 0, "deactivated": 0}
+
+    # ----- ciclo de vida -----
+
+    def start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker, name=f"push-dispatch-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Vacía la cola y detiene los hilos de trabajo.
+        """
+        self.flush(timeout)
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join(timeout)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Espera a que no queden mensajes pendientes ni en curso.
+        """
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending or self._in_flight:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    # ----- API pública -----
+
+    def enqueue(self, user_id: UUID, tokens: List[str], title: str, body: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Encola una notificación para un usuario y retorna inmediatamente.
+        """
+        if not tokens:
+            return {"success": 0, "failed": 0, "queued": 0}
+
+        message = PushMessage(
+            user_id=user_id,
+            tokens=list(tokens),
+            title=title,
+            body=body,
+            data={key: str(value) for key, value in (data or {}).items()}
+        )
+        self.start()
+        with self._lock:
+            key = message.coalesce_key
+            self.stats["enqueued"] += 1
+            if key in self._pending:
+                self._pending[key] = message
+                self.stats["coalesced"] += 1
+                return {"success": 0, "failed": 0, "queued": len(message.tokens), "coalesced": True}
+            self._pending[key] = message
+        self._queue.put(key)
+        return {"success": 0, "failed": 0, "queued": len(message.tokens)}
+
+    # ----- hilos de trabajo -----
+
+    def _take_batch(self, first_key) -> List[PushMessage]:
+        """
+        Toma el mensaje indicado y los que lleguen durante la ventana de espera
+        (linger), hasta MAX_TOKENS_PER_BATCH mensajes.
+        """
+        keys = [first_key]
+        deadline = time.monotonic() + self.linger
+        while len(keys) < MAX_TOKENS_PER_BATCH:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    key = self._queue.get(timeout=remaining)
+                else:
+                    key = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if key is None:
+                # Señal de parada: se devuelve para que otro hilo la consuma
+                self._queue.put(None)
+                break
+            keys.append(key)
+
+        with self._lock:
+            messages = [self._pending.pop(key)
+                        for key in keys if key in self._pending]
+            self._in_flight += len(messages)
+        return messages
+
+    def _worker(self) -> None:
+        while True:
+            key = self._queue.get()
+            if key is None:
+                return
+            messages = self._take_batch(key)
+            try:
+                self._deliver(messages)
+            except Exception as e:
+                logger.error(f"Error en despacho de notificaciones push: {e}")
+            finally:
+                with self._idle:
+                    self._in_flight -= len(messages)
+                    self._idle.notify_all()
+
+    def _deliver(self, messages: List[PushMessage]) -> None:
+        grouped: Dict[Tuple, List[PushMessage]] = {}
+        for message in messages:
+            grouped.setdefault(message.payload_key, []).append(message)
+
+        invalid_tokens: List[str] = []
+        for group in grouped.values():
+            sample = group[0]
+            tokens = [token for message in group for token in message.tokens]
+            result = send_in_batches(
+                self.client, tokens, sample.title, sample.body, sample.data)
+            invalid_tokens.extend(result["invalid_tokens"])
+            with self._lock:
+                self.stats["sent"] += result["success"]
+                self.stats["failed"] += result["failed"]
+
+        if invalid_tokens:
+            deactivated = self._deactivate(invalid_tokens)
+            with self._lock:
+                self.stats["deactivated"] += deactivated
+
+    def _deactivate(self, tokens: List[str]) -> int:
+        if self._session_factory is None:
+            from app.core.db import engine
+            session = Session(engine)
+        else:
+            session = self._session_factory()
+        try:
+            return deactivate_invalid_tokens(session, tokens)
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Error desactivando tokens FCM inválidos: {e}")
+            return 0
+        finally:
+            session.close()
+
+
+_dispatcher: Optional[PushDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_push_dispatcher() -> PushDispatcher:
+    """
+    Retorna el despachador del proceso, creándolo la primera vez.
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = PushDispatcher()
+        return _dispatcher
+
+
+def set_push_dispatcher(dispatcher: Optional[PushDispatcher]) -> None:
+    """
+    Reemplaza el despachador del proceso (por ejemplo, con un FakePushClient en tests).
+    """
+    global _dispatcher
+    with _dispatcher_lock:
+        previous, _dispatcher = _dispatcher, dispatcher
+    if previous is not None and previous is not dispatcher:
+        previous.stop()
+
+
+def shutdown_push_dispatcher(timeout: float = 5.0) -> None:
+    """
+    Vacía la cola pendiente y detiene los hilos. Se llama al cerrar la aplicación.
+    """
+    with _dispatcher_lock:
+        dispatcher = _dispatcher
+    if dispatcher is not None:
+        dispatcher.stop(timeout)
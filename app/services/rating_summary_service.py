@@ -0,0 +1,138 @@
+from sqlmodel import Session
+from sqlalchemy import and_, delete, func, insert, literal, select, update
+from app.models.client_request import ClientRequest, StatusEnum
+from app.models.rating_summary import RatingSummary
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from uuid import UUID
+import logging
+import pytz
+
+logger = logging.getLogger(__name__)
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+DRIVER_ROLE = "driver"
+PASSENGER_ROLE = "passenger"
+
+# Columna de client_request que califica a cada rol y columna del usuario calificado
+_ROLE_COLUMNS = {
+    DRIVER_ROLE: (ClientRequest.driver_rating, ClientRequest.id_driver_assigned),
+    PASSENGER_ROLE: (ClientRequest.client_rating, ClientRequest.id_client),
+}
+
+
+def record_rating(session: Session, user_id: UUID, role: str, rating: float) -> None:
+    """
+    Suma una calificación al acumulado del usuario en el rol indicado.
+    No hace commit: se confirma junto con la calificación del viaje.
+    """
+    table = RatingSummary.__table__
+    now = datetime.now(COLOMBIA_TZ)
+    result = session.execute(
+        update(table).where(
+            and_(table.c.user_id == user_id, table.c.role == role)
+        ).values(
+            rating_sum=table.c.rating_sum + rating,
+            rating_count=table.c.rating_count + 1,
+            average=(table.c.rating_sum + rating) / (table.c.rating_count + 1),
+            updated_at=now
+        )
+    )
+    if result.rowcount == 0:
+        session.execute(insert(table).values(
+            user_id=user_id,
+            role=role,
+            rating_sum=rating,
+            rating_count=1,
+            average=rating,
+            updated_at=now
+        ))
+
+
+def record_paid_trip_ratings(session: Session, client_request: ClientRequest) -> None:
+    """
+    Al pasar un viaje a PAID, agrega al acumulado las calificaciones que ya
+    tuviera (las calificaciones posteriores se suman al calificar).
+    """
+    for role, (rating_column, user_column) in _ROLE_COLUMNS.items():
+        rating = getattr(client_request, rating_column.key)
+        user_id = getattr(client_request, user_column.key)
+        if rating is not None and user_id is not None:
+            record_rating(session, user_id, role, rating)
+
+
+def get_average_ratings(session: Session, role: str, user_ids: Iterable[UUID]) -> Dict[UUID, float]:
+    """
+    Promedio de calificación de varios usuarios en una sola consulta.
+    Los usuarios sin calificaciones quedan con 0.0.
+    """
+    ids = list({user_id for user_id in user_ids if user_id is not None})
+    averages = {user_id: 0.0 for user_id in ids}
+    if not ids:
+        return averages
+    rows = session.execute(
+        select(RatingSummary.user_id, RatingSummary.average).where(
+            RatingSummary.role == role,
+            RatingSummary.user_id.in_(ids)
+        )
+    ).all()
+    for user_id, average in rows:
+        averages[user_id] = float(average)
+    return averages
+
+
+def get_rating_summary(session: Session, user_id: UUID, role: str) -> Optional[RatingSummary]:
+    return session.get(RatingSummary, (user_id, role))
+
+
+def rebuild_rating_summaries(session: Session, user_id: Optional[UUID] = None) -> int:
+    """
+    Recalcula el acumulado desde client_request (viajes PAID con calificación)
+    con un INSERT ... SELECT por rol. Si se indica user_id solo recalcula ese
+    usuario. Retorna el número de filas generadas.
+    """
+    total = rebuild_rating_summary_rows(session, user_id)
+    session.commit()
+    logger.info("Resumen de calificaciones reconstruido: %s filas", total)
+    return total
+
+
+def rebuild_rating_summary_rows(bind, user_id: Optional[UUID] = None) -> int:
+    """
+    Sentencias de la reconstrucción sin commit; `bind` puede ser una sesión
+    o una conexión (se usa también desde las migraciones).
+    """
+    table = RatingSummary.__table__
+    delete_statement = delete(table)
+    if user_id is not None:
+        delete_statement = delete_statement.where(table.c.user_id == user_id)
+    bind.execute(delete_statement)
+
+    now = datetime.now(COLOMBIA_TZ)
+    total = 0
+    for role, (rating_column, user_column) in _ROLE_COLUMNS.items():
+        aggregate = (
+            select(
+                user_column,
+                literal(role),
+                func.sum(rating_column),
+                func.count(rating_column),
+                func.avg(rating_column),
+                literal(now)
+            )
+            .where(
+                ClientRequest.status == StatusEnum.PAID,
+                rating_column.isnot(None),
+                user_column.isnot(None)
+            )
+            .group_by(user_column)
+        )
+        if user_id is not None:
+            aggregate = aggregate.where(user_column == user_id)
+        result = bind.execute(insert(table).from_select(
+            ["user_id", "role", "rating_sum", "rating_count", "average", "updated_at"],
+            aggregate
+        ))
+        total += result.rowcount or 0
+    return total
@@ -1,57 +1,221 @@
 import secrets
 import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Iterable, Optional, List
 from uuid import UUID, uuid4
 from fastapi import HTTPException, status
 from sqlmodel import Session, select
+from sqlalchemy import delete, false, insert, literal, text, true, update
+from sqlalchemy.engine import Connection
 from jose import jwt, JWTError
 from app.models.refresh_token import RefreshToken
 from app.models.user import User
 from app.core.config import settings
-import traceback
+import logging
+
+logger = logging.getLogger(__name__)
+
+PARTITION_PREFIX = "refresh_token_p"
+DEFAULT_PARTITION = "refresh_token_default"
+
+
+def hash_token(token: str) -> str:
+    """
+    Hash con el que se guarda y se busca el token. Nunca se registra el token
+    en claro ni su hash en los logs.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevokedTokenCache:
+    """
+    Caché negativa en memoria de hashes de refresh tokens que ya no son
+    válidos (revocados, rotados o desconocidos). Una revocación es definitiva,
+    así que una entrada nunca se vuelve incorrecta: la caché solo evita ir a
+    la base cuando un cliente reintenta con un token viejo. Cada worker tiene
+    la suya; la base sigue siendo la fuente de verdad.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries or settings.REFRESH_TOKEN_REVOKED_CACHE_SIZE
+        self.ttl = settings.REFRESH_TOKEN_REVOKED_CACHE_TTL_SECONDS if ttl is None else ttl
+        self._entries: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def add(self, token_hash: str) -> None:
+        with self._lock:
+            self._entries[token_hash] = time.monotonic() + self.ttl
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def add_many(self, token_hashes: Iterable[str]) -> None:
+        for token_hash in token_hashes:
+            self.add(token_hash)
+
+    def __contains__(self, token_hash: str) -> bool:
+        with self._lock:
+            expires = self._entries.get(token_hash)
+            if expires is not None and expires > time.monotonic():
+                self.stats["hits"] += 1
+                return True
+            if expires is not None:
+                del self._entries[token_hash]
+            self.stats["misses"] += 1
+            return False
+
+
+_revoked_cache: Optional[RevokedTokenCache] = None
+_revoked_cache_lock = threading.Lock()
+
+
+def get_revoked_token_cache() -> RevokedTokenCache:
+    global _revoked_cache
+    with _revoked_cache_lock:
+        if _revoked_cache is None:
+            _revoked_cache = RevokedTokenCache()
+        return _revoked_cache
+
+
+def set_revoked_token_cache(cache: Optional[RevokedTokenCache]) -> None:
+    global _revoked_cache
+    with _revoked_cache_lock:
+        _revoked_cache = cache
+
+
+# ============================================================================
+# PARTICIONES POR MES DE EXPIRACIÓN (PostgreSQL)
+# ============================================================================
+#
+# En PostgreSQL refresh_token está particionada por rango de expires_at, una
+# partición por mes (refresh_token_pAAAAMM) más una por defecto. Borrar los
+# tokens vencidos es un DROP de las particiones de meses pasados en lugar de
+# un DELETE fila por fila. En otros motores (tests) es una tabla normal.
+
+
+def _month_start(moment: datetime) -> datetime:
+    return datetime(moment.year, moment.month, 1)
+
+
+def _next_month(month: datetime) -> datetime:
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = 'refresh_token' AND pg_table_is_visible(c.oid)"
+    )).scalar())
+
+
+def _partitions(conn: Connection) -> List[str]:
+    return list(conn.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = 'refresh_token' AND pg_table_is_visible(parent.oid)"
+    )).scalars())
+
+
+def ensure_refresh_token_partitions(conn: Connection, until: Optional[datetime] = None) -> List[str]:
+    """
+    Crea las particiones mensuales que falten desde el mes actual hasta
+    `until` (por defecto la expiración de un token nuevo más
+    REFRESH_TOKEN_PARTITION_MONTHS_AHEAD meses) y la partición por defecto.
+    Retorna los nombres creados. No hace nada si la tabla no está particionada.
+    """
+    if not is_partitioned(conn):
+        return []
+    now = datetime.utcnow()
+    if until is None:
+        until = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        for _ in range(settings.REFRESH_TOKEN_PARTITION_MONTHS_AHEAD):
+            until = _next_month(_month_start(until))
+    existing = set(_partitions(conn))
+    created = []
+    month = _month_start(now)
+    while month <= until:
+        name = f"{PARTITION_PREFIX}{month:%Y%m}"
+        if name not in existing:
+            try:
+                with conn.begin_nested():
+                    conn.execute(text(
+                        f"CREATE TABLE {name} PARTITION OF refresh_token "
+                        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{_next_month(month):%Y-%m-%d}')"
+                    ))
+                created.append(name)
+            except Exception as e:
+                # Falla si la partición por defecto ya tiene filas de ese mes;
+                # esas filas siguen ahí hasta que venzan
+                logger.error("No se pudo crear la partición %s: %s", name, e)
+        month = _next_month(month)
+    if DEFAULT_PARTITION not in existing:
+        conn.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF refresh_token DEFAULT"))
+        created.append(DEFAULT_PARTITION)
+    if created:
+        logger.info("Particiones de refresh_token creadas: %s", created)
+    return created
+
+
+def drop_expired_refresh_token_partitions(conn: Connection) -> List[str]:
+    """
+    Elimina las particiones de meses ya vencidos por completo.
+    """
+    if not is_partitioned(conn):
+        return []
+    current = _month_start(datetime.utcnow())
+    dropped = []
+    for name in sorted(_partitions(conn)):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        month = datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m")
+        if _next_month(month) <= current:
+            conn.execute(text(f"DROP TABLE {name}"))
+            dropped.append(name)
+    if dropped:
+        logger.info("Particiones vencidas de refresh_token eliminadas: %s", dropped)
+    return dropped
 
 
 class RefreshTokenService:
     def __init__(self, session: Session):
         self.session = session
+        self.revoked = get_revoked_token_cache()
 
     def generate_refresh_token(self, user_id: UUID, user_agent: Optional[str] = None, ip_address: Optional[str] = None) -> tuple[str, RefreshToken]:
         """
         Genera un nuevo refresh token para un usuario
         Returns: (token_plain, refresh_token_record)
         """
-        # Generar token aleatorio seguro
+        # Generar token aleatorio seguro; en BD solo se guarda su hash
         token_plain = secrets.token_urlsafe(64)
-        print("[DEBUG] generate_refresh_token: token_plain:", token_plain)
-        # Crear hash del token para almacenar en BD
-        token_hash = hashlib.sha256(token_plain.encode()).hexdigest()
-        print("[DEBUG] generate_refresh_token: token_hash:", token_hash)
-        # Calcular fecha de expiración
         expires_at = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-        # Crear registro en BD
         refresh_token = RefreshToken(
             id=uuid4(),
             user_id=user_id,
-            token_hash=token_hash,
+            token_hash=hash_token(token_plain),
             expires_at=expires_at,
             user_agent=user_agent,
             ip_address=ip_address
         )
         self.session.add(refresh_token)
         self.session.commit()
-        self.session.refresh(refresh_token)
-        print("[DEBUG] generate_refresh_token: refresh_token guardado:", refresh_token)
         return token_plain, refresh_token
 
     def validate_refresh_token(self, token: str) -> Optional[RefreshToken]:
         """
         Valida un refresh token y retorna el registro si es válido
         """
-        print("[DEBUG] validate_refresh_token: token recibido:", token)
+        token_hash = hash_token(token)
+        if token_hash in self.revoked:
+            return None
         try:
-            token_hash = hashlib.sha256(token.encode()).hexdigest()
-            print("[DEBUG] validate_refresh_token: token_hash:", token_hash)
             refresh_token = self.session.exec(
                 select(RefreshToken)
                 .where(
@@ -60,51 +224,52 @@ class RefreshTokenService:
                     RefreshToken.is_revoked == False
                 )
             ).first()
-            print(
-                "[DEBUG] validate_refresh_token: refresh_token encontrado:", refresh_token)
-            return refresh_token
         except Exception as e:
-            print("[ERROR] validate_refresh_token:", e)
-            print(traceback.format_exc())
+            logger.error("Error validando refresh token: %s", e, exc_info=True)
             return None
+        if refresh_token is None:
+            self.revoked.add(token_hash)
+        return refresh_token
 
     def revoke_refresh_token(self, token: str) -> bool:
         """
-        Revoca un refresh token específico
+        Revoca un refresh token específico (un solo UPDATE)
         """
-        refresh_token = self.validate_refresh_token(token)
-        if not refresh_token:
+        token_hash = hash_token(token)
+        if token_hash in self.revoked:
             return False
-
-        refresh_token.is_revoked = True
-        refresh_token.updated_at = datetime.utcnow()
-        self.session.add(refresh_token)
+        now = datetime.utcnow()
+        result = self.session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.expires_at > now,
+                RefreshToken.is_revoked == False
+            )
+            .values(is_revoked=True, updated_at=now)
+        )
         self.session.commit()
-
-        return True
+        self.revoked.add(token_hash)
+        return bool(result.rowcount)
 
     def revoke_all_user_tokens(self, user_id: UUID) -> int:
         """
         Revoca todos los refresh tokens de un usuario
         Returns: número de tokens revocados
         """
-        result = self.session.exec(
-            select(RefreshToken)
-            .where(
-                RefreshToken.user_id == user_id,
-                RefreshToken.is_revoked == False
-            )
-        ).all()
-
-        count = 0
-        for token in result:
-            token.is_revoked = True
-            token.updated_at = datetime.utcnow()
-            self.session.add(token)
-            count += 1
-
+        conditions = (RefreshToken.user_id == user_id, RefreshToken.is_revoked == False)
+        statement = update(RefreshToken).where(*conditions).values(
+            is_revoked=True, updated_at=datetime.utcnow())
+        if self.session.get_bind().dialect.update_returning:
+            token_hashes = self.session.execute(
+                statement.returning(RefreshToken.token_hash)).scalars().all()
+        else:
+            token_hashes = self.session.exec(
+                select(RefreshToken.token_hash).where(*conditions)).all()
+            self.session.execute(statement)
         self.session.commit()
-        return count
+        self.revoked.add_many(token_hashes)
+        return len(token_hashes)
 
     def get_user_active_tokens(self, user_id: UUID) -> List[RefreshToken]:
         """
@@ -122,84 +287,143 @@ class RefreshTokenService:
 
     def cleanup_expired_tokens(self) -> int:
         """
-        Elimina tokens expirados de la base de datos
+        Elimina tokens expirados de la base de datos (un solo DELETE)
         Returns: número de tokens eliminados
         """
-        expired_tokens = self.session.exec(
-            select(RefreshToken)
-            .where(RefreshToken.expires_at <= datetime.utcnow())
-        ).all()
-
-        count = len(expired_tokens)
-        for token in expired_tokens:
-            self.session.delete(token)
+        result = self.session.execute(
+            delete(RefreshToken).where(RefreshToken.expires_at <= datetime.utcnow())
+        )
+        self.session.commit()
+        return result.rowcount or 0
 
+    def maintain_partitions(self) -> dict:
+        """
+        Crea las particiones de los próximos meses y elimina las vencidas.
+        Sin particiones (otros motores) no hace nada.
+        """
+        conn = self.session.connection()
+        created = ensure_refresh_token_partitions(conn)
+        dropped = drop_expired_refresh_token_partitions(conn)
         self.session.commit()
-        return count
+        return {"created_partitions": created, "dropped_partitions": dropped}
+
+    def _create_access_token(self, user_id: UUID) -> str:
+        expire = datetime.utcnow() + timedelta(
+            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES_NEW)
+        return jwt.encode(
+            {"sub": str(user_id), "type": "access", "exp": expire},
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM
+        )
 
     def create_access_token_from_refresh(self, refresh_token: RefreshToken) -> str:
         """
         Crea un nuevo access token a partir de un refresh token válido
         """
-        # Verificar que el usuario existe
+        # Verificar que el usuario existe y está activo
         user = self.session.get(User, refresh_token.user_id)
-        if not user:
+        if not user or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
+        return self._create_access_token(user.id)
 
-        # Crear payload para el access token
-        to_encode = {
-            "sub": str(user.id),
-            "type": "access"
-        }
-
-        # Calcular expiración
-        expires_delta = timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES_NEW)
-        expire = datetime.utcnow() + expires_delta
-        to_encode.update({"exp": expire})
+    def _swap_token(self, old_hash: str, new_hash: str, user_agent: Optional[str],
+                    ip_address: Optional[str]) -> Optional[UUID]:
+        """
+        Revoca el token viejo e inserta el nuevo para el mismo usuario. Solo
+        una rotación concurrente del mismo token gana (el UPDATE exige
+        is_revoked = false) y solo si el usuario existe y está activo.
+        Retorna el user_id o None si no se rotó.
 
-        # Generar JWT
-        encoded_jwt = jwt.encode(
-            to_encode,
-            settings.SECRET_KEY,
-            algorithm=settings.ALGORITHM
+        En PostgreSQL es una sola sentencia:
+        WITH revoked AS (UPDATE ... RETURNING user_id) INSERT ... SELECT FROM revoked.
+        """
+        table = RefreshToken.__table__
+        users = User.__table__
+        now = datetime.utcnow()
+        valid = (
+            table.c.token_hash == old_hash,
+            table.c.expires_at > now,
+            table.c.is_revoked == false(),
+            select(users.c.id).where(
+                users.c.id == table.c.user_id, users.c.is_active == true()
+            ).exists(),
         )
+        revoke = update(table).where(*valid).values(is_revoked=True, updated_at=now)
+        new_values = {
+            "id": uuid4(),
+            "token_hash": new_hash,
+            "expires_at": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            "is_revoked": False,
+            "created_at": now,
+            "updated_at": now,
+            "user_agent": user_agent,
+            "ip_address": ip_address,
+        }
 
-        return encoded_jwt
+        if self.session.get_bind().dialect.name == "postgresql":
+            revoked = revoke.returning(table.c.user_id).cte("revoked")
+            columns = ["user_id", *new_values]
+            user_id = self.session.execute(
+                insert(table)
+                .from_select(columns, select(
+                    revoked.c.user_id,
+                    *(literal(value, table.c[name].type).label(name)
+                      for name, value in new_values.items())
+                ))
+                .returning(table.c.user_id)
+            ).scalar()
+        else:
+            user_id = self.session.execute(select(table.c.user_id).where(*valid)).scalar()
+            if user_id is not None and self.session.execute(revoke).rowcount:
+                self.session.execute(insert(table).values(user_id=user_id, **new_values))
+            else:
+                user_id = None
+        self.session.commit()
+        return user_id
 
     def rotate_refresh_token(self, old_token: str, user_agent: Optional[str] = None, ip_address: Optional[str] = None) -> tuple[str, str]:
         """
         Rota un refresh token (crea uno nuevo y revoca el anterior)
         Returns: (new_access_token, new_refresh_token)
         """
-        print("[DEBUG] rotate_refresh_token: old_token:", old_token)
-        try:
+        invalid = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid refresh token"
+        )
+        old_hash = hash_token(old_token)
+        if old_hash in self.revoked:
+            raise invalid
+
+        if not settings.REFRESH_TOKEN_ROTATION:
             old_refresh_token = self.validate_refresh_token(old_token)
-            print("[DEBUG] rotate_refresh_token: old_refresh_token:",
-                  old_refresh_token)
             if not old_refresh_token:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid refresh token"
-                )
-            new_access_token = self.create_access_token_from_refresh(
-                old_refresh_token)
-            if settings.REFRESH_TOKEN_ROTATION:
-                new_refresh_token_plain, new_refresh_token_record = self.generate_refresh_token(
-                    old_refresh_token.user_id,
-                    user_agent,
-                    ip_address
-                )
-                self.revoke_refresh_token(old_token)
-                print("[DEBUG] rotate_refresh_token: new_refresh_token_plain:",
-                      new_refresh_token_plain)
-                return new_access_token, new_refresh_token_plain
-            else:
-                return new_access_token, old_token
+                raise invalid
+            return self.create_access_token_from_refresh(old_refresh_token), old_token
+
+        new_refresh_token_plain = secrets.token_urlsafe(64)
+        try:
+            user_id = self._swap_token(
+                old_hash, hash_token(new_refresh_token_plain), user_agent, ip_address)
         except Exception as e:
-            print("[ERROR] rotate_refresh_token:", e)
-            print(traceback.format_exc())
+            self.session.rollback()
+            logger.error("Error rotando refresh token: %s", e, exc_info=True)
             raise
+        if user_id is None:
+            # Token vigente de un usuario inexistente o inactivo: 404 como
+            # create_access_token_from_refresh (solo en el camino de error)
+            if self.session.execute(select(RefreshToken.id).where(
+                    RefreshToken.token_hash == old_hash,
+                    RefreshToken.expires_at > datetime.utcnow(),
+                    RefreshToken.is_revoked == false())).first() is not None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+            self.revoked.add(old_hash)
+            raise invalid
+        # Rotado: el token viejo ya no sirve
+        self.revoked.add(old_hash)
+        return self._create_access_token(user_id), new_refresh_token_plain
@@ -0,0 +1,337 @@
+from sqlmodel import Session
+from sqlalchemy import delete, select, update
+from app.models.client_request import ClientRequest, StatusEnum
+from app.models.chat_message import ChatMessage, ChatUnreadCounter
+from app.core.config import settings
+from app.core.sio_rooms import user_room
+from app.services.config_cache_service import get_project_settings
+from app.services.dispatch_feed_service import get_dispatch_feed
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import heapq
+import logging
+import threading
+import time
+import pytz
+
+logger = logging.getLogger(__name__)
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+DEFAULT_TIMEOUT_MINUTES = 5
+
+
+def _timestamp(value: datetime) -> float:
+    # created_at se guarda en hora de Bogotá; sin zona se interpreta así
+    if value.tzinfo is None:
+        value = COLOMBIA_TZ.localize(value)
+    return value.timestamp()
+
+
+def get_request_timeout_minutes(session: Session) -> float:
+    project_settings = get_project_settings(session)
+    if project_settings and project_settings.request_timeout_minutes:
+        return project_settings.request_timeout_minutes
+    return DEFAULT_TIMEOUT_MINUTES
+
+
+def expire_client_requests(session: Session, ids: Optional[List[UUID]] = None,
+                           older_than: Optional[datetime] = None,
+                           limit: int = 500) -> List[Tuple[UUID, UUID]]:
+    """
+    Pasa a CANCELLED, en un solo UPDATE, las solicitudes que siguen en CREATED
+    entre `ids` o creadas antes de `older_than`. El filtro por estado hace la
+    operación segura entre workers: una solicitud que ya recibió conductor o
+    que otro worker venció no se toca.
+
+    El UPDATE masivo no pasa por after_update_listener, así que aquí mismo se
+    borran los mensajes de chat. Retorna (id, id_client) de las vencidas.
+    """
+    if not ids and older_than is None:
+        return []
+    candidates = select(ClientRequest.id).where(
+        ClientRequest.status == StatusEnum.CREATED)
+    if ids:
+        candidates = candidates.where(ClientRequest.id.in_(ids))
+    if older_than is not None:
+        candidates = candidates.where(ClientRequest.created_at < older_than)
+    candidates = candidates.limit(limit)
+
+    rows = session.execute(
+        update(ClientRequest)
+        .where(ClientRequest.id.in_(candidates),
+               ClientRequest.status == StatusEnum.CREATED)
+        .values(status=StatusEnum.CANCELLED, updated_at=datetime.now(COLOMBIA_TZ))
+        .returning(ClientRequest.id, ClientRequest.id_client)
+        .execution_options(synchronize_session=False)
+    ).all()
+    expired = [(row[0], row[1]) for row in rows]
+    if expired:
+        expired_ids = [client_request_id for client_request_id, _ in expired]
+        session.execute(
+            delete(ChatMessage).where(ChatMessage.client_request_id.in_(expired_ids))
+            .execution_options(synchronize_session=False))
+        session.execute(
+            delete(ChatUnreadCounter).where(ChatUnreadCounter.client_request_id.in_(expired_ids))
+            .execution_options(synchronize_session=False))
+    session.commit()
+    return expired
+
+
+class RequestExpiryEngine:
+    """
+    Vence las solicitudes que nadie tomó dentro de request_timeout_minutes.
+
+    - Cada worker mantiene un heap con (created_at, id) de las solicitudes en
+      CREATED que conoce: las abiertas al arrancar y las que crea
+      create_client_request. El ciclo solo mira la cima del heap, así que
+      no toca la base de datos mientras nada haya vencido.
+    - Las vencidas pasan a CANCELLED en un UPDATE masivo; se quitan del feed
+      de los conductores y el pasajero recibe `new_status_trip/{id}` con
+      motivo "expired" en su room de usuario.
+    - Las que salen de CREATED por otro camino se descartan del heap sin
+      buscarlas (la entrada queda y se ignora al llegar a la cima).
+    - El job de mantenimiento expire_client_requests barre la base de datos
+      como respaldo (solicitudes de un worker que se cayó).
+    """
+
+    def __init__(self, emit: Optional[Callable[[str, Dict, str], Awaitable]] = None,
+                 interval: Optional[float] = None, batch_size: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        self._emit = emit
+        self.interval = interval if interval is not None else settings.REQUEST_EXPIRY_TICK_SECONDS
+        self.batch_size = batch_size or settings.REQUEST_EXPIRY_BATCH_SIZE
+        self._clock = clock
+        self._heap: List[Tuple[float, UUID]] = []
+        self._scheduled: Dict[UUID, float] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"scheduled": 0, "discarded": 0, "expired": 0, "ticks": 0}
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def __contains__(self, client_request_id: UUID) -> bool:
+        return client_request_id in self._scheduled
+
+    # ----- heap de vencimientos -----
+
+    def schedule(self, client_request_id: UUID, created_at: datetime) -> None:
+        created = _timestamp(created_at)
+        with self._lock:
+            if client_request_id in self._scheduled:
+                return
+            self._scheduled[client_request_id] = created
+            heapq.heappush(self._heap, (created, client_request_id))
+            self.stats["scheduled"] += 1
+
+    def discard(self, client_request_id: UUID) -> None:
+        with self._lock:
+            if self._scheduled.pop(client_request_id, None) is not None:
+                self.stats["discarded"] += 1
+
+    def pop_due(self, timeout_seconds: float, now: Optional[float] = None,
+                limit: Optional[int] = None) -> List[UUID]:
+        """
+        Saca del heap hasta `limit` solicitudes creadas hace más de
+        `timeout_seconds`.
+        """
+        cutoff = (now if now is not None else self._clock()) - timeout_seconds
+        limit = limit or self.batch_size
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= cutoff and len(due) < limit:
+                created, client_request_id = heapq.heappop(self._heap)
+                # Descartada o reprogramada: la entrada ya no vale
+                if self._scheduled.get(client_request_id) != created:
+                    continue
+                del self._scheduled[client_request_id]
+                due.append(client_request_id)
+        return due
+
+    def next_deadline(self, timeout_seconds: float) -> Optional[float]:
+        with self._lock:
+            while self._heap and self._scheduled.get(self._heap[0][1]) != self._heap[0][0]:
+                heapq.heappop(self._heap)
+            return self._heap[0][0] + timeout_seconds if self._heap else None
+
+    def load_open_requests(self, session: Session) -> int:
+        """
+        Programa las solicitudes que ya estaban en CREATED al arrancar (usa el
+        índice parcial idx_client_request_open_created).
+        """
+        rows = session.execute(
+            select(ClientRequest.id, ClientRequest.created_at).where(
+                ClientRequest.status == StatusEnum.CREATED)
+        ).all()
+        for client_request_id, created_at in rows:
+            self.schedule(client_request_id, created_at)
+        return len(rows)
+
+    # ----- vencimiento -----
+
+    def _expire_due(self) -> List[Tuple[UUID, UUID]]:
+        from app.core.db import engine
+        with Session(engine) as session:
+            timeout_seconds = get_request_timeout_minutes(session) * 60
+            expired = []
+            while True:
+                due = self.pop_due(timeout_seconds)
+                if not due:
+                    return expired
+                expired.extend(expire_client_requests(session, ids=due, limit=len(due)))
+
+    def notify(self, expired: List[Tuple[UUID, UUID]]) -> None:
+        """
+        Quita las solicitudes del feed y avisa a cada pasajero. Se puede
+        llamar desde un hilo (job de mantenimiento) o desde el event loop.
+        """
+        if not expired:
+            return
+        self.stats["expired"] += len(expired)
+        feed = get_dispatch_feed()
+        emits = []
+        for client_request_id, id_client in expired:
+            try:
+                feed.publish_request_closed(client_request_id, StatusEnum.CANCELLED.value)
+            except Exception as e:
+                logger.error("Error publicando cierre de %s en el feed: %s", client_request_id, e)
+            emits.append((
+                f"new_status_trip/{client_request_id}",
+                {
+                    "status": StatusEnum.CANCELLED.value,
+                    "id_client_request": str(client_request_id),
+                    "reason": "expired",
+                },
+                user_room(id_client),
+            ))
+        emit = self._emit or _sio_emit
+
+        async def send():
+            for event, data, room in emits:
+                try:
+                    await emit(event, data, room)
+                except Exception as e:
+                    logger.error("Error emitiendo %s a %s: %s", event, room, e)
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None:
+            running.create_task(send())
+        elif self._loop is not None and self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(send(), self._loop)
+        else:
+            asyncio.run(send())
+
+    async def tick(self) -> int:
+        """
+        Un ciclo: vence lo que llegó a su plazo. Retorna cuántas venció.
+        """
+        self.stats["ticks"] += 1
+        if not self._heap:
+            return 0
+        expired = await asyncio.to_thread(self._expire_due)
+        if expired:
+            logger.info("Solicitudes vencidas sin conductor: %s", len(expired))
+            self.notify(expired)
+        return len(expired)
+
+    # ----- ciclo de vida -----
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Error en el ciclo de vencimiento de solicitudes: %s", e, exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+
+        def load():
+            from app.core.db import engine
+            with Session(engine) as session:
+                return self.load_open_requests(session)
+
+        try:
+            loaded = await asyncio.to_thread(load)
+            logger.info("Solicitudes abiertas programadas para vencer: %s", loaded)
+        except Exception as e:
+            logger.error("Error cargando solicitudes abiertas: %s", e)
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+async def _sio_emit(event: str, data: Dict, room: str) -> None:
+    from app.core.sio_events import sio
+    await sio.emit(event, data, room=room)
+
+
+def expire_stale_requests_job(session: Session) -> Dict:
+    """
+    Barrido de respaldo: vence en la base de datos las solicitudes en CREATED
+    más viejas que el timeout, aunque ningún worker las tenga en su heap.
+    """
+    engine = get_request_expiry()
+    older_than = datetime.now(COLOMBIA_TZ) - timedelta(
+        minutes=get_request_timeout_minutes(session))
+    expired = []
+    while True:
+        batch = expire_client_requests(session, older_than=older_than,
+                                       limit=engine.batch_size)
+        expired.extend(batch)
+        if len(batch) < engine.batch_size:
+            break
+    for client_request_id, _ in expired:
+        engine.discard(client_request_id)
+    engine.notify(expired)
+    return {"expired_requests": len(expired)}
+
+
+_engine: Optional[RequestExpiryEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_request_expiry() -> RequestExpiryEngine:
+    """
+    Retorna el motor de vencimiento del proceso, creándolo la primera vez.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = RequestExpiryEngine()
+        return _engine
+
+
+def set_request_expiry(engine: Optional[RequestExpiryEngine]) -> None:
+    global _engine
+    with _engine_lock:
+        _engine = engine
+
+
+async def start_request_expiry() -> None:
+    if settings.REQUEST_EXPIRY_ENABLED:
+        await get_request_expiry().start()
+
+
+async def shutdown_request_expiry() -> None:
+    if _engine is not None:
+        await _engine.stop()
@@ -17,6 +17,7 @@ from app.models.vehicle_type import VehicleType
 from app.models.user_has_roles import UserHasRole, RoleStatus
 from app.models.driver_savings import DriverSavings
 from app.models.project_settings import ProjectSettings
+from app.services.config_cache_service import get_project_settings
 from app.models.company_account import CompanyAccount, cashflow
 from app.models.type_service import TypeService
 
@@ -203,8 +204,7 @@ class StatisticsService:
 
             # --- 3. Estadísticas Financieras ---
             # Obtener configuración del proyecto para porcentajes de comisión
-            project_settings = self.session.exec(
-                select(ProjectSettings)).first()
+            project_settings = get_project_settings(self.session)
             company_commission_rate = float(
                 project_settings.company) if project_settings and project_settings.company else 0.0
 
@@ -1047,18 +1047,42 @@ class StatisticsService:
             }
 
             # --- 4. Estadísticas de Suspensiones ---
-            suspended_drivers_stats = self.batch_check_all_suspended_drivers()
-            response_data["suspended_drivers_stats"] = suspended_drivers_stats
+            # Solo lectura: las suspensiones se levantan en el job de mantenimiento
+            response_data["suspended_drivers_stats"] = self.get_suspended_drivers_stats()
 
             return response_data
 
         except Exception as e:
             raise
 
+    def get_suspended_drivers_stats(self):
+        """
+        Conductores suspendidos ahora y resultado del último barrido de
+        suspensiones (job `lift_suspensions`), guardado en maintenance_job_run
+        por el worker que lo ejecutó.
+        """
+        from app.services.maintenance_service import get_last_job_run
+
+        total_suspended = self.session.exec(
+            select(func.count(UserHasRole.id_user)).where(
+                UserHasRole.id_rol == "DRIVER",
+                UserHasRole.suspension == True
+            )
+        ).one()
+        last_sweep = get_last_job_run(self.session, "lift_suspensions")
+        result = (last_sweep.result if last_sweep else None) or {}
+        return {
+            "success": True,
+            "total_suspended_drivers": total_suspended,
+            "suspensions_lifted": result.get("suspensions_lifted", 0),
+            "still_suspended": result.get("still_suspended", 0),
+            "last_sweep_at": last_sweep.finished_at.isoformat() if last_sweep else None,
+        }
+
     def batch_check_all_suspended_drivers(self):
         """
         Método para verificar y levantar suspensiones de todos los conductores suspendidos.
-        Útil para ejecutar como tarea programada (cron job).
+        Lo ejecuta periódicamente el job `lift_suspensions` (maintenance_service).
 
         Returns:
             dict: Resumen de las suspensiones levantadas
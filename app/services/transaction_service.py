@@ -6,6 +6,7 @@ from fastapi import HTTPException
 from uuid import UUID
 from app.models.user import User
 from app.utils.balance_notifications import check_and_notify_low_balance
+from app.services.config_cache_service import get_project_settings
 
 
 class TransactionService:
@@ -176,14 +177,11 @@ class TransactionService:
         Crea una recarga de saldo para el usuario.
         La transacción se crea como pendiente de aprobación (is_confirmed=False).
         """
-        from app.models.project_settings import ProjectSettings
         from app.models.user import User
         from sqlmodel import select
 
         # Obtener configuración de monto mínimo
-        project_settings = self.session.exec(
-            select(ProjectSettings).where(ProjectSettings.id == 1)
-        ).first()
+        project_settings = get_project_settings(self.session)
 
         if not project_settings:
             raise HTTPException(
@@ -0,0 +1,161 @@
+from sqlmodel import Session
+from sqlalchemy import func, select, tuple_
+from app.models.client_request import ClientRequest
+from app.models.payment_method import PaymentMethod
+from app.models.user import User
+from app.services.address_service import coord_key, get_cached_addresses
+from app.utils.pagination import encode_cursor, decode_cursor
+from typing import Any, Dict, Optional
+from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
+
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Solo las columnas que usa el historial (sin cargar la entidad completa)
+_HISTORY_COLUMNS = (
+    ClientRequest.id,
+    ClientRequest.id_client,
+    ClientRequest.id_driver_assigned,
+    ClientRequest.fare_offered,
+    ClientRequest.fare_assigned,
+    ClientRequest.pickup_description,
+    ClientRequest.destination_description,
+    ClientRequest.client_rating,
+    ClientRequest.driver_rating,
+    ClientRequest.status,
+    func.ST_Y(ClientRequest.pickup_position).label("pickup_lat"),
+    func.ST_X(ClientRequest.pickup_position).label("pickup_lng"),
+    func.ST_Y(ClientRequest.destination_position).label("destination_lat"),
+    func.ST_X(ClientRequest.destination_position).label("destination_lng"),
+    ClientRequest.created_at,
+    ClientRequest.updated_at,
+    ClientRequest.review,
+    ClientRequest.payment_method_id,
+)
+
+
+def _position(lat, lng) -> Optional[Dict[str, float]]:
+    if lat is None or lng is None:
+        return None
+    return {"lat": lat, "lng": lng}
+
+
+def _address(addresses: Dict[str, str], position: Optional[Dict[str, float]], description: Optional[str]) -> str:
+    """
+    Dirección guardada para la coordenada; si aún no se ha geocodificado se usa
+    la descripción que escribió el usuario.
+    """
+    if not position:
+        return "No disponible"
+    return addresses.get(coord_key(position["lat"], position["lng"])) or description or "No disponible"
+
+
+def _users_by_id(session: Session, user_ids) -> Dict[UUID, User]:
+    ids = {user_id for user_id in user_ids if user_id is not None}
+    if not ids:
+        return {}
+    users = session.execute(select(User).where(User.id.in_(ids))).scalars()
+    return {user.id: user for user in users}
+
+
+def _payment_methods_by_id(session: Session, payment_method_ids) -> Dict[int, Dict[str, Any]]:
+    ids = {pm_id for pm_id in payment_method_ids if pm_id is not None}
+    if not ids:
+        return {}
+    rows = session.execute(
+        select(PaymentMethod.id, PaymentMethod.name).where(PaymentMethod.id.in_(ids))).all()
+    return {pm_id: {"id": pm_id, "name": name} for pm_id, name in rows}
+
+
+def get_trip_history(session: Session, user_id: UUID, role: str, status: str,
+                     limit: Optional[int] = HISTORY_PAGE_SIZE, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Historial de viajes del usuario como pasajero (role="client") o como
+    conductor (role="driver"), del más reciente al más antiguo, paginado por
+    cursor sobre (created_at, id).
+
+    Usuarios y métodos de pago se cargan en lote y las direcciones salen de
+    geocoded_address: la lectura no llama a servicios externos.
+    Con limit=None retorna todo el historial en una sola página.
+    """
+    owner_column = ClientRequest.id_client if role == "client" else ClientRequest.id_driver_assigned
+    query = (
+        select(*_HISTORY_COLUMNS)
+        .where(owner_column == user_id, ClientRequest.status == status)
+        .order_by(ClientRequest.created_at.desc(), ClientRequest.id.desc())
+    )
+    after = decode_cursor(cursor)
+    if after is not None:
+        query = query.where(
+            tuple_(ClientRequest.created_at, ClientRequest.id) < tuple_(*after))
+    if limit is not None:
+        # Una fila extra indica si hay más páginas
+        query = query.limit(limit + 1)
+
+    rows = session.execute(query).all()
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    positions = [
+        (_position(row.pickup_lat, row.pickup_lng),
+         _position(row.destination_lat, row.destination_lng))
+        for row in rows
+    ]
+    addresses = get_cached_addresses(session, [
+        (position["lat"], position["lng"])
+        for pair in positions for position in pair if position
+    ])
+
+    if role == "client":
+        counterparts = _users_by_id(session, (row.id_driver_assigned for row in rows))
+        payment_methods = _payment_methods_by_id(
+            session, (row.payment_method_id for row in rows))
+    else:
+        counterparts = _users_by_id(session, (row.id_client for row in rows))
+
+    items = []
+    for row, (pickup_position, destination_position) in zip(rows, positions):
+        item = {
+            "id": row.id,
+            "id_client": row.id_client,
+            "id_driver_assigned": row.id_driver_assigned,
+            "fare_offered": row.fare_offered,
+            "fare_assigned": row.fare_assigned,
+            "pickup_description": row.pickup_description,
+            "destination_description": row.destination_description,
+            "client_rating": row.client_rating,
+            "driver_rating": row.driver_rating,
+            "status": str(row.status),
+            "pickup_position": pickup_position,
+            "destination_position": destination_position,
+            "pickup_address": _address(addresses, pickup_position, row.pickup_description),
+            "destination_address": _address(addresses, destination_position, row.destination_description),
+            "created_at": row.created_at.isoformat(),
+            "updated_at": row.updated_at.isoformat(),
+            "review": row.review,
+        }
+        if role == "client":
+            driver = counterparts.get(row.id_driver_assigned)
+            item["payment_method"] = payment_methods.get(row.payment_method_id)
+            item["driver"] = {
+                "id": str(driver.id),
+                "full_name": driver.full_name,
+                "phone_number": driver.phone_number,
+                "country_code": driver.country_code,
+                "selfie_url": driver.selfie_url
+            } if driver else None
+        else:
+            client = counterparts.get(row.id_client)
+            item["client"] = {
+                "id": str(client.id),
+                "full_name": client.full_name,
+                "selfie_url": client.selfie_url
+            } if client else None
+        items.append(item)
+
+    return {"items": items, "next_cursor": next_cursor}
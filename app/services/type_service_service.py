@@ -1,6 +1,7 @@
 from sqlmodel import Session, select
 from app.models.type_service import TypeService, TypeServiceCreate, AllowedRole
 from app.models.vehicle_type import VehicleType
+from app.services.config_cache_service import invalidate_type_services
 from fastapi import HTTPException
 from datetime import datetime
 
@@ -19,6 +20,7 @@ class TypeServiceService:
         self.session.add(db_type_service)
         self.session.commit()
         self.session.refresh(db_type_service)
+        invalidate_type_services()
         return db_type_service
 
     def get_type_service(self, type_service_id: int) -> TypeService:
@@ -80,3 +82,4 @@ class TypeServiceService:
             self.session.add(moto_service)
 
         self.session.commit()
+        invalidate_type_services()
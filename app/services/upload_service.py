@@ -6,6 +6,9 @@ from datetime import datetime
 from pathlib import Path
 from enum import Enum
 from uuid import UUID
+from sqlmodel import Session
+from app.core.storage import key_from_url
+from app.services.file_storage_service import get_content_store, release_reference
 
 # Definir tipos de documentos y sus categorí
 
@@ -116,16 +119,7 @@ class UploadService:
                 status_code=400,
                 detail=f"Extensión no permitida para {document_type.name}. Permitidas: {', '.join(allowed_exts)}"
             )
-        # Validar tamaño
-        file.file.seek(0, os.SEEK_END)
-        file_size = file.file.tell()
-        file.file.seek(0)
-        max_size = MAX_FILE_SIZES.get(document_type, 2 * 1024 * 1024)
-        if file_size > max_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"El archivo es demasiado grande. Máximo permitido: {max_size // (1024*1024)}MB"
-            )
+        # El tamaño se valida al guardar, mientras se lee por bloques
 
     def _generate_file_path(self, user_id: UUID, document_type: DocumentType) -> tuple[Path, str]:
         """Genera la ruta del archivo y su nombre único."""
@@ -166,15 +160,12 @@ class UploadService:
         # Validar el archivo
         self._validate_file(file, document_type)
 
-        # Generar ruta y nombre del archivo
-        file_path, relative_url = self._generate_file_path(
-            user_id, document_type)
-
-        # Guardar el archivo
+        # Guardar el archivo por contenido
         try:
-            content = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            saved = await get_content_store().put_upload(
+                file, max_size=MAX_FILE_SIZES.get(document_type, 2 * 1024 * 1024))
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -183,13 +174,14 @@ class UploadService:
 
         # Retornar información del documento
         return {
-            "url": relative_url,
+            "url": saved.url,
             "type": document_type,
             "user_id": user_id,
             "description": description,
             "original_filename": file.filename,
             "content_type": file.content_type,
-            "size": len(content),
+            "size": saved.size,
+            "sha256": saved.sha256,
             "uploaded_at": datetime.now().isoformat()
         }
 
@@ -198,7 +190,16 @@ class UploadService:
         return f"/static/uploads/{relative_url}"
 
     def delete_document(self, relative_url: str) -> None:
-        """Elimina un documento."""
+        """
+        Elimina un documento. Los del almacenamiento por contenido solo pierden
+        una referencia; el recolector borra el archivo cuando nadie lo usa.
+        """
+        if key_from_url(relative_url) is not None:
+            from app.core.db import engine
+            with Session(engine) as session:
+                release_reference(session, relative_url)
+                session.commit()
+            return
         try:
             file_path = self.base_upload_dir / \
                 relative_url.lstrip("/static/uploads/")
@@ -229,31 +230,15 @@ class UploadService:
                 status_code=400,
                 detail=f"Extensión no permitida. Permitidas: {', '.join(allowed_exts)}"
             )
-        # Validar tamaño (ejemplo: 10MB)
-        file.file.seek(0, os.SEEK_END)
-        file_size = file.file.tell()
-        file.file.seek(0)
+        # Tamaño máximo (10MB), validado al guardar por bloques
         max_size = 10 * 1024 * 1024
-        if file_size > max_size:
-            raise HTTPException(
-                status_code=400,
-                detail=f"El archivo es demasiado grande. Máximo permitido: {max_size // (1024*1024)}MB"
-            )
-
-        # Construir ruta: static/uploads/drivers/{driver_id}/{document_type}/{side}_{uuid}.{ext}
-        folder = f"static/uploads/drivers/{driver_id}/{document_type}"
-        Path(folder).mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_name = f"{side + '_' if side else ''}{timestamp}_{uuid.uuid4().hex}{file_ext}"
-        file_path = os.path.join(folder, unique_name)
-        # La ruta relativa NO debe incluir /static/uploads/
-        relative_url = os.path.relpath(file_path, "static/uploads")
 
-        # Guardar el archivo
+        # Guardar por contenido: la llave (objects/ab/<sha256>.ext) es la ruta
+        # relativa, sin /static/uploads/
         try:
-            content = await file.read()
-            with open(file_path, "wb") as f:
-                f.write(content)
+            saved = await get_content_store().put_upload(file, max_size=max_size)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(
                 status_code=500,
@@ -261,14 +246,15 @@ class UploadService:
             )
 
         return {
-            "url": relative_url,
+            "url": saved.key,
             "type": document_type,
             "side": side,
             "driver_id": driver_id,
             "description": description,
             "original_filename": file.filename,
             "content_type": file.content_type,
-            "size": len(content),
+            "size": saved.size,
+            "sha256": saved.sha256,
             "uploaded_at": datetime.now().isoformat()
         }
 
@@ -3,7 +3,15 @@ from app.models.user_fcm_token import UserFCMToken
 from uuid import UUID
 from datetime import datetime
 from typing import List, Optional
-from firebase_admin import messaging
+from app.services.push_dispatch_service import (
+    build_push_client,
+    deactivate_invalid_tokens,
+    get_push_dispatcher,
+    send_in_batches
+)
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class UserFCMTokenService:
@@ -84,31 +92,31 @@ class UserFCMTokenService:
 
     def send_notification(self, tokens: List[str], title: str, body: str, data: Optional[dict] = None) -> dict:
         """
-        Envía una notificación push a una lista de tokens FCM.
+        Envía una notificación push a una lista de tokens FCM de forma síncrona.
+        Los tokens se envían en lotes de hasta 500 y los que FCM reporta como
+        no registrados se desactivan.
         Retorna un dict con el resultado del envío.
         """
         if not tokens:
             return {"success": 0, "failed": 0}
 
         try:
-            message = messaging.MulticastMessage(
-                tokens=tokens,
-                notification=messaging.Notification(
-                    title=title,
-                    body=body
-                ),
-                data=data or {}
-            )
-            response = messaging.send_multicast(message)
-            return {"success": response.success_count, "failed": response.failure_count}
-        except ValueError as e:
-            # Firebase no está configurado (caso de tests)
-            if "The default Firebase app does not exist" in str(e):
-                print("⚠️ Firebase no configurado - simulando envío de notificación")
-                return {"success": len(tokens), "failed": 0, "simulated": True}
-            else:
-                raise e
+            result = send_in_batches(
+                build_push_client(), tokens, title, body, data)
+            invalid_tokens = result.pop("invalid_tokens")
+            if invalid_tokens:
+                result["deactivated"] = deactivate_invalid_tokens(
+                    self.session, invalid_tokens)
+            return result
         except Exception as e:
             # Otros errores de Firebase
-            print(f"❌ Error enviando notificación FCM: {e}")
+            logger.error("❌ Error enviando notificación FCM: %s", e)
             return {"success": 0, "failed": len(tokens), "error": str(e)}
+
+    def enqueue_notification(self, user_id: UUID, tokens: List[str], title: str, body: str, data: Optional[dict] = None) -> dict:
+        """
+        Encola una notificación push para un usuario sin bloquear al llamador.
+        El envío, el agrupamiento en lotes y la limpieza de tokens inválidos
+        los realiza el despachador en segundo plano.
+        """
+        return get_push_dispatcher().enqueue(user_id, tokens, title, body, data)
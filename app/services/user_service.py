@@ -9,6 +9,7 @@ from sqlalchemy.orm import selectinload
 from datetime import datetime
 import os
 from app.core.config import settings
+from app.services.file_storage_service import get_content_store, release_reference
 import uuid
 from uuid import UUID
 from app.models.verify_mount import VerifyMount
@@ -120,16 +121,11 @@ class UserService:
         return user
 
     def _save_user_selfie(self, uploader, user_id: UUID, selfie: UploadFile):
-        """Guarda la selfie en static/uploads/users/{user_id}/selfie_<uuid>.jpg"""
-        selfie_dir = os.path.join("static", "uploads", "users", str(user_id))
-        os.makedirs(selfie_dir, exist_ok=True)
-        ext = os.path.splitext(selfie.filename)[1] or ".jpg"
-        unique_name = f"selfie_{uuid.uuid4().hex}{ext}"
-        selfie_path = os.path.join(selfie_dir, unique_name)
-        with open(selfie_path, "wb") as f:
-            f.write(selfie.file.read())
-        url = f"{settings.STATIC_URL_PREFIX}/users/{user_id}/{unique_name}"
-        return {"url": url}
+        """Guarda la selfie en el almacenamiento por contenido"""
+        stored = get_content_store().put_upload_sync(
+            selfie.file, selfie.filename or "selfie.jpg", selfie.content_type,
+            session=self.session)
+        return {"url": stored.url}
 
     def get_users(self) -> list[User]:
         return self.session.exec(select(User)).all()
@@ -228,7 +224,9 @@ class UserService:
 
     def update_selfie(self, user_id: UUID, selfie: UploadFile):
         user = self.get_user(user_id)
+        previous_url = user.selfie_url
         selfie_info = self._save_user_selfie(None, user.id, selfie)
+        release_reference(self.session, previous_url)
         user.selfie_url = selfie_info["url"]
         self.session.add(user)
         self.session.commit()
@@ -0,0 +1,107 @@
+from sqlmodel import Session
+from sqlalchemy import case, func, select
+from app.models.driver_documents import DriverDocuments, DriverStatus
+from app.models.driver_info import DriverInfo
+from app.models.user_has_roles import UserHasRole, RoleStatus
+from app.models.verification_counter import (
+    COUNTER_NAMES,
+    COUNTER_SHARDS,
+    COLOMBIA_TZ,
+    DRIVER_ROLE,
+    VerificationCounter,
+    apply_counter_deltas,
+)
+from datetime import datetime
+from typing import Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def get_verification_counts(session: Session) -> Dict[str, int]:
+    """
+    Contadores del tablero en una sola lectura de la tabla verification_counter
+    (la suma de las filas de cada contador), sin importar cuántos conductores
+    haya.
+    """
+    counts = {name: 0 for name in COUNTER_NAMES}
+    rows = session.execute(
+        select(VerificationCounter.name, func.sum(VerificationCounter.value))
+        .group_by(VerificationCounter.name)).all()
+    for name, value in rows:
+        counts[name] = int(value or 0)
+    return counts
+
+
+def counter_rows(counts: Dict[str, int]) -> list:
+    """
+    Filas iniciales de verification_counter: el valor en la fila 0 y las
+    demás en cero, para que los flushes siempre encuentren su fila.
+    """
+    now = datetime.now(COLOMBIA_TZ)
+    return [
+        {"name": name, "shard": shard, "value": counts[name] if shard == 0 else 0,
+         "updated_at": now}
+        for name in COUNTER_NAMES for shard in range(COUNTER_SHARDS)
+    ]
+
+
+def count_verification_totals(bind) -> Dict[str, int]:
+    """
+    Conteos reales sobre user_has_role y driver_documents. `bind` puede ser
+    una sesión o una conexión (se usa también desde las migraciones).
+    """
+    roles = UserHasRole.__table__
+    documents = DriverDocuments.__table__
+    total, verified, approved = bind.execute(
+        select(
+            func.count(),
+            func.sum(case((roles.c.is_verified == True, 1), else_=0)),
+            func.sum(case((roles.c.status == RoleStatus.APPROVED, 1), else_=0)),
+        ).where(roles.c.id_rol == DRIVER_ROLE)
+    ).one()
+    driver_infos = DriverInfo.__table__
+    # Conductores (usuarios), no DriverInfo: uno por vehículo
+    with_pending = bind.execute(
+        select(func.count(func.distinct(driver_infos.c.user_id)))
+        .select_from(documents)
+        .join(driver_infos, driver_infos.c.id == documents.c.driver_info_id)
+        .where(documents.c.status == DriverStatus.PENDING)
+    ).scalar()
+    return {
+        "total_drivers": total or 0,
+        "verified_drivers": verified or 0,
+        "approved_drivers": approved or 0,
+        "drivers_with_pending_docs": with_pending or 0,
+    }
+
+
+def reconcile_verification_counters(session: Session) -> Dict[str, int]:
+    """
+    Corrige los contadores con los conteos reales y retorna la diferencia
+    encontrada por contador.
+
+    Todas las filas de los contadores se bloquean antes de contar: los
+    flushes que ajustan un contador esperan a este commit, y los que ya lo
+    ajustaron quedaron confirmados antes del conteo, así que ningún cambio se
+    pierde ni se cuenta dos veces. La corrección se suma en la fila 0.
+    """
+    table = VerificationCounter.__table__
+    # Orden fijo (name, shard), el mismo de los flushes: no hay deadlocks
+    rows = session.execute(
+        select(table.c.name, table.c.value)
+        .order_by(table.c.name, table.c.shard).with_for_update()).all()
+    stored = {}
+    for name, value in rows:
+        stored[name] = stored.get(name, 0) + value
+    actual = count_verification_totals(session)
+    drift = {name: actual[name] - stored.get(name, 0) for name in COUNTER_NAMES}
+    apply_counter_deltas(session, drift, shard=0)
+    session.commit()
+    if any(drift.values()):
+        logger.warning("Contadores de verificación corregidos: %s", drift)
+    return drift
+
+
+def reconcile_verification_counters_job(session: Session) -> Dict:
+    return {"drift": reconcile_verification_counters(session)}
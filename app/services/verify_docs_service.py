@@ -6,10 +6,15 @@ from app.models.user import User
 from app.models.document_type import DocumentType
 from app.models.user_has_roles import UserHasRole, RoleStatus
 from fastapi import HTTPException, status
-from sqlalchemy import func
+from sqlalchemy import func, update, tuple_
 from pydantic import BaseModel
 from uuid import UUID
 from app.models.driver_info import DriverInfo
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.services.verification_counter_service import get_verification_counts
+
+REVIEW_PAGE_SIZE = 50
+REVIEW_MAX_PAGE_SIZE = 200
 
 # modelo  para la respuesta de listas en ususario
 
@@ -17,10 +22,17 @@ from app.models.driver_info import DriverInfo
 class UserWithDocs(BaseModel):
     user: User
     documents: List[DriverDocuments]
+    # Documento más antiguo en ese estado: cuánto lleva esperando el conductor
+    waiting_since: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
+
+class UserWithDocsPage(BaseModel):
+    items: List[UserWithDocs]
+    next_cursor: Optional[str] = None
+
 # Primero, creamos un modelo para la respuesta del documento
 
 
@@ -52,55 +64,83 @@ class VerifyDocsService:
     def __init__(self, db):
         self.db = db
 
-    def get_users_with_pending_docs(self) -> List[UserWithDocs]:
-        """Lista usuarios con documentos pendientes y sus documentos, pero solo para conductores NO verificados (is_verified = False)"""
-        # Primero obtenemos los usuarios que son conductores NO verificados
-        unverified_drivers_query = (
-            select(User)
-            .join(UserHasRole, User.id == UserHasRole.id_user)
-            .where(
-                and_(
-                    UserHasRole.id_rol == "DRIVER",
-                    UserHasRole.is_verified == False  # Solo conductores no verificados
-                )
-            )
-        )
-        unverified_drivers = self.db.exec(unverified_drivers_query).all()
-
-        result = []
-        for user in unverified_drivers:
-            # Para cada conductor no verificado, obtenemos sus documentos pendientes
-            docs_query = (
-                select(DriverDocuments)
-                .join(DriverInfo, DriverDocuments.driver_info_id == DriverInfo.id)
-                .where(
-                    and_(
-                        DriverInfo.user_id == user.id,
-                        DriverDocuments.status == DriverStatus.PENDING
-                    )
-                )
-            )
-            pending_docs = self.db.exec(docs_query).all()
-
-            # Solo añadimos al resultado si el conductor tiene documentos pendientes
-            if pending_docs:
-                result.append(UserWithDocs(
-                    user=user,
-                    documents=pending_docs
-                ))
+    def _users_with_docs(self, doc_status: DriverStatus, unverified_only: bool = False,
+                         limit: Optional[int] = REVIEW_PAGE_SIZE,
+                         cursor: Optional[str] = None) -> UserWithDocsPage:
+        """
+        Cola de revisión: conductores con documentos en `doc_status` y esos
+        documentos, del que más lleva esperando al más reciente, paginado por
+        cursor sobre (documento más antiguo, user_id).
 
-        return result
+        Una sola consulta: la subconsulta agrupa y pagina los conductores y la
+        externa trae sus usuarios y documentos. Con limit=None retorna todo.
+        """
+        waiting_since = func.min(DriverDocuments.created_at).label("waiting_since")
+        page = (
+            select(DriverInfo.user_id.label("user_id"), waiting_since)
+            .join(DriverDocuments, DriverDocuments.driver_info_id == DriverInfo.id)
+            .where(DriverDocuments.status == doc_status)
+            .group_by(DriverInfo.user_id)
+        )
+        if unverified_only:
+            page = page.join(UserHasRole, and_(
+                UserHasRole.id_user == DriverInfo.user_id,
+                UserHasRole.id_rol == "DRIVER",
+                UserHasRole.is_verified == False
+            ))
+        after = decode_cursor(cursor)
+        if after is not None:
+            page = page.having(tuple_(waiting_since, DriverInfo.user_id) > tuple_(*after))
+        page = page.order_by(waiting_since, DriverInfo.user_id)
+        if limit is not None:
+            # Un conductor extra indica si hay más páginas
+            page = page.limit(limit + 1)
+        page = page.subquery()
+
+        rows = self.db.exec(
+            select(User, DriverDocuments, page.c.waiting_since)
+            .join(page, page.c.user_id == User.id)
+            .join(DriverInfo, DriverInfo.user_id == User.id)
+            .join(DriverDocuments, DriverDocuments.driver_info_id == DriverInfo.id)
+            .where(DriverDocuments.status == doc_status)
+            .order_by(page.c.waiting_since, page.c.user_id,
+                      DriverDocuments.document_type_id, DriverDocuments.created_at)
+        ).all()
+
+        grouped: Dict[UUID, UserWithDocs] = {}
+        for user, doc, since in rows:
+            entry = grouped.get(user.id)
+            if entry is None:
+                entry = grouped[user.id] = UserWithDocs(
+                    user=user, documents=[], waiting_since=since)
+            entry.documents.append(doc)
+
+        items = list(grouped.values())
+        next_cursor = None
+        if limit is not None and len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            next_cursor = encode_cursor(last.waiting_since, last.user.id)
+        return UserWithDocsPage(items=items, next_cursor=next_cursor)
+
+    def get_users_with_pending_docs(self, limit: Optional[int] = REVIEW_PAGE_SIZE,
+                                    cursor: Optional[str] = None) -> UserWithDocsPage:
+        """Conductores NO verificados con documentos pendientes, paginados por tiempo de espera"""
+        return self._users_with_docs(DriverStatus.PENDING, unverified_only=True,
+                                     limit=limit, cursor=cursor)
 
     def get_users_with_all_approved_docs(self) -> List[User]:
         """Lista usuarios con todos sus documentos aprobados y rol aprobado"""
         users_with_non_approved = (
-            select(DriverDocuments.user_id)
+            select(DriverInfo.user_id)
+            .join(DriverDocuments, DriverDocuments.driver_info_id == DriverInfo.id)
             .where(DriverDocuments.status != DriverStatus.APPROVED)
         )
 
         query = (
             select(User)
-            .join(DriverDocuments)
+            .join(DriverInfo, DriverInfo.user_id == User.id)
+            .join(DriverDocuments, DriverDocuments.driver_info_id == DriverInfo.id)
             # Join con UserHasRole
             .join(UserHasRole, User.id == UserHasRole.id_user)
             .where(
@@ -117,133 +157,50 @@ class VerifyDocsService:
 
     def get_verification_status(self) -> Dict[str, Any]:
         """
-        Obtiene estadísticas sobre el estado de verificación de los conductores.
+        Obtiene estadísticas sobre el estado de verificación de los conductores
+        desde los contadores mantenidos (ver verification_counter_service).
         """
-        # Total de conductores
-        total_drivers = self.db.exec(
-            select(func.count(UserHasRole.id))
-            .where(UserHasRole.id_rol == "DRIVER")
-        ).first() or 0
-
-        # Conductores verificados (is_verified = True)
-        verified_drivers = self.db.exec(
-            select(func.count(UserHasRole.id))
-            .where(
-                and_(
-                    UserHasRole.id_rol == "DRIVER",
-                    UserHasRole.is_verified == True
-                )
-            )
-        ).first() or 0
-
-        # Conductores con status APPROVED
-        approved_drivers = self.db.exec(
-            select(func.count(UserHasRole.id))
-            .where(
-                and_(
-                    UserHasRole.id_rol == "DRIVER",
-                    UserHasRole.status == RoleStatus.APPROVED
-                )
-            )
-        ).first() or 0
-
-        # Conductores con documentos pendientes
-        drivers_with_pending_docs = self.db.exec(
-            select(func.count(func.distinct(DriverInfo.user_id)))
-            .join(DriverDocuments, DriverInfo.id == DriverDocuments.driver_info_id)
-            .where(DriverDocuments.status == DriverStatus.PENDING)
-        ).first() or 0
+        counts = get_verification_counts(self.db)
+        total_drivers = counts["total_drivers"]
+        verified_drivers = counts["verified_drivers"]
+        approved_drivers = counts["approved_drivers"]
 
         return {
             "total_drivers": total_drivers,
             "verified_drivers": verified_drivers,
             "approved_drivers": approved_drivers,
-            "drivers_with_pending_docs": drivers_with_pending_docs,
+            "drivers_with_pending_docs": counts["drivers_with_pending_docs"],
             "verification_rate": (verified_drivers / total_drivers * 100) if total_drivers > 0 else 0,
             "approval_rate": (approved_drivers / total_drivers * 100) if total_drivers > 0 else 0
         }
 
-    def get_users_with_rejected_docs(self) -> List[UserWithDocs]:
-        """Lista usuarios con documentos rechazados"""
-        query = (
-            select(User)
-            .join(DriverDocuments)
-            .where(DriverDocuments.status == DriverStatus.REJECTED)
-            .distinct()
-        )
-
-        users = self.db.exec(query).all()
-
-        result = []
-        for user in users:
-            # Para cada usuario, obtenemos sus documentos revocado
-            docs_query = (
-                select(DriverDocuments)
-                .where(
-                    DriverDocuments.user_id == user.id,
-                    DriverDocuments.status == DriverStatus.REJECTED
-                )
-            )
-            rejected_docs = self.db.exec(docs_query).all()
-
-            result.append(UserWithDocs(
-                user=user,
-                documents=rejected_docs
-            ))
-        return result
-
-    def get_users_with_expired_docs(self) -> List[UserWithDocs]:
-        """Lista usuarios con documentos expirados"""
-        query = (
-            select(User)
-            .join(DriverDocuments)
-            .where(DriverDocuments.status == DriverStatus.EXPIRED)
-            .distinct()
-        )
-        users = self.db.exec(query).all()
-
-        result = []
-        for user in users:
-            # Para cada usuario, obtenemos sus documentos pendientes
-            docs_query = (
-                select(DriverDocuments)
-                .where(
-                    DriverDocuments.user_id == user.id,
-                    DriverDocuments.status == DriverStatus.EXPIRED
-                )
-            )
-            expired_docs = self.db.exec(docs_query).all()
-
-            result.append(UserWithDocs(
-                user=user,
-                documents=expired_docs
-            ))
+    def get_users_with_rejected_docs(self, limit: Optional[int] = REVIEW_PAGE_SIZE,
+                                     cursor: Optional[str] = None) -> UserWithDocsPage:
+        """Conductores con documentos rechazados, paginados por tiempo de espera"""
+        return self._users_with_docs(DriverStatus.REJECTED, limit=limit, cursor=cursor)
 
-        return result
+    def get_users_with_expired_docs(self, limit: Optional[int] = REVIEW_PAGE_SIZE,
+                                    cursor: Optional[str] = None) -> UserWithDocsPage:
+        """Conductores con documentos expirados, paginados por tiempo de espera"""
+        return self._users_with_docs(DriverStatus.EXPIRED, limit=limit, cursor=cursor)
 
     # actualiza los documentos que se venciron en fecha a expirado
 
     def update_expired_documents(self) -> int:
-        """Actualiza documentos expirados"""
+        """Actualiza documentos expirados (un solo UPDATE)"""
         current_date = datetime.utcnow()
-        query = (
-            select(DriverDocuments)
+        result = self.db.execute(
+            update(DriverDocuments)
             .where(
                 and_(
                     DriverDocuments.status == DriverStatus.APPROVED,
                     DriverDocuments.expiration_date < current_date
                 )
             )
+            .values(status=DriverStatus.EXPIRED)
         )
-        expired_docs = self.db.exec(query).all()
-
-        count = 0
-        for doc in expired_docs:
-            doc.status = DriverStatus.EXPIRED
-            count += 1
-
         self.db.commit()
-        return count
+        return result.rowcount or 0
 
     # muestra los usuarios que tienen documentos proximos a vencersen en fecha
 
@@ -255,7 +212,8 @@ class VerifyDocsService:
         # Primero obtenemos los usuarios y documentos
         query = (
             select(User, DriverDocuments)
-            .join(DriverDocuments)
+            .join(DriverInfo, DriverInfo.user_id == User.id)
+            .join(DriverDocuments, DriverDocuments.driver_info_id == DriverInfo.id)
             .where(
                 and_(
                     DriverDocuments.status == DriverStatus.APPROVED,
@@ -0,0 +1,70 @@
+from sqlalchemy import create_engine, event, insert
+from sqlmodel import Session, select
+
+from app.models.geocoded_address import GeocodedAddress
+from app.services import address_service
+from app.services.address_service import coord_key, resolve_address, warm_addresses
+
+
+def make_engine():
+    engine = create_engine("sqlite://")
+
+    # pysqlite no abre la transacción antes de un SAVEPOINT; la receta de
+    # SQLAlchemy para que begin_nested se comporte como en MySQL/PostgreSQL
+    @event.listens_for(engine, "connect")
+    def disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+    GeocodedAddress.__table__.create(engine)
+    return engine
+
+
+class TestResolveAddress:
+
+    def test_resolve_address_leaves_the_commit_to_the_caller(self, monkeypatch):
+        monkeypatch.setattr(address_service, "get_address_from_coords",
+                            lambda lat, lng: "Calle 100 # 15-20")
+        engine = make_engine()
+
+        with Session(engine) as session:
+            assert resolve_address(session, 4.68, -74.05) == "Calle 100 # 15-20"
+            # La transacción del llamador sigue abierta y se puede revertir
+            session.rollback()
+        with Session(engine) as session:
+            assert session.exec(select(GeocodedAddress)).all() == []
+
+    def test_resolve_address_tolerates_a_concurrent_insert(self, monkeypatch):
+        engine = make_engine()
+        session = Session(engine)
+
+        def geocode_while_another_request_saves(lat, lng):
+            # La fila aparece entre la lectura y el insert, como si otra
+            # petición la hubiera guardado mientras se geocodificaba
+            session.execute(insert(GeocodedAddress).values(
+                coord_key=coord_key(lat, lng), address="Calle 100"))
+            return "Calle 100 # 15-20"
+
+        monkeypatch.setattr(address_service, "get_address_from_coords",
+                            geocode_while_another_request_saves)
+
+        with session:
+            assert resolve_address(session, 4.68, -74.05) == "Calle 100 # 15-20"
+            # La transacción del llamador sigue utilizable
+            session.commit()
+        with Session(engine) as session:
+            assert [row.address for row in session.exec(select(GeocodedAddress)).all()] == ["Calle 100"]
+
+    def test_warm_addresses_commits_each_resolved_address(self, monkeypatch):
+        monkeypatch.setattr(address_service, "get_address_from_coords",
+                            lambda lat, lng: f"Dirección {lat},{lng}")
+        engine = make_engine()
+
+        with Session(engine) as session:
+            warm_addresses(session, [(4.68, -74.05), (4.70, -74.06)])
+        with Session(engine) as session:
+            keys = {row.coord_key for row in session.exec(select(GeocodedAddress)).all()}
+        assert keys == {coord_key(4.68, -74.05), coord_key(4.70, -74.06)}
@@ -9,6 +9,7 @@ from app.models.chat_message import ChatMessage, MessageStatus
 from app.models.user_has_roles import UserHasRole, RoleStatus
 from app.models.project_settings import ProjectSettings
 from app.core.db import engine
+from app.services.chat_service import get_conversation_unread_count
 from datetime import datetime, timedelta
 import pytz
 from geoalchemy2.shape import from_shape
@@ -220,6 +221,52 @@ class TestChatSystem:
         assert unread_counts[0]["unread_count"] == 1
         assert unread_counts[0]["conversation_id"] == str(client_request.id)
 
+    def test_unread_counter_incremented_on_send_and_reset_on_read(self, client: TestClient):
+        """Test para el contador de no leídos por conversación"""
+        client_user, driver_user = self._create_test_users()
+        client_request = self._create_test_client_request(
+            client_user.id, driver_user.id)
+        client_request_id = client_request.id
+
+        client_token = self._authenticate_user(
+            client, client_user.phone_number)
+        client_headers = {"Authorization": f"Bearer {client_token}"}
+
+        for text in ["Primer mensaje", "Segundo mensaje"]:
+            response = client.post("/chat/send", json={
+                "receiver_id": str(driver_user.id),
+                "client_request_id": str(client_request_id),
+                "message": text
+            }, headers=client_headers)
+            assert response.status_code == 201
+
+        with Session(engine) as session:
+            assert get_conversation_unread_count(
+                session, driver_user.id, client_request_id) == 2
+            assert get_conversation_unread_count(
+                session, client_user.id, client_request_id) == 0
+
+        driver_token = self._authenticate_user(
+            client, driver_user.phone_number)
+        driver_headers = {"Authorization": f"Bearer {driver_token}"}
+
+        response = client.get("/chat/unread-count", headers=driver_headers)
+        assert response.status_code == 200
+        unread_counts = response.json()
+        assert len(unread_counts) == 1
+        assert unread_counts[0]["unread_count"] == 2
+        assert unread_counts[0]["last_message"] == "Segundo mensaje"
+        assert unread_counts[0]["other_user_name"] == "Cliente Test"
+
+        response = client.patch(
+            f"/chat/mark-read/{client_request_id}", headers=driver_headers)
+        assert response.status_code == 200
+        assert response.json()["count"] == 2
+
+        with Session(engine) as session:
+            assert get_conversation_unread_count(
+                session, driver_user.id, client_request_id) == 0
+
     # Métodos auxiliares para crear datos de prueba
 
     def _create_test_users(self):
@@ -0,0 +1,86 @@
+from sqlmodel import Session, select
+
+from app.models.project_settings import ProjectSettingsUpdate
+from app.models.type_service import AllowedRole, TypeServiceCreate
+from app.models.vehicle_type import VehicleType
+from app.services.config_cache_service import (
+    ConfigCache,
+    get_project_settings,
+    get_type_services_by_vehicle_type,
+    set_config_cache,
+)
+from app.services.project_settings_service import update_project_settings_service
+from app.services.type_service_service import TypeServiceService
+
+
+class InMemoryBus:
+    """
+    Canal pub/sub en memoria que conecta varias cachés como si fueran workers.
+    """
+
+    def __init__(self):
+        self.subscribers = []
+
+    def publish(self, message):
+        for callback in list(self.subscribers):
+            callback(message)
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def close(self):
+        pass
+
+
+class TestConfigCache:
+
+    def test_project_settings_cached_and_invalidated_on_update(self, session: Session):
+        cache = ConfigCache(ttl=300)
+        set_config_cache(cache)
+        try:
+            first = get_project_settings(session)
+            second = get_project_settings(session)
+            assert first is second
+            assert cache.stats["hits"] == 1
+
+            update_project_settings_service(
+                session, ProjectSettingsUpdate(request_timeout_minutes=9))
+
+            refreshed = get_project_settings(session)
+            assert refreshed is not first
+            assert refreshed.request_timeout_minutes == 9
+        finally:
+            set_config_cache(None)
+
+    def test_new_type_service_invalidates_the_cache(self, session: Session):
+        cache = ConfigCache(ttl=300)
+        set_config_cache(cache)
+        try:
+            vehicle_type_id = session.exec(
+                select(VehicleType.id).where(VehicleType.name == "Car")).one()
+            before = get_type_services_by_vehicle_type(session, vehicle_type_id)
+
+            TypeServiceService(session).create_type_service(TypeServiceCreate(
+                name="Car_Ride_Express",
+                description="Servicio en carro con prioridad",
+                vehicle_type_id=vehicle_type_id,
+                allowed_role=AllowedRole.DRIVER
+            ))
+
+            after = get_type_services_by_vehicle_type(session, vehicle_type_id)
+            assert len(after) == len(before) + 1
+        finally:
+            set_config_cache(None)
+
+    def test_invalidation_propagates_to_other_workers(self):
+        bus = InMemoryBus()
+        worker_a = ConfigCache(ttl=300, bus=bus)
+        worker_b = ConfigCache(ttl=300, bus=bus)
+
+        worker_a.get_or_load("project_settings", lambda: "v1")
+        worker_b.get_or_load("project_settings", lambda: "v1")
+
+        worker_a.invalidate("project_settings")
+
+        assert worker_b.get_or_load("project_settings", lambda: "v2") == "v2"
+        assert worker_a.get_or_load("project_settings", lambda: "v2") == "v2"
@@ -0,0 +1,146 @@
+from uuid import uuid4
+
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlmodel import select
+
+from app.core.config import settings
+from app.core.sio_rooms import user_room
+from app.models.client_request import ClientRequest, StatusEnum
+from app.models.user import User
+from app.services.dispatch_feed_service import (
+    DispatchFeed,
+    LiveDriverIndex,
+    OFFER_EVENT,
+    REMOVED_REQUEST_EVENT,
+    build_dispatch_bus,
+    set_dispatch_feed,
+)
+
+
+class TestLiveDriverIndex:
+
+    def test_nearby_filters_by_radius_vehicle_type_and_moves(self):
+        index = LiveDriverIndex(ttl=60)
+        near, far, moto = uuid4(), uuid4(), uuid4()
+        index.upsert(near, 4.6500, -74.0600, 1)
+        index.upsert(far, 4.7500, -74.0600, 1)
+        index.upsert(moto, 4.6505, -74.0600, 2)
+
+        assert [driver for driver, _ in index.nearby(4.6510, -74.0600, 5000, 1)] == [near]
+
+        # Al moverse cambia de celda y sale del radio
+        index.upsert(near, 4.8000, -74.0600)
+        assert index.nearby(4.6510, -74.0600, 5000, 1) == []
+        # Sin suscripción previa no se agrega
+        assert index.upsert(uuid4(), 4.6510, -74.0600) is False
+
+
+class TestDispatchFeed:
+
+    def test_deltas_only_reach_drivers_that_received_the_request(self):
+        sent = []
+
+        async def emit(event, data, room):
+            sent.append((event, room))
+
+        feed = DispatchFeed(emit=emit)
+        request_id, first, second = uuid4(), uuid4(), uuid4()
+        feed._track(request_id, {first, second})
+
+        assert feed.publish_offer(request_id, first, 1) == 1
+        assert sent == [(OFFER_EVENT, user_room(second))]
+
+        sent.clear()
+        assert feed.publish_request_closed(request_id, "CANCELLED") == 2
+        assert {room for _, room in sent} == {user_room(first), user_room(second)}
+        assert all(event == REMOVED_REQUEST_EVENT for event, _ in sent)
+        # Ya cerrada: no se vuelve a notificar
+        assert feed.publish_request_closed(request_id, "CANCELLED") == 0
+
+    def test_bus_delivers_deltas_from_the_worker_that_holds_the_driver(self):
+        subscribers = []
+
+        class InMemoryBus:
+            def publish(self, message):
+                for callback in list(subscribers):
+                    callback(message)
+
+            def subscribe(self, callback):
+                subscribers.append(callback)
+
+            def close(self):
+                pass
+
+        sent = []
+
+        async def emit(event, data, room):
+            sent.append((event, room))
+
+        worker_a = DispatchFeed(emit=emit, bus=InMemoryBus())
+        worker_b = DispatchFeed(emit=emit, bus=InMemoryBus())
+        request_id, driver = uuid4(), uuid4()
+        worker_b._track(request_id, {driver})
+
+        # Cerrada desde el worker que atendió el REST
+        assert worker_a.publish_request_closed(request_id, "CANCELLED") == 0
+        assert sent == [(REMOVED_REQUEST_EVENT, user_room(driver))]
+
+        # Eventos del socket del pasajero reenviados a quienes la recibieron
+        sent.clear()
+        other_request = uuid4()
+        worker_b._track(other_request, {driver})
+        assert worker_a.publish_to_recipients(
+            other_request, "created_client_request", {"id_client_request": str(other_request)}) == 0
+        assert sent == [("created_client_request", user_room(driver))]
+
+    def test_redis_bus_logs_with_the_feed_label(self, monkeypatch, caplog):
+        monkeypatch.setattr(settings, "SIO_MANAGER", "redis")
+        monkeypatch.setattr(settings, "SIO_REDIS_URL", "redis://127.0.0.1:1/0")
+        bus = build_dispatch_bus()
+        assert bus.channel == settings.DISPATCH_FEED_CHANNEL
+
+        # Sin Redis la publicación solo deja un aviso con la etiqueta del feed
+        bus.publish({"type": "closed", "id": str(uuid4()), "status": "CANCELLED"})
+        assert "feed de despacho" in caplog.text
+        assert "caché de configuración" not in caplog.text
+
+
+class TestClosedRequestListener:
+
+    def test_closed_request_is_published_only_after_commit(self, session):
+        published = []
+
+        class RecordingFeed:
+            def publish_request_closed(self, client_request_id, status):
+                published.append((client_request_id, status))
+
+        set_dispatch_feed(RecordingFeed())
+        try:
+            client = session.exec(select(User)).first()
+            request = ClientRequest(
+                id_client=client.id,
+                fare_offered=20000,
+                pickup_description="Origen",
+                destination_description="Destino",
+                pickup_position=from_shape(Point(-74.073170, 4.718136), srid=4326),
+                destination_position=from_shape(Point(-74.109776, 4.702468), srid=4326),
+                type_service_id=1,
+                status=StatusEnum.CREATED,
+            )
+            session.add(request)
+            session.commit()
+
+            # Cancelada y revertida: no se avisa a los conductores
+            request.status = StatusEnum.CANCELLED
+            session.flush()
+            assert published == []
+            session.rollback()
+            assert published == []
+
+            assert request.status == StatusEnum.CREATED
+            request.status = "CANCELLED"
+            session.commit()
+            assert published == [(request.id, "CANCELLED")]
+        finally:
+            set_dispatch_feed(None)
@@ -710,3 +710,64 @@ def test_cannot_create_driver_if_user_suspended(client):
         except Exception as e:
             print(f"Error en el test: {str(e)}")
             raise
+
+
+def test_failed_driver_registration_releases_only_its_uploads(client):
+    """
+    Si el registro falla después de subir los archivos, solo se libera la
+    referencia de lo subido en esa solicitud: un archivo ya existente que el
+    cliente envía como URL conserva su referencia.
+    """
+    import hashlib
+    from sqlmodel import Session, select
+    from app.core.db import engine
+    from app.core.storage import content_key
+    from app.models.stored_file import StoredFile
+    from app.services.file_storage_service import get_content_store
+
+    table = StoredFile.__table__
+    with Session(engine) as session:
+        shared = get_content_store().put_upload_sync(
+            io.BytesIO(b"soat-compartido"), "soat.pdf", "application/pdf", session=session)
+        session.commit()
+
+    data = {
+        "user": json.dumps({
+            "full_name": "Conductor Fallido",
+            "country_code": "+57",
+            "phone_number": "3010000099"
+        }),
+        "driver_info": json.dumps({
+            "first_name": "Conductor",
+            "last_name": "Fallido",
+            "birth_date": "1990-01-01",
+            "email": "fallido@example.com"
+        }),
+        # Tipo de vehículo inexistente: falla al insertar VehicleInfo
+        "vehicle_info": json.dumps({
+            "brand": "Renault",
+            "model": "Logan",
+            "model_year": 2020,
+            "color": "Gris",
+            "plate": "FAL123",
+            "vehicle_type_id": 999
+        }),
+        "driver_documents": json.dumps({
+            "soat_url": shared.url,
+            "soat_expiration_date": "2030-01-01"
+        })
+    }
+    files = {
+        "selfie": ("selfie.jpg", b"selfie-fallida", "image/jpeg"),
+        "license_front": ("license_front.jpg", b"licencia-fallida", "image/jpeg"),
+    }
+    response = client.post("/drivers/", data=data, files=files)
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR, response.text
+
+    with Session(engine) as session:
+        counts = dict(session.exec(select(table.c.key, table.c.ref_count)).all())
+    selfie_key = content_key(hashlib.sha256(b"selfie-fallida").hexdigest(), ".jpg")
+    license_key = content_key(hashlib.sha256(b"licencia-fallida").hexdigest(), ".jpg")
+    assert counts[shared.key] == 1
+    assert counts[selfie_key] == 0
+    assert counts[license_key] == 0
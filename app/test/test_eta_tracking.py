@@ -0,0 +1,114 @@
+import asyncio
+from uuid import uuid4
+
+from app.services.eta_tracking_service import EtaTracker, TrackedTrip
+
+
+def make_tracker(routes):
+    emitted = []
+
+    async def emit(event, data, room):
+        emitted.append((event, data, room))
+
+    def fetch_route(driver, pickup):
+        routes.append(driver)
+        return 2000.0, 300.0
+
+    tracker = EtaTracker(emit=emit, fetch_route=fetch_route, interval=1)
+    tracker.move_threshold = 75
+    tracker.max_age = 30
+    tracker.route_refresh = 90
+    tracker.max_route_calls = 20
+    return tracker, emitted
+
+
+class TestEtaTracker:
+
+    def test_recomputes_only_after_movement_or_max_age(self):
+        routes = []
+        tracker, _ = make_tracker(routes)
+        trip_id = uuid4()
+        trip = TrackedTrip(trip_id, uuid4(), (4.6500, -74.0600), (4.6600, -74.0600))
+
+        assert len(tracker.compute([trip], now=0)) == 1
+        assert tracker.latest(trip_id).source == "google"
+
+        # Sin moverse y antes del tiempo máximo: no se recalcula
+        assert tracker.compute([trip], now=10) == []
+
+        # Se movió ~220 m: se escala la ruta en caché sin llamar a Google
+        trip.driver = (4.6520, -74.0600)
+        updates = tracker.compute([trip], now=20)
+        assert len(updates) == 1
+        assert updates[0][1].source == "route"
+        assert updates[0][1].distance < 2000.0
+        assert len(routes) == 1
+
+        # Vence la ruta: se vuelve a consultar Google
+        assert tracker.compute([trip], now=200)[0][1].source == "google"
+        assert len(routes) == 2
+
+    def test_inactive_trips_are_dropped_and_tick_emits(self):
+        tracker, emitted = make_tracker([])
+        trip_id = uuid4()
+        trip = TrackedTrip(trip_id, uuid4(), (4.65, -74.06), (4.66, -74.06))
+        tracker._load = lambda: [trip]
+
+        assert asyncio.run(tracker.tick()) == 1
+        assert emitted[0][0] == f"eta_update/{trip_id}"
+        assert emitted[0][2] == f"trip:{trip_id}"
+
+        tracker._load = lambda: []
+        asyncio.run(tracker.tick())
+        assert tracker.latest(trip_id) is None
+
+    def test_follower_workers_share_the_leader_snapshots(self):
+        subscribers = []
+
+        class InMemoryBus:
+            def publish(self, message):
+                for callback in list(subscribers):
+                    callback(message)
+
+            def subscribe(self, callback):
+                subscribers.append(callback)
+
+            def close(self):
+                pass
+
+        class StaticLock:
+            def __init__(self, leader):
+                self.leader = leader
+
+            def acquire(self):
+                return self.leader
+
+            def release(self):
+                pass
+
+        routes = []
+        leader, emitted = make_tracker(routes)
+        follower, _ = make_tracker(routes)
+        for tracker, is_leader in ((leader, True), (follower, False)):
+            tracker._bus = InMemoryBus()
+            tracker._bus.subscribe(tracker._on_message)
+            tracker._leader_lock = StaticLock(is_leader)
+        trip_id = uuid4()
+        trip = TrackedTrip(trip_id, uuid4(), (4.65, -74.06), (4.66, -74.06))
+        leader._load = lambda: [trip]
+
+        asyncio.run(leader.tick())
+        assert follower.latest(trip_id).distance == leader.latest(trip_id).distance
+
+        # El socket y POST start-tracking llegan al follower; calcula el líder
+        follower.observe_driver_position(trip_id, 4.6520, -74.06)
+        follower.request_refresh(trip_id)
+        assert asyncio.run(follower.tick()) == 0
+        assert asyncio.run(leader.tick()) == 1
+        assert leader.latest(trip_id).driver == (4.6520, -74.06)
+        assert follower.latest(trip_id).driver == (4.6520, -74.06)
+        assert len(emitted) == 2
+
+        leader._load = lambda: []
+        asyncio.run(leader.tick())
+        assert follower.latest(trip_id) is None
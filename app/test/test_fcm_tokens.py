@@ -573,3 +573,121 @@ class TestFCMTokens:
         android_token = next(
             t for t in data["tokens"] if t["fcm_token"] == "token_android")
         assert android_token["is_active"] is False
+
+    def test_push_dispatcher_batches_and_coalesces(self, session: Session):
+        """Test para el despachador push: lotes de 500 tokens y fusión de duplicados"""
+        from uuid import uuid4
+        from app.services.push_dispatch_service import PushDispatcher, FakePushClient, MAX_TOKENS_PER_BATCH
+
+        fake_client = FakePushClient()
+        # Con linger amplio los mensajes siguen pendientes mientras se encolan
+        dispatcher = PushDispatcher(client=fake_client, workers=1, linger=0.5)
+
+        user_id = uuid4()
+        # Dos ofertas distintas para el mismo usuario: se envían ambas
+        dispatcher.enqueue(user_id, ["token_a"], "Titulo 1", "Cuerpo 1", {"type": "new_offer", "offer_id": "1"})
+        dispatcher.enqueue(user_id, ["token_a"], "Titulo 2", "Cuerpo 2", {"type": "new_offer", "offer_id": "2"})
+        # Un duplicado exacto pendiente se fusiona
+        dispatcher.enqueue(user_id, ["token_a"], "Titulo 2", "Cuerpo 2", {"type": "new_offer", "offer_id": "2"})
+        # Mismo contenido para muchos usuarios: se agrupa en lotes de 500 tokens
+        for index in range(MAX_TOKENS_PER_BATCH + 10):
+            dispatcher.enqueue(uuid4(), [f"token_{index}"], "Oferta", "Nueva oferta", {"type": "offer"})
+
+        assert dispatcher.flush(timeout=10)
+        dispatcher.stop()
+
+        titles = [batch["title"] for batch in fake_client.sent]
+        assert sorted(title for title in titles if title != "Oferta") == ["Titulo 1", "Titulo 2"]
+        assert dispatcher.stats["coalesced"] == 1
+        assert all(len(batch["tokens"]) <= MAX_TOKENS_PER_BATCH for batch in fake_client.sent)
+        offer_tokens = sum(len(batch["tokens"]) for batch in fake_client.sent if batch["title"] == "Oferta")
+        assert offer_tokens == MAX_TOKENS_PER_BATCH + 10
+
+    def test_push_dispatcher_deactivates_unregistered_tokens(self, session: Session):
+        """Test para desactivar tokens que FCM reporta como no registrados"""
+        from app.services.push_dispatch_service import PushDispatcher, FakePushClient
+
+        user = User(
+            full_name="Test Push User",
+            country_code="+57",
+            phone_number="3001234599"
+        )
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+
+        for token in ["valid_token", "stale_token"]:
+            session.add(UserFCMToken(
+                user_id=user.id,
+                fcm_token=token,
+                device_type="android",
+                is_active=True
+            ))
+        session.commit()
+
+        fake_client = FakePushClient(invalid_tokens=["stale_token"])
+        dispatcher = PushDispatcher(
+            client=fake_client, workers=1, session_factory=lambda: Session(session.bind))
+        dispatcher.enqueue(user.id, ["valid_token", "stale_token"], "Hola", "Prueba")
+        assert dispatcher.flush(timeout=10)
+        dispatcher.stop()
+
+        assert dispatcher.stats["deactivated"] == 1
+        session.expire_all()
+        stale = session.exec(select(UserFCMToken).where(
+            UserFCMToken.fcm_token == "stale_token")).first()
+        valid = session.exec(select(UserFCMToken).where(
+            UserFCMToken.fcm_token == "valid_token")).first()
+        assert stale.is_active is False
+        assert valid.is_active is True
+
+    def test_send_batch_notification_to_many_drivers(self, session: Session):
+        """Test para el envío masivo de una plantilla a varios conductores"""
+        from app.services.push_dispatch_service import PushDispatcher, FakePushClient, set_push_dispatcher
+
+        fake_client = FakePushClient()
+        dispatcher = PushDispatcher(client=fake_client, workers=1)
+        set_push_dispatcher(dispatcher)
+        try:
+            driver_ids = []
+            for index in range(5):
+                driver = User(
+                    full_name=f"Batch Driver {index}",
+                    country_code="+57",
+                    phone_number=f"30055500{index:02d}"
+                )
+                session.add(driver)
+                session.commit()
+                session.refresh(driver)
+                driver_ids.append(driver.id)
+                # El último conductor no tiene tokens registrados
+                if index < 4:
+                    session.add(UserFCMToken(
+                        user_id=driver.id,
+                        fcm_token=f"batch_token_{index}",
+                        device_type="android",
+                        is_active=True
+                    ))
+            session.commit()
+
+            notification_service = NotificationService(session)
+            result = notification_service.notify_drivers(
+                driver_ids,
+                "pending_request_cancelled",
+                request_id=driver_ids[0],
+                reason="Prueba"
+            )
+
+            assert result["recipients"] == 4
+            assert result["without_tokens"] == 1
+            assert result["queued"] == 4
+            assert dispatcher.flush(timeout=10)
+
+            sent_tokens = [
+                token for batch in fake_client.sent for token in batch["tokens"]]
+            assert sorted(sent_tokens) == [
+                f"batch_token_{index}" for index in range(4)]
+            assert all(batch["title"] == "Solicitud pendiente cancelada"
+                       for batch in fake_client.sent)
+        finally:
+            set_push_dispatcher(None)
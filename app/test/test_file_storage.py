@@ -0,0 +1,140 @@
+import base64
+import hashlib
+import io
+import os
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlmodel import Session
+
+from app.core.storage import LocalStorageBackend, S3StorageBackend, content_key, key_from_url
+from app.models.stored_file import StoredFile
+from app.services.file_storage_service import ContentStore, release_reference
+
+
+class NotFound(Exception):
+    response = {"Error": {"Code": "404"}}
+
+
+class FakeS3Client:
+    """
+    Sustituto en memoria del cliente de S3 (head/upload/delete/presign).
+    """
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = 0
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFound()
+        return {"ContentLength": len(self.objects[(Bucket, Key)][0])}
+
+    def upload_file(self, path, bucket, key, ExtraArgs=None):
+        with open(path, "rb") as f:
+            self.objects[(bucket, key)] = (f.read(), ExtraArgs)
+        self.uploads += 1
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3.local/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
+
+
+def make_session():
+    engine = create_engine("sqlite://")
+    StoredFile.__table__.create(engine)
+    return Session(engine)
+
+
+def ref_count(session, key):
+    table = StoredFile.__table__
+    return session.execute(
+        select(table.c.ref_count).where(table.c.key == key)).scalar()
+
+
+class TestContentStore:
+
+    def test_same_content_is_stored_once_and_counted(self, tmp_path):
+        backend = LocalStorageBackend(root=str(tmp_path / "uploads"),
+                                      public_url="http://cdn.test/uploads", secret="s")
+        store = ContentStore(backend, staging_dir=str(tmp_path / "tmp"))
+        session = make_session()
+        data = b"%PDF-1.4 soat"
+
+        first = store.put_upload_sync(io.BytesIO(data), "soat.PDF", "application/pdf", session=session)
+        second = store.put_upload_sync(io.BytesIO(data), "otro.pdf", "application/pdf", session=session)
+        session.commit()
+
+        sha = hashlib.sha256(data).hexdigest()
+        assert first.key == second.key == content_key(sha, ".pdf")
+        assert first.url == f"http://cdn.test/uploads/objects/{sha[:2]}/{sha}.pdf"
+        assert open(backend.path_for(first.key), "rb").read() == data
+        assert ref_count(session, first.key) == 2
+        assert os.listdir(tmp_path / "tmp") == []
+
+    def test_garbage_collector_only_deletes_unreferenced_files_after_grace(self, tmp_path):
+        backend = LocalStorageBackend(root=str(tmp_path), public_url="http://cdn.test", secret="s")
+        store = ContentStore(backend, staging_dir=str(tmp_path / "tmp"))
+        session = make_session()
+        kept = store.put_upload_sync(io.BytesIO(b"licencia"), "a.jpg", session=session)
+        dropped = store.put_upload_sync(io.BytesIO(b"selfie vieja"), "b.jpg", session=session)
+        session.commit()
+
+        assert release_reference(session, dropped.url)
+        assert not release_reference(session, "http://cdn.test/users/selfie_legacy.jpg")
+        session.commit()
+        # Dentro del periodo de gracia no se borra
+        assert store.collect_garbage(session, grace_seconds=3600) == 0
+
+        table = StoredFile.__table__
+        session.execute(update(table).where(table.c.key == dropped.key).values(
+            updated_at=datetime.now() - timedelta(days=2)))
+        session.commit()
+        assert store.collect_garbage(session, grace_seconds=3600) == 1
+        assert not backend.exists(dropped.key)
+        assert backend.exists(kept.key)
+        assert ref_count(session, dropped.key) is None
+
+    def test_local_signed_url_matches_nginx_secure_link(self, tmp_path):
+        backend = LocalStorageBackend(root=str(tmp_path), public_url="http://cdn.test/static/uploads",
+                                      secret="secreto")
+        url = backend.signed_url("objects/ab/abc.jpg", ttl=60)
+
+        parts = urlsplit(url)
+        query = parse_qs(parts.query)
+        expected = base64.urlsafe_b64encode(hashlib.md5(
+            f"{query['expires'][0]}{parts.path} secreto".encode()).digest()).decode().rstrip("=")
+        assert parts.path == "/static/uploads/objects/ab/abc.jpg"
+        assert query["md5"][0] == expected
+        assert key_from_url(url) == "objects/ab/abc.jpg"
+
+    def test_local_signed_url_requires_secret(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("app.core.storage.settings.STORAGE_URL_SECRET", None)
+        backend = LocalStorageBackend(root=str(tmp_path), public_url="http://cdn.test")
+
+        assert backend.url_for("objects/ab/abc.jpg") == "http://cdn.test/objects/ab/abc.jpg"
+        with pytest.raises(ValueError):
+            backend.signed_url("objects/ab/abc.jpg")
+
+    def test_s3_backend_uploads_once_with_immutable_cache_headers(self, tmp_path):
+        client = FakeS3Client()
+        backend = S3StorageBackend(bucket="milla99", client=client,
+                                   endpoint_url="http://minio.local:9000")
+        store = ContentStore(backend, staging_dir=str(tmp_path / "tmp"))
+        session = make_session()
+
+        first = store.put_upload_sync(io.BytesIO(b"tarjeta"), "front.png", "image/png", session=session)
+        store.put_upload_sync(io.BytesIO(b"tarjeta"), "front.png", "image/png", session=session)
+
+        assert client.uploads == 1
+        body, extra = client.objects[("milla99", first.key)]
+        assert body == b"tarjeta"
+        assert extra["CacheControl"].endswith("immutable")
+        assert extra["ContentType"] == "image/png"
+        assert first.url == f"http://minio.local:9000/milla99/{first.key}"
+        assert "X-Amz-Expires=60" in store.signed_url(first.url, ttl=60)
+        assert os.listdir(tmp_path / "tmp") == []
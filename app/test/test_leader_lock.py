@@ -0,0 +1,81 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from app.core.leader_lock import LeaderLock
+
+
+class FakeConnection:
+    """
+    Conexión que responde al advisory lock; `alive=False` simula que el
+    servidor la cerró.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.alive = True
+        self.closed = False
+
+    def execute(self, statement):
+        if not self.alive:
+            raise ConnectionError("server closed the connection unexpectedly")
+        if "pg_try_advisory_lock" in str(statement):
+            self.engine.lock_attempts += 1
+            # Da tiempo a que otros hilos lleguen a la vez
+            time.sleep(0.01)
+        return SimpleNamespace(scalar=lambda: True)
+
+    def commit(self):
+        pass
+
+    def invalidate(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class FakeEngine:
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self):
+        self.connections = []
+        self.lock_attempts = 0
+
+    def connect(self):
+        conn = FakeConnection(self)
+        self.connections.append(conn)
+        return conn
+
+
+class TestLeaderLock:
+
+    def test_lost_connection_gives_up_leadership(self):
+        engine = FakeEngine()
+        lock = LeaderLock(1, engine=engine)
+
+        assert lock.acquire() is True
+        assert lock.acquire() is True
+        assert len(engine.connections) == 1
+
+        engine.connections[0].alive = False
+        assert lock.acquire() is False
+        assert engine.connections[0].closed
+        # En el siguiente intento vuelve a competir con una conexión nueva
+        assert lock.acquire() is True
+        assert len(engine.connections) == 2
+
+    def test_concurrent_acquire_opens_a_single_connection(self):
+        engine = FakeEngine()
+        lock = LeaderLock(1, engine=engine)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(lock.acquire()))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [True] * 5
+        assert engine.lock_attempts == 1
+        assert len(engine.connections) == 1
@@ -0,0 +1,112 @@
+import json
+import logging
+import sys
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core import logging_config
+from app.core.config import settings
+from app.core.logging_config import DebugSamplingFilter, JSONFormatter, configure_logging, stop_logging
+from app.core.middleware.auth import JWTAuthMiddleware
+
+
+def make_record(level=logging.INFO, msg="hola %s", args=("mundo",), **extra):
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+class TestJSONFormatter:
+
+    def test_one_json_line_with_extra_fields(self):
+        line = JSONFormatter().format(make_record(client_request_id="abc", elapsed_ms=12))
+
+        payload = json.loads(line)
+        assert payload["level"] == "INFO"
+        assert payload["logger"] == "app.test"
+        assert payload["message"] == "hola mundo"
+        assert payload["client_request_id"] == "abc"
+        assert payload["elapsed_ms"] == 12
+        assert "\n" not in line
+
+    def test_exception_and_non_serializable_values(self):
+        try:
+            raise ValueError("falló")
+        except ValueError:
+            record = make_record(level=logging.ERROR, duration=timedelta(seconds=3))
+            record.exc_info = sys.exc_info()
+
+        payload = json.loads(JSONFormatter().format(record))
+        assert "ValueError: falló" in payload["exc_info"]
+        assert payload["duration"] == "0:00:03"
+
+
+class TestDebugSamplingFilter:
+
+    def test_samples_only_debug_records(self, monkeypatch):
+        sampler = DebugSamplingFilter(sample_rate=0.25)
+        monkeypatch.setattr(logging_config.random, "random", lambda: 0.5)
+        assert not sampler.filter(make_record(level=logging.DEBUG))
+        assert sampler.filter(make_record(level=logging.INFO))
+
+        monkeypatch.setattr(logging_config.random, "random", lambda: 0.1)
+        assert sampler.filter(make_record(level=logging.DEBUG))
+
+    def test_full_rate_keeps_every_debug_record(self):
+        sampler = DebugSamplingFilter(sample_rate=1.0)
+        assert all(sampler.filter(make_record(level=logging.DEBUG)) for _ in range(50))
+
+
+class TestConfigureLogging:
+
+    def test_root_and_module_levels(self):
+        root = logging.getLogger()
+        previous_handlers, previous_level = list(root.handlers), root.level
+        try:
+            configure_logging(level="warning", module_levels={"app.services.noisy": "error",
+                                                              "app.services.chatty": "debug"},
+                              log_format="text", debug_sample_rate=1.0)
+            assert root.level == logging.WARNING
+            assert logging.getLogger("app.services.noisy").level == logging.ERROR
+            assert logging.getLogger("app.services.chatty").level == logging.DEBUG
+            # La app solo encola; el hilo del listener escribe
+            assert [type(handler) for handler in root.handlers] == [logging.handlers.QueueHandler]
+        finally:
+            stop_logging()
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            for handler in previous_handlers:
+                root.addHandler(handler)
+            root.setLevel(previous_level)
+            logging.getLogger("app.services.noisy").setLevel(logging.NOTSET)
+            logging.getLogger("app.services.chatty").setLevel(logging.NOTSET)
+
+
+class TestAuthMiddlewareLogs:
+
+    def test_credentials_are_never_logged(self, caplog):
+        app = FastAPI()
+        app.add_middleware(JWTAuthMiddleware)
+
+        @app.get("/private")
+        def private(request: Request):
+            return {"user_id": str(request.state.user_id)}
+
+        client = TestClient(app)
+        token = jwt.encode({"sub": "2f1d0c7e-6a4b-4c1e-9a51-3b0f5d3c9e11",
+                            "exp": datetime.now(timezone.utc) + timedelta(minutes=5)},
+                           settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+        caplog.set_level(logging.DEBUG, logger="app.core.middleware.auth")
+
+        assert client.get("/private", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+        assert client.get("/private").status_code == 401
+        assert client.get("/private", headers={"Authorization": "Bearer no-es-un-jwt"}).status_code == 401
+
+        assert token[:20] not in caplog.text
+        assert "no-es-un-jwt" not in caplog.text
+        assert "Bearer" not in caplog.text
+        # Un 401 es rutina: no llega a WARNING
+        assert all(record.levelno < logging.WARNING for record in caplog.records)
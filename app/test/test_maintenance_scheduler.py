@@ -0,0 +1,84 @@
+import asyncio
+
+from sqlmodel import Session
+
+from app.core.scheduler import MaintenanceScheduler, ScheduledJob
+from app.services.maintenance_service import record_job_run
+from app.services.statistics_service import StatisticsService
+
+
+class FollowerLock:
+    """
+    Lock de líder que nunca se obtiene (otro worker es el líder).
+    """
+
+    def acquire(self):
+        return False
+
+    def release(self):
+        pass
+
+
+class TestMaintenanceScheduler:
+
+    def test_run_job_records_timing_result_and_failures(self):
+        scheduler = MaintenanceScheduler()
+        scheduler.add_job("ok", lambda: {"deleted_tokens": 3}, interval=60)
+
+        def broken():
+            raise RuntimeError("sin conexión")
+
+        scheduler.add_job("broken", broken, interval=60)
+
+        assert asyncio.run(scheduler.run_job("ok")) == {"deleted_tokens": 3}
+        asyncio.run(scheduler.run_job("broken"))
+
+        stats = scheduler.stats()
+        assert stats["ok"]["runs"] == 1 and stats["ok"]["failures"] == 0
+        assert stats["ok"]["last_result"] == {"deleted_tokens": 3}
+        assert stats["ok"]["last_ms"] is not None
+        assert stats["broken"]["failures"] == 1
+        assert stats["broken"]["last_error"] == "sin conexión"
+
+    def test_only_the_leader_runs_jobs(self):
+        calls = []
+        scheduler = MaintenanceScheduler(leader_lock=FollowerLock())
+        scheduler.add_job("sweep", lambda: calls.append(1), interval=60)
+
+        assert asyncio.run(scheduler.run_job("sweep")) is None
+        assert calls == []
+        assert scheduler.stats()["sweep"]["skipped_not_leader"] == 1
+
+    def test_loop_runs_periodically_with_jitter(self):
+        job = ScheduledJob("sweep", lambda: None, interval=100, jitter=0.1)
+        delays = [job.next_delay() for _ in range(200)]
+        assert all(90 <= delay <= 110 for delay in delays)
+        assert len(set(delays)) > 1
+
+        calls = []
+        scheduler = MaintenanceScheduler()
+        scheduler.add_job("sweep", lambda: calls.append(1), interval=0.01, jitter=0)
+
+        async def scenario():
+            scheduler.start()
+            await asyncio.sleep(0.1)
+            await scheduler.stop()
+
+        asyncio.run(scenario())
+        assert len(calls) >= 2
+
+    def test_suspension_stats_read_the_persisted_sweep(self, session: Session):
+        stats = StatisticsService(session)
+        record_job_run(session, "lift_suspensions", {
+            "total_suspended_drivers": 5, "suspensions_lifted": 2, "still_suspended": 3})
+
+        # Lo lee cualquier worker, aunque no haya corrido el job
+        summary = stats.get_suspended_drivers_stats()
+        assert summary["suspensions_lifted"] == 2
+        assert summary["still_suspended"] == 3
+        assert summary["last_sweep_at"] is not None
+
+        record_job_run(session, "lift_suspensions", {
+            "total_suspended_drivers": 3, "suspensions_lifted": 3, "still_suspended": 0})
+        summary = stats.get_suspended_drivers_stats()
+        assert (summary["suspensions_lifted"], summary["still_suspended"]) == (3, 0)
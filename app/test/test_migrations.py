@@ -0,0 +1,27 @@
+import sqlalchemy
+from sqlmodel import Session
+
+from app.core.migrations import run_migrations, migration_status
+from app.core.migrations.versions.v0002_hot_path_indexes import INDEXES
+
+
+class TestMigrations:
+
+    def test_run_migrations_is_idempotent_and_creates_indexes(self, session: Session):
+        engine = session.get_bind()
+
+        run_migrations(engine)
+        # Una segunda corrida no aplica nada
+        assert run_migrations(engine) == []
+        assert all(item["applied_at"] is not None
+                   for item in migration_status(engine))
+
+        inspector = sqlalchemy.inspect(engine)
+        index_names = {
+            index["name"]
+            for table_name in INDEXES
+            for index in inspector.get_indexes(table_name)
+        }
+        assert "idx_client_request_open_created" in index_names
+        assert "idx_transaction_user_type" in index_names
+        assert "idx_user_fcm_token_user_active" in index_names
@@ -0,0 +1,27 @@
+from uuid import uuid4
+
+from app.services.offer_view_service import OfferViewCache
+
+
+class TestOfferViewCache:
+
+    def test_view_reused_until_offer_set_changes(self):
+        cache = OfferViewCache(ttl=300)
+        request_id = uuid4()
+        builds = []
+
+        def builder():
+            builds.append(1)
+            return [len(builds)]
+
+        assert cache.get_or_build(request_id, (1, "t1"), builder) == [1]
+        assert cache.get_or_build(request_id, (1, "t1"), builder) == [1]
+        # Llega una oferta nueva: cambia la versión y se reconstruye
+        assert cache.get_or_build(request_id, (2, "t2"), builder) == [2]
+        assert cache.stats == {"hits": 1, "misses": 2}
+
+    def test_expired_view_is_rebuilt(self):
+        cache = OfferViewCache(ttl=0)
+        request_id = uuid4()
+        cache.get_or_build(request_id, (1, "t1"), lambda: ["a"])
+        assert cache.get_or_build(request_id, (1, "t1"), lambda: ["b"]) == ["b"]
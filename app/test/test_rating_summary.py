@@ -0,0 +1,33 @@
+from sqlmodel import Session, select
+
+from app.models.user import User
+from app.services.driver_trip_offer_service import get_average_rating
+from app.services.rating_summary_service import (
+    DRIVER_ROLE,
+    PASSENGER_ROLE,
+    get_average_ratings,
+    get_rating_summary,
+    record_rating,
+)
+
+
+class TestRatingSummary:
+
+    def test_record_rating_accumulates_average(self, session: Session):
+        users = session.exec(select(User).limit(2)).all()
+        rated, unrated = users[0], users[1]
+
+        record_rating(session, rated.id, DRIVER_ROLE, 5)
+        record_rating(session, rated.id, DRIVER_ROLE, 4)
+        record_rating(session, rated.id, PASSENGER_ROLE, 3)
+        session.commit()
+
+        summary = get_rating_summary(session, rated.id, DRIVER_ROLE)
+        assert summary.rating_count == 2
+        assert summary.rating_sum == 9
+        assert summary.average == 4.5
+        assert get_average_rating(session, "passenger", rated.id) == 3
+
+        averages = get_average_ratings(
+            session, DRIVER_ROLE, [rated.id, unrated.id])
+        assert averages == {rated.id: 4.5, unrated.id: 0.0}
@@ -0,0 +1,160 @@
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.services.refresh_token_service import (
+    RefreshTokenService,
+    RevokedTokenCache,
+    drop_expired_refresh_token_partitions,
+    ensure_refresh_token_partitions,
+    hash_token,
+    set_revoked_token_cache,
+)
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def scalar(self):
+        return self.rows[0] if self.rows else None
+
+    def scalars(self):
+        return self.rows
+
+
+class FakePostgresConnection:
+    """
+    Conexión que responde las consultas de catálogo de una tabla
+    refresh_token particionada y registra el DDL emitido.
+    """
+
+    def __init__(self, partitions):
+        self.dialect = SimpleNamespace(name="postgresql")
+        self.partitions = list(partitions)
+        self.ddl = []
+
+    def execute(self, statement):
+        sql = str(statement)
+        if "pg_partitioned_table" in sql:
+            return FakeResult([1])
+        if "pg_inherits" in sql:
+            return FakeResult(self.partitions)
+        self.ddl.append(sql)
+        return FakeResult()
+
+    @contextmanager
+    def begin_nested(self):
+        yield
+
+
+class TestRevokedTokenCache:
+
+    def test_entries_expire_and_are_bounded(self):
+        cache = RevokedTokenCache(max_entries=2, ttl=60)
+        cache.add_many(["a", "b", "c"])
+        assert "a" not in cache
+        assert "b" in cache and "c" in cache
+
+        expired = RevokedTokenCache(max_entries=10, ttl=0)
+        expired.add("a")
+        assert "a" not in expired
+
+
+class TestRefreshTokenRotation:
+
+    def test_rotation_revokes_old_token_and_rejects_replay(self, session: Session):
+        set_revoked_token_cache(RevokedTokenCache(max_entries=100, ttl=60))
+        try:
+            user = session.exec(select(User).where(User.is_active == True)).first()
+            service = RefreshTokenService(session)
+            token, _ = service.generate_refresh_token(user.id, "pytest", "127.0.0.1")
+
+            access_token, new_token = service.rotate_refresh_token(token, "pytest", "127.0.0.1")
+            assert access_token and new_token != token
+
+            rows = {row.token_hash: row for row in session.exec(
+                select(RefreshToken).where(RefreshToken.user_id == user.id)).all()}
+            assert rows[hash_token(token)].is_revoked
+            assert not rows[hash_token(new_token)].is_revoked
+            assert rows[hash_token(new_token)].user_agent == "pytest"
+
+            # Reusar el token rotado falla sin consultar la base
+            hits = service.revoked.stats["hits"]
+            assert service.validate_refresh_token(token) is None
+            assert service.revoked.stats["hits"] == hits + 1
+
+            assert service.revoke_all_user_tokens(user.id) >= 1
+            assert service.validate_refresh_token(new_token) is None
+        finally:
+            set_revoked_token_cache(None)
+
+    def test_rotation_rejects_inactive_user_without_rotating(self, session: Session):
+        set_revoked_token_cache(RevokedTokenCache(max_entries=100, ttl=60))
+        try:
+            user = User(full_name="Usuario Inactivo", country_code="+57",
+                        phone_number="3209990010", is_active=False)
+            session.add(user)
+            session.commit()
+            service = RefreshTokenService(session)
+            token, _ = service.generate_refresh_token(user.id, "pytest", "127.0.0.1")
+
+            with pytest.raises(HTTPException) as error:
+                service.rotate_refresh_token(token, "pytest", "127.0.0.1")
+            assert error.value.status_code == 404
+
+            rows = session.exec(select(RefreshToken).where(RefreshToken.user_id == user.id)).all()
+            assert len(rows) == 1 and not rows[0].is_revoked
+        finally:
+            set_revoked_token_cache(None)
+
+
+def _month_name(year, month):
+    return f"refresh_token_p{year:04d}{month:02d}"
+
+
+class TestRefreshTokenPartitions:
+
+    def test_creates_missing_months_and_default_partition(self):
+        now = datetime.utcnow()
+        current = (now.year, now.month)
+        following = (now.year + now.month // 12, now.month % 12 + 1)
+        after = (following[0] + following[1] // 12, following[1] % 12 + 1)
+        conn = FakePostgresConnection([_month_name(*current)])
+
+        created = ensure_refresh_token_partitions(conn, until=datetime(*after, 1))
+
+        assert created == [_month_name(*following), _month_name(*after), "refresh_token_default"]
+        assert conn.ddl == [
+            f"CREATE TABLE {_month_name(*following)} PARTITION OF refresh_token "
+            f"FOR VALUES FROM ('{following[0]:04d}-{following[1]:02d}-01') "
+            f"TO ('{after[0]:04d}-{after[1]:02d}-01')",
+            f"CREATE TABLE {_month_name(*after)} PARTITION OF refresh_token "
+            f"FOR VALUES FROM ('{after[0]:04d}-{after[1]:02d}-01') "
+            f"TO ('{after[0] + after[1] // 12:04d}-{after[1] % 12 + 1:02d}-01')",
+            "CREATE TABLE refresh_token_default PARTITION OF refresh_token DEFAULT",
+        ]
+
+    def test_drops_only_fully_expired_months(self):
+        now = datetime.utcnow()
+        current = _month_name(now.year, now.month)
+        conn = FakePostgresConnection(
+            ["refresh_token_p202001", "refresh_token_p202002", current, "refresh_token_default"])
+
+        assert drop_expired_refresh_token_partitions(conn) == [
+            "refresh_token_p202001", "refresh_token_p202002"]
+        assert conn.ddl == ["DROP TABLE refresh_token_p202001", "DROP TABLE refresh_token_p202002"]
+
+    def test_other_dialects_emit_no_ddl(self):
+        conn = FakePostgresConnection([])
+        conn.dialect.name = "mysql"
+
+        assert ensure_refresh_token_partitions(conn) == []
+        assert drop_expired_refresh_token_partitions(conn) == []
+        assert conn.ddl == []
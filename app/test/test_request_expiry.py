@@ -0,0 +1,62 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytz
+
+from app.services.request_expiry_service import RequestExpiryEngine
+
+COLOMBIA_TZ = pytz.timezone("America/Bogota")
+
+
+class TestRequestExpiryEngine:
+
+    def test_pop_due_returns_only_expired_requests_in_creation_order(self):
+        engine = RequestExpiryEngine(batch_size=10)
+        now = datetime.now(COLOMBIA_TZ)
+        old, older, recent = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        engine.schedule(old, now - timedelta(minutes=6))
+        engine.schedule(recent, now - timedelta(minutes=1))
+        engine.schedule(older, now - timedelta(minutes=10))
+
+        due = engine.pop_due(5 * 60, now=now.timestamp())
+
+        assert due == [older, old]
+        assert len(engine) == 1 and recent in engine
+        assert engine.next_deadline(5 * 60) == (now - timedelta(minutes=1)).timestamp() + 300
+
+    def test_discarded_requests_never_expire(self):
+        engine = RequestExpiryEngine(batch_size=10)
+        now = datetime.now(COLOMBIA_TZ)
+        accepted, waiting = uuid.uuid4(), uuid.uuid4()
+        engine.schedule(accepted, now - timedelta(minutes=30))
+        engine.schedule(waiting, now - timedelta(minutes=20))
+        # Un conductor la tomó antes del plazo
+        engine.discard(accepted)
+
+        assert engine.pop_due(5 * 60, now=now.timestamp()) == [waiting]
+        assert engine.next_deadline(5 * 60) is None
+
+    def test_naive_created_at_is_read_as_bogota_time(self):
+        engine = RequestExpiryEngine(batch_size=10)
+        now = datetime.now(COLOMBIA_TZ)
+        request_id = uuid.uuid4()
+        engine.schedule(request_id, (now - timedelta(minutes=4)).replace(tzinfo=None))
+
+        assert engine.pop_due(5 * 60, now=now.timestamp()) == []
+        assert engine.pop_due(5 * 60, now=(now + timedelta(minutes=2)).timestamp()) == [request_id]
+
+    def test_pop_due_respects_batch_limit(self):
+        engine = RequestExpiryEngine(batch_size=2)
+        created = datetime.now(COLOMBIA_TZ) - timedelta(hours=1)
+        for _ in range(5):
+            engine.schedule(uuid.uuid4(), created)
+
+        assert len(engine.pop_due(60)) == 2
+        assert len(engine) == 3
+
+    def test_tick_without_scheduled_requests_skips_the_database(self):
+        engine = RequestExpiryEngine()
+        engine._expire_due = lambda: (_ for _ in ()).throw(AssertionError("no debe consultar"))
+
+        assert asyncio.run(engine.tick()) == 0
@@ -0,0 +1,66 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+import socketio
+
+from app.core.sio_manager import (
+    LocalPubSubBroker,
+    LocalPubSubManager,
+    build_client_manager,
+    get_sio_stats,
+)
+from app.core.sio_rooms import user_room
+
+
+def make_worker(broker):
+    """
+    AsyncServer conectado al broker como si fuera otro worker; registra a
+    qué sockets locales se envió cada paquete.
+    """
+    sio = socketio.AsyncServer(
+        async_mode="asgi", client_manager=LocalPubSubManager(broker))
+    sio.manager_initialized = True
+    sio.manager.initialize()
+    sent = []
+
+    async def send_packet(eio_sid, pkt):
+        sent.append(eio_sid)
+
+    sio.eio.send_packet = send_packet
+    return sio, sent
+
+
+class TestSioManager:
+
+    def test_build_client_manager_by_backend(self):
+        assert isinstance(build_client_manager("memory"), socketio.AsyncManager)
+        with pytest.raises(ValueError):
+            build_client_manager("kafka")
+
+    def test_emit_reaches_socket_connected_to_another_worker(self):
+        user_id = uuid4()
+
+        async def scenario():
+            broker = LocalPubSubBroker()
+            worker_a, sent_a = make_worker(broker)
+            worker_b, sent_b = make_worker(broker)
+            try:
+                await asyncio.sleep(0)
+                sid = await worker_b.manager.connect("eio-b", "/")
+                await worker_b.manager.enter_room(sid, "/", user_room(user_id))
+
+                await worker_a.emit("driver_assigned/x", {"ok": True}, room=user_room(user_id))
+                await asyncio.sleep(0.05)
+                return sent_a, sent_b, get_sio_stats(worker_a), get_sio_stats(worker_b)
+            finally:
+                worker_a.manager.thread.cancel()
+                worker_b.manager.thread.cancel()
+
+        sent_a, sent_b, stats_a, stats_b = asyncio.run(scenario())
+        assert sent_a == []
+        assert sent_b == ["eio-b"]
+        assert stats_a["published"] == 1
+        assert stats_b["received"] >= 1
+        assert stats_b["connected"] == 1 and stats_b["rooms"] == 1
+        assert stats_b["listener_alive"] is True
@@ -0,0 +1,155 @@
+import asyncio
+from uuid import uuid4
+
+from app.core import sio_events
+from app.core.sio_events import (
+    change_driver_position,
+    new_driver_assigned,
+    sio,
+    trip_change_driver_position,
+    update_eta,
+    update_status_trip,
+)
+from app.core.sio_rooms import area_room, area_rooms_around, trip_room, user_room
+
+
+def _fake_trip_access(monkeypatch, participants):
+    """
+    Sustituye la consulta de participantes: el usuario de cada socket es su
+    sid y solo los de `participants` pertenecen al viaje.
+    """
+    async def session_user_id(sid):
+        return sid
+
+    monkeypatch.setattr(sio_events, "_session_user_id", session_user_id)
+    monkeypatch.setattr(sio_events, "_with_db_session", lambda fn, *args: fn(None, *args))
+    monkeypatch.setattr(sio_events, "is_trip_participant",
+                        lambda session, client_request_id, user_id: user_id in participants)
+
+
+class TestSioRooms:
+
+    def test_area_rooms_around_cover_neighbour_cells(self):
+        rooms = area_rooms_around(4.6500, -74.0600)
+        assert len(set(rooms)) == 9
+        assert area_room(4.6500, -74.0600) in rooms
+        # Un conductor a ~3 km queda en una celda vecina
+        assert area_room(4.6770, -74.0600) in rooms
+
+    def test_trip_events_only_reach_trip_participants(self, monkeypatch):
+        trip_id = uuid4()
+        received = []
+
+        async def send_packet(eio_sid, pkt):
+            received.append(eio_sid)
+
+        async def scenario():
+            original = sio.eio.send_packet
+            sio.eio.send_packet = send_packet
+            sids = []
+            try:
+                for i in range(10):
+                    sid = await sio.manager.connect(f"eio-test-{i}", "/")
+                    await sio.manager.enter_room(sid, "/", user_room(uuid4()))
+                    sids.append(sid)
+                for sid in sids[:2]:
+                    await sio.manager.enter_room(sid, "/", trip_room(trip_id))
+                _fake_trip_access(monkeypatch, set(sids[:2]))
+
+                await update_status_trip(sids[0], {
+                    "id_client_request": str(trip_id),
+                    "status": "ARRIVED",
+                })
+                # Un socket ajeno al viaje no puede emitir en su room
+                await update_status_trip(sids[5], {
+                    "id_client_request": str(trip_id),
+                    "status": "CANCELLED",
+                })
+            finally:
+                sio.eio.send_packet = original
+                for sid in sids:
+                    await sio.manager.disconnect(sid, "/")
+
+        asyncio.run(scenario())
+        assert sorted(received) == ["eio-test-0", "eio-test-1"]
+
+    def test_assignment_requires_client_and_assigned_driver(self, monkeypatch):
+        trip_id = uuid4()
+        joined = []
+
+        async def join_user_to_trip(user_id, client_request_id):
+            joined.append((user_id, client_request_id))
+
+        async def emit(*args, **kwargs):
+            pass
+
+        client, driver, stranger = uuid4(), uuid4(), uuid4()
+        _fake_trip_access(monkeypatch, {client, driver})
+        monkeypatch.setattr(sio_events, "join_user_to_trip", join_user_to_trip)
+        monkeypatch.setattr(sio, "emit", emit)
+
+        async def scenario():
+            # Ni un ajeno puede unir a un conductor, ni el cliente a un ajeno
+            await new_driver_assigned(stranger, {
+                "id_client_request": str(trip_id), "id_driver": str(driver)})
+            await new_driver_assigned(client, {
+                "id_client_request": str(trip_id), "id_driver": str(stranger)})
+            await new_driver_assigned(client, {
+                "id_client_request": str(trip_id), "id_driver": str(driver)})
+
+        asyncio.run(scenario())
+        assert joined == [(driver, trip_id)]
+
+    def test_trip_position_requires_room_and_assigned_driver(self, monkeypatch):
+        trip_id, client_id = uuid4(), uuid4()
+        driver, passenger, stranger = uuid4(), uuid4(), uuid4()
+        sessions = {sid: {"user_id": sid} for sid in (driver, passenger, stranger)}
+        rooms = {driver: [trip_room(trip_id)], passenger: [trip_room(trip_id)], stranger: []}
+        emitted, observed, lookups = [], [], []
+
+        async def get_session(sid):
+            return sessions[sid]
+
+        async def save_session(sid, session):
+            sessions[sid] = session
+
+        async def emit(event, data=None, room=None, **kwargs):
+            emitted.append((event, room))
+
+        def assigned_client(session, client_request_id, user_id):
+            lookups.append(user_id)
+            return client_id if user_id == driver else None
+
+        class Tracker:
+            def observe_driver_position(self, client_request_id, lat, lng):
+                observed.append(client_request_id)
+
+        monkeypatch.setattr(sio, "get_session", get_session)
+        monkeypatch.setattr(sio, "save_session", save_session)
+        monkeypatch.setattr(sio, "rooms", lambda sid: rooms[sid])
+        monkeypatch.setattr(sio, "emit", emit)
+        monkeypatch.setattr(sio_events, "_with_db_session", lambda fn, *args: fn(None, *args))
+        monkeypatch.setattr(sio_events, "get_assigned_trip_client", assigned_client)
+        monkeypatch.setattr("app.services.eta_tracking_service.get_eta_tracker", lambda: Tracker())
+        monkeypatch.setattr("app.services.client_requests_service.evaluate_and_update_trip_state",
+                            lambda session, client_request_id, position: None)
+
+        async def scenario():
+            ping = {"id_client_request": str(trip_id), "id_client": str(uuid4()),
+                    "lat": 4.65, "lng": -74.06}
+            # Fuera del room, o en el room sin ser el conductor: se descarta
+            await trip_change_driver_position(stranger, ping)
+            await trip_change_driver_position(passenger, ping)
+            await update_eta(passenger, {"id_client_request": str(trip_id),
+                                         "distance": 10, "duration": 5})
+            for _ in range(3):
+                await trip_change_driver_position(driver, ping)
+            await change_driver_position(stranger, {"id": str(driver), "lat": 4.65, "lng": -74.06})
+
+        asyncio.run(scenario())
+        # El nombre del evento usa el cliente del viaje, no el del payload
+        assert emitted[:3] == [(f"trip_new_driver_position/{client_id}", trip_room(trip_id))] * 3
+        assert observed == [trip_id] * 3
+        # Una consulta por socket y viaje, no una por ping
+        assert lookups == [passenger, driver]
+        assert emitted[3][0] == "new_driver_position"
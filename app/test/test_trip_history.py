@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from geoalchemy2.shape import from_shape
+from shapely.geometry import Point
+from sqlmodel import Session, select
+
+from app.models.client_request import ClientRequest, StatusEnum
+from app.models.user import User
+from app.services.trip_history_service import get_trip_history
+
+
+class TestTripHistory:
+
+    def test_history_pages_follow_cursor_without_repeating(self, session: Session):
+        client_user = session.exec(select(User)).first()
+        base = datetime(2025, 1, 1, 8, 0)
+        for minutes in range(5):
+            session.add(ClientRequest(
+                id_client=client_user.id,
+                type_service_id=1,
+                status=StatusEnum.PAID,
+                pickup_description="Origen",
+                destination_description="Destino",
+                pickup_position=from_shape(Point(-74.07, 4.71), srid=4326),
+                destination_position=from_shape(Point(-74.10, 4.70), srid=4326),
+                created_at=base + timedelta(minutes=minutes),
+            ))
+        session.commit()
+
+        first = get_trip_history(session, client_user.id, "client", "PAID", limit=2)
+        second = get_trip_history(
+            session, client_user.id, "client", "PAID", limit=2, cursor=first["next_cursor"])
+        third = get_trip_history(
+            session, client_user.id, "client", "PAID", limit=2, cursor=second["next_cursor"])
+
+        pages = first["items"] + second["items"] + third["items"]
+        assert len(pages) == 5
+        assert len({item["id"] for item in pages}) == 5
+        assert third["next_cursor"] is None
+        # Más recientes primero y sin geocodificar: se usa la descripción
+        assert pages[0]["created_at"] > pages[-1]["created_at"]
+        assert pages[0]["pickup_address"] == "Origen"
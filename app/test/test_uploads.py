@@ -0,0 +1,95 @@
+import asyncio
+import hashlib
+import io
+import os
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.core.config import settings
+from app.core.storage import LocalStorageBackend
+from app.services.file_storage_service import ContentStore, set_content_store
+from app.utils.uploads import FileUploader, save_upload_stream, save_upload_stream_sync
+
+
+class CountingFile(io.BytesIO):
+    """
+    Archivo que registra el tamaño de cada lectura.
+    """
+
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.reads.append(len(chunk))
+        return chunk
+
+
+class TestStreamingUploads:
+
+    def test_saves_in_chunks_and_hashes_content(self, tmp_path):
+        data = os.urandom(300 * 1024)
+        source = CountingFile(data)
+        upload = UploadFile(source, filename="soat.pdf")
+        destination = str(tmp_path / "docs" / "soat.pdf")
+
+        saved = asyncio.run(save_upload_stream(
+            upload, destination, max_size=1024 * 1024, chunk_size=64 * 1024))
+
+        assert saved.size == len(data)
+        assert saved.sha256 == hashlib.sha256(data).hexdigest()
+        assert open(destination, "rb").read() == data
+        assert max(source.reads) <= 64 * 1024
+        assert not os.path.exists(destination + ".part")
+
+    def test_rejects_oversized_file_without_reading_it_all(self, tmp_path):
+        source = CountingFile(b"x" * (5 * 1024 * 1024))
+        upload = UploadFile(source, filename="selfie.jpg")
+        destination = str(tmp_path / "selfie.jpg")
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(save_upload_stream(
+                upload, destination, max_size=1024 * 1024, chunk_size=64 * 1024))
+
+        assert exc.value.status_code == 400
+        assert sum(source.reads) <= 1024 * 1024 + 64 * 1024
+        assert not os.path.exists(destination)
+        assert not os.path.exists(destination + ".part")
+
+    def test_rejects_by_declared_size_before_reading(self, tmp_path):
+        source = CountingFile(b"x" * 10)
+        upload = UploadFile(source, filename="license.png", size=20 * 1024 * 1024)
+
+        with pytest.raises(HTTPException):
+            asyncio.run(save_upload_stream(
+                upload, str(tmp_path / "license.png"), max_size=1024 * 1024))
+
+        assert source.reads == []
+
+    def test_sync_version_enforces_limit(self, tmp_path):
+        destination = str(tmp_path / "selfie.jpg")
+
+        saved = save_upload_stream_sync(io.BytesIO(b"abc"), destination, max_size=10)
+        assert saved.size == 3
+
+        with pytest.raises(HTTPException):
+            save_upload_stream_sync(io.BytesIO(b"x" * 20), destination + "2", max_size=10, chunk_size=4)
+        assert not os.path.exists(destination + "2")
+
+
+class TestFileUrls:
+
+    def test_only_content_keys_use_the_storage_backend(self, tmp_path):
+        backend = LocalStorageBackend(root=str(tmp_path), public_url="https://cdn.test/uploads",
+                                      secret="s")
+        set_content_store(ContentStore(backend, staging_dir=str(tmp_path / "tmp")))
+        try:
+            uploader = FileUploader()
+            assert uploader.get_file_url("objects/ab/abc.jpg") == "https://cdn.test/uploads/objects/ab/abc.jpg"
+            # Rutas anteriores al almacenamiento por contenido y datos de ejemplo
+            assert uploader.get_file_url("drivers/7/license/front.jpg") == \
+                f"{settings.STATIC_URL_PREFIX}/drivers/7/license/front.jpg"
+        finally:
+            set_content_store(None)
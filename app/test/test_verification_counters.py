@@ -0,0 +1,118 @@
+from datetime import date, datetime
+
+from sqlmodel import Session, select
+
+from app.models.driver_documents import DriverDocuments, DriverStatus
+from app.models.driver_info import DriverInfo
+from app.models.user import User
+from app.models.user_has_roles import RoleStatus, UserHasRole
+from app.models.verification_counter import (
+    COUNTER_SHARDS,
+    TOTAL_DRIVERS,
+    VerificationCounter,
+    apply_counter_deltas,
+)
+from app.services.verification_counter_service import (
+    count_verification_totals,
+    get_verification_counts,
+    reconcile_verification_counters,
+)
+
+
+class TestVerificationCounters:
+
+    def test_counters_follow_role_and_document_changes(self, session: Session):
+        reconcile_verification_counters(session)
+        before = get_verification_counts(session)
+
+        user = User(full_name="Conductor Contadores", country_code="+57",
+                    phone_number="3209990001", is_verified_phone=True, is_active=True)
+        session.add(user)
+        session.flush()
+        role = UserHasRole(id_user=user.id, id_rol="DRIVER")
+        driver_info = DriverInfo(user_id=user.id, first_name="Conductor",
+                                 last_name="Contadores", birth_date=date(1990, 1, 1))
+        session.add_all([role, driver_info])
+        session.flush()
+        documents = [
+            DriverDocuments(driver_info_id=driver_info.id, document_type_id=document_type_id,
+                            status=DriverStatus.PENDING, created_at=datetime(2020, 1, 1))
+            for document_type_id in (1, 2)
+        ]
+        session.add_all(documents)
+        session.commit()
+
+        counts = get_verification_counts(session)
+        assert counts["total_drivers"] == before["total_drivers"] + 1
+        assert counts["drivers_with_pending_docs"] == before["drivers_with_pending_docs"] + 1
+
+        # Aprobar uno deja al conductor con pendientes; aprobar ambos lo saca
+        documents[0].status = DriverStatus.APPROVED
+        session.commit()
+        assert get_verification_counts(session)["drivers_with_pending_docs"] == \
+            before["drivers_with_pending_docs"] + 1
+        documents[1].status = DriverStatus.APPROVED
+        role.is_verified = True
+        role.status = RoleStatus.APPROVED
+        session.commit()
+
+        counts = get_verification_counts(session)
+        assert counts["drivers_with_pending_docs"] == before["drivers_with_pending_docs"]
+        assert counts["verified_drivers"] == before["verified_drivers"] + 1
+        assert counts["approved_drivers"] == before["approved_drivers"] + 1
+        assert counts == count_verification_totals(session)
+        assert not any(reconcile_verification_counters(session).values())
+
+    def test_driver_with_two_vehicles_counts_once_as_pending(self, session: Session):
+        reconcile_verification_counters(session)
+        before = get_verification_counts(session)["drivers_with_pending_docs"]
+
+        user = User(full_name="Conductor Dos Vehiculos", country_code="+57",
+                    phone_number="3209990002", is_verified_phone=True, is_active=True)
+        session.add(user)
+        session.flush()
+        # Un DriverInfo por vehículo (carro y moto) del mismo usuario
+        driver_infos = [
+            DriverInfo(user_id=user.id, first_name="Conductor",
+                       last_name=f"Vehiculo {index}", birth_date=date(1990, 1, 1))
+            for index in range(2)
+        ]
+        session.add_all(driver_infos)
+        session.flush()
+        documents = [
+            DriverDocuments(driver_info_id=driver_info.id, document_type_id=3,
+                            status=DriverStatus.PENDING, created_at=datetime(2020, 1, 1))
+            for driver_info in driver_infos
+        ]
+        session.add_all(documents)
+        session.commit()
+
+        assert get_verification_counts(session)["drivers_with_pending_docs"] == before + 1
+        assert count_verification_totals(session)["drivers_with_pending_docs"] == before + 1
+
+        # Sigue pendiente mientras le quede un documento por revisar
+        documents[0].status = DriverStatus.APPROVED
+        session.commit()
+        assert get_verification_counts(session)["drivers_with_pending_docs"] == before + 1
+        documents[1].status = DriverStatus.APPROVED
+        session.commit()
+        assert get_verification_counts(session)["drivers_with_pending_docs"] == before
+        assert not any(reconcile_verification_counters(session).values())
+
+    def test_counter_is_the_sum_of_its_shards(self, session: Session):
+        reconcile_verification_counters(session)
+        before = get_verification_counts(session)[TOTAL_DRIVERS]
+
+        # Flushes concurrentes suman en filas distintas del mismo contador
+        for shard in range(COUNTER_SHARDS):
+            apply_counter_deltas(session.connection(), {TOTAL_DRIVERS: 1}, shard=shard)
+        session.commit()
+
+        shards = session.exec(
+            select(VerificationCounter.shard).where(VerificationCounter.name == TOTAL_DRIVERS)).all()
+        assert sorted(shards) == list(range(COUNTER_SHARDS))
+        assert get_verification_counts(session)[TOTAL_DRIVERS] == before + COUNTER_SHARDS
+
+        # Sin conductores nuevos la reconciliación descuenta lo sumado a mano
+        assert reconcile_verification_counters(session)[TOTAL_DRIVERS] == -COUNTER_SHARDS
+        assert get_verification_counts(session)[TOTAL_DRIVERS] == before
@@ -0,0 +1,62 @@
+from datetime import date, datetime, timedelta
+
+from sqlmodel import Session
+
+from app.models.driver_documents import DriverDocuments, DriverStatus
+from app.models.driver_info import DriverInfo
+from app.models.user import User
+from app.models.user_has_roles import RoleStatus, UserHasRole
+from app.services.verify_docs_service import VerifyDocsService
+
+
+def create_pending_driver(session: Session, phone: str, submitted_at: datetime) -> User:
+    user = User(full_name="Conductor Pendiente", country_code="+57",
+                phone_number=phone, is_verified_phone=True, is_active=True)
+    session.add(user)
+    session.flush()
+    session.add(UserHasRole(id_user=user.id, id_rol="DRIVER",
+                            is_verified=False, status=RoleStatus.PENDING))
+    driver_info = DriverInfo(user_id=user.id, first_name="Conductor",
+                             last_name="Pendiente", birth_date=date(1990, 1, 1))
+    session.add(driver_info)
+    session.flush()
+    for document_type_id in (1, 2):
+        session.add(DriverDocuments(
+            driver_info_id=driver_info.id,
+            document_type_id=document_type_id,
+            document_front_url="http://localhost/doc.jpg",
+            status=DriverStatus.PENDING,
+            created_at=submitted_at + timedelta(minutes=document_type_id),
+        ))
+    return user
+
+
+class TestDocumentReviewQueue:
+
+    def test_pending_queue_pages_by_waiting_time(self, session: Session):
+        base = datetime(2020, 1, 1, 8, 0)
+        newest = create_pending_driver(session, "3201110003", base + timedelta(days=2))
+        oldest = create_pending_driver(session, "3201110001", base)
+        middle = create_pending_driver(session, "3201110002", base + timedelta(days=1))
+        session.commit()
+
+        service = VerifyDocsService(session)
+        items, cursor = [], None
+        while True:
+            page = service.get_users_with_pending_docs(limit=2, cursor=cursor)
+            assert len(page.items) <= 2
+            items.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        user_ids = [item.user.id for item in items]
+        assert len(user_ids) == len(set(user_ids))
+        ours = [user_id for user_id in user_ids if user_id in {oldest.id, middle.id, newest.id}]
+        assert ours == [oldest.id, middle.id, newest.id]
+        # Más tiempo esperando primero
+        assert [item.waiting_since for item in items] == sorted(item.waiting_since for item in items)
+        first = next(item for item in items if item.user.id == oldest.id)
+        assert first.waiting_since == base + timedelta(minutes=1)
+        assert len(first.documents) == 2
+        assert all(doc.status == DriverStatus.PENDING for doc in first.documents)
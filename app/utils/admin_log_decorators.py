@@ -7,6 +7,9 @@ from app.models.admin_log import AdminActionType, LogSeverity
 from app.core.db import SessionDep
 from app.core.dependencies.admin_auth import get_current_admin_user
 import json
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def log_withdrawal_approval():
@@ -60,7 +63,8 @@ def log_withdrawal_approval():
 
             except Exception as e:
                 # No fallar la función principal si el logging falla
-                print(f"Error al loggear aprobación de retiro: {str(e)}")
+                logger.error(
+                    "Error al loggear aprobación de retiro: %s", str(e))
 
             return result
 
@@ -113,7 +117,7 @@ def log_withdrawal_rejection():
                 )
 
             except Exception as e:
-                print(f"Error al loggear rechazo de retiro: {str(e)}")
+                logger.error("Error al loggear rechazo de retiro: %s", str(e))
 
             return result
 
@@ -176,7 +180,7 @@ def log_balance_adjustment():
                 )
 
             except Exception as e:
-                print(f"Error al loggear ajuste de balance: {str(e)}")
+                logger.error("Error al loggear ajuste de balance: %s", str(e))
 
             return result
 
@@ -238,8 +242,8 @@ def log_project_settings_update():
                 )
 
             except Exception as e:
-                print(
-                    f"Error al loggear actualización de configuraciones: {str(e)}")
+                logger.error(
+                    "Error al loggear actualización de configuraciones: %s", str(e))
 
             return result
 
@@ -287,7 +291,8 @@ def log_admin_password_change():
                 )
 
             except Exception as e:
-                print(f"Error al loggear cambio de contraseña: {str(e)}")
+                logger.error(
+                    "Error al loggear cambio de contraseña: %s", str(e))
 
             return result
 
@@ -340,7 +345,8 @@ def log_driver_force_approval():
                 )
 
             except Exception as e:
-                print(f"Error al loggear aprobación de conductor: {str(e)}")
+                logger.error(
+                    "Error al loggear aprobación de conductor: %s", str(e))
 
             return result
 
@@ -397,7 +403,8 @@ def log_document_verification():
                 )
 
             except Exception as e:
-                print(f"Error al loggear verificación de documento: {str(e)}")
+                logger.error(
+                    "Error al loggear verificación de documento: %s", str(e))
 
             return result
 
@@ -450,7 +457,8 @@ def log_user_suspension():
                 )
 
             except Exception as e:
-                print(f"Error al loggear suspensión de usuario: {str(e)}")
+                logger.error(
+                    "Error al loggear suspensión de usuario: %s", str(e))
 
             return result
 
@@ -503,7 +511,8 @@ def log_user_activation():
                 )
 
             except Exception as e:
-                print(f"Error al loggear activación de usuario: {str(e)}")
+                logger.error(
+                    "Error al loggear activación de usuario: %s", str(e))
 
             return result
 
@@ -563,7 +572,8 @@ def log_transaction_approval():
 
             except Exception as e:
                 # No fallar la función principal si el logging falla
-                print(f"Error al loggear aprobación de transacción: {str(e)}")
+                logger.error(
+                    "Error al loggear aprobación de transacción: %s", str(e))
 
             return result
 
@@ -615,7 +625,7 @@ def log_critical_action(action_type: AdminActionType, resource_type: str):
                 )
 
             except Exception as e:
-                print(f"Error al loggear acción crítica: {str(e)}")
+                logger.error("Error al loggear acción crítica: %s", str(e))
 
             return result
 
@@ -678,7 +688,8 @@ def log_with_details(
                 )
 
             except Exception as e:
-                print(f"Error al loggear acción con detalles: {str(e)}")
+                logger.error(
+                    "Error al loggear acción con detalles: %s", str(e))
 
             return result
 
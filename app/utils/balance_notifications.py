@@ -1,5 +1,8 @@
 from sqlmodel import Session
 from app.models.user import User
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def check_and_notify_low_balance(session: Session, user_id: int, balance: int):
@@ -20,5 +23,5 @@ def check_and_notify_low_balance(session: Session, user_id: int, balance: int):
                 "Recarga para poder seguir usando el servicio."
             )
             # En producción, reemplazar este print por la llamada real a tu API de WhatsApp.
-            print(
-                f"[WHATSAPP] Enviando a {user.country_code}{user.phone_number}: {message}")
+            logger.debug(
+                "[WHATSAPP] Enviando a %s%s: %s", user.country_code, user.phone_number, message)
@@ -1,3 +1,7 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
 def wkb_to_coords(wkb):
     """
     Convierte un campo WKBElement a un diccionario con latitud y longitud.
@@ -14,6 +18,6 @@ def wkb_to_coords(wkb):
         point = to_shape(wkb)
         return {"lat": point.y, "lng": point.x}
     except Exception as e:
-        print("[ERROR] wkb_to_coords:", e)
-        print(traceback.format_exc())
+        logger.error("[ERROR] wkb_to_coords: %s", e)
+        logger.error("Traceback:", exc_info=True)
         return None
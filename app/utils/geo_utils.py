@@ -1,8 +1,11 @@
 from geoalchemy2.shape import to_shape
 import requests
-from typing import Optional
+from typing import List, Optional, Tuple
 from app.core.config import settings
 import math
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def wkb_to_coords(wkb):
@@ -42,15 +45,15 @@ def get_address_from_coords(lat: float, lng: float) -> Optional[str]:
         if data.get("status") == "OK" and data.get("results"):
             return data["results"][0].get("formatted_address")
         else:
-            print(
-                f"Error de Geocoding API: {data.get('status')}, {data.get('error_message')}")
+            logger.error(
+                "Error de Geocoding API: %s, %s", data.get('status'), data.get('error_message'))
             return "Dirección no encontrada"
 
     except requests.exceptions.RequestException as e:
-        print(f"Error de red al consultar Google Geocoding API: {e}")
+        logger.error("Error de red al consultar Google Geocoding API: %s", e)
         return "Error al obtener dirección"
     except Exception as e:
-        print(f"Error inesperado en get_address_from_coords: {e}")
+        logger.error("Error inesperado en get_address_from_coords: %s", e)
         return "Error al procesar dirección"
 
 
@@ -67,44 +70,92 @@ def get_time_and_distance_from_google(origin_lat, origin_lng, destination_lat, d
         "key": settings.GOOGLE_API_KEY
     }
 
-    print(f"🔍 DEBUG GOOGLE API: Consultando Distance Matrix")
-    print(f"🔍 DEBUG GOOGLE API: Origen: {origin_lat}, {origin_lng}")
-    print(f"🔍 DEBUG GOOGLE API: Destino: {destination_lat}, {destination_lng}")
-    print(f"🔍 DEBUG GOOGLE API: URL: {url}")
-    print(
-        f"🔍 DEBUG GOOGLE API: API Key configurada: {'Sí' if settings.GOOGLE_API_KEY else 'No'}")
+    logger.debug("🔍 DEBUG GOOGLE API: Consultando Distance Matrix")
+    logger.debug("🔍 DEBUG GOOGLE API: Origen: %s, %s", origin_lat, origin_lng)
+    logger.debug(
+        "🔍 DEBUG GOOGLE API: Destino: %s, %s", destination_lat, destination_lng)
+    logger.debug("🔍 DEBUG GOOGLE API: URL: %s", url)
+    logger.debug(
+        "🔍 DEBUG GOOGLE API: API Key configurada: %s", 'Sí' if settings.GOOGLE_API_KEY else 'No')
 
     try:
         response = requests.get(url, params=params)
-        print(f"🔍 DEBUG GOOGLE API: Status Code: {response.status_code}")
+        logger.debug(
+            "🔍 DEBUG GOOGLE API: Status Code: %s", response.status_code)
 
         response.raise_for_status()
         data = response.json()
-        print(f"🔍 DEBUG GOOGLE API: Respuesta: {data}")
+        logger.debug("🔍 DEBUG GOOGLE API: Respuesta: %s", data)
 
         if data.get("status") == "OK" and data["rows"][0]["elements"][0]["status"] == "OK":
             distance = data["rows"][0]["elements"][0]["distance"]["value"]
             duration = data["rows"][0]["elements"][0]["duration"]["value"]
-            print(
-                f"✅ DEBUG GOOGLE API: Distancia: {distance}m, Duración: {duration}s")
+            logger.debug(
+                "✅ DEBUG GOOGLE API: Distancia: %sm, Duración: %ss", distance, duration)
             return distance, duration
         else:
-            print(
-                f"❌ DEBUG GOOGLE API: Error en respuesta - Status: {data.get('status')}")
-            print(
-                f"❌ DEBUG GOOGLE API: Error message: {data.get('error_message', 'No disponible')}")
+            logger.warning(
+                "❌ DEBUG GOOGLE API: Error en respuesta - Status: %s", data.get('status'))
+            logger.warning(
+                "❌ DEBUG GOOGLE API: Error message: %s", data.get('error_message', 'No disponible'))
             if data.get("rows") and data["rows"][0].get("elements"):
                 element_status = data["rows"][0]["elements"][0].get("status")
-                print(f"❌ DEBUG GOOGLE API: Element status: {element_status}")
+                logger.warning(
+                    "❌ DEBUG GOOGLE API: Element status: %s", element_status)
             return None, None
     except requests.exceptions.RequestException as e:
-        print(f"❌ DEBUG GOOGLE API: Error de red: {e}")
+        logger.warning("❌ DEBUG GOOGLE API: Error de red: %s", e)
         return None, None
     except Exception as e:
-        print(f"❌ DEBUG GOOGLE API: Error inesperado: {e}")
+        logger.warning("❌ DEBUG GOOGLE API: Error inesperado: %s", e)
         return None, None
 
 
+# Distance Matrix acepta hasta 25 orígenes por solicitud
+DISTANCE_MATRIX_MAX_ORIGINS = 25
+
+
+def get_times_and_distances_from_google(origins: List[Tuple[float, float]], destination_lat, destination_lng) -> List[Tuple[Optional[int], Optional[int]]]:
+    """
+    Igual que get_time_and_distance_from_google pero con varios orígenes hacia
+    un mismo destino: una sola llamada a Distance Matrix por cada 25 orígenes.
+    Retorna una lista (distancia_en_metros, duracion_en_segundos) alineada con
+    `origins`; (None, None) en los orígenes que fallen.
+    """
+    results: List[Tuple[Optional[int], Optional[int]]] = []
+    url = "https://maps.googleapis.com/maps/api/distancematrix/json"
+
+    for start in range(0, len(origins), DISTANCE_MATRIX_MAX_ORIGINS):
+        chunk = origins[start:start + DISTANCE_MATRIX_MAX_ORIGINS]
+        params = {
+            "origins": "|".join(f"{lat},{lng}" for lat, lng in chunk),
+            "destinations": f"{destination_lat},{destination_lng}",
+            "units": "metric",
+            "key": settings.GOOGLE_API_KEY
+        }
+        chunk_results = [(None, None)] * len(chunk)
+        try:
+            response = requests.get(url, params=params)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("status") == "OK":
+                for index, row in enumerate(data.get("rows", [])[:len(chunk)]):
+                    element = row["elements"][0]
+                    if element.get("status") == "OK":
+                        chunk_results[index] = (
+                            element["distance"]["value"], element["duration"]["value"])
+            else:
+                logger.warning(
+                    "Distance Matrix respondió %s: %s", data.get('status'), data.get('error_message', 'No disponible'))
+        except requests.exceptions.RequestException as e:
+            logger.warning("Error de red consultando Distance Matrix: %s", e)
+        except Exception as e:
+            logger.warning("Error inesperado consultando Distance Matrix: %s", e)
+        results.extend(chunk_results)
+
+    return results
+
+
 def get_distance_meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
     """
     Calcula la distancia en metros entre dos puntos geográficos usando la fórmula de Haversine.
@@ -120,6 +120,19 @@ class NotificationTemplates:
             }
         }
 
+    @staticmethod
+    def new_request_nearby(request_id: UUID, pickup_address: str, destination_address: str, fare: float) -> Dict[str, Any]:
+        """Notificación a conductores cercanos cuando se crea una nueva solicitud."""
+        return {
+            "title": "¡Nueva solicitud cerca de ti!",
+            "body": f"Viaje de {pickup_address} a {destination_address} por ${fare:,.0f}",
+            "data": {
+                "type": "new_request_nearby",
+                "request_id": str(request_id),
+                "action": "view_request"
+            }
+        }
+
     @staticmethod
     def trip_cancelled_by_client(request_id: UUID) -> Dict[str, Any]:
         """Notificación cuando el cliente cancela el viaje."""
@@ -0,0 +1,28 @@
+from fastapi import HTTPException
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+import base64
+import json
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """
+    Cursor opaco para paginación por llave (keyset) sobre (created_at, id).
+    """
+    raw = json.dumps([created_at.isoformat(), str(row_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, UUID]]:
+    """
+    Inverso de encode_cursor. Lanza HTTPException 400 si el cursor no es válido.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail="Cursor inválido") from e
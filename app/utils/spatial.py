@@ -0,0 +1,57 @@
+from sqlalchemy import Index, cast, func, text
+from geoalchemy2 import Geography
+
+# Las columnas POINT se guardan como geometry SRID 4326 (grados). Las
+# distancias y radios se calculan sobre geography para trabajar en metros.
+SRID = 4326
+
+
+def make_point(lat: float, lng: float):
+    """
+    Construye un punto PostGIS (SRID 4326) con lat/lng como parámetros
+    enlazados, en lugar de interpolarlos en un texto WKT.
+    """
+    return func.ST_SetSRID(func.ST_MakePoint(lng, lat), SRID)
+
+
+def as_geography(expression):
+    """
+    Convierte una expresión geometry a geography (`CAST(x AS geography)`),
+    la misma expresión de los índices GiST creados por geography_index().
+    """
+    return cast(expression, Geography(geometry_type=None))
+
+
+def distance_meters(column, point):
+    """
+    Distancia geodésica en metros entre una columna POINT y un punto.
+    """
+    return func.ST_Distance(as_geography(column), as_geography(point))
+
+
+def within_meters(column, point, meters: float):
+    """
+    Filtro de radio en metros con ST_DWithin sobre geography. A diferencia de
+    `ST_Distance(...) < radio`, puede resolverse con el índice GiST.
+    """
+    return func.ST_DWithin(as_geography(column), as_geography(point), meters)
+
+
+def knn_order(column, point):
+    """
+    Orden por cercanía con el operador KNN `<->`, resuelto por el índice GiST
+    (recorrido del árbol en orden de distancia, sin ordenar todas las filas).
+    """
+    return as_geography(column).op("<->")(as_geography(point))
+
+
+def geography_index(table_name: str, column_name: str) -> Index:
+    """
+    Índice GiST de expresión sobre `column::geography`, usado por
+    within_meters() y knn_order(). Solo se crea en PostgreSQL.
+    """
+    return Index(
+        f"idx_{table_name}_{column_name}_geog",
+        text(f"({column_name}::geography)"),
+        postgresql_using="gist",
+    ).ddl_if(dialect="postgresql")
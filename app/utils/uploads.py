@@ -1,11 +1,163 @@
+import asyncio
+import hashlib
+import logging
 import os
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from fastapi import UploadFile
-from typing import Optional
+from fastapi import HTTPException, UploadFile
+from typing import BinaryIO, Optional
 from pathlib import Path
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+
+
+@dataclass
+class SavedUpload:
+    path: str
+    size: int
+    sha256: str
+
+
+def _too_large(max_size: int) -> HTTPException:
+    return HTTPException(
+        status_code=400,
+        detail=f"El archivo es demasiado grande. Máximo permitido: {max_size // (1024*1024)}MB"
+    )
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload_stream(
+    file: UploadFile,
+    destination: str,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> SavedUpload:
+    """
+    Guarda el archivo por bloques: lee `chunk_size` bytes a la vez, calcula el
+    SHA-256 sobre la marcha y escribe en el threadpool, así que la memoria por
+    subida queda acotada al bloque y el event loop no se bloquea con el disco.
+
+    Si el tamaño declarado o el leído supera `max_size` responde 400 sin
+    terminar de leer. Escribe en `destination.part` y renombra al final: nunca
+    queda un archivo a medias con el nombre definitivo.
+    """
+    max_size = max_size or settings.UPLOAD_MAX_FILE_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    if file.size is not None and file.size > max_size:
+        raise _too_large(max_size)
+
+    Path(destination).parent.mkdir(parents=True, exist_ok=True)
+    partial = f"{destination}.part"
+    digest = hashlib.sha256()
+    size = 0
+    out = await asyncio.to_thread(open, partial, "wb")
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_size:
+                raise _too_large(max_size)
+            digest.update(chunk)
+            await asyncio.to_thread(out.write, chunk)
+        await asyncio.to_thread(out.close)
+        await asyncio.to_thread(os.replace, partial, destination)
+    except BaseException:
+        out.close()
+        _remove_quietly(partial)
+        raise
+    return SavedUpload(destination, size, digest.hexdigest())
+
+
+def save_upload_stream_sync(
+    source: BinaryIO,
+    destination: str,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> SavedUpload:
+    """
+    Versión síncrona de save_upload_stream para handlers que ya corren en el
+    threadpool (recibe `upload.file`).
+    """
+    max_size = max_size or settings.UPLOAD_MAX_FILE_SIZE
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+    Path(destination).parent.mkdir(parents=True, exist_ok=True)
+    partial = f"{destination}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial, "wb") as out:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise _too_large(max_size)
+                digest.update(chunk)
+                out.write(chunk)
+        os.replace(partial, destination)
+    except BaseException:
+        _remove_quietly(partial)
+        raise
+    return SavedUpload(destination, size, digest.hexdigest())
+
+
+def thumbnail_path(path: str) -> str:
+    stem, _ = os.path.splitext(path)
+    return f"{stem}_thumb.jpg"
+
+
+def create_thumbnail(path: str, max_px: Optional[int] = None) -> Optional[str]:
+    """
+    Genera una miniatura JPEG comprimida junto a la imagen (`*_thumb.jpg`).
+    Requiere Pillow; sin él, o si el archivo no es una imagen, no hace nada.
+    """
+    if os.path.splitext(path)[1].lower() not in IMAGE_EXTENSIONS:
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        logger.debug("Pillow no está instalado: no se generan miniaturas")
+        return None
+    max_px = max_px or settings.UPLOAD_THUMBNAIL_MAX_PX
+    target = thumbnail_path(path)
+    with Image.open(path) as image:
+        image.thumbnail((max_px, max_px))
+        image.convert("RGB").save(target, "JPEG", quality=80, optimize=True)
+    return target
+
+
+def schedule_thumbnail(path: str) -> None:
+    """
+    Encola la miniatura en el threadpool sin esperar el resultado
+    (UPLOAD_THUMBNAILS_ENABLED).
+    """
+    if not settings.UPLOAD_THUMBNAILS_ENABLED:
+        return
+
+    def run():
+        try:
+            create_thumbnail(path)
+        except Exception as e:
+            logger.warning("No se pudo generar la miniatura de %s: %s", path, e)
+
+    try:
+        asyncio.get_running_loop().run_in_executor(None, run)
+    except RuntimeError:
+        run()
+
 
 class FileUploader:
     def __init__(self, base_path: str = "static/uploads"):
@@ -35,7 +187,7 @@ class FileUploader:
         subfolder: Optional[str] = None
     ) -> str:
         """
-        Guarda un documento del conductor manteniendo un historial de versiones.
+        Guarda un documento del conductor en el almacenamiento por contenido.
 
         Args:
             file: Archivo a subir
@@ -46,30 +198,24 @@ class FileUploader:
         Returns:
             str: URL relativa del archivo guardado
         """
-        # Crear estructura de directorios
-        driver_path = self._get_driver_path(driver_id)
-        document_path = os.path.join(driver_path, document_type)
-        if subfolder:
-            document_path = os.path.join(document_path, subfolder)
-
-        # Asegurar que los directorios existan
-        Path(document_path).mkdir(parents=True, exist_ok=True)
-
-        # Generar nombre único para el archivo
-        filename = self._generate_unique_filename(file.filename)
-        file_path = os.path.join(document_path, filename)
+        # Se guarda por contenido: un documento idéntico reutiliza el archivo
+        from app.services.file_storage_service import get_content_store
+        stored = await get_content_store().put_upload(file)
 
-        # Guardar el archivo
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-
-        # Retornar la URL relativa
-        return os.path.relpath(file_path, self.base_path)
+        # Retornar la llave (ruta relativa) del archivo
+        return stored.key
 
     def get_file_url(self, relative_path: str) -> str:
-        """Convierte una ruta relativa en una URL absoluta usando el prefijo de settings"""
-        return f"{settings.STATIC_URL_PREFIX}/{relative_path.replace(os.sep, '/')}"
+        """
+        Convierte una ruta relativa en una URL absoluta: las llaves del
+        almacenamiento por contenido (objects/...) usan su backend y las rutas
+        anteriores (drivers/..., datos de ejemplo) el prefijo de settings.
+        """
+        path = relative_path.replace(os.sep, '/')
+        if path.startswith("objects/"):
+            from app.services.file_storage_service import get_content_store
+            return get_content_store().url_for(path)
+        return f"{settings.STATIC_URL_PREFIX}/{path}"
 
 
 # Instancia global del uploader